@@ -32,6 +32,8 @@ from core.database import Base, _resolve_database_url
 
 _proj = pathlib.Path(__file__).resolve().parent.parent
 _model_files = {
+    "core.analytics_models": _proj / "src" / "core" / "analytics_models.py",
+    "core.leader_models": _proj / "src" / "core" / "leader_models.py",
     "core.rate_limit_models": _proj / "src" / "core" / "rate_limit_models.py",
     "zenith_admin_bot.models": _proj / "src" / "zenith_admin_bot" / "models.py",
     "zenith_ai_bot.models": _proj / "src" / "zenith_ai_bot" / "models.py",
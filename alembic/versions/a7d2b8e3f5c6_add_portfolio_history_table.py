@@ -0,0 +1,43 @@
+"""add portfolio history table
+
+Revision ID: a7d2b8e3f5c6
+Revises: f6c1a7d2e4b5
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "a7d2b8e3f5c6"
+down_revision: str | Sequence[str] | None = "f6c1a7d2e4b5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "crypto_portfolio_history" not in tables:
+        op.create_table(
+            "crypto_portfolio_history",
+            sa.Column("user_id", sa.BigInteger(), primary_key=True),
+            sa.Column("taken_at", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("value", sa.Float(), nullable=False),
+            sa.Column("cost", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_crypto_portfolio_history_taken_at", "crypto_portfolio_history", ["taken_at"])
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "crypto_portfolio_history" in tables:
+        op.drop_table("crypto_portfolio_history")
@@ -0,0 +1,39 @@
+"""add leader_leases table
+
+Revision ID: c3c7c3d0f66f
+Revises: b2b6b2cfe76e
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "c3c7c3d0f66f"
+down_revision: str | Sequence[str] | None = "b2b6b2cfe76e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if "leader_leases" not in inspector.get_table_names():
+        op.create_table(
+            "leader_leases",
+            sa.Column("name", sa.String(100), primary_key=True),
+            sa.Column("holder", sa.String(200), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if "leader_leases" in inspector.get_table_names():
+        op.drop_table("leader_leases")
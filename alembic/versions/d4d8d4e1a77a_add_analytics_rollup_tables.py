@@ -0,0 +1,92 @@
+"""add analytics rollup tables
+
+Revision ID: d4d8d4e1a77a
+Revises: c3c7c3d0f66f
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "d4d8d4e1a77a"
+down_revision: str | Sequence[str] | None = "c3c7c3d0f66f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "zenith_moderation_daily" not in tables:
+        op.create_table(
+            "zenith_moderation_daily",
+            sa.Column("chat_id", sa.BigInteger(), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("action", sa.String(50), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        )
+        # Seed from whatever the 7-day log still holds
+        op.execute(
+            "INSERT INTO zenith_moderation_daily (chat_id, day, action, count) "
+            "SELECT chat_id, CAST(created_at AS DATE), action, COUNT(*) FROM zenith_moderation_log "
+            "WHERE created_at IS NOT NULL GROUP BY chat_id, CAST(created_at AS DATE), action"
+        )
+
+    if "zenith_moderation_violators_daily" not in tables:
+        op.create_table(
+            "zenith_moderation_violators_daily",
+            sa.Column("chat_id", sa.BigInteger(), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("user_id", sa.BigInteger(), primary_key=True),
+            sa.Column("username", sa.String(100), nullable=True),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.execute(
+            "INSERT INTO zenith_moderation_violators_daily (chat_id, day, user_id, username, count) "
+            "SELECT chat_id, CAST(created_at AS DATE), user_id, MAX(username), COUNT(*) FROM zenith_moderation_log "
+            "WHERE created_at IS NOT NULL GROUP BY chat_id, CAST(created_at AS DATE), user_id"
+        )
+
+    if "subscription_daily_stats" not in tables:
+        op.create_table(
+            "subscription_daily_stats",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("product", sa.String(20), primary_key=True),
+            sa.Column("keys_generated", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("keys_redeemed", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("users", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("subscriptions", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("active_subscriptions", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("expiring_soon", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("activation_keys", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("snapshot_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        # Rebuild per-day key counters from the key tables so revenue totals keep their history
+        for product, key_table in (("crypto", "crypto_activation_keys"), ("group", "group_activation_keys")):
+            if key_table not in tables:
+                continue
+            op.execute(
+                "INSERT INTO subscription_daily_stats (day, product, keys_generated, keys_redeemed) "
+                f"SELECT day, '{product}', SUM(generated), SUM(redeemed) FROM ("
+                f"  SELECT CAST(created_at AS DATE) AS day, 1 AS generated, 0 AS redeemed FROM {key_table} "
+                "   WHERE created_at IS NOT NULL"
+                "  UNION ALL"
+                f"  SELECT CAST(used_at AS DATE), 0, 1 FROM {key_table} WHERE is_used AND used_at IS NOT NULL"
+                ") AS key_events GROUP BY day"
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for table in ("subscription_daily_stats", "zenith_moderation_violators_daily", "zenith_moderation_daily"):
+        if table in tables:
+            op.drop_table(table)
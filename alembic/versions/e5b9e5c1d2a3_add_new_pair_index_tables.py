@@ -0,0 +1,55 @@
+"""add new pair index tables
+
+Revision ID: e5b9e5c1d2a3
+Revises: d4d8d4e1a77a
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "e5b9e5c1d2a3"
+down_revision: str | Sequence[str] | None = "d4d8d4e1a77a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "crypto_new_pairs" not in tables:
+        op.create_table(
+            "crypto_new_pairs",
+            sa.Column("pair", sa.String(42), primary_key=True),
+            sa.Column("token0", sa.String(42), nullable=False),
+            sa.Column("token1", sa.String(42), nullable=False),
+            sa.Column("block", sa.BigInteger(), nullable=False),
+            sa.Column("tx_hash", sa.String(66), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_crypto_new_pairs_block", "crypto_new_pairs", ["block"])
+        op.create_index("ix_crypto_new_pairs_created_at", "crypto_new_pairs", ["created_at"])
+
+    if "crypto_indexer_cursors" not in tables:
+        op.create_table(
+            "crypto_indexer_cursors",
+            sa.Column("name", sa.String(50), primary_key=True),
+            sa.Column("block", sa.BigInteger(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for table in ("crypto_indexer_cursors", "crypto_new_pairs"):
+        if table in tables:
+            op.drop_table(table)
@@ -0,0 +1,43 @@
+"""add token security table
+
+Revision ID: f6c1a7d2e4b5
+Revises: e5b9e5c1d2a3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "f6c1a7d2e4b5"
+down_revision: str | Sequence[str] | None = "e5b9e5c1d2a3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "crypto_token_security" not in tables:
+        op.create_table(
+            "crypto_token_security",
+            sa.Column("chain_id", sa.String(10), primary_key=True),
+            sa.Column("contract", sa.String(42), primary_key=True),
+            sa.Column("data", sa.JSON(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index("ix_crypto_token_security_fetched_at", "crypto_token_security", ["fetched_at"])
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    if "crypto_token_security" in tables:
+        op.drop_table("crypto_token_security")
@@ -0,0 +1 @@
+"""Hot-path benchmarks with stored baselines. Run ``python -m benchmarks --help``."""
@@ -0,0 +1,75 @@
+"""
+Run the hot-path benchmarks and compare them with ``benchmarks/baseline.json``.
+
+    python -m benchmarks                   # run everything, fail on regressions
+    python -m benchmarks -k filters        # only cases whose name contains "filters"
+    python -m benchmarks --save            # record the current numbers as the baseline
+
+The exit status is 1 when any case's normalized throughput drops more than
+``--threshold`` (default 30%) below its baseline. Benchmarks always run
+against an in-memory SQLite database, never the configured DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite://"
+os.environ.setdefault("WEBHOOK_SECRET", "bench-secret")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from benchmarks import bench_filters, bench_gateway, bench_rendering, bench_repos  # noqa: E402, F401
+from benchmarks.harness import (  # noqa: E402
+    BASELINE_PATH,
+    DEFAULT_MIN_TIME,
+    DEFAULT_ROUNDS,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    get_cases,
+    load_baseline,
+    run_cases,
+    save_baseline,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Hot-path benchmarks")
+    parser.add_argument("-k", dest="pattern", default="", help="only run cases whose name contains this")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown (0.3 = 30%%)")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="seconds per timing round")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    cases = get_cases(args.pattern)
+    if not cases:
+        print(f"No benchmark matches {args.pattern!r}")
+        return 1
+
+    print(f"Running {len(cases)} benchmarks")
+    score, results = asyncio.run(run_cases(cases, args.min_time, args.rounds))
+
+    if args.save:
+        save_baseline(score, results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("No baseline recorded yet, run with --save to create one")
+        return 0
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression.name}: {regression.change:+.0%} normalized throughput vs baseline")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
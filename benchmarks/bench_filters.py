@@ -0,0 +1,33 @@
+"""Group moderation filters run on every group message."""
+
+from benchmarks.corpus import chat_messages, custom_words
+from benchmarks.harness import bench
+from zenith_group_bot.filters import _pattern_cache, build_abuse_pattern, scan_for_abuse, scan_for_spam
+
+MESSAGES = chat_messages(1000)
+CUSTOM_50 = custom_words(50)
+CUSTOM_500 = custom_words(500)
+
+
+@bench("filters.scan_for_abuse", ops=len(MESSAGES))
+def scan_abuse_default():
+    for text in MESSAGES:
+        scan_for_abuse(text)
+
+
+@bench("filters.scan_for_abuse.custom_50", ops=len(MESSAGES))
+def scan_abuse_custom():
+    for text in MESSAGES:
+        scan_for_abuse(text, CUSTOM_50)
+
+
+@bench("filters.scan_for_spam", ops=len(MESSAGES))
+def scan_spam():
+    for text in MESSAGES:
+        scan_for_spam(text)
+
+
+@bench("filters.build_abuse_pattern.custom_500")
+def build_pattern_cold():
+    _pattern_cache.clear()
+    build_abuse_pattern(CUSTOM_500)
@@ -0,0 +1,70 @@
+"""Update ingress: webhook, parsing, validation and rate limiting."""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from telegram import Update
+
+from benchmarks.corpus import update_payloads
+from benchmarks.harness import bench
+from core.config import WEBHOOK_SECRET
+from core.database import init_db
+from core.gateway import TelegramRequestValidator
+from core.rate_limiter import SlidingWindowLimiter
+from core.webhook_router import register_bot_webhook
+from core.webhook_router import router as webhook_router
+
+PAYLOADS = update_payloads(500)
+UPDATES = [Update.de_json(payload, None) for payload in PAYLOADS]
+WEBHOOK_BATCH = 50
+LIMITER_USERS = 10_000
+
+_limiter = SlidingWindowLimiter()
+_bench_bot = SimpleNamespace(bot=None, update_queue=asyncio.Queue())
+_update_ids = itertools.count(1_000_000)
+_client: AsyncClient | None = None
+
+
+@bench("telegram.update_de_json", ops=len(PAYLOADS))
+def parse_updates():
+    for payload in PAYLOADS:
+        Update.de_json(payload, None)
+
+
+@bench("gateway.validate_update", ops=len(UPDATES))
+def validate_updates():
+    for update in UPDATES:
+        TelegramRequestValidator.validate_update(update)
+
+
+async def _webhook_setup():
+    global _client
+    app = FastAPI()
+    app.include_router(webhook_router)
+    register_bot_webhook("bench", _bench_bot)
+    _client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+@bench("webhook.asgi_roundtrip", ops=WEBHOOK_BATCH, setup=_webhook_setup)
+async def webhook_roundtrip():
+    for payload in PAYLOADS[:WEBHOOK_BATCH]:
+        body = {**payload, "update_id": next(_update_ids)}
+        await _client.post(f"/webhook/bench/{WEBHOOK_SECRET}", json=body)
+    queue = _bench_bot.update_queue
+    while not queue.empty():
+        queue.get_nowait()
+
+
+async def _limiter_setup():
+    await init_db()
+    # Pays the one-off rehydrate from the DB outside the timed rounds
+    await _limiter.check(0, "bench", 30, 60)
+
+
+@bench("rate_limiter.check.10k_users", ops=LIMITER_USERS, setup=_limiter_setup)
+async def limiter_check():
+    for user_id in range(LIMITER_USERS):
+        await _limiter.check(user_id, "bench", 30, 60)
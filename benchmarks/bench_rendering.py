@@ -0,0 +1,24 @@
+"""Output rendering: LLM answer sanitizing and PnL images."""
+
+from benchmarks.corpus import llm_output
+from benchmarks.harness import bench
+from zenith_ai_bot.utils import sanitize_telegram_html
+
+LLM_OUTPUT = llm_output()
+
+
+@bench("ai.sanitize_telegram_html.long")
+def sanitize_long_output():
+    sanitize_telegram_html(LLM_OUTPUT)
+
+
+try:
+    from zenith_crypto_bot.pnl_card import generate_pnl_card
+except ImportError:  # Pillow is only in requirements.txt
+    generate_pnl_card = None
+
+if generate_pnl_card is not None:
+
+    @bench("crypto.generate_pnl_card")
+    def render_pnl_card():
+        generate_pnl_card("ETH", 42.5, 1234.56)
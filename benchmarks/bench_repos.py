@@ -0,0 +1,41 @@
+"""Repository calls against SQLite: hot reads, an idempotent register and a rollup upsert."""
+
+from benchmarks.harness import bench
+from core.database import init_db
+from zenith_crypto_bot.repository import CryptoSubscriptionRepo, PriceAlertRepo
+from zenith_group_bot.repository import AuditLogRepo
+
+USERS = range(50_000, 50_100)
+
+
+_seeded = False
+
+
+async def _seed_users():
+    global _seeded
+    if _seeded:
+        return
+    _seeded = True
+    await init_db()
+    for user_id in USERS:
+        await CryptoSubscriptionRepo.register_user(user_id)
+        if user_id % 2:
+            await PriceAlertRepo.create_alert(user_id, "ethereum", "ETH", 5000.0, "above")
+
+
+@bench("repo.alerts.get_user_alerts", ops=len(USERS), setup=_seed_users)
+async def read_user_alerts():
+    for user_id in USERS:
+        await PriceAlertRepo.get_user_alerts(user_id)
+
+
+@bench("repo.crypto.register_user.existing", ops=len(USERS), setup=_seed_users)
+async def register_existing_users():
+    for user_id in USERS:
+        await CryptoSubscriptionRepo.register_user(user_id)
+
+
+@bench("repo.group.log_action", ops=20, setup=init_db)
+async def log_moderation_actions():
+    for i in range(20):
+        await AuditLogRepo.log_action(-100_777, 60_000 + i % 5, "bench", "DELETED", "spam")
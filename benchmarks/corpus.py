@@ -0,0 +1,81 @@
+"""Deterministic inputs shaped like production traffic (seeded, so every run sees the same data)."""
+
+import random
+from datetime import UTC, datetime
+
+from zenith_group_bot.word_list import BANNED_WORDS, SPAM_DOMAINS
+
+_SEED = 1337
+
+_CHAT_WORDS = (
+    "gm anyone watching eth today the chart looks ready for a breakout soon i think we retest support first "
+    "what do you think about the new listing wen airdrop devs are building bullish on this team lfg "
+    "can an admin check the pinned post thanks for the update see you at the ama later tonight"
+).split()
+_EMOJI = ("🚀", "🔥", "💎", "😂", "👀", "📈", "🙏")
+
+
+def chat_messages(count: int = 1000) -> list[str]:
+    """Group chat lines: mostly clean, ~5% abusive, ~3% spam links, some long pastes and emoji."""
+    rng = random.Random(_SEED)
+    messages = []
+    for _ in range(count):
+        words = rng.choices(_CHAT_WORDS, k=rng.choice((3, 8, 15, 40, 120)))
+        roll = rng.random()
+        if roll < 0.05:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(BANNED_WORDS))
+        elif roll < 0.08:
+            words.append(f"https://{rng.choice(SPAM_DOMAINS)}/{rng.getrandbits(32):x}")
+        if rng.random() < 0.3:
+            words.append(rng.choice(_EMOJI))
+        messages.append(" ".join(words))
+    return messages
+
+
+def custom_words(count: int) -> list[str]:
+    """Per-chat custom ban list entries, including a few regex: rules."""
+    rng = random.Random(_SEED + count)
+    words = [f"{rng.choice(_CHAT_WORDS)}{rng.randrange(10_000)}" for _ in range(count)]
+    words[::50] = [f"regex:scam{i}\\w+" for i in range(len(words[::50]))]
+    return words
+
+
+def update_payloads(count: int = 500, start_id: int = 1) -> list[dict]:
+    """Raw webhook bodies: 70% messages (half of them commands), 30% callback queries."""
+    rng = random.Random(_SEED)
+    date = int(datetime(2026, 1, 1, tzinfo=UTC).timestamp())
+    payloads = []
+    for offset, text in enumerate(chat_messages(count)):
+        user = {"id": 10_000 + rng.randrange(5000), "is_bot": False, "first_name": "Bench", "username": "bench"}
+        chat = {"id": -100_000 - rng.randrange(50), "type": "supergroup", "title": "Bench Group"}
+        message = {"message_id": offset + 1, "date": date, "chat": chat, "from": user, "text": text}
+        update = {"update_id": start_id + offset}
+        if rng.random() < 0.3:
+            update["callback_query"] = {
+                "id": str(offset),
+                "from": user,
+                "chat_instance": "bench",
+                "data": f"alert_del_{rng.randrange(1000)}",
+                "message": message,
+            }
+        else:
+            if rng.random() < 0.5:
+                message["text"] = f"/price {rng.choice(('btc', 'eth', 'sol'))}"
+            update["message"] = message
+        payloads.append(update)
+    return payloads
+
+
+def llm_output(paragraphs: int = 12) -> str:
+    """A long model answer mixing Markdown bold, allowed and disallowed HTML tags."""
+    rng = random.Random(_SEED)
+    parts = ["```html"]
+    for i in range(paragraphs):
+        sentence = " ".join(rng.choices(_CHAT_WORDS, k=45))
+        parts.append(
+            f"<h3>Section {i}</h3><p>**Key point {i}:** {sentence}<br/>"
+            f'<a href="https://example.com/{i}">source</a> <code>tx_{i}</code> <span class="x">{sentence[:60]}</span>'
+            f'<img src="chart{i}.png"/></p>\n\n\n'
+        )
+    parts.append("```")
+    return "".join(parts)
@@ -0,0 +1,164 @@
+"""
+Minimal benchmark harness: registration, timing, baselines and regression checks.
+
+Cases are plain sync or async callables registered with ``@bench``. One call
+performs ``ops`` operations (e.g. scanning a 1,000 message corpus is 1,000
+ops), so results are comparable as operations per second.
+
+Raw throughput depends on the machine, so every run also times a fixed
+pure-Python calibration loop. Cases are compared on ``normalized``
+throughput (ops/s divided by the calibration score). That keeps a baseline
+recorded on a laptop meaningful on a CI runner.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.30
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_ROUNDS = 5
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], object] | Callable[[], Awaitable[object]]
+    ops: int = 1
+    setup: Callable[[], object] | Callable[[], Awaitable[object]] | None = None
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    normalized: float
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+_CASES: dict[str, Case] = {}
+
+
+def bench(name: str, ops: int = 1, setup: Callable | None = None):
+    """Register ``func`` as benchmark ``name``; ``setup`` runs once before timing."""
+
+    def decorator(func):
+        _CASES[name] = Case(name, func, ops, setup)
+        return func
+
+    return decorator
+
+
+def get_cases(pattern: str = "") -> list[Case]:
+    return [case for name, case in _CASES.items() if pattern in name]
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _time_calls(func: Callable, calls: int) -> float:
+    if not inspect.iscoroutinefunction(func):
+        return _time(func, calls)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await func()
+    return time.perf_counter() - start
+
+
+async def measure(case: Case, min_time: float = DEFAULT_MIN_TIME, rounds: int = DEFAULT_ROUNDS) -> float:
+    """Best-of-``rounds`` ops/s, each round repeating the call until it lasts ``min_time``."""
+    if case.setup is not None:
+        await _maybe_await(case.setup())
+    await _time_calls(case.func, 1)  # first call pays for lazy imports and cold caches
+
+    calls = 1
+    while (elapsed := await _time_calls(case.func, calls)) < min_time / 10:
+        calls *= 2
+    calls = max(1, int(calls * (min_time / max(elapsed, 1e-9))))
+
+    best = min([await _time_calls(case.func, calls) for _ in range(rounds)])
+    return case.ops * calls / best
+
+
+def _calibration_loop() -> int:
+    total = 0
+    data = {str(i): i for i in range(200)}
+    for key, value in data.items():
+        total += len(key) + value
+    return total
+
+
+def calibrate(rounds: int = DEFAULT_ROUNDS) -> float:
+    """Calls per second of a fixed dict/str workload, a rough speed score for this machine."""
+    calls = 2000
+    best = min(_time(_calibration_loop, calls) for _ in range(rounds))
+    return calls / best
+
+
+def _time(func: Callable, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return time.perf_counter() - start
+
+
+async def run_cases(
+    cases: list[Case], min_time: float = DEFAULT_MIN_TIME, rounds: int = DEFAULT_ROUNDS, report=print
+) -> tuple[float, list[Result]]:
+    before = calibrate(rounds)
+    measured = []
+    for case in cases:
+        ops_per_sec = await measure(case, min_time, rounds)
+        measured.append((case.name, ops_per_sec))
+        report(f"  {case.name:<42} {ops_per_sec:>14,.1f} ops/s")
+        await asyncio.sleep(0)
+    # Best of both ends of the run, so a noisy moment at start-up does not skew every case
+    score = max(before, calibrate(rounds))
+    return score, [Result(name, ops_per_sec, ops_per_sec / score) for name, ops_per_sec in measured]
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(score: float, results: list[Result], path: Path = BASELINE_PATH, merge: bool = True) -> None:
+    """Write results as the new baseline; with ``merge`` cases not run this time keep their old entry."""
+    cases = load_baseline(path).get("cases", {}) if merge else {}
+    for result in results:
+        cases[result.name] = {
+            "ops_per_sec": round(result.ops_per_sec, 1),
+            "normalized": float(f"{result.normalized:.6g}"),
+        }
+    payload = {"calibration_score": round(score, 1), "cases": dict(sorted(cases.items()))}
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def find_regressions(results: list[Result], baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[Regression]:
+    """Cases whose normalized throughput fell more than ``threshold`` below the baseline."""
+    recorded = baseline.get("cases", {})
+    regressions = []
+    for result in results:
+        entry = recorded.get(result.name)
+        if entry and result.normalized < entry["normalized"] * (1 - threshold):
+            regressions.append(Regression(result.name, entry["normalized"], result.normalized))
+    return regressions
@@ -0,0 +1,410 @@
+"""
+End-to-end load generator: replays synthetic Telegram traffic through the real gateway.
+
+    python -m benchmarks.loadgen                                   # 60s at 20 arrivals/s, default mix
+    python -m benchmarks.loadgen --rate 100 --duration 300
+    python -m benchmarks.loadgen --mix group_clean=80 --mix group_raid=20
+    python -m benchmarks.loadgen --latency groq=3000 --failure-rate telegram=0.02 --json run.json
+
+``gateway.app`` boots with its lifespan (all four bots, schedulers, the
+database). Updates are then posted to ``/webhook/{bot}/{secret}`` over ASGI
+in an open loop. ``--rate`` counts arrivals; a flood or raid arrival is a
+burst of updates. Every external API is answered in-process by
+``benchmarks.stubs`` with a configurable latency and 429 rate.
+
+Latency is measured from webhook ingress to the end of the handler. It
+comes from the update's trace, which includes the time spent in the bot's
+update queue. The AI worker answers ``/zenith`` after the handler has
+returned, so that work shows up under stub calls rather than latency. DB
+statements per update are the trace's ``db`` spans.
+
+The database is in-memory SQLite unless ``LOADGEN_DATABASE_URL`` points at
+a scratch Postgres. Never point it at production: the run seeds groups and
+users and writes audit logs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_ENV = {
+    "DATABASE_URL": os.environ.get("LOADGEN_DATABASE_URL", "sqlite+aiosqlite://"),
+    "DATABASE_REPLICA_URLS": "",
+    "REDIS_URL": "",
+    "GROUP_BOT_TOKEN": "100001:loadgen-group",
+    "AI_BOT_TOKEN": "100002:loadgen-ai",
+    "CRYPTO_BOT_TOKEN": "100003:loadgen-crypto",
+    "ADMIN_BOT_TOKEN": "100004:loadgen-admin",
+    "ADMIN_USER_ID": "1",
+    "WEBHOOK_URL": "https://loadgen.invalid",
+    "WEBHOOK_SECRET": "loadgen-secret",
+    "MAINTENANCE_MODE": "false",
+    "ETH_RPC_URL": "https://rpc.loadgen.invalid",
+    "ETHERSCAN_API_KEY": "loadgen",
+    "GROQ_API_KEY": "gsk_loadgen",
+    "SERPER_API_KEY": "loadgen",
+    "TRACE_SAMPLE_RATE": "1.0",
+    "OTLP_TRACES_ENDPOINT": "",
+    "SENTRY_DSN": "",
+    "COIN_INDEX_PATH": os.path.join(tempfile.gettempdir(), "loadgen_coin_index.json.gz"),
+}
+os.environ.update(_ENV)
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from benchmarks.stubs import DEFAULT_LATENCY_MS, StubServices  # noqa: E402
+from benchmarks.traffic import (  # noqa: E402
+    DEFAULT_MIX,
+    DM_USERS,
+    GROUP_CHATS,
+    GROUP_OWNER_ID,
+    Event,
+    TrafficGenerator,
+    parse_mix,
+)
+
+STARTUP_TIMEOUT = 60.0
+# Telegram delivers webhooks from 149.154.160.0/20 and 91.108.4.0/22
+_TELEGRAM_NETS = ("149.154.160", "149.154.161", "149.154.162", "91.108.4", "91.108.5")
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # not Linux: peak RSS is the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+@dataclass
+class ClassStats:
+    sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    ack_ms: list[float] = field(default_factory=list)
+    latency_ms: list[float] = field(default_factory=list)
+    db_queries: list[int] = field(default_factory=list)
+    errors: int = 0
+    rejected: int = 0
+
+    @property
+    def processed(self) -> int:
+        return len(self.latency_ms)
+
+    def summary(self) -> dict:
+        return {
+            "sent": self.sent,
+            "processed": self.processed,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "http_statuses": dict(self.statuses),
+            "ack_p99_ms": round(percentile(self.ack_ms, 99), 1),
+            "p50_ms": round(percentile(self.latency_ms, 50), 1),
+            "p95_ms": round(percentile(self.latency_ms, 95), 1),
+            "p99_ms": round(percentile(self.latency_ms, 99), 1),
+            "db_per_update_p50": percentile(self.db_queries, 50),
+            "db_per_update_max": max(self.db_queries, default=0),
+        }
+
+
+class TraceCollector:
+    """Stands in for the OTLP exporter: ``core.tracing`` hands it every kept trace."""
+
+    def __init__(self, classes: dict[int, str], stats: dict[str, ClassStats]):
+        self._classes = classes
+        self._stats = stats
+        self.processed = 0
+
+    def submit(self, trace) -> None:
+        traffic_class = self._classes.pop(trace.attributes.get("update_id"), None)
+        if traffic_class is None:
+            return
+        stats = self._stats[traffic_class]
+        stats.latency_ms.append(trace.duration_ms)
+        stats.db_queries.append(sum(1 for s in trace.spans if s.kind == "db"))
+        if "rejected" in trace.attributes:
+            stats.rejected += 1
+        elif trace.error:
+            stats.errors += 1
+        self.processed += 1
+
+    async def stop(self) -> None:
+        pass
+
+
+@dataclass
+class Sample:
+    elapsed: float
+    sent: int
+    processed: int
+    queued: int
+    rss: int
+
+
+@dataclass
+class LoadRun:
+    rate: float
+    duration: float
+    mix: dict[str, float]
+    source_ips: int = 64
+    drain: float = 30.0
+    sample_interval: float = 5.0
+    stubs: StubServices = field(default_factory=StubServices)
+    stats: dict[str, ClassStats] = field(default_factory=lambda: defaultdict(ClassStats))
+    samples: list[Sample] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def __post_init__(self):
+        self._classes: dict[int, str] = {}
+        self._collector = TraceCollector(self._classes, self.stats)
+        self._generator = TrafficGenerator(self.mix)
+        self._sent = 0
+
+    @property
+    def sent(self) -> int:
+        return self._sent
+
+    @property
+    def processed(self) -> int:
+        return self._collector.processed
+
+    # ── Lifecycle ─────────────────────────────────────────
+    async def run(self) -> None:
+        import gateway
+        from core import tracing
+
+        self.stubs.install()
+        tracing._exporter = self._collector
+        try:
+            async with gateway.lifespan(gateway.app):
+                await self._wait_until_ready(gateway.SERVICE_REGISTRY)
+                await self._seed()
+                transport = ASGITransport(app=gateway.app, client=("149.154.160.1", 443))
+                async with AsyncClient(transport=transport, base_url="http://loadgen") as client:
+                    await self._drive(client)
+        finally:
+            tracing._exporter = None
+            self.stubs.uninstall()
+
+    async def _wait_until_ready(self, registry: dict) -> None:
+        deadline = time.perf_counter() + STARTUP_TIMEOUT
+        while self.stubs.calls_to("telegram", "setWebhook") < 4:
+            failed = {name: state for name, state in registry.items() if state != "online"}
+            if failed:
+                raise RuntimeError(f"Services failed to start: {failed}")
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Webhooks not registered after {STARTUP_TIMEOUT:.0f}s: {registry}")
+            await asyncio.sleep(0.1)
+
+    async def _seed(self) -> None:
+        from zenith_ai_bot.repository import SettingsRepo as AISettingsRepo
+        from zenith_group_bot.repository import SettingsRepo as GroupSettingsRepo
+
+        for chat_id in GROUP_CHATS:
+            await GroupSettingsRepo.upsert_settings(chat_id, GROUP_OWNER_ID, f"Loadgen {chat_id}", is_active=True)
+        for user_id in DM_USERS:
+            await AISettingsRepo.set_api_key(user_id, "gsk_loadgen")
+
+    # ── Traffic ───────────────────────────────────────────
+    async def _post(self, client: AsyncClient, event: Event, source_ip: str) -> None:
+        from core.config import WEBHOOK_SECRET
+
+        stats = self.stats[event.traffic_class]
+        started = time.perf_counter()
+        response = await client.post(
+            f"/webhook/{event.bot}/{WEBHOOK_SECRET}",
+            json=event.payload,
+            headers={"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET, "X-Forwarded-For": source_ip},
+        )
+        stats.ack_ms.append((time.perf_counter() - started) * 1000)
+        stats.statuses[response.status_code] += 1
+        if response.status_code != 200:
+            self._classes.pop(event.update_id, None)
+
+    async def _drive(self, client: AsyncClient) -> None:
+        ips = [
+            f"{_TELEGRAM_NETS[i % len(_TELEGRAM_NETS)]}.{i // len(_TELEGRAM_NETS) % 254 + 1}"
+            for i in range(self.source_ips)
+        ]
+        in_flight: set[asyncio.Task] = set()
+        sampler = asyncio.create_task(self._sample())
+        start = time.perf_counter()
+        arrivals = 0
+        while (elapsed := time.perf_counter() - start) < self.duration:
+            for _ in range(int(elapsed * self.rate) - arrivals):
+                for event in self._generator.next_events():
+                    self._classes[event.update_id] = event.traffic_class
+                    self.stats[event.traffic_class].sent += 1
+                    task = asyncio.create_task(self._post(client, event, ips[self._sent % len(ips)]))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    self._sent += 1
+                arrivals += 1
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*in_flight)
+
+        deadline = time.perf_counter() + self.drain
+        while self._classes and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+        self.elapsed = time.perf_counter() - start
+        sampler.cancel()
+        self._take_sample(start)
+
+    async def _sample(self) -> None:
+        start = time.perf_counter()
+        while True:
+            self._take_sample(start)
+            await asyncio.sleep(self.sample_interval)
+
+    def _take_sample(self, start: float) -> None:
+        from core.webhook_router import get_registered_bots
+
+        queued = sum(app.update_queue.qsize() for app in get_registered_bots().values())
+        self.samples.append(Sample(time.perf_counter() - start, self._sent, self.processed, queued, _rss_bytes()))
+
+    # ── Reporting ─────────────────────────────────────────
+    def report(self) -> dict:
+        first, last = self.samples[0], self.samples[-1]
+        return {
+            "rate": self.rate,
+            "duration": self.duration,
+            "elapsed": round(self.elapsed, 1),
+            "mix": self.mix,
+            "sent": self.sent,
+            "processed": self.processed,
+            "throughput": round(self.processed / self.elapsed, 1) if self.elapsed else 0.0,
+            "classes": {name: stats.summary() for name, stats in sorted(self.stats.items())},
+            "memory": {
+                "start_mb": round(first.rss / 2**20, 1),
+                "peak_mb": round(max(s.rss for s in self.samples) / 2**20, 1),
+                "end_mb": round(last.rss / 2**20, 1),
+                "growth_kb_per_1k_updates": round((last.rss - first.rss) / 1024 / max(self.sent, 1) * 1000, 1),
+            },
+            "timeline": [
+                {
+                    "t": round(s.elapsed, 1),
+                    "sent": s.sent,
+                    "processed": s.processed,
+                    "queued": s.queued,
+                    "rss_mb": round(s.rss / 2**20, 1),
+                }
+                for s in self.samples
+            ],
+            "stub_calls": {f"{service}.{method}": n for (service, method), n in self.stubs.calls.most_common()},
+            "stub_failures": dict(self.stubs.failures),
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Offered {report['rate']:g} arrivals/s for {report['duration']:g}s: {report['sent']} updates",
+        f"Processed {report['processed']}/{report['sent']} in {report['elapsed']}s ({report['throughput']} updates/s)",
+        "",
+        f"{'class':<16}{'sent':>7}{'done':>7}{'err':>6}{'non-200':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ack p99':>9}{'db/upd':>8}{'db max':>8}",
+    ]
+    for name, c in report["classes"].items():
+        non_ok = sum(n for status, n in c["http_statuses"].items() if int(status) != 200)
+        lines.append(
+            f"{name:<16}{c['sent']:>7}{c['processed']:>7}{c['errors']:>6}{non_ok:>9}"
+            f"{c['p50_ms']:>9.1f}{c['p95_ms']:>9.1f}{c['p99_ms']:>9.1f}{c['ack_p99_ms']:>9.1f}"
+            f"{c['db_per_update_p50']:>8}{c['db_per_update_max']:>8}"
+        )
+    memory = report["memory"]
+    lines += [
+        "",
+        f"Memory (RSS): start {memory['start_mb']} MB, peak {memory['peak_mb']} MB, end {memory['end_mb']} MB "
+        f"({memory['growth_kb_per_1k_updates']:+} KB per 1k updates)",
+    ]
+    lines += [
+        f"  t={s['t']:>6}s  sent={s['sent']:<7} processed={s['processed']:<7} queued={s['queued']:<5} rss={s['rss_mb']} MB"
+        for s in report["timeline"]
+    ]
+    calls = ", ".join(f"{name}={n}" for name, n in list(report["stub_calls"].items())[:12])
+    lines += ["", f"Stub calls: {calls}"]
+    if report["stub_failures"]:
+        lines.append(f"Injected 429s: {report['stub_failures']}")
+    unstubbed = {name: n for name, n in report["stub_calls"].items() if name.startswith("unstubbed.")}
+    if unstubbed:
+        lines.append(f"WARNING requests to hosts without a stub: {unstubbed}")
+    return "\n".join(lines)
+
+
+def _parse_service_values(specs: list[str], option: str) -> dict[str, float]:
+    values = {}
+    for spec in specs:
+        service, _, value = spec.partition("=")
+        if service not in DEFAULT_LATENCY_MS or not value:
+            raise SystemExit(f"{option} expects service=value with service in {', '.join(DEFAULT_LATENCY_MS)}")
+        values[service] = float(value)
+    return values
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description="End-to-end webhook load test")
+    parser.add_argument("--rate", type=float, default=20.0, help="arrivals per second (bursts count once)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of offered load")
+    parser.add_argument(
+        "--mix",
+        action="append",
+        default=[],
+        metavar="CLASS=WEIGHT",
+        help=f"traffic class weight, repeatable; classes: {', '.join(DEFAULT_MIX)}",
+    )
+    parser.add_argument("--latency", action="append", default=[], metavar="SERVICE=MS", help="stub median latency")
+    parser.add_argument(
+        "--failure-rate", action="append", default=[], metavar="SERVICE=RATE", help="share of stub calls answered 429"
+    )
+    parser.add_argument(
+        "--source-ips", type=int, default=64, help="distinct Telegram source IPs to spread updates over"
+    )
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for queued updates after the run")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="seconds between memory samples")
+    parser.add_argument("--json", type=Path, help="also write the full report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    stubs = StubServices(
+        latency_ms={**DEFAULT_LATENCY_MS, **_parse_service_values(args.latency, "--latency")},
+        failure_rate=_parse_service_values(args.failure_rate, "--failure-rate"),
+    )
+    load = LoadRun(args.rate, args.duration, mix, args.source_ips, args.drain, args.sample_interval, stubs)
+
+    print(f"Booting gateway and driving {args.rate:g} arrivals/s for {args.duration:g}s")
+    try:
+        asyncio.run(load.run())
+    except RuntimeError as e:
+        print(f"Load run aborted: {e}")
+        return 1
+
+    report = load.report()
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
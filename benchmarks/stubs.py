@@ -0,0 +1,302 @@
+"""
+In-process stand-ins for every external service the bots call.
+
+``StubServices.install()`` patches ``httpx.AsyncHTTPTransport`` so that
+requests never leave the process. That covers PTB's Bot API client, the
+Groq SDK and the market/search clients built on ``TracedTransport``. Each
+request is answered by a handler for its host after a simulated latency.
+A per-service failure rate turns a share of the answers into 429s, the
+failure mode these APIs actually show under load. Requests to any other
+host get a 502 and are counted as ``unstubbed``, so a new integration
+shows up in the report instead of going out to the internet.
+
+httpx's connection pool sits below the patched method, so pool limits
+(e.g. PTB's ``connection_pool_size``) are not exercised.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl
+
+import httpx
+
+from benchmarks.corpus import llm_output
+
+# host -> service name used for latency, failure and call accounting
+HOSTS = {
+    "api.telegram.org": "telegram",
+    "api.groq.com": "groq",
+    "api.coingecko.com": "coingecko",
+    "api.alternative.me": "coingecko",
+    "api.etherscan.io": "etherscan",
+    "api.gopluslabs.io": "goplus",
+    "google.serper.dev": "serper",
+    "rpc.loadgen.invalid": "rpc",
+}
+
+# Typical p50 of each API from a European VPS, in milliseconds
+DEFAULT_LATENCY_MS = {
+    "telegram": 40,
+    "groq": 900,
+    "coingecko": 150,
+    "etherscan": 200,
+    "goplus": 300,
+    "serper": 400,
+    "rpc": 60,
+}
+
+_COINS = ("bitcoin", "ethereum", "solana", "binancecoin", "ripple", "cardano", "dogecoin", "tron", "chainlink", "pepe")
+
+
+def _json(status: int, payload) -> httpx.Response:
+    return httpx.Response(status, content=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+
+
+@dataclass
+class StubServices:
+    latency_ms: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LATENCY_MS))
+    failure_rate: dict[str, float] = field(default_factory=dict)
+    seed: int = 1337
+    calls: Counter = field(default_factory=Counter)
+    failures: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._message_ids = itertools.count(1)
+        self._original = None
+
+    # ── Patching ──────────────────────────────────────────
+    def install(self) -> None:
+        stubs = self
+        self._original = httpx.AsyncHTTPTransport.handle_async_request
+
+        async def handle_async_request(transport, request: httpx.Request) -> httpx.Response:
+            return await stubs.handle(request)
+
+        httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            httpx.AsyncHTTPTransport.handle_async_request = self._original
+            self._original = None
+
+    def calls_to(self, service: str, method: str | None = None) -> int:
+        return sum(n for (s, m), n in self.calls.items() if s == service and method in (None, m))
+
+    # ── Dispatch ──────────────────────────────────────────
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        service = HOSTS.get(request.url.host)
+        if service is None:
+            self.calls["unstubbed", request.url.host] += 1
+            return _json(502, {"error": f"no stub for {request.url.host}"})
+
+        body = await request.aread()
+        method = request.url.path.rsplit("/", 1)[-1] or request.url.host
+        self.calls[service, method] += 1
+
+        latency = self.latency_ms.get(service, 0) / 1000
+        if latency:
+            # Long-tailed like real APIs: mostly near the median, occasionally several times it
+            await asyncio.sleep(latency * self._rng.lognormvariate(0, 0.5))
+
+        if self._rng.random() < self.failure_rate.get(service, 0.0):
+            self.failures[service] += 1
+            return self._too_many_requests(service)
+
+        handler = getattr(self, f"_{service}")
+        return handler(request, body)
+
+    @staticmethod
+    def _too_many_requests(service: str) -> httpx.Response:
+        if service == "telegram":
+            return _json(
+                429,
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                },
+            )
+        return _json(429, {"error": "rate limited"})
+
+    # ── Telegram Bot API ──────────────────────────────────
+    def _telegram(self, request: httpx.Request, body: bytes) -> httpx.Response:
+        _, token, method = request.url.path.split("/", 2)
+        bot_id = int(token.removeprefix("bot").split(":", 1)[0])
+        params = {}
+        if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+            for key, value in parse_qsl(body.decode()):
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    params[key] = value
+        return _json(200, {"ok": True, "result": self._telegram_result(method, bot_id, params)})
+
+    def _telegram_result(self, method: str, bot_id: int, params: dict):
+        chat_id = params.get("chat_id", 1)
+        chat_id = chat_id if isinstance(chat_id, int) else 1
+        user_id = params.get("user_id", 1)
+        if method == "getMe":
+            return {
+                "id": bot_id,
+                "is_bot": True,
+                "first_name": "Loadgen",
+                "username": f"loadgen_{bot_id}_bot",
+                "can_join_groups": True,
+                "can_read_all_group_messages": True,
+                "supports_inline_queries": False,
+            }
+        if method == "getWebhookInfo":
+            return {"url": "https://loadgen.invalid", "has_custom_certificate": False, "pending_update_count": 0}
+        if method == "getChatMember":
+            return {"status": "member", "user": {"id": user_id, "is_bot": False, "first_name": "Member"}}
+        if method == "getChatAdministrators":
+            return [
+                {"status": "creator", "is_anonymous": False, "user": {"id": 1, "is_bot": False, "first_name": "Owner"}}
+            ]
+        if method == "getChat":
+            kind = "private" if chat_id > 0 else "supergroup"
+            return {"id": chat_id, "type": kind, "title": "Loadgen", "accent_color_id": 0, "max_reaction_count": 11}
+        if method == "getMyCommands":
+            return []
+        if method.startswith(("send", "edit")):
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+                "text": str(params.get("text", "")),
+            }
+        return True
+
+    # ── Groq (OpenAI-compatible chat completions) ─────────
+    def _groq(self, _request: httpx.Request, body: bytes) -> httpx.Response:
+        model = json.loads(body or b"{}").get("model", "llama-3.3-70b-versatile")
+        content = llm_output(self._rng.choice((2, 4, 8)))
+        completion = len(content) // 4
+        return _json(
+            200,
+            {
+                "id": f"chatcmpl-{self._rng.getrandbits(48):x}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 350, "completion_tokens": completion, "total_tokens": 350 + completion},
+            },
+        )
+
+    # ── Market data ───────────────────────────────────────
+    def _coingecko(self, request: httpx.Request, _body: bytes) -> httpx.Response:
+        path = request.url.path
+        if request.url.host == "api.alternative.me":
+            return _json(
+                200, {"data": [{"value": "57", "value_classification": "Greed", "timestamp": str(int(time.time()))}]}
+            )
+        if path.endswith("/simple/price"):
+            ids = request.url.params.get("ids", "").split(",")
+            return _json(200, {coin: self._quote() for coin in ids if coin})
+        if path.endswith("/coins/markets"):
+            per_page = int(request.url.params.get("per_page", 100))
+            first = (int(request.url.params.get("page", 1)) - 1) * per_page + 1
+            ranks = range(first, first + per_page)
+            return _json(200, [self._market_row(_COINS[(rank - 1) % len(_COINS)], rank) for rank in ranks])
+        if path.endswith("/coins/list"):
+            return _json(
+                200, [{"id": coin, "symbol": coin[:4], "name": coin.title(), "platforms": {}} for coin in _COINS]
+            )
+        if path.endswith("/search"):
+            query = request.url.params.get("query", "btc").lower()
+            return _json(200, {"coins": [{"id": query, "symbol": query, "name": query.title(), "market_cap_rank": 1}]})
+        return _json(200, {})
+
+    def _quote(self) -> dict:
+        return {"usd": round(self._rng.uniform(0.01, 70_000), 4), "usd_24h_change": round(self._rng.gauss(0, 4), 2)}
+
+    def _market_row(self, coin: str, rank: int) -> dict:
+        quote = self._quote()
+        return {
+            "id": f"{coin}-{rank}" if rank > len(_COINS) else coin,
+            "symbol": coin[:4],
+            "name": coin.title(),
+            "current_price": quote["usd"],
+            "market_cap": int(quote["usd"] * 1e7),
+            "market_cap_rank": rank,
+            "total_volume": int(quote["usd"] * 1e6),
+            "price_change_percentage_24h": quote["usd_24h_change"],
+        }
+
+    def _etherscan(self, request: httpx.Request, _body: bytes) -> httpx.Response:
+        offset = int(request.url.params.get("offset", 5))
+        address = request.url.params.get("address", "0x0")
+        txns = [
+            {
+                "hash": f"0x{self._rng.getrandbits(256):064x}",
+                "from": address,
+                "to": f"0x{self._rng.getrandbits(160):040x}",
+                "value": str(int(self._rng.expovariate(1 / 20) * 1e18)),
+                "timeStamp": str(int(time.time()) - i * 60),
+                "tokenSymbol": "USDC",
+                "tokenDecimal": "6",
+            }
+            for i in range(min(offset, 25))
+        ]
+        return _json(200, {"status": "1", "message": "OK", "result": txns})
+
+    def _goplus(self, request: httpx.Request, _body: bytes) -> httpx.Response:
+        contracts = request.url.params.get("contract_addresses", "").lower().split(",")
+        reports = {contract: self._security_report() for contract in contracts if contract}
+        return _json(200, {"code": 1, "message": "OK", "result": reports})
+
+    def _security_report(self) -> dict:
+        return {
+            "token_name": "Loadgen Token",
+            "token_symbol": "LOAD",
+            "is_honeypot": "0",
+            "is_open_source": "1",
+            "is_mintable": "0",
+            "buy_tax": "0",
+            "sell_tax": "0.01",
+            "holder_count": str(self._rng.randrange(100, 50_000)),
+            "owner_address": "0x0000000000000000000000000000000000000000",
+        }
+
+    def _serper(self, request: httpx.Request, _body: bytes) -> httpx.Response:
+        key = "news" if request.url.path.endswith("/news") else "organic"
+        results = [
+            {
+                "title": f"Result {i}",
+                "link": f"https://example.com/{i}",
+                "snippet": "Markets moved today.",
+                "date": "1h ago",
+            }
+            for i in range(8)
+        ]
+        return _json(200, {key: results})
+
+    def _rpc(self, _request: httpx.Request, body: bytes) -> httpx.Response:
+        payload = json.loads(body or b"{}")
+        if isinstance(payload, list):
+            return _json(200, [self._rpc_result(call) for call in payload])
+        return _json(200, self._rpc_result(payload))
+
+    def _rpc_result(self, call: dict) -> dict:
+        method = call.get("method")
+        if method == "eth_gasPrice":
+            result = hex(int(self._rng.uniform(8, 40) * 1e9))
+        elif method == "eth_blockNumber":
+            result = hex(20_000_000 + int(time.time()) // 12 % 1_000_000)
+        elif method == "eth_getBlockByNumber":
+            result = {"number": hex(20_000_000), "baseFeePerGas": hex(int(self._rng.uniform(6, 35) * 1e9))}
+        elif method == "eth_getLogs":
+            result = []
+        else:
+            result = "0x"
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
@@ -0,0 +1,178 @@
+"""
+Synthetic Telegram update streams for the load generator.
+
+Every update belongs to a traffic class. Classes that model bursts (floods
+and raids) yield several updates at once, the way Telegram delivers them.
+Update ids come from one counter across all bots, so an id alone identifies
+the class of the update when its trace comes back.
+"""
+
+import itertools
+import random
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from benchmarks.corpus import chat_messages
+from zenith_group_bot.word_list import BANNED_WORDS, SPAM_DOMAINS
+
+GROUP_CHATS = [-1_000_000_000_000 - i for i in range(20)]
+GROUP_USERS = range(10_000, 15_000)
+DM_USERS = range(20_000, 20_500)
+GROUP_OWNER_ID = 1
+FLOOD_BURST = 8
+RAID_BURST = 10
+
+DEFAULT_MIX = {
+    "group_clean": 50,
+    "group_abusive": 5,
+    "group_spam": 3,
+    "group_flood": 2,
+    "group_raid": 1,
+    "callback": 15,
+    "ai_command": 8,
+    "crypto_command": 16,
+}
+
+_CRYPTO_COMMANDS = (
+    "/market",
+    "/gas",
+    "/gainers",
+    "/losers",
+    "/alerts",
+    "/portfolio",
+    "/watchlist",
+    "/audit 0x6982508145454ce325ddbe47a25d4ec3d2311933",
+)
+_AI_PROMPTS = (
+    "/zenith explain how uniswap v3 concentrated liquidity works",
+    "/zenith summarize today's crypto market in three bullets",
+    "/zenith write a python function that retries an http call",
+    "/zenith what is the difference between a rollup and a sidechain",
+)
+_CALLBACKS = {
+    "crypto": ("ui_main_menu", "ui_price_alerts", "ui_gas", "ui_whale_radar", "ui_wallet_tracker"),
+    "ai": ("ai_main_menu", "ai_personas", "ai_history"),
+}
+
+
+@dataclass(slots=True)
+class Event:
+    bot: str
+    traffic_class: str
+    payload: dict
+
+    @property
+    def update_id(self) -> int:
+        return self.payload["update_id"]
+
+
+def parse_mix(specs: list[str]) -> dict[str, float]:
+    """``["group_clean=50", "ai_command=10"]`` -> weights; unknown classes are an error."""
+    if not specs:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for spec in specs:
+        name, _, weight = spec.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown traffic class {name!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class TrafficGenerator:
+    def __init__(self, mix: dict[str, float], seed: int = 1337):
+        self.mix = {name: weight for name, weight in mix.items() if weight > 0}
+        self._rng = random.Random(seed)
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._new_members = itertools.count(1_000_000)
+        banned = set(BANNED_WORDS)
+        lines = chat_messages(2000)
+        self._clean = [line for line in lines if "http" not in line and banned.isdisjoint(line.split())]
+
+    def next_events(self) -> list[Event]:
+        """The updates for one arrival: usually one, a whole burst for floods and raids."""
+        traffic_class = self._rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        return getattr(self, f"_{traffic_class}")()
+
+    # ── Payload building ──────────────────────────────────
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}"}
+
+    def _message(self, chat: dict, user: dict, **fields) -> dict:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(datetime.now(UTC).timestamp()),
+            "chat": chat,
+            "from": user,
+            **fields,
+        }
+
+    def _event(self, bot: str, traffic_class: str, **update) -> Event:
+        return Event(bot, traffic_class, {"update_id": next(self._update_ids), **update})
+
+    def _group_message(self, traffic_class: str, text: str, user_id: int | None = None, chat_id: int | None = None):
+        chat = {"id": chat_id or self._rng.choice(GROUP_CHATS), "type": "supergroup", "title": "Loadgen Group"}
+        user = self._user(user_id or self._rng.choice(GROUP_USERS))
+        entities = []
+        if "https://" in text:
+            offset = text.index("https://")
+            entities = [{"type": "url", "offset": offset, "length": len(text) - offset}]
+        message = self._message(chat, user, text=text, **({"entities": entities} if entities else {}))
+        return self._event("group", traffic_class, message=message)
+
+    def _private_command(self, bot: str, traffic_class: str, text: str) -> Event:
+        user = self._user(self._rng.choice(DM_USERS))
+        chat = {"id": user["id"], "type": "private", "first_name": user["first_name"]}
+        command = text.split()[0]
+        entities = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        return self._event(bot, traffic_class, message=self._message(chat, user, text=text, entities=entities))
+
+    # ── Traffic classes ───────────────────────────────────
+    def _group_clean(self) -> list[Event]:
+        return [self._group_message("group_clean", self._rng.choice(self._clean))]
+
+    def _group_abusive(self) -> list[Event]:
+        words = self._rng.choice(self._clean).split()
+        words.insert(self._rng.randrange(len(words) + 1), self._rng.choice(BANNED_WORDS))
+        return [self._group_message("group_abusive", " ".join(words))]
+
+    def _group_spam(self) -> list[Event]:
+        link = f"https://{self._rng.choice(SPAM_DOMAINS)}/{self._rng.getrandbits(32):x}"
+        return [self._group_message("group_spam", f"free airdrop claim now {link}")]
+
+    def _group_flood(self) -> list[Event]:
+        user_id, chat_id = self._rng.choice(GROUP_USERS), self._rng.choice(GROUP_CHATS)
+        return [
+            self._group_message("group_flood", self._rng.choice(self._clean), user_id, chat_id)
+            for _ in range(FLOOD_BURST)
+        ]
+
+    def _group_raid(self) -> list[Event]:
+        chat = {"id": self._rng.choice(GROUP_CHATS), "type": "supergroup", "title": "Loadgen Group"}
+        events = []
+        for _ in range(RAID_BURST):
+            member = self._user(next(self._new_members))
+            message = self._message(chat, member, new_chat_members=[member])
+            events.append(self._event("group", "group_raid", message=message))
+        return events
+
+    def _callback(self) -> list[Event]:
+        bot = self._rng.choice(list(_CALLBACKS))
+        user = self._user(self._rng.choice(DM_USERS))
+        chat = {"id": user["id"], "type": "private", "first_name": user["first_name"]}
+        bot_user = {"id": 1, "is_bot": True, "first_name": "Loadgen"}
+        callback = {
+            "id": str(self._rng.getrandbits(63)),
+            "from": user,
+            "chat_instance": str(user["id"]),
+            "data": self._rng.choice(_CALLBACKS[bot]),
+            "message": self._message(chat, bot_user, text="menu"),
+        }
+        return [self._event(bot, "callback", callback_query=callback)]
+
+    def _ai_command(self) -> list[Event]:
+        return [self._private_command("ai", "ai_command", self._rng.choice(_AI_PROMPTS))]
+
+    def _crypto_command(self) -> list[Event]:
+        return [self._private_command("crypto", "crypto_command", self._rng.choice(_CRYPTO_COMMANDS))]
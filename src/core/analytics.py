@@ -0,0 +1,100 @@
+"""
+Incrementally maintained rollups behind the admin dashboards.
+
+The dashboards used to run COUNT(*) scans over the subscription and key tables
+on every tap. They now read one ``subscription_daily_stats`` row per product
+and day, so their cost grows with days instead of rows:
+- Key counters (generated / redeemed) are bumped by the key write paths
+  inside the same transaction as the write
+- Gauges (users, subscriptions, expiring soon) are refreshed by a periodic
+  snapshot job, see ``refresh_subscription_snapshot``
+
+Moderation counters per chat live next to the group bot models and are
+maintained by ``AuditLogRepo.log_action``.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from core.analytics_models import SubscriptionDailyStat
+from core.database import db_retry, get_db
+from core.logger import setup_logger
+from core.permissions import PRODUCT_CRYPTO, PRODUCT_GROUP
+
+logger = setup_logger("ANALYTICS")
+
+EXPIRING_SOON_DAYS = 7
+_KEY_COUNTERS = ("keys_generated", "keys_redeemed")
+
+
+def utc_today() -> date:
+    return datetime.now(UTC).date()
+
+
+def _insert_for(session: Any):
+    return sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+
+
+async def bump_key_counter(session: Any, product: str, counter: str, amount: int = 1) -> None:
+    """Add ``amount`` to today's key counter inside the caller's transaction."""
+    if counter not in _KEY_COUNTERS:
+        raise ValueError(f"Unknown key counter: {counter}")
+    stmt = _insert_for(session)(SubscriptionDailyStat).values(day=utc_today(), product=product, **{counter: amount})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "product"],
+        set_={counter: getattr(SubscriptionDailyStat, counter) + stmt.excluded[counter]},
+    )
+    await session.execute(stmt)
+
+
+def _snapshot_sources() -> dict[str, tuple]:
+    """Source tables (users, subscriptions, keys) for each product's gauges."""
+    from zenith_crypto_bot.models import ActivationKey, CryptoUser, Subscription
+    from zenith_group_bot.models import GroupActivationKey, GroupSettings, GroupSubscription
+
+    return {
+        PRODUCT_CRYPTO: (CryptoUser, Subscription, ActivationKey),
+        PRODUCT_GROUP: (GroupSettings, GroupSubscription, GroupActivationKey),
+    }
+
+
+async def _count_gauges(session: Any, sources: tuple, now: datetime) -> dict[str, int]:
+    users_model, subs_model, keys_model = sources
+    soon = now + timedelta(days=EXPIRING_SOON_DAYS)
+    row = (
+        await session.execute(
+            select(
+                select(func.count()).select_from(users_model).scalar_subquery(),
+                select(func.count()).select_from(subs_model).scalar_subquery(),
+                select(func.count()).where(subs_model.expires_at > now).scalar_subquery(),
+                select(func.count())
+                .where(subs_model.expires_at > now, subs_model.expires_at <= soon)
+                .scalar_subquery(),
+                select(func.count()).select_from(keys_model).scalar_subquery(),
+            )
+        )
+    ).one()
+    return dict(
+        zip(("users", "subscriptions", "active_subscriptions", "expiring_soon", "activation_keys"), row, strict=True)
+    )
+
+
+@db_retry
+async def refresh_subscription_snapshot() -> None:
+    """Overwrite today's gauges for every product from the source tables."""
+    now = datetime.now(UTC)
+    async with get_db() as session:
+        insert = _insert_for(session)
+        for product, sources in _snapshot_sources().items():
+            gauges = await _count_gauges(session, sources, now)
+            stmt = insert(SubscriptionDailyStat).values(day=now.date(), product=product, snapshot_at=now, **gauges)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "product"],
+                set_={**gauges, "snapshot_at": now},
+            )
+            await session.execute(stmt)
+    logger.debug("Subscription snapshot refreshed")
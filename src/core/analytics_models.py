@@ -0,0 +1,22 @@
+"""Daily subscription and activation key rollups read by the admin dashboards."""
+
+from sqlalchemy import Column, Date, DateTime, Integer, String
+
+from core.database import Base
+
+
+class SubscriptionDailyStat(Base):
+    __tablename__ = "subscription_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    product = Column(String(20), primary_key=True)
+    # Counters bumped by the key write paths
+    keys_generated = Column(Integer, nullable=False, default=0)
+    keys_redeemed = Column(Integer, nullable=False, default=0)
+    # Gauges overwritten by the periodic snapshot job
+    users = Column(Integer, nullable=False, default=0)
+    subscriptions = Column(Integer, nullable=False, default=0)
+    active_subscriptions = Column(Integer, nullable=False, default=0)
+    expiring_soon = Column(Integer, nullable=False, default=0)
+    activation_keys = Column(Integer, nullable=False, default=0)
+    snapshot_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,23 +1,165 @@
 import asyncio
 import functools
 import time
+from collections.abc import Awaitable, Callable, Hashable
+
 from cachetools import TTLCache
 
-def async_ttl_cache(ttl=60, maxsize=128):
+from core.logger import setup_logger
+from core.single_flight import SingleFlight
+
+logger = setup_logger("CACHE")
+
+_caches: dict[str, object] = {}
+
+
+class MeteredTTLCache(TTLCache):
+    """
+    TTLCache that counts hits and misses and registers itself by name for /metrics.
+    A lookup is ``cache.get(key)``, ``cache[key]`` or ``key in cache``.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, **kwargs):
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        register_cache(name, self)
+
+    def __getitem__(self, key):
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def __contains__(self, key) -> bool:
+        found = super().__contains__(key)
+        if not found:
+            self.misses += 1
+        return found
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        # Invalidation, not a lookup: bypass the counters
+        if super().__contains__(key):
+            value = super().__getitem__(key)
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+
+def register_cache(name: str, cache) -> None:
+    """Report ``cache`` (anything with ``hits``, ``misses`` and ``len()``) in ``get_cache_stats``."""
+    _caches[name] = cache
+
+
+def get_cache_stats() -> dict[str, dict]:
+    """Hits, misses and live entries for every registered cache in this process."""
+    return {name: {"hits": c.hits, "misses": c.misses, "size": len(c)} for name, c in _caches.items()}
+
+
+class SWRCache:
     """
-    An asynchronous TTL cache decorator.
+    Stale-while-revalidate cache for async loaders.
+
+    An entry is fresh for ``soft_ttl`` seconds. Until ``hard_ttl`` it is
+    stale: still returned at once, while one background task reloads it.
+    After ``hard_ttl`` it is dropped and the next read waits for the loader.
+    Concurrent loads of one key share a single call. Loaders signal failure
+    by raising, and a failed reload keeps the old value. That leaves
+    last-known-good data for the whole ``hard_ttl``, e.g. while a circuit
+    breaker is open.
+    """
+
+    def __init__(self, name: str, soft_ttl: float, hard_ttl: float, maxsize: int = 128):
+        if hard_ttl < soft_ttl:
+            raise ValueError("hard_ttl must be at least soft_ttl")
+        self.name = name
+        self.soft_ttl = soft_ttl
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=hard_ttl)  # key -> (value, loaded_at)
+        self._flight = SingleFlight(name)
+        self._refreshes: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refresh_failures = 0
+        register_cache(name, self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable, default=None):
+        """The cached value, fresh or stale, without loading or counting a lookup."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else default
+
+    def set(self, key: Hashable, value) -> None:
+        self._entries[key] = (value, time.monotonic())
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable]):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return await self._flight.do(key, lambda: self._load(key, load))
+        value, loaded_at = entry
+        self.hits += 1
+        if time.monotonic() - loaded_at >= self.soft_ttl:
+            self.stale_hits += 1
+            if not self._flight.is_in_flight(key):
+                task = asyncio.create_task(self._revalidate(key, load))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+        return value
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable]):
+        value = await load()
+        self.set(key, value)
+        return value
+
+    async def _revalidate(self, key: Hashable, load: Callable[[], Awaitable]) -> None:
+        try:
+            await self._flight.do(key, lambda: self._load(key, load))
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.debug(f"Background refresh of {self.name} failed, serving stale: {e}")
+
+
+def _make_key(args: tuple, kwargs: dict) -> Hashable:
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:  # unhashable arguments (lists, dicts) fall back to their repr
+        return repr(key)
+    return key
+
+
+def async_ttl_cache(ttl=60, maxsize=128, stale_ttl=0):
+    """
+    Cache an async function's results per arguments for ``ttl`` seconds.
+
+    With ``stale_ttl`` an expired result is served for up to that many more
+    seconds while one background call refreshes it. Concurrent calls with the
+    same arguments share a single call.
     """
-    cache = TTLCache(maxsize=maxsize, ttl=ttl)
 
     def decorator(func):
+        cache = SWRCache(func.__qualname__, soft_ttl=ttl, hard_ttl=ttl + stale_ttl, maxsize=maxsize)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            key = str(args) + str(kwargs)
-            if key in cache:
-                return cache[key]
-            
-            result = await func(*args, **kwargs)
-            cache[key] = result
-            return result
+            return await cache.get(_make_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
         return wrapper
+
     return decorator
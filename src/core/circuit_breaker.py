@@ -154,6 +154,11 @@ class CircuitBreaker:
     def is_open(self) -> bool:
         return self.state == CircuitState.OPEN
 
+    @property
+    def is_cooling_down(self) -> bool:
+        """OPEN and still inside the recovery timeout, so no probe would be let through yet."""
+        return self.is_open and time.monotonic() - self.last_state_change < self.config.recovery_timeout
+
     @property
     def status(self) -> dict:
         return {
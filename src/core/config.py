@@ -49,14 +49,66 @@ elif DATABASE_URL and DATABASE_URL.startswith("postgresql://") and "+asyncpg" no
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 3))
+DB_BACKGROUND_POOL_SIZE = int(os.getenv("DB_BACKGROUND_POOL_SIZE", 3))
+DB_ANALYTICS_POOL_SIZE = int(os.getenv("DB_ANALYTICS_POOL_SIZE", 2))
+# Set when PgBouncer >= 1.21 runs with max_prepared_statements > 0, so prepared statements can be reused
+DB_PGBOUNCER_PREPARED_STATEMENTS = os.getenv("DB_PGBOUNCER_PREPARED_STATEMENTS", "false").lower() == "true"
+# Optional comma-separated read replicas, used only by repo methods marked read-only
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# Query profiling: statements slower than this are sampled, updates issuing more statements are flagged as N+1
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 250))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", 25))
+
+# ==========================================
+# Tracing
+# ==========================================
+# Share of updates whose trace is kept; failed updates and ones slower than TRACE_SLOW_MS are always kept
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.05))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 2000))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 100))
+# Optional OTLP/HTTP JSON collector, e.g. http://localhost:4318/v1/traces
+OTLP_TRACES_ENDPOINT = os.getenv("OTLP_TRACES_ENDPOINT", "").strip()
+OTLP_SERVICE_NAME = os.getenv("OTLP_SERVICE_NAME", "monolith")
+# Sentry performance tracing runs on every sampled request; errors are reported regardless
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", 0.0))
+
+# ==========================================
+# Shared State (caches, rate limits)
+# ==========================================
+# Leave empty for in-process state (single worker). Set to redis://... to share across workers/replicas.
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
 
 # ==========================================
 # Blockchain RPCs
 # ==========================================
 ETH_RPC_URL = os.getenv("ETH_RPC_URL", "")
+# Comma-separated fallback endpoints; requests go to whichever answers fastest and fail over between them
+ETH_RPC_FALLBACK_URLS = [u.strip() for u in os.getenv("ETH_RPC_FALLBACK_URLS", "").split(",") if u.strip()]
+ETH_RPC_URLS = [u for u in [ETH_RPC_URL, *ETH_RPC_FALLBACK_URLS] if u]
+ETH_BLOCK_TIME = float(os.getenv("ETH_BLOCK_TIME", 12))
 SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "")
 ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY", "")
 
+# ==========================================
+# Market Data
+# ==========================================
+# Alerted, portfolio and recently looked-up tokens are refreshed from CoinGecko every PRICE_FEED_INTERVAL seconds
+PRICE_FEED_INTERVAL = int(os.getenv("PRICE_FEED_INTERVAL", 30))
+# Older quotes are refetched before they are served (stale ones are still served while CoinGecko is down)
+PRICE_MAX_AGE = int(os.getenv("PRICE_MAX_AGE", 90))
+PRICE_BATCH_SIZE = int(os.getenv("PRICE_BATCH_SIZE", 250))
+# The top MARKET_SNAPSHOT_SIZE coins by market cap (up to 1000) back movers, /market and their prices
+MARKET_SNAPSHOT_SIZE = min(int(os.getenv("MARKET_SNAPSHOT_SIZE", 250)), 1000)
+MARKET_SNAPSHOT_INTERVAL = int(os.getenv("MARKET_SNAPSHOT_INTERVAL", 120))
+# Full CoinGecko coin list for local symbol/name/contract resolution, refetched when older than COIN_INDEX_MAX_AGE
+COIN_INDEX_PATH = Path(os.getenv("COIN_INDEX_PATH", str(_env_path.parent / "data" / "coin_index.json.gz")))
+COIN_INDEX_MAX_AGE = int(os.getenv("COIN_INDEX_MAX_AGE", 86400))
+# Seconds between snapshots of every user's portfolio value into crypto_portfolio_history
+PORTFOLIO_SNAPSHOT_INTERVAL = int(os.getenv("PORTFOLIO_SNAPSHOT_INTERVAL", 3600))
+# Whale alerts: transfers of at least WHALE_MIN_ETH touching a known wallet, or WHALE_ANY_MIN_ETH between any addresses
+WHALE_MIN_ETH = float(os.getenv("WHALE_MIN_ETH", 50))
+WHALE_ANY_MIN_ETH = float(os.getenv("WHALE_ANY_MIN_ETH", 1000))
+
 # ==========================================
 # AI Services
 # ==========================================
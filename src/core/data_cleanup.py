@@ -1,78 +1,173 @@
-"""Data retention cleanup to stay within Supabase free tier (50K rows)."""
-
+"""
+Data retention to stay within the Supabase free tier (50K rows).
+
+Each table has a ``RetentionPolicy``. ``run_cleanup`` purges them one after
+another in keyed batches:
+- ``DELETE ... WHERE pk IN (SELECT pk ... WHERE <expired> LIMIT n)``, so
+  every batch is a short transaction that holds few locks and writes
+  little WAL
+- The loop yields to the event loop between batches
+- It stops at a time budget instead of being killed mid-statement
+
+Progress is checkpointed in the state backend after every policy. A run
+that hits its budget resumes with the unfinished policies on the next
+call. Batches that already committed stay deleted either way.
+"""
+
+import asyncio
 import datetime
+import time
+from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import delete
+from sqlalchemy import Date, DateTime, delete, inspect, select, tuple_
 
 from core.database import db_retry, get_db
 from core.logger import setup_logger
+from core.rate_limit_models import PersistentRateLimit
+from core.state_backend import get_state_backend
 from zenith_admin_bot.models import AdminAuditLog
 from zenith_ai_bot.models import AIConversation, AIUsageLog
-from zenith_group_bot.models import ModerationLog
+from zenith_crypto_bot.models import NewPair, PortfolioSnapshot, PriceAlert, TokenSecurity
+from zenith_group_bot.models import ModerationDailyStat, ModerationLog, ModerationViolatorDaily, NewMember
 
 logger = setup_logger("DATA_CLEANUP")
 
+MODERATION_LOG_RETENTION_DAYS = 7
+# Daily rollups back the 30/90-day group analytics long after the raw log is gone
+MODERATION_ROLLUP_RETENTION_DAYS = 90
+
+RETENTION_BATCH_SIZE = 1000
+RETENTION_BATCH_PAUSE = 0.05
+# Stop before the gateway's 120s ``wait_for`` would cancel the run
+RETENTION_TIME_BUDGET = 100.0
+
+_CHECKPOINT_KEY = "retention:checkpoint"
+_CHECKPOINT_TTL = 2 * 86400
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Delete rows of ``model`` whose ``date_col`` is older than ``max_age``."""
+
+    model: Any
+    date_col: Any
+    max_age: datetime.timedelta
+    extra_where: tuple = field(default=())
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    def cutoff(self, now: datetime.datetime) -> Any:
+        """``now - max_age`` in the shape the column stores: date, aware or naive UTC."""
+        cutoff = now - self.max_age
+        col_type = self.date_col.type
+        if isinstance(col_type, Date):
+            return cutoff.date()
+        if isinstance(col_type, DateTime) and col_type.timezone:
+            return cutoff
+        return cutoff.replace(tzinfo=None)
+
+
+RETENTION_POLICIES: tuple[RetentionPolicy, ...] = (
+    RetentionPolicy(AIConversation, AIConversation.created_at, datetime.timedelta(days=5)),
+    RetentionPolicy(ModerationLog, ModerationLog.created_at, datetime.timedelta(days=MODERATION_LOG_RETENTION_DAYS)),
+    RetentionPolicy(
+        ModerationDailyStat, ModerationDailyStat.day, datetime.timedelta(days=MODERATION_ROLLUP_RETENTION_DAYS)
+    ),
+    RetentionPolicy(
+        ModerationViolatorDaily,
+        ModerationViolatorDaily.day,
+        datetime.timedelta(days=MODERATION_ROLLUP_RETENTION_DAYS),
+    ),
+    RetentionPolicy(AdminAuditLog, AdminAuditLog.created_at, datetime.timedelta(days=30)),
+    RetentionPolicy(AIUsageLog, AIUsageLog.usage_date, datetime.timedelta(days=90)),
+    RetentionPolicy(PersistentRateLimit, PersistentRateLimit.window_start, datetime.timedelta(hours=24)),
+    # Triggered alerts are only shown in the alert list; keep them a month
+    RetentionPolicy(
+        PriceAlert, PriceAlert.created_at, datetime.timedelta(days=30), extra_where=(PriceAlert.is_triggered.is_(True),)
+    ),
+    # The New Pairs view only shows the latest few
+    RetentionPolicy(NewPair, NewPair.created_at, datetime.timedelta(days=2)),
+    # Past the longest field TTL every security result is refetched before use anyway
+    RetentionPolicy(TokenSecurity, TokenSecurity.fetched_at, datetime.timedelta(days=30)),
+    # Value-history charts go back at most 90 days
+    RetentionPolicy(PortfolioSnapshot, PortfolioSnapshot.taken_at, datetime.timedelta(days=90)),
+    # Quarantine only looks at joins from the last 24 hours
+    RetentionPolicy(NewMember, NewMember.joined_at, datetime.timedelta(days=2)),
+)
 
-@db_retry
-async def run_cleanup() -> dict[str, int]:
-    """Delete old rows, return dict of table -> rows_deleted."""
-    results: dict[str, int] = {}
 
+@db_retry
+async def _delete_batch(policy: RetentionPolicy, cutoff: Any, batch_size: int) -> int:
+    pk = inspect(policy.model).primary_key
+    key = pk[0] if len(pk) == 1 else tuple_(*pk)
+    expired = select(*pk).where(policy.date_col < cutoff, *policy.extra_where).limit(batch_size)
     async with get_db() as session:
-        now = datetime.datetime.now(datetime.UTC)
-        now_naive = now.replace(tzinfo=None)
-
-        results["zenith_ai_conversations"] = await _do_delete(
-            session,
-            AIConversation,
-            AIConversation.created_at,
-            now_naive - datetime.timedelta(days=5),
-        )
-
-        results["zenith_moderation_log"] = await _do_delete(
-            session,
-            ModerationLog,
-            ModerationLog.created_at,
-            now_naive - datetime.timedelta(days=7),
-        )
-
-        results["admin_audit_log"] = await _do_delete(
-            session,
-            AdminAuditLog,
-            AdminAuditLog.created_at,
-            now - datetime.timedelta(days=30),
-        )
-
-        results["zenith_ai_usage"] = await _do_delete(
-            session,
-            AIUsageLog,
-            AIUsageLog.usage_date,
-            (now_naive - datetime.timedelta(days=90)).date(),
-        )
-
-
-
-        await session.commit()
-
-    total = sum(results.values())
+        result = await session.execute(delete(policy.model).where(key.in_(expired)))
+        return int(result.rowcount)
+
+
+async def purge_expired(
+    policy: RetentionPolicy,
+    now: datetime.datetime | None = None,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    deadline: float | None = None,
+) -> tuple[int, bool]:
+    """Delete expired rows of one policy in batches.
+
+    Returns ``(rows_deleted, finished)``; ``finished`` is False when
+    ``deadline`` (a ``time.monotonic()`` value) passed first.
+    """
+    cutoff = policy.cutoff(now or datetime.datetime.now(datetime.UTC))
+    total = 0
+    while True:
+        deleted = await _delete_batch(policy, cutoff, batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total, True
+        if deadline is not None and time.monotonic() >= deadline:
+            return total, False
+        await asyncio.sleep(RETENTION_BATCH_PAUSE)
+
+
+async def retention_in_progress() -> bool:
+    """True while a budget-limited run has policies left to resume."""
+    return await get_state_backend().get(_CHECKPOINT_KEY) is not None
+
+
+async def run_cleanup(
+    policies: tuple[RetentionPolicy, ...] = RETENTION_POLICIES,
+    time_budget: float = RETENTION_TIME_BUDGET,
+    batch_size: int = RETENTION_BATCH_SIZE,
+) -> dict[str, int]:
+    """Purge every policy, return dict of table -> rows_deleted.
+
+    Counts include batches deleted by earlier, interrupted runs of the same
+    checkpoint.
+    """
+    backend = get_state_backend()
+    checkpoint = await backend.get(_CHECKPOINT_KEY) or {"done": [], "deleted": {}}
+    results: dict[str, int] = dict(checkpoint["deleted"])
+    deadline = time.monotonic() + time_budget
+    now = datetime.datetime.now(datetime.UTC)
+
+    for policy in policies:
+        if policy.table in checkpoint["done"]:
+            continue
+        deleted, finished = await purge_expired(policy, now, batch_size=batch_size, deadline=deadline)
+        results[policy.table] = results.get(policy.table, 0) + deleted
+        if not finished:
+            await backend.set(_CHECKPOINT_KEY, {**checkpoint, "deleted": dict(results)}, ttl=_CHECKPOINT_TTL)
+            logger.warning(f"Retention budget of {time_budget:g}s used up in {policy.table}, will resume")
+            return results
+        checkpoint = {"done": [*checkpoint["done"], policy.table], "deleted": dict(results)}
+        await backend.set(_CHECKPOINT_KEY, checkpoint, ttl=_CHECKPOINT_TTL)
+
+    await backend.delete(_CHECKPOINT_KEY)
     for table, count in results.items():
         if count > 0:
             logger.info(f"Cleaned {count} rows from {table}")
-    logger.info(f"Total rows cleaned: {total}")
+    logger.info(f"Total rows cleaned: {sum(results.values())}")
     return results
-
-
-async def _do_delete(
-    session: Any,
-    model: Any,
-    date_col: Any,
-    cutoff: Any,
-    extra_where: list[Any] | None = None,
-) -> int:
-    stmt = delete(model).where(date_col < cutoff)
-    if extra_where:
-        for clause in extra_where:
-            stmt = stmt.where(clause)
-    result = await session.execute(stmt)
-    return int(result.rowcount)
@@ -1,28 +1,77 @@
 import asyncio
 import contextlib
 import functools
+import random
 import re
-from collections.abc import AsyncGenerator
+import uuid
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
 
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from core.config import DATABASE_URL, DB_POOL_SIZE
+from core.config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_ANALYTICS_POOL_SIZE,
+    DB_BACKGROUND_POOL_SIZE,
+    DB_PGBOUNCER_PREPARED_STATEMENTS,
+    DB_POOL_SIZE,
+)
 from core.logger import setup_logger
+from core.query_profiler import instrument_engines, tag_queries
 
 logger = setup_logger("DATABASE")
+instrument_engines()
 
 Base = declarative_base()
 
+DEFAULT_POOL = "interactive"
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    size: int
+    max_overflow: int
+    timeout: float
+
+
+# Separate pools so background loops and admin reports can never starve user commands.
+POOL_CONFIGS: dict[str, PoolConfig] = {
+    "interactive": PoolConfig(size=max(5, DB_POOL_SIZE), max_overflow=max(10, DB_POOL_SIZE * 2), timeout=30),
+    "background": PoolConfig(size=max(1, DB_BACKGROUND_POOL_SIZE), max_overflow=DB_BACKGROUND_POOL_SIZE, timeout=60),
+    "analytics": PoolConfig(size=max(1, DB_ANALYTICS_POOL_SIZE), max_overflow=0, timeout=120),
+    # Leader election keeps one connection checked out for the process lifetime (advisory locks),
+    # so it gets a pool of its own rather than a permanent slot in the background pool.
+    "leader": PoolConfig(size=1, max_overflow=0, timeout=30),
+}
+
 _engine: AsyncEngine | None = None
 _sessionmaker_instance: sessionmaker | None = None
+_engines: dict[str, AsyncEngine] = {}
+_sessionmakers: dict[AsyncEngine, sessionmaker] = {}
+
+_pool_var: ContextVar[str] = ContextVar("db_pool", default=DEFAULT_POOL)
+_read_only_var: ContextVar[bool] = ContextVar("db_read_only", default=False)
 
 
 class LazyAsyncSessionMaker:
-    """Lazy session maker that acquires a live session dynamically when called or entered."""
+    """Lazy session maker that acquires a live session dynamically when called or entered.
+
+    Routes to the pool and replica chosen by ``db_route``/``use_pool``, or by the
+    ``pool=`` and ``read_only=`` session options. Inside ``unit_of_work()`` it
+    hands out a view of the shared session instead.
+    """
 
-    def __call__(self, *args, **kwargs) -> AsyncSession:
-        sm = get_session()
+    def __call__(self, *args, pool: str | None = None, read_only: bool | None = None, **kwargs) -> AsyncSession:
+        pool = pool or _pool_var.get()
+        read_only = _read_only_var.get() if read_only is None else read_only
+        uow = _current_uow()
+        if uow is not None and not args and not kwargs and pool == DEFAULT_POOL and not read_only:
+            return _JoinedSession(uow)
+        sm = get_session(pool, read_only=read_only)
         return sm(*args, **kwargs)
 
 
@@ -45,44 +94,332 @@ def _resolve_database_url(url: str) -> str:
     return url
 
 
-def get_engine() -> AsyncEngine:
+def _prepared_statement_name() -> str:
+    return f"__zenith_{uuid.uuid4().hex}__"
+
+
+def _create_engine(raw_url: str, config: PoolConfig) -> AsyncEngine:
+    use_pgbouncer = "pgbouncer=true" in raw_url.lower()
+    resolved_url = _resolve_database_url(raw_url)
+    if resolved_url.startswith("sqlite"):
+        return create_async_engine(resolved_url, echo=False)
+
+    connect_args = {}
+    if use_pgbouncer:
+        # Transaction pooling hands each transaction a different server connection, so
+        # asyncpg's own cache must stay off and SQLAlchemy's prepares need globally unique
+        # names. PgBouncer >= 1.21 with max_prepared_statements tracks protocol-level
+        # prepares per client; only then is it safe to keep them cached for reuse.
+        connect_args = {"statement_cache_size": 0, "prepared_statement_name_func": _prepared_statement_name}
+        if not DB_PGBOUNCER_PREPARED_STATEMENTS:
+            connect_args["prepared_statement_cache_size"] = 0
+
+    return create_async_engine(
+        resolved_url,
+        pool_size=config.size,
+        max_overflow=config.max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=300,  # Refresh connections sooner (5 minutes) for cloud DBs
+        pool_timeout=config.timeout,
+        pool_use_lifo=True,
+        connect_args=connect_args,
+    )
+
+
+def _shares_primary() -> bool:
+    # Each SQLite engine is its own database (in-memory in tests), so every pool uses the primary.
+    return (DATABASE_URL or "").startswith("sqlite")
+
+
+def get_engine(pool: str = DEFAULT_POOL, read_only: bool = False) -> AsyncEngine:
+    """Engine for a named pool; ``read_only`` picks a replica when any are configured."""
     global _engine
+    if pool not in POOL_CONFIGS:
+        raise ValueError(f"Unknown database pool: {pool!r}")
     if _engine is None:
-        raw_url = DATABASE_URL or ""
-        use_pgbouncer = "pgbouncer=true" in raw_url.lower()
-        
-        resolved_url = _resolve_database_url(raw_url)
-        if resolved_url.startswith("sqlite"):
-            _engine = create_async_engine(resolved_url, echo=False)
-        else:
-            # If using PgBouncer, statement caching must be 0. Otherwise, use defaults.
-            connect_args = {"statement_cache_size": 0} if use_pgbouncer else {}
-            execution_options = {"prepared_statement_cache_size": 0} if use_pgbouncer else {}
-            
-            _engine = create_async_engine(
-                resolved_url,
-                pool_size=max(5, DB_POOL_SIZE),
-                max_overflow=max(10, DB_POOL_SIZE * 2),
-                pool_pre_ping=True,
-                pool_recycle=300,  # Refresh connections sooner (5 minutes) for cloud DBs
-                pool_timeout=30,
-                pool_use_lifo=True,
-                connect_args=connect_args,
-                execution_options=execution_options,
-            )
-        logger.info("Database engine created (PgBouncer=%s)", use_pgbouncer)
-    return _engine
-
-
-def get_session() -> sessionmaker:
+        _engine = _create_engine(DATABASE_URL or "", POOL_CONFIGS[DEFAULT_POOL])
+        logger.info("Database engine created (PgBouncer=%s)", "pgbouncer=true" in (DATABASE_URL or "").lower())
+    if _shares_primary():
+        return _engine
+
+    replica = random.randrange(len(DATABASE_REPLICA_URLS)) if read_only and DATABASE_REPLICA_URLS else None
+    if pool == DEFAULT_POOL and replica is None:
+        return _engine
+    key = pool if replica is None else f"{pool}@replica{replica}"
+    if key not in _engines:
+        url = DATABASE_URL if replica is None else DATABASE_REPLICA_URLS[replica]
+        _engines[key] = _create_engine(url, POOL_CONFIGS[pool])
+        logger.info(f"Database engine created for pool '{key}'")
+    return _engines[key]
+
+
+def get_engines() -> dict[str, AsyncEngine]:
+    """Every engine created so far, keyed by pool name (replicas as ``pool@replicaN``)."""
+    engines = {DEFAULT_POOL: _engine} if _engine is not None else {}
+    engines.update(_engines)
+    return engines
+
+
+def get_session(pool: str = DEFAULT_POOL, read_only: bool = False) -> sessionmaker:
     global _sessionmaker_instance
-    if _sessionmaker_instance is None:
-        _sessionmaker_instance = sessionmaker(
-            get_engine(),
-            class_=AsyncSession,
-            expire_on_commit=False,
-        )
-    return _sessionmaker_instance
+    engine = get_engine(pool, read_only=read_only)
+    if engine is _engine:
+        if _sessionmaker_instance is None:
+            _sessionmaker_instance = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        return _sessionmaker_instance
+    if engine not in _sessionmakers:
+        _sessionmakers[engine] = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return _sessionmakers[engine]
+
+
+@contextlib.contextmanager
+def use_pool(pool: str, read_only: bool = False):
+    """Route sessions opened in this block (and tasks it spawns) to ``pool``."""
+    if pool not in POOL_CONFIGS:
+        raise ValueError(f"Unknown database pool: {pool!r}")
+    pool_token = _pool_var.set(pool)
+    ro_token = _read_only_var.set(read_only)
+    try:
+        yield
+    finally:
+        _read_only_var.reset(ro_token)
+        _pool_var.reset(pool_token)
+
+
+def db_route(pool: str | None = None, read_only: bool = False):
+    """Decorator: run a repo method on ``pool`` and, if ``read_only``, on a read replica.
+
+    Read-only methods may see replica lag; only mark methods that tolerate it.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with use_pool(pool or _pool_var.get(), read_only=read_only):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class UnitOfWork:
+    """One session (one pooled connection) shared by every repo call in a request.
+
+    Each repo block runs in its own SAVEPOINT, so a block that fails or rolls
+    back only undoes its own work, as it did when it had a private session.
+    Repo ``commit()`` calls become flushes; the real COMMIT happens once when
+    the unit of work ends. Cache invalidations queued with ``after_commit`` run
+    after that, so no other worker can re-cache a row before its change lands.
+    """
+
+    def __init__(self):
+        self.owner = asyncio.current_task()
+        self.session: AsyncSession | None = None
+        self.broken = False
+        self.depth = 0
+        self.joins = 0
+        self.deferred: list[Callable[[], Awaitable]] = []
+
+    def get_session(self) -> AsyncSession:
+        if self.session is None:
+            self.session = get_session()()
+        return self.session
+
+    def detach(self) -> None:
+        """Stop sharing the session (its connection failed); later calls go standalone."""
+        self.broken = True
+
+    async def finish(self) -> None:
+        if self.session is None:
+            return
+        try:
+            if self.broken:
+                await self.session.rollback()
+            else:
+                await self.session.commit()
+        except Exception as e:
+            logger.error(f"Unit of work commit failed after {self.joins} repo calls: {e}", exc_info=True)
+            with contextlib.suppress(Exception):
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+            self.session = None
+
+    async def run_deferred(self) -> None:
+        actions, self.deferred = self.deferred, []
+        for action in actions:
+            try:
+                await action()
+            except Exception as e:
+                logger.warning(f"Deferred post-commit action failed: {e}")
+
+    async def release(self) -> None:
+        """Commit the work so far and return the connection; the next repo call checks out a new one."""
+        if self.depth:
+            return
+        await self.finish()
+        await self.run_deferred()
+
+
+_uow_var: ContextVar[UnitOfWork | None] = ContextVar("db_unit_of_work", default=None)
+
+
+def _current_uow() -> UnitOfWork | None:
+    """The active unit of work, if this task opened one and it is still usable.
+
+    Tasks spawned from a handler inherit the contextvar but must not share the
+    session concurrently, so only the opening task joins.
+    """
+    uow = _uow_var.get()
+    if uow is None or uow.broken or uow.owner is not asyncio.current_task():
+        return None
+    return uow
+
+
+class _NoopTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _JoinedSession:
+    """A repo's view of the shared session: its block runs in a SAVEPOINT."""
+
+    def __init__(self, uow: UnitOfWork):
+        self._uow = uow
+        self._session = uow.get_session()
+        self._nested = None
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def __aenter__(self):
+        self._uow.depth += 1
+        self._uow.joins += 1
+        self._nested = await self._session.begin_nested()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._uow.depth -= 1
+        nested, self._nested = self._nested, None
+        try:
+            if nested is not None and nested.is_active:
+                if exc_type is None:
+                    await nested.commit()
+                else:
+                    await nested.rollback()
+        except Exception:
+            self._uow.detach()
+            raise
+        finally:
+            if self._uow.depth == 0 and self._uow.session is not None:
+                # Objects leave the block detached, exactly as after a standalone session closes
+                self._uow.session.expunge_all()
+        return False
+
+    def begin(self):
+        return _NoopTransaction()
+
+    async def commit(self):
+        await self._session.flush()
+
+    async def rollback(self):
+        if self._nested is not None and self._nested.is_active:
+            await self._nested.rollback()
+            self._nested = await self._session.begin_nested()
+
+    async def close(self):
+        return None
+
+
+@contextlib.asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """Share one session across every repo call made by the current task.
+
+    Opened by the gateway per Telegram update. Repos using ``AsyncSessionLocal()``
+    or ``get_db()`` join it transparently; work outside one (background jobs,
+    tasks spawned from a handler) keeps its own short-lived sessions. Completed
+    repo blocks are committed when the block exits, even if the handler raised,
+    or earlier by ``commit_and_release()`` before the handler goes off-box.
+    """
+    existing = _current_uow()
+    if existing is not None:
+        yield existing
+        return
+    uow = UnitOfWork()
+    token = _uow_var.set(uow)
+    try:
+        yield uow
+    finally:
+        _uow_var.reset(token)
+        try:
+            await uow.finish()
+        finally:
+            await uow.run_deferred()
+
+
+async def after_commit(action: Callable[[], Awaitable], session: AsyncSession | None = None) -> None:
+    """Run ``action`` once the current unit of work has ended, or right away outside one.
+
+    For cache invalidation after a repo write: inside a unit of work the repo's
+    ``commit()`` is only a SAVEPOINT release, so deleting a cache key there lets
+    another worker re-cache the old row before the COMMIT. Deferred actions also
+    run when the unit of work rolls back, which drops anything cached from its
+    uncommitted state. Outside a unit of work, pass the ``session`` whose
+    transaction is still open and ``action`` runs once it commits.
+    """
+    uow = _uow_var.get()
+    if uow is not None and uow.owner is asyncio.current_task():
+        uow.deferred.append(action)
+        return
+    if session is not None and session.in_transaction():
+        event.listen(session.sync_session, "after_commit", lambda _s: _run_soon(action), once=True)
+        return
+    await action()
+
+
+async def commit_and_release() -> None:
+    """Commit the current unit of work and give its connection back before slow external I/O.
+
+    The outbound HTTP transport, the Bot API request and the LLM client call
+    this, so a handler never holds a pooled connection, an open transaction or
+    ``with_for_update`` row locks while it waits on the network. Handlers that
+    sleep between repo calls can call it too. No-op outside a unit of work and
+    inside a repo block.
+    """
+    uow = _current_uow()
+    if uow is not None:
+        await uow.release()
+
+
+_post_commit_tasks: set[asyncio.Task] = set()
+
+
+def _run_soon(action: Callable[[], Awaitable]) -> None:
+    task = asyncio.get_running_loop().create_task(action())
+    _post_commit_tasks.add(task)
+    task.add_done_callback(_post_commit_tasks.discard)
+
+
+@contextlib.asynccontextmanager
+async def read_connection() -> AsyncGenerator[AsyncConnection, None]:
+    """Connection for a single read-only statement (see core.lookups).
+
+    Inside a unit of work this is the shared connection without a savepoint:
+    a lone SELECT has no partial work to undo. Otherwise the connection comes
+    straight from the routed pool, skipping the ORM session entirely.
+    """
+    pool, read_only = _pool_var.get(), _read_only_var.get()
+    uow = _current_uow()
+    if uow is not None and pool == DEFAULT_POOL and not read_only:
+        uow.joins += 1
+        yield await uow.get_session().connection()
+        return
+    async with get_engine(pool, read_only=read_only).connect() as conn:
+        yield conn
 
 
 @contextlib.asynccontextmanager
@@ -93,7 +430,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         async with get_db() as session:
             result = await session.execute(stmt)
     """
-    session = get_session()()
+    pool, read_only = _pool_var.get(), _read_only_var.get()
+    uow = _current_uow()
+    if uow is not None and pool == DEFAULT_POOL and not read_only:
+        async with _JoinedSession(uow) as joined:
+            yield joined
+        return
+    session = get_session(pool, read_only=read_only)()
     try:
         yield session
         await session.commit()
@@ -112,7 +455,8 @@ def db_retry(func):
         last_error = None
         for attempt in range(3):
             try:
-                return await func(*args, **kwargs)
+                with tag_queries(func.__qualname__):
+                    return await func(*args, **kwargs)
             except Exception as e:
                 error_name = type(e).__name__
                 retryable = isinstance(e, ConnectionError | OSError | TimeoutError | asyncio.TimeoutError) or (
@@ -129,6 +473,9 @@ def db_retry(func):
                         "PoolError",
                     )
                 )
+                if retryable and (uow := _current_uow()) is not None:
+                    # The shared connection is gone; retry on a standalone session
+                    uow.detach()
                 if not retryable or attempt == 2:
                     logger.error(
                         f"\n┌── 🚨 SECTOR ERROR DIAGNOSTIC ──┐\n"
@@ -160,6 +507,8 @@ def _get_init_lock() -> asyncio.Lock:
 @db_retry
 async def init_db():
     async with _get_init_lock():
+        import core.analytics_models  # noqa: F401
+        import core.leader_models  # noqa: F401
         import core.rate_limit_models  # noqa: F401
         import zenith_admin_bot.models  # noqa: F401
         import zenith_ai_bot.models  # noqa: F401
@@ -185,6 +534,11 @@ def _get_dispose_lock() -> asyncio.Lock:
 async def dispose_engine():
     global _engine, _sessionmaker_instance
     async with _get_dispose_lock():
+        for key, engine in list(_engines.items()):
+            await engine.dispose()
+            logger.info(f"Database engine disposed (pool '{key}')")
+        _engines.clear()
+        _sessionmakers.clear()
         if _engine is not None:
             await _engine.dispose()
             _engine = None
@@ -4,7 +4,7 @@ Database health monitoring for Project Monolith.
 Provides:
 - Periodic connection pool stats logging
 - Connection health ping
-- Slow query detection
+- Slow query detection and per-repo timings (recorded by core.query_profiler)
 - Pool exhaustion alerting
 """
 
@@ -41,16 +41,27 @@ async def check_connection_health(engine: AsyncEngine) -> tuple[bool, float]:
         return False, round(latency, 2)
 
 
-def get_pool_stats(engine: AsyncEngine) -> dict:
-    """Get connection pool statistics."""
+def get_pool_stats(engine: AsyncEngine | None = None) -> dict:
+    """
+    Get connection pool statistics for one engine, or for every named pool
+    (interactive, background, analytics, replicas) keyed by pool name.
+    """
+    if engine is None:
+        from core.database import get_engines
+
+        return {name: get_pool_stats(eng) for name, eng in get_engines().items()}
     try:
         pool = engine.pool
         if hasattr(pool, "size"):
+            checked_out = pool.checkedout()
+            capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
             return {
                 "total": pool.size(),
                 "checked_in": pool.checkedin(),
-                "checked_out": pool.checkedout(),
+                "checked_out": checked_out,
                 "overflow": pool.overflow(),
+                "timeout": getattr(pool, "_timeout", None),
+                "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
             }
         return {"total": getattr(pool, "_pool_size", 0), "overflow": getattr(pool, "_max_overflow", 0)}
     except Exception as e:
@@ -71,7 +82,7 @@ async def health_monitor_loop(engine: AsyncEngine, interval: int = 300):
             healthy, latency = await check_connection_health(engine)
             _is_healthy = healthy
 
-            stats = get_pool_stats(engine)
+            stats = get_pool_stats()
 
             if healthy:
                 if latency > 1000:
@@ -81,13 +92,16 @@ async def health_monitor_loop(engine: AsyncEngine, interval: int = 300):
             else:
                 logger.error(f"🔴 DB unhealthy: {latency}ms | Pool: {stats}")
 
-            # Warn if pool is nearly exhausted
-            checked_out = stats.get("checked_out", 0)
-            pool_size = stats.get("total", stats.get("pool_size", 1))
-            if isinstance(checked_out, int) and isinstance(pool_size, int) and pool_size > 0:
-                utilization = checked_out / pool_size
-                if utilization > 0.8:
-                    logger.warning(f"⚠️ Connection pool {utilization:.0%} utilized " f"({checked_out}/{pool_size})")
+            # Warn if any pool is nearly exhausted
+            for name, pool_stats in stats.items():
+                checked_out = pool_stats.get("checked_out", 0)
+                pool_size = pool_stats.get("total", pool_stats.get("pool_size", 1))
+                if isinstance(checked_out, int) and isinstance(pool_size, int) and pool_size > 0:
+                    utilization = checked_out / pool_size
+                    if utilization > 0.8:
+                        logger.warning(
+                            f"⚠️ Connection pool '{name}' {utilization:.0%} utilized ({checked_out}/{pool_size})"
+                        )
 
         except asyncio.CancelledError:
             break
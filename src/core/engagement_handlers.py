@@ -6,6 +6,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.logger import setup_logger
+from core.permissions import resolve_tier
 from zenith_crypto_bot.repository import CryptoSubscriptionRepo
 
 logger = setup_logger("ENGAGEMENT")
@@ -90,7 +91,7 @@ async def cmd_mystats(update: Update, context: ContextTypes.DEFAULT_TYPE):
         from zenith_ai_bot.repository import UsageRepo
 
         quota = await UsageRepo.get_token_quota(user_id)
-        days = await CryptoSubscriptionRepo.get_days_left(user_id)
+        days = (await resolve_tier(user_id)).days_left
         stats = await CryptoSubscriptionRepo.get_referral_stats(user_id)
         tier = "Pro" if days > 0 else "Free"
 
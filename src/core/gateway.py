@@ -10,26 +10,30 @@ Provides:
 import asyncio
 import contextlib
 import gc
+import hmac
+import re
 from collections.abc import Callable
 
-from cachetools import TTLCache
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from core.database import unit_of_work
 from core.logger import setup_logger
+from core.metrics import HANDLER_DURATION, timed
+from core.query_profiler import query_scope
 from core.rate_limiter import SlidingWindowLimiter
+from core.state_backend import get_state_backend
+from core.tracing import claim_ingress, record_span, span, start_trace
 
 logger = setup_logger("GATEWAY")
 
-_seen_update_ids: dict[str, TTLCache] = {}
+UPDATE_DEDUP_TTL = 300
 
 
-def get_update_id_dedup_cache(bot_name: str = "default") -> TTLCache:
-    global _seen_update_ids
-    key = bot_name.upper()
-    if key not in _seen_update_ids:
-        _seen_update_ids[key] = TTLCache(maxsize=10000, ttl=300)
-    return _seen_update_ids[key]
+async def is_duplicate_update(bot_name: str, update_id: int) -> bool:
+    """Claim ``update_id`` for ``bot_name``; True if any worker already saw it recently."""
+    key = f"dedup:{bot_name.upper()}:{update_id}"
+    return not await get_state_backend().set_if_absent(key, True, ttl=UPDATE_DEDUP_TTL)
 
 
 class TelegramRequestValidator:
@@ -113,6 +117,7 @@ class GatewayController:
         if self.total_processed % 500 == 0:
             logger.info("Running periodic gateway memory optimization and garbage collection...")
             await SlidingWindowLimiter.prune_all_memory()
+            get_state_backend().prune()
             gc.collect()
 
     def get_stats(self) -> dict:
@@ -127,6 +132,24 @@ class GatewayController:
 _gateway = GatewayController(max_concurrent_updates=250)
 
 
+def _update_label(update: Update) -> str:
+    """Short handler-ish label for per-update query accounting, without ids or user text."""
+    if update.callback_query and update.callback_query.data:
+        return "callback:" + re.sub(r"_-?\d+$", "", update.callback_query.data)
+    message = update.effective_message
+    if message and message.text and message.text.startswith("/"):
+        return message.text.split(maxsplit=1)[0].split("@", 1)[0][:32]
+    return "message" if message else "update"
+
+
+def _route_label(label: str) -> str:
+    """Collapse a callback label to its first two non-numeric segments to bound metric cardinality."""
+    if not label.startswith("callback:"):
+        return label
+    parts = [part for part in label[len("callback:") :].split("_") if not part.lstrip("-").isdigit()]
+    return "callback:" + "_".join(parts[:2])
+
+
 async def gateway_middleware(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -134,27 +157,49 @@ async def gateway_middleware(
 ):
     """
     Middleware function to wrap around bot handlers for validation,
-    rate limiting check, and memory optimization.
+    rate limiting check, and memory optimization. Handlers run inside a
+    unit of work so every repo call for the update shares one DB session.
+    Each update is traced under the id the webhook assigned to it.
     """
-    is_valid, reason = TelegramRequestValidator.validate_update(update)
-    if not is_valid:
-        logger.warning(f"Gateway rejected invalid update: {reason}")
-        return
-
-    acquired = await _gateway.acquire()
-    if not acquired:
-        if update.effective_message:
-            with contextlib.suppress(Exception):
-                await update.effective_message.reply_text(
-                    "⚠️ Server under high load. Please try again in a few seconds."
-                )
-        return
-
+    label = _update_label(update)
     try:
-        await _gateway.check_memory_and_prune()
-        return await next_handler(update, context)
-    finally:
-        _gateway.release()
+        ingress = claim_ingress(update.get_bot(), update.update_id)
+    except RuntimeError:  # built without a bot, e.g. in tests
+        ingress = None
+    trace_id, enqueued = ingress if ingress else (None, None)
+
+    with start_trace(label, trace_id=trace_id, started=enqueued, update_id=update.update_id) as trace:
+        if enqueued is not None:
+            record_span("queue_wait", "stage", enqueued)
+
+        with span("validation", "stage"):
+            is_valid, reason = TelegramRequestValidator.validate_update(update)
+        if not is_valid:
+            trace.attributes["rejected"] = reason
+            logger.warning(f"Gateway rejected invalid update: {reason}")
+            return
+
+        acquired = await _gateway.acquire()
+        if not acquired:
+            trace.attributes["rejected"] = "overloaded"
+            if update.effective_message:
+                with contextlib.suppress(Exception):
+                    await update.effective_message.reply_text(
+                        "⚠️ Server under high load. Please try again in a few seconds."
+                    )
+            return
+
+        try:
+            await _gateway.check_memory_and_prune()
+            with (
+                span("handler", "stage"),
+                timed(HANDLER_DURATION, route=_route_label(label)),
+                query_scope(label),
+            ):
+                async with unit_of_work():
+                    return await next_handler(update, context)
+        finally:
+            _gateway.release()
 
 
 def get_gateway() -> GatewayController:
@@ -172,6 +217,16 @@ def validate_webhook_auth(path_secret: str, request) -> bool:
     return not (header_token and header_token != WEBHOOK_SECRET)
 
 
+def validate_ops_auth(request) -> bool:
+    """Validate ``Authorization: Bearer <WEBHOOK_SECRET>`` on operator-only endpoints."""
+    from core.config import WEBHOOK_SECRET
+
+    if not WEBHOOK_SECRET:
+        return False
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), WEBHOOK_SECRET.encode())
+
+
 def resolve_webhook_url(bot_name: str) -> str:
     """Build the full webhook URL for a bot service."""
     from core.config import WEBHOOK_SECRET, WEBHOOK_URL
@@ -0,0 +1,267 @@
+"""
+Lease-based leader election for singleton background loops.
+
+Every replica starts the same bots, but loops that poll external APIs or send
+user alerts (price alerts, whale/wallet watchers, schedulers, cleanup) must
+run on exactly one of them. Each loop is wrapped with ``leader_only(name, fn)``;
+the wrapped loop only runs while this process holds the lease for ``name``
+and is cancelled as soon as the lease is lost.
+
+Backends:
+- Postgres: session-level ``pg_try_advisory_lock`` on one dedicated connection
+  from the single-connection ``leader`` pool. A crashed leader's session ends
+  and the lock is freed immediately.
+- Anything else (SQLite in tests, PgBouncer transaction pooling where session
+  locks are unsafe): a ``leader_leases`` row renewed every RENEW_INTERVAL and
+  taken over once it is LEASE_SECONDS stale.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+from sqlalchemy import or_, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from core.config import DATABASE_URL
+from core.database import AsyncSessionLocal
+from core.leader_models import LeaderLease
+from core.logger import setup_logger
+from utils.time_util import utc_now
+
+logger = setup_logger("LEADER")
+
+LEASE_SECONDS = 15.0
+RENEW_INTERVAL = 5.0
+
+
+def _lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a loop name."""
+    digest = hashlib.blake2b(f"zenith:leader:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class LeaderElector:
+    """Campaigns for a set of named leases on behalf of this process."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        lease_seconds: float = LEASE_SECONDS,
+        renew_interval: float = RENEW_INTERVAL,
+        use_advisory_locks: bool | None = None,
+    ):
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.renew_interval = renew_interval
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        if use_advisory_locks is None:
+            use_advisory_locks = engine.dialect.name == "postgresql" and "pgbouncer=true" not in DATABASE_URL.lower()
+        self.use_advisory_locks = use_advisory_locks
+
+        self._names: set[str] = set()
+        self._held: set[str] = set()
+        self._leading: dict[str, asyncio.Event] = {}
+        self._following: dict[str, asyncio.Event] = {}
+        self._wake = asyncio.Event()
+        self._conn: AsyncConnection | None = None
+
+    def register(self, name: str) -> None:
+        if name in self._names:
+            return
+        self._names.add(name)
+        self._leading[name] = asyncio.Event()
+        self._following[name] = asyncio.Event()
+        self._following[name].set()
+        self._wake.set()
+
+    def is_leader(self, name: str) -> bool:
+        return name in self._held
+
+    async def wait_for_leadership(self, name: str) -> None:
+        self.register(name)
+        await self._leading[name].wait()
+
+    async def wait_for_loss(self, name: str) -> None:
+        await self._following[name].wait()
+
+    def _set_held(self, name: str, held: bool) -> None:
+        if held == (name in self._held):
+            return
+        if held:
+            self._held.add(name)
+            self._following[name].clear()
+            self._leading[name].set()
+            logger.info(f"👑 Acquired leadership: {name} ({self.holder_id})")
+        else:
+            self._held.discard(name)
+            self._leading[name].clear()
+            self._following[name].set()
+            logger.warning(f"Lost leadership: {name}")
+
+    def _drop_all(self) -> None:
+        for name in list(self._held):
+            self._set_held(name, False)
+
+    async def tick(self) -> None:
+        """One acquire/renew round for every registered name."""
+        try:
+            if self.use_advisory_locks:
+                await self._tick_advisory()
+            else:
+                await self._tick_lease()
+        except Exception as e:
+            logger.warning(f"Leader election round failed, stepping down: {e}")
+            self._drop_all()
+            await self._close_conn()
+
+    async def _tick_advisory(self) -> None:
+        if self._conn is None:
+            self._conn = await self.engine.connect()
+        # Session-level locks live as long as this connection; a successful
+        # round trip is the lease renewal.
+        await self._conn.execute(text("SELECT 1"))
+        for name in sorted(self._names - self._held):
+            result = await self._conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _lock_key(name)})
+            if result.scalar():
+                self._set_held(name, True)
+        await self._conn.commit()
+
+    async def _tick_lease(self) -> None:
+        now = utc_now()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        async with AsyncSessionLocal(pool="leader") as session:
+            insert = sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+            acquired = set()
+            for name in sorted(self._names):
+                result = await session.execute(
+                    update(LeaderLease)
+                    .where(
+                        LeaderLease.name == name,
+                        or_(LeaderLease.holder == self.holder_id, LeaderLease.expires_at < now),
+                    )
+                    .values(holder=self.holder_id, expires_at=expires_at)
+                )
+                if result.rowcount == 0:
+                    stmt = insert(LeaderLease).values(name=name, holder=self.holder_id, expires_at=expires_at)
+                    result = await session.execute(stmt.on_conflict_do_nothing(index_elements=["name"]))
+                if result.rowcount == 1:
+                    acquired.add(name)
+            await session.commit()
+        for name in self._names:
+            self._set_held(name, name in acquired)
+
+    async def run(self) -> None:
+        while True:
+            self._wake.clear()
+            await self.tick()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.renew_interval)
+
+    async def release(self) -> None:
+        """Give up every lease so another replica can take over without waiting."""
+        held = list(self._held)
+        self._drop_all()
+        if not held:
+            await self._close_conn()
+            return
+        try:
+            if self.use_advisory_locks and self._conn is not None:
+                for name in held:
+                    await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _lock_key(name)})
+                await self._conn.commit()
+            elif not self.use_advisory_locks:
+                async with AsyncSessionLocal(pool="leader") as session:
+                    await session.execute(
+                        update(LeaderLease).where(LeaderLease.holder == self.holder_id).values(expires_at=utc_now())
+                    )
+                    await session.commit()
+        except Exception as e:
+            logger.warning(f"Leader lease release failed (will expire on its own): {e}")
+        await self._close_conn()
+
+    async def _close_conn(self) -> None:
+        if self._conn is not None:
+            with contextlib.suppress(Exception):
+                await self._conn.close()
+            self._conn = None
+
+
+_elector: LeaderElector | None = None
+_task: asyncio.Task | None = None
+
+
+async def start_leader_election(engine: AsyncEngine):
+    """Start campaigning for leases. Loops wrapped with ``leader_only`` wait for it."""
+    global _elector, _task
+    if _task is not None:
+        return
+    _elector = LeaderElector(engine)
+    _task = asyncio.create_task(_elector.run())
+    mode = "advisory locks" if _elector.use_advisory_locks else "lease table"
+    logger.info(f"🗳️ Leader election started ({mode}, id={_elector.holder_id})")
+
+
+async def stop_leader_election():
+    global _elector, _task
+    if _task:
+        _task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _task
+        _task = None
+    if _elector:
+        await _elector.release()
+        _elector = None
+
+
+def campaign(name: str) -> None:
+    """Start competing for ``name`` without blocking (pair with ``is_leader``)."""
+    if _elector is not None:
+        _elector.register(name)
+
+
+def is_leader(name: str) -> bool:
+    """True if this process should run ``name``. Without election every process leads."""
+    return _elector is None or _elector.is_leader(name)
+
+
+def leader_only(name: str, loop_fn: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+    """
+    Wrap a background loop so it only runs while this process leads ``name``.
+
+    The wrapper waits for leadership, runs ``loop_fn`` and cancels it if the
+    lease is lost, then waits to be re-elected. If ``loop_fn`` returns or
+    raises, so does the wrapper. Scheduler jobs use ``leader=True`` instead.
+    When election is not running (standalone bot scripts) the loop runs as-is.
+    """
+
+    async def runner():
+        elector = _elector
+        if elector is None:
+            return await loop_fn()
+
+        while True:
+            await elector.wait_for_leadership(name)
+            task = asyncio.create_task(loop_fn())
+            lost = asyncio.create_task(elector.wait_for_loss(name))
+            try:
+                done, _ = await asyncio.wait({task, lost}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                lost.cancel()
+                if not task.done():
+                    task.cancel()
+                    # wait() rather than awaiting the task so our own cancellation is never swallowed
+                    await asyncio.wait({task})
+            if task in done:
+                return task.result()
+            # Lease lost: the loop was cancelled, wait to be re-elected
+
+    runner.__name__ = getattr(loop_fn, "__name__", name)
+    return runner
@@ -0,0 +1,13 @@
+"""Leader lease model used when Postgres advisory locks are unavailable."""
+
+from sqlalchemy import Column, DateTime, String
+
+from core.database import Base
+
+
+class LeaderLease(Base):
+    __tablename__ = "leader_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
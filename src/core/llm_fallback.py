@@ -1,10 +1,14 @@
 import asyncio
+import time
 from dataclasses import dataclass
 
 from groq import AsyncGroq
 
 from core.circuit_breaker import get_breaker
+from core.database import commit_and_release
 from core.logger import setup_logger
+from core.metrics import LLM_DURATION, LLM_TOKENS
+from core.tracing import record_span
 
 logger = setup_logger("LLM_FALLBACK")
 
@@ -135,11 +139,14 @@ class AIExecutionEngine:
                 error="circuit_open",
             )
 
+        # Completions take seconds: don't hold the update's DB connection through them
+        await commit_and_release()
         client = AsyncGroq(api_key=api_key, max_retries=1, timeout=timeout)
         chain = cls.get_fallback_chain(preferred_model)
         last_error = "unknown_error"
 
         for idx, model_id in enumerate(chain):
+            started = time.perf_counter()
             try:
                 # Adjust max_tokens if model has lower limit
                 m_info = AVAILABLE_MODELS.get(model_id, {})
@@ -156,6 +163,12 @@ class AIExecutionEngine:
                     kwargs["tool_choice"] = "auto"
                 
                 response = await client.chat.completions.create(**kwargs)
+                LLM_DURATION.observe(time.perf_counter() - started, model=model_id, outcome="ok")
+                usage = getattr(response, "usage", None)
+                if usage:
+                    LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model_id, kind="prompt")
+                    LLM_TOKENS.inc(usage.completion_tokens or 0, model=model_id, kind="completion")
+                record_span(model_id, "llm", started, tokens=usage.total_tokens if usage else 0)
                 raw_content = response.choices[0].message.content or ""
                 t_calls = response.choices[0].message.tool_calls
                 breaker.record_success()
@@ -173,6 +186,8 @@ class AIExecutionEngine:
                 )
 
             except Exception as e:
+                LLM_DURATION.observe(time.perf_counter() - started, model=model_id, outcome="error")
+                record_span(model_id, "llm", started, error=type(e).__name__)
                 error_str = str(e).lower()
                 if "429" in error_str or "rate_limit" in error_str or "rate limit" in error_str:
                     logger.warning(f"Groq rate limit on {model_id}: {e}")
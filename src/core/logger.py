@@ -14,6 +14,11 @@ def set_correlation_id(cid: str | None):
     return _correlation_id.set(cid)
 
 
+def reset_correlation_id(token) -> None:
+    """Restore the correlation ID that was active before ``set_correlation_id`` returned ``token``."""
+    _correlation_id.reset(token)
+
+
 def get_correlation_id() -> str | None:
     """Retrieve the correlation ID of the current async execution context."""
     return _correlation_id.get()
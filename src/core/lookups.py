@@ -0,0 +1,37 @@
+"""
+Fast path for the hottest single-row repository lookups.
+
+Hot lookups (days left, group settings, API key, quarantine, strikes) run on
+every message, so they skip the ORM:
+- Statements are wrapped in ``lambda_stmt``: SQLAlchemy builds the construct
+  and its cache key once per call site and afterwards only extracts the new
+  bound values, instead of rebuilding ``select()`` on every call
+- They select table columns and run on a plain Core connection, returning
+  ``Row`` tuples (or ``__slots__`` dataclasses) rather than ORM entities, so
+  there is no identity map or attribute instrumentation
+- Inside a unit of work they reuse its connection without a savepoint
+
+Usage:
+    expires_at = await fetch_scalar(
+        lambda_stmt(lambda: select(subs.c.expires_at).where(subs.c.user_id == user_id))
+    )
+"""
+
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.sql import Executable
+
+from core.database import read_connection
+
+
+async def fetch_first(stmt: Executable) -> Row | None:
+    """First row of a read-only statement, or None."""
+    async with read_connection() as conn:
+        return (await conn.execute(stmt)).first()
+
+
+async def fetch_scalar(stmt: Executable, default: Any = None) -> Any:
+    """First column of the first row, or ``default`` when there is no row."""
+    row = await fetch_first(stmt)
+    return default if row is None else row[0]
@@ -0,0 +1,320 @@
+"""
+Prometheus text exposition for the whole monolith (``GET /metrics``).
+Scrapers authenticate with ``Authorization: Bearer <WEBHOOK_SECRET>``.
+
+Two kinds of metrics:
+- Instruments (``Counter``, ``Histogram``) updated on the hot path. They are
+  plain dicts keyed by label values. Every update runs on the event loop
+  thread, so there are no locks, and an update costs one dict lookup
+- Collectors, called only at scrape time. They read state that other
+  modules already keep: gateway stats, circuit breakers, cache counters,
+  DB pools, queue depths, query timings
+
+Label cardinality is capped per metric. Once ``MAX_SERIES`` label sets
+exist, new ones are folded into ``other``, so user-controlled values
+(commands, callback data) cannot grow memory without bound.
+"""
+
+import contextlib
+import math
+import time
+from collections.abc import Callable, Iterable
+
+from telegram.request import HTTPXRequest
+
+from core.database import commit_and_release
+from core.logger import setup_logger
+from core.tracing import span
+
+logger = setup_logger("METRICS")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+MAX_SERIES = 200
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if value == math.inf:
+        return f"{name} +Inf"
+    return f"{name} {value:g}" if isinstance(value, float) else f"{name} {value}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple, object] = {}
+
+    def _key(self, labels: dict[str, str]) -> tuple:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        if key not in self._series and len(self._series) >= MAX_SERIES:
+            return ("other",) * len(self.labelnames)
+        return key
+
+    def _labels(self, key: tuple) -> dict[str, str]:
+        return dict(zip(self.labelnames, key, strict=True))
+
+    def samples(self) -> list[Sample]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._series.get(self._key(labels), 0)
+
+    def samples(self) -> list[Sample]:
+        return [(f"{self.name}_total", self._labels(key), value) for key, value in self._series.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) if buckets[-1] == math.inf else (*buckets, math.inf)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # [bucket counts..., sum]
+            series = self._series[key] = [0] * len(self.buckets) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-1] += value
+
+    def samples(self) -> list[Sample]:
+        out: list[Sample] = []
+        for key, series in self._series.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series, strict=False):
+                cumulative += hits
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                out.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            out.append((f"{self.name}_count", labels, cumulative))
+            out.append((f"{self.name}_sum", labels, series[-1]))
+        return out
+
+
+class Gauge(_Metric):
+    """A gauge whose samples come from a callable at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Iterable[tuple[dict, float]]]):
+        super().__init__(name, documentation)
+        self._collect = collect
+
+    def samples(self) -> list[Sample]:
+        return [(self.name, labels, value) for labels, value in self._collect()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, collect: Callable) -> Gauge:
+        return self.register(Gauge(name, documentation, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.warning(f"Metric {metric.name} failed to collect: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(name, labels, value) for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── Instruments updated on the hot path ────────────────────
+UPDATES_RECEIVED = REGISTRY.counter(
+    "monolith_updates_received", "Telegram updates accepted by the webhook, per bot", ["bot"]
+)
+HANDLER_DURATION = REGISTRY.histogram(
+    "monolith_handler_duration_seconds", "Update handling time by command or callback prefix", ["route"]
+)
+TELEGRAM_REQUESTS = REGISTRY.counter(
+    "monolith_telegram_requests", "Outbound Bot API calls by bot, method and HTTP status", ["bot", "method", "status"]
+)
+TELEGRAM_RATE_LIMITED = REGISTRY.counter(
+    "monolith_telegram_rate_limited", "Outbound Bot API calls answered with 429", ["bot", "method"]
+)
+LLM_DURATION = REGISTRY.histogram(
+    "monolith_llm_request_duration_seconds", "LLM completion latency per model and outcome", ["model", "outcome"]
+)
+LLM_TOKENS = REGISTRY.counter("monolith_llm_tokens", "LLM tokens used per model", ["model", "kind"])
+UPSTREAM_COALESCED = REGISTRY.counter(
+    "monolith_upstream_coalesced", "External API calls that joined an identical call already in flight", ["call"]
+)
+
+
+class MeteredHTTPXRequest(HTTPXRequest):
+    """Bot API transport that counts outbound calls and 429s for one bot.
+
+    Commits the caller's unit of work before each call, like ``TracedTransport``.
+    """
+
+    def __init__(self, bot_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.bot_name = bot_name
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        await commit_and_release()
+        try:
+            with span(api_method, "telegram", bot=self.bot_name) as current:
+                code, payload = await super().do_request(url, method, *args, **kwargs)
+                if current is not None:
+                    current.attributes["status"] = code
+        except Exception:
+            TELEGRAM_REQUESTS.inc(bot=self.bot_name, method=api_method, status="error")
+            raise
+        TELEGRAM_REQUESTS.inc(bot=self.bot_name, method=api_method, status=str(code))
+        if code == 429:
+            TELEGRAM_RATE_LIMITED.inc(bot=self.bot_name, method=api_method)
+        return code, payload
+
+
+@contextlib.contextmanager
+def timed(histogram: Histogram, **labels: str):
+    """``with timed(HANDLER_DURATION, route="/start"):`` observes the block's wall time."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+# ── Collectors, evaluated per scrape ───────────────────────
+def _queue_depths():
+    from core.webhook_router import get_registered_bots
+
+    for bot, bot_app in get_registered_bots().items():
+        yield {"bot": bot}, bot_app.update_queue.qsize()
+
+
+def _gateway_stats():
+    from core.gateway import get_gateway
+
+    stats = get_gateway().get_stats()
+    for field in ("active_requests", "total_processed", "rejected_requests"):
+        yield {"field": field}, stats[field]
+
+
+def _breaker_states():
+    from core.circuit_breaker import get_all_breaker_statuses
+
+    for status in get_all_breaker_statuses():
+        for state in ("closed", "open", "half_open"):
+            yield {"breaker": status["name"], "state": state}, 1 if status["state"] == state else 0
+
+
+def _breaker_failures():
+    from core.circuit_breaker import get_all_breaker_statuses
+
+    for status in get_all_breaker_statuses():
+        yield {"breaker": status["name"]}, status["recent_failures"]
+
+
+def _cache_stats(field: str):
+    def collect():
+        from core.cache import get_cache_stats
+
+        for name, stats in get_cache_stats().items():
+            yield {"cache": name}, stats[field]
+
+    return collect
+
+
+def _db_pools(field: str):
+    def collect():
+        from core.db_health import get_pool_stats
+
+        for pool, stats in get_pool_stats().items():
+            if isinstance(stats.get(field), int | float):
+                yield {"pool": pool}, stats[field]
+
+    return collect
+
+
+def _query_stats(field: str):
+    def collect():
+        from core.query_profiler import get_histograms
+
+        for repo, hist in get_histograms().items():
+            yield {"repo": repo}, hist.count if field == "count" else hist.total_ms / 1000
+
+    return collect
+
+
+def _scheduler_jobs(field: str):
+    def collect():
+        from core.scheduler import get_all_scheduler_stats
+
+        for scheduler, scheduler_stats in get_all_scheduler_stats().items():
+            for job, stats in scheduler_stats["jobs"].items():
+                if isinstance(stats.get(field), int | float):
+                    yield {"scheduler": scheduler, "job": job}, stats[field]
+
+    return collect
+
+
+REGISTRY.gauge("monolith_update_queue_depth", "Updates waiting in each bot's PTB queue", _queue_depths)
+REGISTRY.gauge("monolith_gateway", "GatewayController active, processed and rejected update counts", _gateway_stats)
+REGISTRY.gauge("monolith_circuit_breaker_state", "1 for each breaker's current state", _breaker_states)
+REGISTRY.gauge("monolith_circuit_breaker_recent_failures", "Failures inside each breaker's window", _breaker_failures)
+REGISTRY.gauge("monolith_cache_hits", "Lookups served from an in-process cache", _cache_stats("hits"))
+REGISTRY.gauge("monolith_cache_misses", "Lookups that missed an in-process cache", _cache_stats("misses"))
+REGISTRY.gauge("monolith_cache_entries", "Live entries per in-process cache", _cache_stats("size"))
+REGISTRY.gauge("monolith_db_pool_checked_out", "Connections in use per pool", _db_pools("checked_out"))
+REGISTRY.gauge("monolith_db_pool_size", "Configured connections per pool", _db_pools("total"))
+REGISTRY.gauge("monolith_db_pool_overflow", "Overflow connections per pool", _db_pools("overflow"))
+REGISTRY.gauge("monolith_db_pool_utilization", "Checked-out share of pool capacity", _db_pools("utilization"))
+REGISTRY.gauge("monolith_db_queries", "Statements executed per repo method", _query_stats("count"))
+REGISTRY.gauge("monolith_db_query_seconds", "Statement time spent per repo method", _query_stats("seconds"))
+REGISTRY.gauge("monolith_scheduler_job_runs", "Completed runs per scheduled job", _scheduler_jobs("runs"))
+REGISTRY.gauge("monolith_scheduler_job_failures", "Failed runs per scheduled job", _scheduler_jobs("failures"))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
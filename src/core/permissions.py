@@ -3,7 +3,7 @@ Unified tier-checking middleware for all Zenith bots.
 
 Provides:
 - TierContext: resolved user tier info (cached)
-- resolve_tier(): single async call to get user's tier
+- resolve_tier(): single async call to get user's tier for a product
 - @require_pro / @require_owner decorators for handler functions
 - Replaces 30+ inline tier-check patterns across all bots
 """
@@ -12,18 +12,32 @@ import contextlib
 import functools
 import inspect
 from dataclasses import dataclass
+from datetime import UTC, datetime
 
-from cachetools import TTLCache
+from sqlalchemy import lambda_stmt, select
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from core.config import is_owner
+from core.database import after_commit
 from core.logger import setup_logger
+from core.state_backend import get_state_backend
 
 logger = setup_logger("PERMISSIONS")
 
-# Cache tier lookups for 60 seconds to avoid DB spam
-_tier_cache: TTLCache = TTLCache(maxsize=10000, ttl=60.0)
+# Products with their own subscription table
+PRODUCT_CRYPTO = "crypto"  # Zenith Pro: crypto + AI bots (``subscriptions``)
+PRODUCT_GROUP = "group"  # Group bot Pro (``group_subscriptions``)
+PRODUCTS = (PRODUCT_CRYPTO, PRODUCT_GROUP)
+
+# Cached expiries live until the soonest one passes, capped here. Subscription
+# changes invalidate explicitly, so users without one are cached for the full cap.
+_TIER_CACHE_MAX_TTL = 600.0
+_TIER_CACHE_MIN_TTL = 1.0
+
+
+def _tier_key(user_id: int) -> str:
+    return f"tier_expiry:{user_id}"
 
 
 @dataclass
@@ -35,55 +49,110 @@ class TierContext:
     is_pro: bool
     days_left: int
     tier_name: str  # "owner", "pro", "free"
+    product: str = PRODUCT_CRYPTO
+    expires_at: datetime | None = None
 
     @property
     def can_access_pro(self) -> bool:
         return self.is_owner or self.is_pro
 
 
-async def resolve_tier(user_id: int) -> TierContext:
-    """
-    Resolve a user's tier with caching.
+def _as_utc(value: datetime | None) -> datetime | None:
+    # SQLite drops tzinfo on DateTime(timezone=True) columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
 
-    Single DB call, cached for 60 seconds. All handlers should use this
-    instead of making their own CryptoSubscriptionRepo calls.
-    """
-    # Check cache first
-    cached = _tier_cache.get(user_id)
-    if cached is not None:
-        return cached
 
-    # Import here to avoid circular imports at module level
-    from zenith_crypto_bot.repository import CryptoSubscriptionRepo
+def _days_left(expires_at: datetime | None, now: datetime) -> int:
+    if not expires_at or expires_at <= now:
+        return 0
+    remaining = expires_at - now
+    return remaining.days + (1 if remaining.seconds > 0 else 0)
+
+
+async def _load_expiries(user_id: int) -> dict[str, datetime | None]:
+    """Both subscription expiries in one round trip."""
+    from core.lookups import fetch_first
+    from zenith_crypto_bot.models import Subscription
+    from zenith_group_bot.models import GroupSubscription
+
+    crypto = Subscription.__table__
+    group = GroupSubscription.__table__
+    row = await fetch_first(
+        lambda_stmt(
+            lambda: select(
+                select(crypto.c.expires_at).where(crypto.c.user_id == user_id).scalar_subquery(),
+                select(group.c.expires_at).where(group.c.user_id == user_id).scalar_subquery(),
+            )
+        )
+    )
+    crypto_expiry, group_expiry = row if row is not None else (None, None)
+    return {PRODUCT_CRYPTO: _as_utc(crypto_expiry), PRODUCT_GROUP: _as_utc(group_expiry)}
+
 
-    owner = is_owner(user_id)
+def _cache_ttl(expiries: dict[str, datetime | None], now: datetime) -> float:
+    upcoming = [(exp - now).total_seconds() for exp in expiries.values() if exp and exp > now]
+    if not upcoming:
+        return _TIER_CACHE_MAX_TTL
+    return max(_TIER_CACHE_MIN_TTL, min(_TIER_CACHE_MAX_TTL, min(upcoming)))
 
-    if owner:
-        ctx = TierContext(
+
+async def resolve_tier(user_id: int, product: str = PRODUCT_CRYPTO) -> TierContext:
+    """
+    Resolve a user's tier for ``product`` ("crypto" or "group").
+
+    One query loads both subscriptions; the expiries are cached (including
+    "no subscription") until the soonest one passes. Subscription changes
+    call ``invalidate_tier_cache``. All handlers should use this instead of
+    the repos' ``is_pro``/``get_days_left``.
+    """
+    if product not in PRODUCTS:
+        raise ValueError(f"Unknown product: {product!r}")
+
+    if is_owner(user_id):
+        return TierContext(
             user_id=user_id,
             is_owner=True,
             is_pro=True,
             days_left=999,
             tier_name="owner",
+            product=product,
         )
-    else:
-        days_left = await CryptoSubscriptionRepo.get_days_left(user_id)
-        is_pro = days_left > 0
-        ctx = TierContext(
-            user_id=user_id,
-            is_owner=False,
-            is_pro=is_pro,
-            days_left=days_left,
-            tier_name="pro" if is_pro else "free",
-        )
-
-    _tier_cache[user_id] = ctx
-    return ctx
 
+    backend = get_state_backend()
+    now = datetime.now(UTC)
+    expiries = await backend.get(_tier_key(user_id))
+    if expiries is None:
+        expiries = await _load_expiries(user_id)
+        await backend.set(_tier_key(user_id), expiries, ttl=_cache_ttl(expiries, now))
+
+    expires_at = expiries.get(product)
+    days_left = _days_left(expires_at, now)
+    return TierContext(
+        user_id=user_id,
+        is_owner=False,
+        is_pro=days_left > 0,
+        days_left=days_left,
+        tier_name="pro" if days_left > 0 else "free",
+        product=product,
+        expires_at=expires_at,
+    )
+
+
+async def invalidate_tier_cache(user_id: int, session=None) -> None:
+    """
+    Invalidate cached tier for a user (call after subscription changes).
 
-def invalidate_tier_cache(user_id: int) -> None:
-    """Invalidate cached tier for a user (call after subscription changes)."""
-    _tier_cache.pop(user_id, None)
+    The entry is dropped now and again once the change commits (see
+    ``after_commit``; pass the session making the change when it runs outside
+    a unit of work). A read that raced the transaction, or a tier cached from
+    uncommitted state in a unit of work that then rolls back, is not left behind.
+    """
+    key = _tier_key(user_id)
+    backend = get_state_backend()
+    await backend.delete(key)
+    await after_commit(lambda: backend.delete(key), session)
 
 
 def _accepts_tier(func) -> bool:
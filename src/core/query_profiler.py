@@ -0,0 +1,208 @@
+"""
+Statement-level query profiling for every database engine.
+
+``instrument_engines`` hooks SQLAlchemy's ``before_cursor_execute`` /
+``after_cursor_execute`` events for every engine and records:
+- Latency histograms per repo method. ``db_retry`` tags the statements it
+  runs with the method's qualified name, e.g. ``AuditLogRepo.log_action``;
+  untagged statements are counted as ``untagged``
+- A ring buffer of slow statements (over ``DB_SLOW_QUERY_MS``) with their
+  parameters redacted to type names
+- N+1 suspects: updates (``query_scope``) that ran more than
+  ``DB_N_PLUS_ONE_THRESHOLD`` statements, with the repo methods responsible
+
+Everything is in-process and exported by ``get_query_report`` for
+``/health/db`` and the admin dashboard.
+"""
+
+import contextlib
+import contextvars
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import DB_N_PLUS_ONE_THRESHOLD, DB_SLOW_QUERY_MS
+from core.logger import setup_logger
+from core.tracing import record_span
+
+logger = setup_logger("QUERY_PROFILER")
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+_SLOW_SAMPLE_SIZE = 50
+_N_PLUS_ONE_SAMPLE_SIZE = 20
+_STATEMENT_PREVIEW = 500
+_UNTAGGED = "untagged"
+
+_repo_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("db_repo_method", default=None)
+_scope_var: contextvars.ContextVar["_QueryScope | None"] = contextvars.ContextVar("db_query_scope", default=None)
+
+
+@dataclass
+class LatencyHistogram:
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_MS))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket bound holding the ``q`` quantile (the observed max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets, strict=True):
+            seen += hits
+            if seen >= rank:
+                return self.max_ms if bound == float("inf") else float(bound)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+@dataclass
+class _QueryScope:
+    label: str
+    queries: int = 0
+    by_repo: Counter = field(default_factory=Counter)
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_slow_queries: deque = deque(maxlen=_SLOW_SAMPLE_SIZE)
+_n_plus_one: deque = deque(maxlen=_N_PLUS_ONE_SAMPLE_SIZE)
+
+
+def _redact(parameters: Any) -> Any:
+    """Replace bound values with their type names so no user data is kept."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [_redact(p) if isinstance(p, dict | list | tuple) else type(p).__name__ for p in parameters]
+    return type(parameters).__name__
+
+
+def record_query(repo: str | None, ms: float, statement: str, parameters: Any = None) -> None:
+    """Account one executed statement (called by the engine hooks)."""
+    repo = repo or _UNTAGGED
+    hist = _histograms.get(repo)
+    if hist is None:
+        hist = _histograms[repo] = LatencyHistogram()
+    hist.observe(ms)
+
+    if (scope := _scope_var.get()) is not None:
+        scope.queries += 1
+        scope.by_repo[repo] += 1
+
+    if ms >= DB_SLOW_QUERY_MS:
+        _slow_queries.append(
+            {
+                "repo": repo,
+                "ms": round(ms, 2),
+                "statement": " ".join(statement.split())[:_STATEMENT_PREVIEW],
+                "parameters": _redact(parameters),
+                "at": datetime.now(UTC).isoformat(timespec="seconds"),
+            }
+        )
+        logger.warning(f"Slow query in {repo}: {ms:.0f}ms")
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, parameters, _context, _executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        started = starts.pop()
+        repo = _repo_var.get()
+        record_query(repo, (time.perf_counter() - started) * 1000, statement, parameters)
+        record_span(repo or _UNTAGGED, "db", started)
+
+
+def _handle_error(context):
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engines() -> None:
+    """Attach the profiling hooks to every engine, including ones created later. Idempotent."""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+@contextlib.contextmanager
+def tag_queries(repo: str):
+    """Attribute statements run inside this block to ``repo``."""
+    token = _repo_var.set(repo)
+    try:
+        yield
+    finally:
+        _repo_var.reset(token)
+
+
+@contextlib.contextmanager
+def query_scope(label: str):
+    """Count the statements of one unit of work (a Telegram update) to flag N+1 patterns."""
+    scope = _QueryScope(label)
+    token = _scope_var.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope_var.reset(token)
+        if scope.queries > DB_N_PLUS_ONE_THRESHOLD:
+            _n_plus_one.append(
+                {
+                    "label": label,
+                    "queries": scope.queries,
+                    "top_repos": scope.by_repo.most_common(3),
+                    "at": datetime.now(UTC).isoformat(timespec="seconds"),
+                }
+            )
+            logger.warning(f"Possible N+1 in {label}: {scope.queries} queries ({scope.by_repo.most_common(3)})")
+
+
+def get_query_report(top: int = 10) -> dict:
+    """Hottest repo methods by total time, plus recent slow statements and N+1 suspects."""
+    ranked = sorted(_histograms.items(), key=lambda item: item[1].total_ms, reverse=True)
+    return {
+        "slow_query_ms": DB_SLOW_QUERY_MS,
+        "n_plus_one_threshold": DB_N_PLUS_ONE_THRESHOLD,
+        "repos": {repo: hist.to_dict() for repo, hist in ranked[:top]},
+        "slow_queries": list(_slow_queries)[-top:],
+        "n_plus_one": list(_n_plus_one)[-top:],
+    }
+
+
+def get_histograms() -> dict[str, LatencyHistogram]:
+    return dict(_histograms)
+
+
+def reset_query_stats() -> None:
+    _histograms.clear()
+    _slow_queries.clear()
+    _n_plus_one.clear()
@@ -1,8 +1,10 @@
 """Persistent rate limit storage to survive restarts."""
 
-from datetime import UTC, datetime, timedelta
+from datetime import datetime, timedelta
 
-from sqlalchemy import delete, select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from core.database import get_db
 from core.logger import setup_logger
@@ -10,6 +12,9 @@ from core.rate_limit_models import PersistentRateLimit
 
 logger = setup_logger("RATE_LIMIT_REPO")
 
+# Rows per upsert statement — keeps bind parameters well under SQLite's limit
+_UPSERT_CHUNK = 200
+
 
 class RateLimitRepo:
     @staticmethod
@@ -52,21 +57,56 @@ class RateLimitRepo:
             return entry.count
 
     @staticmethod
-    async def cleanup_old(older_than_hours: int = 24):
-        cutoff = datetime.now(UTC) - timedelta(hours=older_than_hours)
+    async def increment_many(deltas: dict[tuple[int, str, datetime], int]) -> int:
+        """Add aggregated deltas keyed by (user_id, action, window_start) in bulk.
+
+        Uses ``INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count``
+        so concurrent flushes from several processes never lose increments.
+        Returns the number of rows written.
+        """
+        rows = [
+            {"user_id": user_id, "action": action, "window_start": window_start, "count": count}
+            for (user_id, action, window_start), count in deltas.items()
+            if count > 0
+        ]
+        if not rows:
+            return 0
+
         async with get_db() as session:
-            stmt = delete(PersistentRateLimit).where(PersistentRateLimit.window_start < cutoff)
-            result = await session.execute(stmt)
-            if result.rowcount > 0:
-                logger.debug(f"Cleaned up {result.rowcount} stale rate limit entries")
+            insert = sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+            for i in range(0, len(rows), _UPSERT_CHUNK):
+                stmt = insert(PersistentRateLimit).values(rows[i : i + _UPSERT_CHUNK])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["user_id", "action", "window_start"],
+                    set_={"count": PersistentRateLimit.count + stmt.excluded.count},
+                )
+                await session.execute(stmt)
+        return len(rows)
+
+    @staticmethod
+    async def cleanup_old(older_than_hours: int = 24) -> int:
+        """Delete windows older than ``older_than_hours`` in keyed batches."""
+        from core.data_cleanup import RetentionPolicy, purge_expired
+
+        policy = RetentionPolicy(
+            PersistentRateLimit, PersistentRateLimit.window_start, timedelta(hours=older_than_hours)
+        )
+        deleted, _ = await purge_expired(policy)
+        if deleted > 0:
+            logger.debug(f"Cleaned up {deleted} stale rate limit entries")
+        return deleted
 
     @staticmethod
     async def get_all_active(action: str, since: datetime) -> dict[int, int]:
+        """Total persisted hits per user for ``action`` in windows starting at or after ``since``."""
         async with get_db() as session:
-            stmt = select(PersistentRateLimit).where(
-                PersistentRateLimit.action == action,
-                PersistentRateLimit.window_start >= since,
+            stmt = (
+                select(PersistentRateLimit.user_id, func.sum(PersistentRateLimit.count))
+                .where(
+                    PersistentRateLimit.action == action,
+                    PersistentRateLimit.window_start >= since,
+                )
+                .group_by(PersistentRateLimit.user_id)
             )
             result = await session.execute(stmt)
-            entries = result.scalars().all()
-            return {e.user_id: e.count for e in entries}
+            return {user_id: int(total or 0) for user_id, total in result.all()}
@@ -2,23 +2,28 @@
 Production-grade rate limiting for Zenith bots.
 
 Provides sliding-window rate limiting that:
-- Persists across restarts (DB-backed with in-memory fast path)
+- Persists across restarts (batched DB upserts with in-memory fast path)
 - Supports per-user, per-action limits
 - Returns friendly "try again in X seconds" messages
 - Differentiates between free and pro tiers
 """
 
 import asyncio
+import contextlib
 import time
 from collections import deque
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 from cachetools import TTLCache
 
 from core.logger import setup_logger
+from core.state_backend import get_state_backend
 
 logger = setup_logger("RATE_LIMITER")
 
+# After a failed rehydrate the next check for that action retries once this has passed
+HYDRATE_RETRY_SECONDS = 5.0
+
 
 class SlidingWindowLimiter:
     """
@@ -26,7 +31,12 @@ class SlidingWindowLimiter:
 
     Tracks timestamps of recent actions per user and checks against limits.
     Uses TTLCache for automatic cleanup of inactive users.
-    Persists counts to DB every N requests to survive restarts.
+    Accepted hits are summed per (user, action, minute) and written in one
+    batched upsert by ``flush()``; the first check for an action after a
+    restart rehydrates its hot window from the DB.
+
+    When the shared state backend is in use (multiple workers), the window
+    itself lives there and only the DB deltas are kept locally.
     """
 
     def __init__(self, max_users: int = 50000, max_windows: int = 100):
@@ -34,8 +44,10 @@ class SlidingWindowLimiter:
         self._max_users = max_users
         self._max_windows = max_windows
         self._lock = asyncio.Lock()
-        self._flush_counter = 0
-        self._flush_interval = 10  # persist every 10 requests
+        self._pending: dict[tuple[int, str, datetime], int] = {}
+        self._hydrated: set[str] = set()
+        self._hydrate_retry_at: dict[str, float] = {}
+        self._seeds: dict[str, dict[int, list[float]]] = {}
 
     def _get_window(self, action: str, ttl: float) -> TTLCache:
         """Get or create a TTLCache for an action type."""
@@ -47,22 +59,60 @@ class SlidingWindowLimiter:
             self._windows[key] = TTLCache(maxsize=self._max_users, ttl=ttl)
         return self._windows[key]
 
-    async def _persist(self, user_id: int, action: str, window_seconds: float):
-        """Persist rate limit count to DB."""
+    @staticmethod
+    def _window_start(now: datetime) -> datetime:
+        """Minute bucket used as the persisted window key (naive UTC, matching the column)."""
+        return now.replace(second=0, microsecond=0, tzinfo=None)
+
+    async def _hydrate(self, action: str, window_seconds: float) -> None:
+        """Seed the in-memory window from counts persisted before a restart."""
+        key = f"{action}_{int(window_seconds)}"
+        # Marked before the read so concurrent first checks do not all query the DB
+        self._hydrated.add(key)
         try:
             from core.rate_limit_repo import RateLimitRepo
 
             now = datetime.now(UTC)
-            window_start = now.replace(second=0, microsecond=0)
-            seconds_since_window = (now - window_start).total_seconds()
-            if seconds_since_window > window_seconds:
-                # Past window boundary, persist counts in current window
-                pass
+            since = self._window_start(now - timedelta(seconds=window_seconds))
+            counts = await RateLimitRepo.get_all_active(action, since)
+        except Exception as e:
+            # Unmarked again so a DB blip does not reset the persisted windows to zero for good
+            self._hydrated.discard(key)
+            self._hydrate_retry_at[key] = time.monotonic() + HYDRATE_RETRY_SECONDS
+            logger.warning(f"Rate limit rehydrate failed for {action}, retrying later: {e}")
+            return
+        self._hydrate_retry_at.pop(key, None)
+        if not counts:
+            return
+
+        # Spread persisted hits evenly over the lookback span so they age out
+        # gradually instead of all at once.
+        mono_now = time.monotonic()
+        span = max(0.0, (now.replace(tzinfo=None) - since).total_seconds())
+        seeds: dict[int, list[float]] = {}
+        for user_id, count in counts.items():
+            step = span / (count + 1)
+            seeds[user_id] = [mono_now - span + step * (i + 1) for i in range(count)]
+        async with self._lock:
+            self._seeds[key] = seeds
+        logger.info(f"Rehydrated {len(seeds)} rate limit windows for '{action}'")
 
-            # Simple: persist user hit
-            await RateLimitRepo.increment(user_id, action, window_start)
-        except Exception:
-            pass  # Non-critical, don't break request flow
+    async def flush(self) -> int:
+        """Write accumulated hit deltas to the DB. Returns rows written."""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        try:
+            from core.rate_limit_repo import RateLimitRepo
+
+            return await RateLimitRepo.increment_many(batch)
+        except Exception as e:
+            logger.warning(f"Rate limit flush failed, re-queueing {len(batch)} rows: {e}")
+            async with self._lock:
+                for k, v in batch.items():
+                    self._pending[k] = self._pending.get(k, 0) + v
+            return 0
 
     async def check(
         self,
@@ -79,11 +129,27 @@ class SlidingWindowLimiter:
             - is_allowed: True if within limits
             - seconds_until_reset: seconds until the oldest entry expires (0 if allowed)
         """
+        key = f"{action}_{int(window_seconds)}"
+        backend = get_state_backend()
+        if backend.shared:
+            allowed, _, retry_after = await backend.window_hit(f"rl:{key}:{user_id}", limit, window_seconds)
+            if not allowed:
+                return False, max(1, int(retry_after))
+            async with self._lock:
+                self._record(user_id, action)
+            return True, 0
+
+        if key not in self._hydrated and time.monotonic() >= self._hydrate_retry_at.get(key, 0.0):
+            await self._hydrate(action, window_seconds)
+
         async with self._lock:
             cache = self._get_window(action, window_seconds)
             now = time.monotonic()
 
-            timestamps: deque = cache.get(user_id, deque(maxlen=limit + 1))
+            timestamps: deque | None = cache.get(user_id)
+            if timestamps is None:
+                seeded = self._seeds.get(key, {}).pop(user_id, ())
+                timestamps = deque(seeded, maxlen=limit + 1)
 
             cutoff = now - window_seconds
             while timestamps and timestamps[0] < cutoff:
@@ -92,19 +158,20 @@ class SlidingWindowLimiter:
             if len(timestamps) >= limit:
                 oldest = timestamps[0]
                 seconds_left = max(1, int((oldest + window_seconds) - now))
+                cache[user_id] = timestamps
                 return False, seconds_left
 
             timestamps.append(now)
             cache[user_id] = timestamps
-
-            # Periodically persist to DB
-            self._flush_counter += 1
-            if self._flush_counter >= self._flush_interval:
-                self._flush_counter = 0
-                asyncio.create_task(self._persist(user_id, action, window_seconds))
+            self._record(user_id, action)
 
             return True, 0
 
+    def _record(self, user_id: int, action: str) -> None:
+        """Queue one accepted hit for the next ``flush()``. Caller holds the lock."""
+        bucket = (user_id, action, self._window_start(datetime.now(UTC)))
+        self._pending[bucket] = self._pending.get(bucket, 0) + 1
+
     async def get_remaining(
         self,
         user_id: int,
@@ -113,11 +180,18 @@ class SlidingWindowLimiter:
         window_seconds: float,
     ) -> int:
         """Get how many actions the user has remaining in the current window."""
+        backend = get_state_backend()
+        if backend.shared:
+            used = await backend.window_count(f"rl:{action}_{int(window_seconds)}:{user_id}", window_seconds)
+            return max(0, limit - used)
+
         async with self._lock:
             cache = self._get_window(action, window_seconds)
             now = time.monotonic()
 
-            timestamps: deque = cache.get(user_id, deque())
+            timestamps = cache.get(user_id)
+            if timestamps is None:
+                timestamps = self._seeds.get(f"{action}_{int(window_seconds)}", {}).get(user_id, ())
 
             cutoff = now - window_seconds
             active = sum(1 for t in timestamps if t >= cutoff)
@@ -129,6 +203,13 @@ class SlidingWindowLimiter:
         async with self._lock:
             for cache in self._windows.values():
                 cache.expire()
+            now = time.monotonic()
+            for key, seeds in list(self._seeds.items()):
+                window = float(key.rsplit("_", 1)[-1])
+                for user_id in [u for u, ts in seeds.items() if not ts or ts[-1] < now - window]:
+                    del seeds[user_id]
+                if not seeds:
+                    del self._seeds[key]
 
     @classmethod
     async def prune_all_memory(cls):
@@ -137,6 +218,38 @@ class SlidingWindowLimiter:
 
 
 _limiter = SlidingWindowLimiter()
+_flush_task: asyncio.Task | None = None
+
+
+async def _flush_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _limiter.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Rate limit flush loop error: {e}")
+
+
+async def start_rate_limit_flusher(interval: float = 5.0):
+    """Start the background task that persists rate limit deltas every ``interval`` seconds."""
+    global _flush_task
+    if _flush_task is not None:
+        return
+    _flush_task = asyncio.create_task(_flush_loop(interval))
+    logger.info("💾 Rate limit flusher started")
+
+
+async def stop_rate_limit_flusher():
+    """Stop the flusher and write any remaining deltas."""
+    global _flush_task
+    if _flush_task:
+        _flush_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _flush_task
+        _flush_task = None
+    await _limiter.flush()
 
 
 async def check_rate_limit(
@@ -0,0 +1,358 @@
+"""
+Shared job scheduler for periodic background work.
+
+Replaces the per-bot ``safe_loop`` + ``while True: sleep(...)`` loops:
+- Interval and cron triggers anchored to the schedule, so work time never
+  adds drift
+- Optional jitter, misfire grace and coalescing of missed runs
+- Per-job timeout and max concurrent instances, plus a per-scheduler
+  concurrency cap
+- Jobs pause while their circuit breaker is open and, when marked
+  ``leader``, only fire on the elected replica (see core.leader)
+- Errors are logged and counted; a failing job never stops its schedule
+- Per-job run duration and start lag stats via ``get_stats()``
+- Jobs and workers use the ``background`` DB pool (see core.database)
+
+Long-running consumers (queue dispatchers) are registered with
+``add_worker`` and restarted with a delay if they crash.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from core.database import use_pool
+from core.logger import setup_logger
+
+logger = setup_logger("SCHEDULER")
+
+JobFunc = Callable[[], Awaitable]
+
+
+class IntervalTrigger:
+    """Fire every ``seconds``, first after ``initial_delay`` (defaults to one interval)."""
+
+    def __init__(self, seconds: float, initial_delay: float | None = None):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.initial_delay = seconds if initial_delay is None else initial_delay
+
+    def first_fire(self, now: float) -> float:
+        return now + self.initial_delay
+
+    def next_fire(self, previous: float) -> float:
+        return previous + self.seconds
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class CronTrigger:
+    """
+    Standard 5-field cron expression (minute hour day-of-month month day-of-week),
+    evaluated in UTC. Supports ``*``, ``a``, ``a-b``, ``*/n``, ``a-b/n`` and lists.
+    Day-of-week is 0-6 with 0 (or 7) as Sunday; when both day fields are
+    restricted a day matches either, as in Vixie cron.
+    """
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self._RANGES, strict=True)]
+        self.minutes, self.hours, self.days, self.months, dows = parsed
+        self.weekdays = {d % 7 for d in dows}
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field_expr: str, lo: int, hi: int) -> set[int]:
+        values: set[int] = set()
+        for part in field_expr.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {field_expr!r}")
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(x) for x in part.split("-", 1))
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"Cron value out of range: {field_expr!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.isoweekday() % 7) in self.weekdays
+        if self._dom_any:
+            return dow
+        if self._dow_any:
+            return dom
+        return dom or dow
+
+    def first_fire(self, now: float) -> float:
+        return self.next_fire(now)
+
+    def next_fire(self, previous: float) -> float:
+        dt = datetime.fromtimestamp(previous, UTC).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"cron '{self.expression}'"
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    misfires: int = 0
+    skipped: int = 0  # previous run still in progress (max_instances)
+    paused: int = 0  # circuit breaker open
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    last_error: str = ""
+    last_run_at: float = 0.0
+    next_run_at: float = 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["avg_duration"] = round(self.total_duration / self.runs, 4) if self.runs else 0.0
+        return data
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    trigger: IntervalTrigger | CronTrigger
+    timeout: float | None = None
+    max_instances: int = 1
+    jitter: float = 0.0
+    misfire_grace: float | None = None
+    breaker: str | None = None
+    leader: bool = False
+    stats: JobStats = field(default_factory=JobStats)
+    running: int = 0
+
+
+class Scheduler:
+    """Runs jobs for one service. Each job gets its own timing task."""
+
+    def __init__(self, name: str, max_concurrency: int = 4, worker_restart_delay: float = 5.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.worker_restart_delay = worker_restart_delay
+        self._jobs: dict[str, Job] = {}
+        self._workers: dict[str, JobFunc] = {}
+        self._worker_restarts: dict[str, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._running = False
+        _schedulers[name] = self
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        trigger: IntervalTrigger | CronTrigger,
+        *,
+        timeout: float | None = None,
+        max_instances: int = 1,
+        jitter: float = 0.0,
+        misfire_grace: float | None = None,
+        breaker: str | None = None,
+        leader: bool = False,
+    ) -> Job:
+        """
+        Register a job. ``func`` performs a single run (no internal loop).
+
+        ``misfire_grace``: skip a run that starts more than this many seconds
+        late. Missed fires are always coalesced into one.
+        ``leader``: only run on the replica elected for ``<scheduler>.<name>``.
+        """
+        job = Job(
+            name=name,
+            func=func,
+            trigger=trigger,
+            timeout=timeout,
+            max_instances=max_instances,
+            jitter=jitter,
+            misfire_grace=misfire_grace,
+            breaker=breaker,
+            leader=leader,
+        )
+        self._jobs[name] = job
+        if self._running:
+            self._spawn(self._job_loop(job))
+        return job
+
+    def add_worker(self, name: str, func: JobFunc) -> None:
+        """Register a long-running coroutine (e.g. a queue consumer) to supervise."""
+        self._workers[name] = func
+        self._worker_restarts.setdefault(name, 0)
+        if self._running:
+            self._spawn(self._worker_loop(name, func))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        for job in self._jobs.values():
+            self._spawn(self._job_loop(job))
+        for name, func in self._workers.items():
+            self._spawn(self._worker_loop(name, func))
+        logger.info(f"⏱️ [{self.name}] Scheduler started: {len(self._jobs)} jobs, {len(self._workers)} workers")
+
+    async def stop(self) -> None:
+        self._running = False
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"⏱️ [{self.name}] Scheduler stopped")
+
+    def _leader_name(self, job: Job) -> str:
+        return f"{self.name}.{job.name}"
+
+    def _paused_by_breaker(self, job: Job) -> bool:
+        if not job.breaker:
+            return False
+        from core.circuit_breaker import get_breaker
+
+        return get_breaker(job.breaker).is_cooling_down
+
+    async def _job_loop(self, job: Job) -> None:
+        from core.leader import campaign, is_leader
+
+        if job.leader:
+            campaign(self._leader_name(job))
+
+        scheduled = job.trigger.first_fire(time.time())
+        while True:
+            fire_at = scheduled + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+            job.stats.next_run_at = fire_at
+            await asyncio.sleep(max(0.0, fire_at - time.time()))
+
+            now = time.time()
+            lag = now - fire_at
+            scheduled = job.trigger.next_fire(scheduled)
+            if scheduled <= now:
+                # Coalesce every fire we slept through into this one run
+                scheduled = job.trigger.next_fire(now)
+
+            if job.misfire_grace is not None and lag > job.misfire_grace:
+                job.stats.misfires += 1
+                logger.warning(f"[{self.name}] Job '{job.name}' misfired ({lag:.1f}s late), skipping")
+                continue
+            if job.leader and not is_leader(self._leader_name(job)):
+                continue
+            if self._paused_by_breaker(job):
+                job.stats.paused += 1
+                logger.debug(f"[{self.name}] Job '{job.name}' paused: breaker '{job.breaker}' open")
+                continue
+            if job.running >= job.max_instances:
+                job.stats.skipped += 1
+                logger.warning(f"[{self.name}] Job '{job.name}' still running, skipping this run")
+                continue
+
+            job.stats.last_lag = lag
+            job.stats.max_lag = max(job.stats.max_lag, lag)
+            job.running += 1
+            self._spawn(self._execute(job))
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            async with self._semaphore:
+                start = time.monotonic()
+                job.stats.last_run_at = time.time()
+                try:
+                    with use_pool("background"):
+                        if job.timeout:
+                            await asyncio.wait_for(job.func(), timeout=job.timeout)
+                        else:
+                            await job.func()
+                except TimeoutError:
+                    job.stats.timeouts += 1
+                    job.stats.last_error = f"timed out after {job.timeout}s"
+                    logger.error(f"[{self.name}] Job '{job.name}' timed out after {job.timeout}s")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    job.stats.failures += 1
+                    job.stats.last_error = str(e)[:200]
+                    logger.error(f"[{self.name}] Job '{job.name}' failed: {e}", exc_info=True)
+                finally:
+                    duration = time.monotonic() - start
+                    job.stats.runs += 1
+                    job.stats.last_duration = duration
+                    job.stats.total_duration += duration
+                    job.stats.max_duration = max(job.stats.max_duration, duration)
+        finally:
+            job.running -= 1
+
+    async def _worker_loop(self, name: str, func: JobFunc) -> None:
+        while True:
+            try:
+                with use_pool("background"):
+                    await func()
+                logger.warning(f"[{self.name}] Worker '{name}' exited, restarting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[{self.name}] Worker '{name}' crashed: {e}", exc_info=True)
+            self._worker_restarts[name] += 1
+            await asyncio.sleep(self.worker_restart_delay)
+
+    def get_stats(self) -> dict:
+        return {
+            "jobs": {name: {"trigger": repr(job.trigger), **job.stats.as_dict()} for name, job in self._jobs.items()},
+            "workers": {name: {"restarts": self._worker_restarts.get(name, 0)} for name in self._workers},
+        }
+
+
+_schedulers: dict[str, Scheduler] = {}
+
+
+def get_all_scheduler_stats() -> dict[str, dict]:
+    """Stats for every scheduler in this process (for health/metrics endpoints)."""
+    return {name: sched.get_stats() for name, sched in _schedulers.items()}
@@ -0,0 +1,100 @@
+"""
+Request coalescing ("single-flight") for external API calls.
+
+Concurrent calls with the same arguments share one in-flight request: the
+first caller starts it and everyone arriving before it finishes awaits the
+same result (or exception). Nothing is kept afterwards, so this complements
+rather than replaces the TTL caches: it closes the stampede window between
+a cache miss and the response that fills the cache.
+
+``BatchCoalescer`` does the same for stores whose upstream takes many keys
+per request: keys asked for within a short window are collected and
+fetched together in one call.
+"""
+
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any
+
+from core.metrics import UPSTREAM_COALESCED
+
+COALESCE_WINDOW = 0.05
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+            UPSTREAM_COALESCED.inc(call=self.name)
+        # Shielded: one caller timing out or being cancelled must not cancel the call for the rest
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+
+def single_flight(func):
+    """Coalesce concurrent calls of ``func`` with equal arguments into one call."""
+    flight = SingleFlight(func.__qualname__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:  # e.g. a list argument: nothing to share, call straight through
+            return await func(*args, **kwargs)
+        return await flight.do(key, lambda: func(*args, **kwargs))
+
+    wrapper.flight = flight
+    return wrapper
+
+
+class BatchCoalescer:
+    """Collect keys requested within ``window`` seconds and pass them to ``fetch`` as one set."""
+
+    def __init__(self, fetch: Callable[[set], Awaitable[Any]], window: float = COALESCE_WINDOW):
+        self._fetch = fetch
+        self.window = window
+        self._pending: set = set()
+        self._flush_task: asyncio.Task | None = None
+
+    def submit(self, keys: Iterable[Hashable]) -> asyncio.Task:
+        """Add ``keys`` to the next batch and return the task that fetches it."""
+        self._pending.update(keys)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return self._flush_task
+
+    async def request(self, keys: Iterable[Hashable]) -> None:
+        """Add ``keys`` to the next batch and wait until it has been fetched."""
+        # Shielded: a caller timing out must not cancel the batch other readers wait on
+        await asyncio.shield(self.submit(keys))
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.window)
+        batch, self._pending = self._pending, set()
+        # Keys from now on start the next batch instead of joining one already on the wire
+        self._flush_task = None
+        await self._fetch(batch)
+
+    def pending(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,377 @@
+"""
+Pluggable shared-state backend for caches, counters and rate limits.
+
+Everything that used to live in module-level TTLCaches (tier cache, group
+settings cache, flood control, webhook dedup, gateway rate limits) goes
+through a ``StateBackend`` so the monolith can run several workers or
+replicas against one shared store.
+
+Backends:
+- LocalStateBackend: in-process dict with lazy expiry (default, single worker)
+- RedisStateBackend: any redis.asyncio-compatible client, selected by REDIS_URL
+
+Both implement the same small contract — get/set/set_if_absent/incr/expire/
+delete plus an atomic sliding-window hit — so callers never branch on the
+backend in use.
+
+Redis values are stored as JSON and never pickled, so bytes written to the
+shared store cannot run code in a worker. Besides plain JSON types, the codec
+handles tuples, datetimes and dataclasses registered with
+``register_state_type``. Anything else fails at ``set``.
+"""
+
+import dataclasses
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any
+
+from core.logger import setup_logger
+
+logger = setup_logger("STATE")
+
+_STATE_TYPES: dict[str, type] = {}
+
+
+def register_state_type(cls: type) -> type:
+    """Class decorator: let instances of the dataclass ``cls`` be stored in the Redis backend."""
+    if not dataclasses.is_dataclass(cls):
+        raise TypeError(f"{cls.__name__} is not a dataclass")
+    _STATE_TYPES[cls.__qualname__] = cls
+    return cls
+
+
+def _to_json(value: Any) -> Any:
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(v) for v in value]}
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise TypeError("State backend dict keys must be strings")
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    name = type(value).__qualname__
+    if _STATE_TYPES.get(name) is type(value):
+        fields = {f.name: _to_json(getattr(value, f.name)) for f in dataclasses.fields(value)}
+        return {"__type__": name, "fields": fields}
+    raise TypeError(f"Cannot store {name} in the state backend; register it with register_state_type")
+
+
+def _from_json(obj: dict) -> Any:
+    if "__tuple__" in obj:
+        return tuple(obj["__tuple__"])
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__type__" in obj:
+        cls = _STATE_TYPES.get(obj["__type__"])
+        if cls is None:
+            raise ValueError(f"Unknown state type {obj['__type__']!r}")
+        return cls(**obj["fields"])
+    return obj
+
+
+def encode_state(value: Any) -> bytes:
+    return json.dumps(_to_json(value), separators=(",", ":")).encode()
+
+
+def decode_state(raw: bytes | str) -> Any:
+    return json.loads(raw, object_hook=_from_json)
+
+
+class StateBackend(ABC):
+    """Async key/value store with TTLs, counters and sliding windows."""
+
+    # True when state is visible to other processes (multi-worker safe)
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None: ...
+
+    @abstractmethod
+    async def set_if_absent(self, key: str, value: Any, ttl: float | None = None) -> bool:
+        """Store ``value`` only if ``key`` is missing. Returns True when stored."""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """Atomically add ``amount``; ``ttl`` is applied only when the key is created."""
+
+    @abstractmethod
+    async def expire(self, key: str, ttl: float) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def window_hit(
+        self, key: str, limit: int, window_seconds: float, record_rejected: bool = False
+    ) -> tuple[bool, int, float]:
+        """
+        Record one hit in a sliding window and check it against ``limit``.
+
+        Returns ``(allowed, count, retry_after)`` where ``count`` includes this
+        hit and ``retry_after`` is the seconds until the oldest hit expires.
+        Rejected hits are not recorded unless ``record_rejected`` is set.
+        """
+
+    @abstractmethod
+    async def window_count(self, key: str, window_seconds: float) -> int:
+        """Number of hits currently inside the sliding window, without recording one."""
+
+    def prune(self) -> int:
+        """Drop expired in-process entries. Shared stores expire keys themselves."""
+        return 0
+
+    async def close(self) -> None:
+        return None
+
+
+class LocalStateBackend(StateBackend):
+    """
+    In-process backend. Operations never await, so each one is atomic with
+    respect to the event loop without any locking.
+    """
+
+    shared = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self._max_keys = max_keys
+        self._data: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._windows: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def _live(self, key: str) -> tuple[Any, float | None] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at = entry[1]
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def _store(self, key: str, value: Any, expires_at: float | None) -> None:
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_keys:
+            self._data.popitem(last=False)
+
+    @staticmethod
+    def _deadline(ttl: float | None) -> float | None:
+        return time.monotonic() + ttl if ttl else None
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._store(key, value, self._deadline(ttl))
+
+    async def set_if_absent(self, key: str, value: Any, ttl: float | None = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._store(key, value, self._deadline(ttl))
+        return True
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        entry = self._live(key)
+        if entry is None:
+            value, expires_at = amount, self._deadline(ttl)
+        else:
+            value, expires_at = int(entry[0]) + amount, entry[1]
+        self._store(key, value, expires_at)
+        return value
+
+    async def expire(self, key: str, ttl: float) -> bool:
+        entry = self._live(key)
+        if entry is None:
+            return False
+        self._store(key, entry[0], self._deadline(ttl))
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+        self._windows.pop(key, None)
+
+    async def window_hit(
+        self, key: str, limit: int, window_seconds: float, record_rejected: bool = False
+    ) -> tuple[bool, int, float]:
+        now = time.monotonic()
+        hits = self._windows.get(key)
+        if hits is None:
+            hits = deque()
+            self._windows[key] = hits
+            while len(self._windows) > self._max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+
+        cutoff = now - window_seconds
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+        allowed = len(hits) < limit
+        if allowed or record_rejected:
+            hits.append(now)
+        count = len(hits) if allowed or record_rejected else len(hits) + 1
+        retry_after = max(0.0, hits[0] + window_seconds - now) if hits else 0.0
+        return allowed, count, retry_after
+
+    async def window_count(self, key: str, window_seconds: float) -> int:
+        cutoff = time.monotonic() - window_seconds
+        return sum(1 for t in self._windows.get(key, ()) if t > cutoff)
+
+    def prune(self) -> int:
+        """Drop expired keys and empty windows. Returns the number removed."""
+        now = time.monotonic()
+        expired = [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]
+        for k in expired:
+            del self._data[k]
+        empty = [k for k, hits in self._windows.items() if not hits]
+        for k in empty:
+            del self._windows[k]
+        return len(expired) + len(empty)
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Redis-protocol backend. Works with ``redis.asyncio.Redis`` or any client
+    exposing the same coroutine API (get/set/incrby/pexpire/delete/pipeline).
+
+    Values are JSON (``encode_state``). Counters are plain Redis integers,
+    which are valid JSON too, so INCRBY stays atomic server-side and ``get``
+    reads them back.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "zenith:"):
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "zenith:") -> "RedisStateBackend":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed") from e
+        return cls(Redis.from_url(url), prefix=prefix)
+
+    def _k(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    @staticmethod
+    def _ms(ttl: float | None) -> int | None:
+        return max(1, int(ttl * 1000)) if ttl else None
+
+    @staticmethod
+    def _decode(raw: Any) -> Any:
+        if raw is None:
+            return None
+        try:
+            return decode_state(raw)
+        except (ValueError, TypeError) as e:
+            # e.g. a value written by an older release; treated as a miss and overwritten
+            logger.warning(f"Ignoring undecodable state value: {e}")
+            return None
+
+    async def get(self, key: str) -> Any | None:
+        return self._decode(await self._client.get(self._k(key)))
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        await self._client.set(self._k(key), encode_state(value), px=self._ms(ttl))
+
+    async def set_if_absent(self, key: str, value: Any, ttl: float | None = None) -> bool:
+        return bool(await self._client.set(self._k(key), encode_state(value), nx=True, px=self._ms(ttl)))
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        k = self._k(key)
+        if not ttl:
+            return int(await self._client.incrby(k, amount))
+        # One MULTI block, so a crash or cancellation cannot leave a counter without a TTL.
+        # NX (Redis 7+) only sets the TTL on a key that has none, i.e. the one just created.
+        pipe = self._client.pipeline(transaction=True)
+        pipe.incrby(k, amount)
+        pipe.pexpire(k, self._ms(ttl), nx=True)
+        value, _ = await pipe.execute()
+        return int(value)
+
+    async def expire(self, key: str, ttl: float) -> bool:
+        return bool(await self._client.pexpire(self._k(key), self._ms(ttl)))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._k(key))
+
+    async def window_hit(
+        self, key: str, limit: int, window_seconds: float, record_rejected: bool = False
+    ) -> tuple[bool, int, float]:
+        """
+        Optimistic add-then-count inside one MULTI block. Concurrent replicas
+        can only over-count (never admit more than ``limit``); rejected hits
+        are removed again unless ``record_rejected`` is set.
+        """
+        k = self._k(key)
+        now = time.time()
+        member = f"{now:.6f}:{uuid.uuid4().hex[:8]}"
+        pipe = self._client.pipeline(transaction=True)
+        pipe.zremrangebyscore(k, 0, now - window_seconds)
+        pipe.zadd(k, {member: now})
+        pipe.zcard(k)
+        pipe.zrange(k, 0, 0, withscores=True)
+        pipe.pexpire(k, self._ms(window_seconds))
+        _, _, count, oldest, _ = await pipe.execute()
+
+        count = int(count)
+        allowed = count <= limit
+        if not allowed and not record_rejected:
+            await self._client.zrem(k, member)
+        oldest_ts = float(oldest[0][1]) if oldest else now
+        retry_after = max(0.0, oldest_ts + window_seconds - now)
+        return allowed, count, retry_after
+
+    async def window_count(self, key: str, window_seconds: float) -> int:
+        return int(await self._client.zcount(self._k(key), f"({time.time() - window_seconds}", "+inf"))
+
+    async def close(self) -> None:
+        close = getattr(self._client, "aclose", None) or getattr(self._client, "close", None)
+        if close:
+            await close()
+
+
+_backend: StateBackend | None = None
+
+
+def get_state_backend() -> StateBackend:
+    """Return the process-wide backend, creating it from REDIS_URL on first use."""
+    global _backend
+    if _backend is None:
+        from core.config import REDIS_URL
+
+        if REDIS_URL:
+            _backend = RedisStateBackend.from_url(REDIS_URL)
+            logger.info("Shared state backend: Redis")
+        else:
+            _backend = LocalStateBackend()
+            logger.info("Shared state backend: in-process (single worker only)")
+    return _backend
+
+
+def set_state_backend(backend: StateBackend | None) -> None:
+    """Override the process-wide backend (tests, custom wiring). ``None`` resets to config."""
+    global _backend
+    _backend = backend
+
+
+async def close_state_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
@@ -0,0 +1,365 @@
+"""
+Cheap, sampled, in-process tracing of Telegram updates.
+
+The webhook gives every update a trace id and makes it the logging
+correlation id. ``gateway_middleware`` picks the id up again when PTB
+dequeues the update, so log lines on both sides of the queue share it.
+Spans cover:
+- the gateway stages (queue wait, validation, handler)
+- every DB statement (``query_profiler`` engine hooks)
+- external HTTP calls (``TracedTransport``) and Bot API calls
+  (``MeteredHTTPXRequest``)
+- each LLM attempt (``AIExecutionEngine.execute``)
+
+Every update records its spans, which is one ``perf_counter`` and one list
+append per span. At the end of an update the trace is kept if it was head
+sampled (``TRACE_SAMPLE_RATE``), failed, or took longer than
+``TRACE_SLOW_MS``. Kept traces go to a ring buffer shown in the admin bot.
+If ``OTLP_TRACES_ENDPOINT`` is set they are also batched to an OTLP/HTTP
+JSON collector, e.g. a local OpenTelemetry Collector or Jaeger on
+``http://localhost:4318/v1/traces``.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from cachetools import TTLCache
+
+from core.config import OTLP_SERVICE_NAME, OTLP_TRACES_ENDPOINT, TRACE_BUFFER_SIZE, TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+from core.logger import reset_correlation_id, set_correlation_id, setup_logger
+
+logger = setup_logger("TRACING")
+
+MAX_SPANS_PER_TRACE = 256
+_EXPORT_BATCH = 50
+_EXPORT_INTERVAL = 5.0
+
+_trace_var: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("trace", default=None)
+_span_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("trace_parent_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+@dataclass(slots=True)
+class Span:
+    span_id: str
+    parent_id: str | None
+    name: str
+    kind: str
+    start: float  # perf_counter
+    duration_ms: float = 0.0
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    name: str
+    start: float  # perf_counter
+    start_ns: int  # wall clock, for exporters
+    sampled: bool
+    root_id: str = field(default_factory=lambda: _new_id(64))
+    spans: list[Span] = field(default_factory=list)
+    dropped_spans: int = 0
+    attributes: dict = field(default_factory=dict)
+    duration_ms: float = 0.0
+    error: str | None = None
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def wall_ns(self, perf: float) -> int:
+        return self.start_ns + int((perf - self.start) * 1e9)
+
+    def summary(self, top: int = 4) -> dict:
+        slowest = sorted(self.spans, key=lambda s: s.duration_ms, reverse=True)[:top]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 1),
+            "spans": len(self.spans) + self.dropped_spans,
+            "error": self.error,
+            "at": self.start_ns // 1_000_000_000,
+            "slowest": [(s.kind, s.name, round(s.duration_ms, 1)) for s in slowest],
+        }
+
+
+_recent: deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+# (id(bot), update_id) -> (trace_id, enqueued perf_counter); the PTB queue does not carry context
+_ingress: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+
+# ── Ingress hand-off across the PTB update queue ──────────
+def begin_ingress(bot: Any, update_id: int) -> str:
+    """Assign a trace id to an update entering the webhook and use it as correlation id."""
+    trace_id = _new_id(128)
+    _ingress[(id(bot), update_id)] = (trace_id, time.perf_counter())
+    set_correlation_id(trace_id)
+    return trace_id
+
+
+def claim_ingress(bot: Any, update_id: int) -> tuple[str, float] | None:
+    return _ingress.pop((id(bot), update_id), None)
+
+
+# ── Recording ─────────────────────────────────────────────
+def current_trace() -> Trace | None:
+    return _trace_var.get()
+
+
+def record_span(name: str, kind: str, started: float, error: str | None = None, **attributes) -> None:
+    """Record an already finished span that began at ``started`` (a ``perf_counter`` value)."""
+    trace = _trace_var.get()
+    if trace is None:
+        return
+    trace.add(
+        Span(
+            _new_id(64),
+            _span_var.get() or trace.root_id,
+            name,
+            kind,
+            started,
+            (time.perf_counter() - started) * 1000,
+            attributes,
+            error,
+        )
+    )
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Time the block as a child of the current span. A no-op outside a trace."""
+    trace = _trace_var.get()
+    if trace is None:
+        yield None
+        return
+    current = Span(
+        _new_id(64), _span_var.get() or trace.root_id, name, kind, time.perf_counter(), attributes=attributes
+    )
+    token = _span_var.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        _span_var.reset(token)
+        current.duration_ms = (time.perf_counter() - current.start) * 1000
+        trace.add(current)
+
+
+@contextlib.contextmanager
+def start_trace(name: str, trace_id: str | None = None, started: float | None = None, **attributes):
+    """Trace one unit of work. ``started`` backdates the root, e.g. to when the update was enqueued."""
+    now = time.perf_counter()
+    started = started if started is not None else now
+    trace = Trace(
+        trace_id=trace_id or _new_id(128),
+        name=name,
+        start=started,
+        start_ns=time.time_ns() - int((now - started) * 1e9),
+        sampled=random.random() < TRACE_SAMPLE_RATE,
+        attributes=attributes,
+    )
+    trace_token = _trace_var.set(trace)
+    span_token = _span_var.set(None)
+    cid_token = set_correlation_id(trace.trace_id)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.error = type(e).__name__
+        raise
+    finally:
+        _span_var.reset(span_token)
+        _trace_var.reset(trace_token)
+        reset_correlation_id(cid_token)
+        trace.duration_ms = (time.perf_counter() - trace.start) * 1000
+        _finish(trace)
+
+
+def _finish(trace: Trace) -> None:
+    if trace.error is None and any(s.error for s in trace.spans):
+        trace.error = next(s.error for s in trace.spans if s.error)
+    if not (trace.sampled or trace.error or trace.duration_ms >= TRACE_SLOW_MS):
+        return
+    _recent.append(trace)
+    if _exporter is not None:
+        _exporter.submit(trace)
+
+
+def get_recent_traces(limit: int = 10) -> list[dict]:
+    """Newest kept traces first, summarised for the admin bot."""
+    return [trace.summary() for trace in list(_recent)[-limit:][::-1]]
+
+
+def reset_traces() -> None:
+    _recent.clear()
+    _ingress.clear()
+
+
+# ── Outbound HTTP ─────────────────────────────────────────
+class TracedTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that records a span per request (until response headers).
+
+    Commits the caller's unit of work first, so no DB connection waits on the upstream.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        from core.database import commit_and_release
+
+        await commit_and_release()
+        # Host only: paths and query strings can carry API keys (RPC URLs, Etherscan)
+        with span(request.url.host, "http", method=request.method) as current:
+            response = await super().handle_async_request(request)
+            if current is not None:
+                current.attributes["status"] = response.status_code
+            return response
+
+
+# ── OTLP/HTTP JSON export ─────────────────────────────────
+def _attributes(values: dict) -> list[dict]:
+    out = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            out.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            out.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            out.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            out.append({"key": key, "value": {"stringValue": str(value)}})
+    return out
+
+
+def to_otlp_spans(trace: Trace) -> list[dict]:
+    """The trace as OTLP JSON spans: a root span for the update plus every recorded span."""
+    root = {
+        "traceId": trace.trace_id,
+        "spanId": trace.root_id,
+        "name": trace.name,
+        "kind": 2,  # SERVER
+        "startTimeUnixNano": str(trace.start_ns),
+        "endTimeUnixNano": str(trace.start_ns + int(trace.duration_ms * 1e6)),
+        "attributes": _attributes({**trace.attributes, "dropped_spans": trace.dropped_spans}),
+        "status": {"code": 2 if trace.error else 1},
+    }
+    spans = [root]
+    for s in trace.spans:
+        start_ns = trace.wall_ns(s.start)
+        spans.append(
+            {
+                "traceId": trace.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id,
+                "name": s.name,
+                "kind": 3 if s.kind in ("db", "http", "llm", "telegram") else 1,  # CLIENT / INTERNAL
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(s.duration_ms * 1e6)),
+                "attributes": _attributes({"span.kind": s.kind, **s.attributes}),
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+        )
+    return spans
+
+
+class OTLPExporter:
+    """Batches kept traces to an OTLP/HTTP collector. Drops traces instead of blocking when it falls behind."""
+
+    def __init__(self, endpoint: str, service_name: str, queue_size: int = 1000):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._queue: asyncio.Queue[Trace] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        self.exported = 0
+        self.dropped = 0
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def payload(self, traces: list[Trace]) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes({"service.name": self.service_name})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "core.tracing"},
+                            "spans": [s for trace in traces for s in to_otlp_spans(trace)],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    async def flush(self) -> None:
+        batch: list[Trace] = []
+        while not self._queue.empty() and len(batch) < _EXPORT_BATCH:
+            batch.append(self._queue.get_nowait())
+        if not batch:
+            return
+        try:
+            response = await self._client.post(self.endpoint, json=self.payload(batch))
+            response.raise_for_status()
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning(f"OTLP export of {len(batch)} traces failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(_EXPORT_INTERVAL)
+            while not self._queue.empty():
+                await self.flush()
+
+    def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._client:
+            while not self._queue.empty():
+                await self.flush()
+            await self._client.aclose()
+            self._client = None
+
+
+_exporter: OTLPExporter | None = None
+
+
+async def start_trace_exporter() -> None:
+    """Start the OTLP exporter when ``OTLP_TRACES_ENDPOINT`` is configured."""
+    global _exporter
+    if _exporter is not None or not OTLP_TRACES_ENDPOINT:
+        return
+    _exporter = OTLPExporter(OTLP_TRACES_ENDPOINT, OTLP_SERVICE_NAME)
+    _exporter.start()
+    logger.info(f"🧭 Exporting sampled traces to {OTLP_TRACES_ENDPOINT}")
+
+
+async def stop_trace_exporter() -> None:
+    global _exporter
+    if _exporter:
+        await _exporter.stop()
+        _exporter = None
@@ -6,8 +6,10 @@ Eliminates 5 nearly-identical webhook handlers across bot files.
 from fastapi import APIRouter, Request, Response
 from telegram import Update
 
-from core.gateway import get_update_id_dedup_cache, validate_webhook_auth
+from core.gateway import is_duplicate_update, validate_webhook_auth
 from core.logger import setup_logger
+from core.metrics import UPDATES_RECEIVED
+from core.tracing import begin_ingress
 
 logger = setup_logger("WEBHOOK")
 
@@ -20,6 +22,11 @@ def register_bot_webhook(bot_name: str, bot_app) -> None:
     _update_counters[bot_name.lower()] = 0
 
 
+def get_registered_bots() -> dict[str, object]:
+    """Bot name -> PTB Application for every bot behind the shared webhook."""
+    return {name: entry[0] for name, entry in _bot_registry.items()}
+
+
 router = APIRouter()
 
 
@@ -38,14 +45,13 @@ async def shared_webhook_handler(bot_name: str, secret: str, request: Request):
 
     try:
         data = await request.json()
-        dedup = get_update_id_dedup_cache(display_name.upper())
         update_id = data.get("update_id", 0)
-        if update_id and update_id in dedup:
+        if update_id and await is_duplicate_update(display_name, update_id):
             return Response(status_code=200)
-        if update_id:
-            dedup[update_id] = True
 
         _update_counters[bot_name.lower()] = _update_counters.get(bot_name.lower(), 0) + 1
+        UPDATES_RECEIVED.inc(bot=bot_name.lower())
+        begin_ingress(bot_app.bot, update_id)
         count = _update_counters[bot_name.lower()]
         if count % 100 == 0:
             logger.info(f"[{display_name}] Processed {count} updates")
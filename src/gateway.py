@@ -3,20 +3,34 @@ import socket
 from contextlib import asynccontextmanager
 
 import uvicorn
-from cachetools import TTLCache
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 import run_admin_bot
 import run_ai_bot
 import run_crypto_bot
 import run_group_bot
-from core.config import DATABASE_URL, MAINTENANCE_MODE, PORT, WEBHOOK_SECRET
-from core.data_cleanup import run_cleanup
-from core.database import dispose_engine, get_engine, init_db
-from core.db_health import is_db_healthy, set_db_unhealthy, start_health_monitor, stop_health_monitor
+from core.config import DATABASE_URL, MAINTENANCE_MODE, PORT, SENTRY_TRACES_SAMPLE_RATE, WEBHOOK_SECRET
+from core.data_cleanup import retention_in_progress, run_cleanup
+from core.database import dispose_engine, get_engine, init_db, use_pool
+from core.db_health import (
+    check_connection_health,
+    get_pool_stats,
+    is_db_healthy,
+    set_db_unhealthy,
+    start_health_monitor,
+    stop_health_monitor,
+)
+from core.gateway import validate_ops_auth
+from core.leader import leader_only, start_leader_election, stop_leader_election
 from core.logger import setup_logger
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.metrics import render_metrics
+from core.query_profiler import get_query_report
+from core.rate_limiter import start_rate_limit_flusher, stop_rate_limit_flusher
 from core.secrets import enforce_startup_secrets
+from core.state_backend import close_state_backend, get_state_backend
+from core.tracing import start_trace_exporter, stop_trace_exporter
 from core.webhook_router import router as webhook_router
 
 logger = setup_logger("GATEWAY")
@@ -27,12 +41,13 @@ if sentry_dsn:
     import sentry_sdk
     sentry_sdk.init(
         dsn=sentry_dsn,
-        traces_sample_rate=1.0,
-        enable_tracing=True,
+        # Updates are traced and sampled in-process by core.tracing; Sentry stays error-only by default
+        traces_sample_rate=SENTRY_TRACES_SAMPLE_RATE,
     )
     logger.info("🛡️ Sentry Error Tracking Initialized")
-webhook_rate = TTLCache(maxsize=10000, ttl=5)
-api_rate = TTLCache(maxsize=5000, ttl=5)
+RATE_WINDOW_SECONDS = 5
+WEBHOOK_RATE_LIMIT = 100
+API_RATE_LIMIT = 50
 
 REQUEST_TIMEOUT_SECONDS = 25
 
@@ -56,13 +71,17 @@ async def rate_limit(request: Request) -> bool:
     client_ip = forwarded.split(",")[0].strip() if forwarded else (request.client.host if request.client else "unknown")
 
     if "/webhook/" in request.url.path:
-        current = webhook_rate.get(client_ip, 0)
-        webhook_rate[client_ip] = current + 1
-        return current < 100
+        bucket, limit = "webhook", WEBHOOK_RATE_LIMIT
+    else:
+        bucket, limit = "api", API_RATE_LIMIT
 
-    current = api_rate.get(client_ip, 0)
-    api_rate[client_ip] = current + 1
-    return current < 50
+    try:
+        count = await get_state_backend().incr(f"http_rate:{bucket}:{client_ip}", ttl=RATE_WINDOW_SECONDS)
+    except Exception as e:
+        # Fail open: a state-store outage must not take the webhooks down with it
+        logger.warning(f"Rate limit backend unavailable: {e}")
+        return True
+    return count <= limit
 
 
 async def check_request_size(request: Request) -> bool:
@@ -116,6 +135,11 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 MONOLITH STARTING")
 
     _validate_environment()
+    await start_trace_exporter()
+    try:
+        await start_leader_election(get_engine("leader"))
+    except Exception as e:
+        logger.error(f"❌ Leader election unavailable, background loops run unguarded: {e}")
 
     async def _startup():
         await asyncio.sleep(0.1)  # Yield loop immediately so uvicorn can start serving /health
@@ -123,6 +147,7 @@ async def lifespan(app: FastAPI):
         try:
             await init_db()
             await start_health_monitor(get_engine())
+            await start_rate_limit_flusher()
         except Exception as e:
             set_db_unhealthy()
             logger.error(f"❌ Database init failed: {e}")
@@ -173,14 +198,16 @@ async def lifespan(app: FastAPI):
         while True:
             logger.info("Starting daily data retention cleanup")
             try:
-                await asyncio.wait_for(run_cleanup(), timeout=120.0)
+                with use_pool("background"):
+                    await asyncio.wait_for(run_cleanup(), timeout=120.0)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.warning(f"Data cleanup failed: {e}")
-            await asyncio.sleep(86400)
+            # A run that ran out of budget resumes from its checkpoint within the hour
+            await asyncio.sleep(3600 if await retention_in_progress() else 86400)
 
-    cleanup_task = asyncio.create_task(_daily_cleanup())
+    cleanup_task = asyncio.create_task(leader_only("gateway.daily_cleanup", _daily_cleanup)())
 
     yield
 
@@ -207,6 +234,10 @@ async def lifespan(app: FastAPI):
                 logger.info(f"✅ {service_name} service stopped")
     except TimeoutError:
         logger.error("⚠️ Force closing: one or more services refused to shut down in time.")
+    await stop_rate_limit_flusher()
+    await stop_trace_exporter()
+    await stop_leader_election()
+    await close_state_backend()
     await dispose_engine()
     logger.info("👋 MONOLITH STOPPED")
 
@@ -222,7 +253,7 @@ app = FastAPI(
 
 @app.middleware("http")
 async def global_protection(request: Request, call_next):
-    if request.url.path in ("/health", "/") or request.url.path.startswith("/health/"):
+    if request.url.path in ("/health", "/"):
         response = await call_next(request)
         for header, value in SECURITY_HEADERS.items():
             response.headers[header] = value
@@ -273,6 +304,31 @@ async def health():
     )
 
 
+@app.get("/health/db")
+async def health_db(request: Request):
+    # Runs a live ping and exposes statement text and repo names: operators only
+    if not validate_ops_auth(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    healthy, latency = await check_connection_health(get_engine())
+    return JSONResponse(
+        {
+            "db_healthy": healthy,
+            "ping_ms": latency,
+            "pools": get_pool_stats(),
+            "queries": get_query_report(),
+        },
+        status_code=200 if healthy else 503,
+    )
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    # Per-repo timings, pool use, breaker states and job names: scrapers send the same bearer token
+    if not validate_ops_auth(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     return JSONResponse(
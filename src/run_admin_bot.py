@@ -6,6 +6,7 @@ from core.database import dispose_engine
 from core.error_handler import handle_bot_error
 from core.gateway import attach_gateway, setup_bot_webhook
 from core.logger import setup_logger
+from core.metrics import MeteredHTTPXRequest
 from core.webhook_router import register_bot_webhook
 from zenith_admin_bot.commands import cmd_start, cmd_help, cmd_broadcast
 from zenith_admin_bot.dashboard import handle_dashboard
@@ -22,7 +23,7 @@ async def start_service():
         logger.warning("No ADMIN_BOT_TOKEN provided. Service disabled.")
         return
 
-    bot_app = ApplicationBuilder().token(ADMIN_BOT_TOKEN).build()
+    bot_app = ApplicationBuilder().token(ADMIN_BOT_TOKEN).request(MeteredHTTPXRequest("admin")).build()
     bot_app.add_error_handler(handle_bot_error)
     bot_app.add_handler(CommandHandler("start", cmd_start))
     bot_app.add_handler(CommandHandler("help", cmd_help))
@@ -21,6 +21,7 @@ from core.engagement_handlers import cmd_changelog, cmd_feedback, cmd_mystats, c
 from core.error_handler import handle_bot_error
 from core.gateway import attach_gateway, setup_bot_webhook
 from core.logger import setup_logger
+from core.metrics import MeteredHTTPXRequest
 from core.permissions import resolve_tier
 from core.webhook_router import register_bot_webhook
 from zenith_ai_bot.llm_engine import process_ai_query
@@ -492,7 +493,7 @@ async def start_service():
         logger.warning("AI_BOT_TOKEN missing! AI Service disabled.")
         return
 
-    bot_app = ApplicationBuilder().token(AI_BOT_TOKEN).build()
+    bot_app = ApplicationBuilder().token(AI_BOT_TOKEN).request(MeteredHTTPXRequest("ai")).build()
     attach_gateway(bot_app, "AI")
 
     bot_app.add_handler(CommandHandler("start", cmd_start))
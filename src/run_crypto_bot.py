@@ -7,24 +7,39 @@ from telegram import Update
 from telegram.error import BadRequest, Forbidden, RetryAfter
 from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, ContextTypes
 
-from core.config import CRYPTO_BOT_TOKEN
+from core.config import (
+    CRYPTO_BOT_TOKEN,
+    ETH_BLOCK_TIME,
+    MARKET_SNAPSHOT_INTERVAL,
+    PORTFOLIO_SNAPSHOT_INTERVAL,
+    PRICE_FEED_INTERVAL,
+)
 from core.database import dispose_engine
 from core.engagement_handlers import cmd_changelog, cmd_feedback, cmd_mystats, cmd_referral
 from core.error_handler import handle_bot_error
 from core.gateway import attach_gateway, setup_bot_webhook
 from core.logger import setup_logger
+from core.metrics import MeteredHTTPXRequest
 from core.permissions import resolve_tier
+from core.scheduler import IntervalTrigger, Scheduler
 from core.webhook_router import register_bot_webhook
 from zenith_ai_bot.repository import UsageRepo
 from zenith_crypto_bot import ui as crypto_ui
 from zenith_crypto_bot.ai_handlers import cmd_ai, cmd_delkey, cmd_mykey, cmd_setkey, handle_ai_followup
 from zenith_crypto_bot.market_service import (
     close_market_client,
+    eth_rpc,
     get_prices,
     get_wallet_recent_txns,
+    price_store,
+    refresh_coin_index,
+    refresh_market_snapshot,
 )
+from zenith_crypto_bot.pair_indexer import pair_indexer
 from zenith_crypto_bot.pnl_card import generate_pnl_card
+from zenith_crypto_bot.portfolio import get_portfolio, snapshot_portfolios
 from zenith_crypto_bot.pro_handlers import (
+    build_market_card,
     cmd_addtoken,
     cmd_alert,
     cmd_alerts,
@@ -49,28 +64,12 @@ from zenith_crypto_bot.repository import (
     WalletTrackerRepo,
     WatchlistRepo,
 )
+from zenith_crypto_bot.whale_watcher import ALERT_INTERVAL as WHALE_ALERT_INTERVAL, whale_watcher
 
 logger = setup_logger("CRYPTO")
 bot_app = None
 alert_queue = asyncio.Queue(maxsize=500)
-background_tasks = set()
-
-
-def track_task(task):
-    background_tasks.add(task)
-    task.add_done_callback(background_tasks.discard)
-
-
-async def safe_loop(name, coro):
-    while True:
-        try:
-            await coro()
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Loop '{name}' crashed: {e}")
-            raise e  # Bubble up to handle_bot_error
-            await asyncio.sleep(5)
+scheduler = Scheduler("crypto")
 
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -84,7 +83,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     await CryptoSubscriptionRepo.register_user(user_id)
     first_name = html.escape(update.effective_user.first_name or "Trader")
-    days_left = await CryptoSubscriptionRepo.get_days_left(user_id)
+    days_left = (await resolve_tier(user_id)).days_left
     is_pro = days_left > 0
     await update.message.reply_text(
         crypto_ui.get_welcome_msg(first_name, user_id, is_pro, days_left),
@@ -104,7 +103,7 @@ async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_activate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         user_id = update.effective_user.id
-        days_left = await CryptoSubscriptionRepo.get_days_left(user_id)
+        days_left = (await resolve_tier(user_id)).days_left
         if days_left > 0:
             return await update.message.reply_text(
                 f"💎 <b>Active Subscription</b>\n\nYou are already an active Enterprise Pro VIP member with <b>{days_left} days</b> remaining! No activation needed.",
@@ -122,7 +121,7 @@ async def cmd_audit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     contract = context.args[0][:100].strip()
     user_id = update.effective_user.id
     msg = await update.message.reply_text("Initializing scanner...")
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
     await perform_real_audit(user_id, contract, msg, is_pro)
 
 
@@ -135,7 +134,7 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     user_id = update.effective_user.id
     first_name = html.escape(update.effective_user.first_name or "Trader")
-    days_left = await CryptoSubscriptionRepo.get_days_left(user_id)
+    days_left = (await resolve_tier(user_id)).days_left
     is_pro = days_left > 0
 
     try:
@@ -234,7 +233,7 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
             audit_id = int(query.data.split("_")[-1])
             audit_record = await CryptoSubscriptionRepo.get_audit_by_id(user_id, audit_id)
             if audit_record:
-                await perform_real_audit(user_id, audit_record.contract, query.message, is_pro)
+                await perform_real_audit(user_id, audit_record.contract, query.message, is_pro, saved=True)
 
         elif query.data == "ui_volume":
             await query.edit_message_text("Scanning smart money inflows...")
@@ -248,22 +247,8 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         elif query.data == "ui_market":
             await query.edit_message_text(crypto_ui.get_market_loading())
-            from zenith_crypto_bot.market_service import get_fear_greed_index, get_top_movers
-
-            fng, (gainers, losers), btc_data = await asyncio.gather(
-                get_fear_greed_index(), get_top_movers(), get_prices(["bitcoin", "ethereum"])
-            )
-            fng_val = fng["value"] if fng else 0
-            fng_class = fng["classification"] if fng else "N/A"
-            gauge_bar = crypto_ui.build_gauge(fng_val)
-            btc_p = btc_data.get("bitcoin", {}).get("usd", 0)
-            btc_c = btc_data.get("bitcoin", {}).get("usd_24h_change", 0)
-            eth_p = btc_data.get("ethereum", {}).get("usd", 0)
-            eth_c = btc_data.get("ethereum", {}).get("usd_24h_change", 0)
             await query.edit_message_text(
-                crypto_ui.get_market_card(
-                    fng_val, fng_class, gauge_bar, btc_p, btc_c, eth_p, eth_c, gainers, losers, is_pro
-                ),
+                await build_market_card(is_pro),
                 reply_markup=crypto_ui.get_back_button(),
                 parse_mode="HTML",
             )
@@ -283,18 +268,16 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
         elif query.data == "ui_portfolio":
-            tokens = await WatchlistRepo.get_watchlist(user_id)
-            if not tokens:
+            portfolio = await get_portfolio(user_id)
+            if not portfolio.positions:
                 await query.edit_message_text(
                     crypto_ui.get_portfolio_empty(),
                     reply_markup=crypto_ui.get_back_button(),
                     parse_mode="HTML",
                 )
             else:
-                token_ids = [t.token_id for t in tokens]
-                prices = await get_prices(token_ids)
                 await query.edit_message_text(
-                    crypto_ui.get_portfolio_card(tokens, prices),
+                    crypto_ui.get_portfolio_card(portfolio),
                     reply_markup=crypto_ui.get_portfolio_keyboard(),
                     parse_mode="HTML",
                 )
@@ -478,21 +461,18 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         elif query.data.startswith("ui_flex_"):
             token_id = query.data.replace("ui_flex_", "")
-            tokens = await WatchlistRepo.get_watchlist(user_id)
-            token = next((t for t in tokens if t.token_id == token_id), None)
-            if not token:
+            portfolio = await get_portfolio(user_id)
+            i = portfolio.index(token_id)
+            if i is None:
                 await query.answer("Token not found in portfolio.")
             else:
-                prices = await get_prices([token_id])
-                cp = prices.get(token_id, {}).get("usd", 0)
-                if cp == 0:
+                token = portfolio.positions[i]
+                if portfolio.price[i] == 0:
                     await query.answer("Price data unavailable right now.")
                 else:
-                    invested = token.entry_price * token.quantity
-                    cur = cp * token.quantity
-                    pnl_pct = ((cp - token.entry_price) / token.entry_price * 100) if token.entry_price > 0 else 0
-                    pnl_usd = (cp - token.entry_price) * token.quantity
-                    bio = await asyncio.to_thread(generate_pnl_card, token.token_symbol, pnl_pct, pnl_usd)
+                    bio = await asyncio.to_thread(
+                        generate_pnl_card, token.token_symbol, portfolio.pnl_pct[i], portfolio.pnl_usd[i]
+                    )
                     bio.seek(0)
                     await query.answer()
                     await context.bot.send_photo(
@@ -568,173 +548,202 @@ async def alert_dispatcher():
             await CryptoSubscriptionRepo.toggle_alerts(chat_id, False)
         except Exception as e:
             logger.error(f"Dispatch failed: {e}")
-            raise e  # Bubble up to handle_bot_error
         finally:
             alert_queue.task_done()
             await asyncio.sleep(0.05)
 
 
-async def price_alert_checker():
-    while True:
-        await asyncio.sleep(60)
-        try:
-            alerts = await PriceAlertRepo.get_all_active_alerts()
-            if not alerts:
-                continue
-            token_ids = list(set(a.token_id for a in alerts))
-            prices = await get_prices(token_ids)
+async def refresh_price_feed():
+    # Every worker keeps its own store, so this runs everywhere rather than on the leader only
+    alerted = await PriceAlertRepo.get_active_token_ids()
+    held = await WatchlistRepo.get_all_token_ids()
+    # Quotes the market snapshot just ingested are skipped
+    await price_store.refresh([*alerted, *held], min_age=PRICE_FEED_INTERVAL / 2)
 
-            for alert in alerts:
-                current = prices.get(alert.token_id, {}).get("usd")
-                if current is None:
-                    continue
-                triggered = (alert.direction == "above" and current >= alert.target_price) or (
-                    alert.direction == "below" and current <= alert.target_price
-                )
-                if triggered:
-                    await PriceAlertRepo.trigger_alert(alert.id)
-                    text = crypto_ui.get_price_alert_triggered(
-                        alert.token_symbol, alert.direction, alert.target_price, current
-                    )
-                    with contextlib.suppress(asyncio.QueueFull):
-                        alert_queue.put_nowait((alert.user_id, text))
-        except Exception as e:
-            logger.error(f"Price alert checker error: {e}")
-            raise e  # Bubble up to handle_bot_error
+
+async def price_alert_checker():
+    alerts = await PriceAlertRepo.get_all_active_alerts()
+    if not alerts:
+        return
+    token_ids = list(set(a.token_id for a in alerts))
+    prices = await get_prices(token_ids)
+
+    for alert in alerts:
+        current = prices.get(alert.token_id, {}).get("usd")
+        if current is None:
+            continue
+        triggered = (alert.direction == "above" and current >= alert.target_price) or (
+            alert.direction == "below" and current <= alert.target_price
+        )
+        if triggered:
+            await PriceAlertRepo.trigger_alert(alert.id)
+            text = crypto_ui.get_price_alert_triggered(alert.token_symbol, alert.direction, alert.target_price, current)
+            with contextlib.suppress(asyncio.QueueFull):
+                alert_queue.put_nowait((alert.user_id, text))
 
 
 async def wallet_watcher():
-    while True:
-        await asyncio.sleep(120)
-        try:
-            wallets = await WalletTrackerRepo.get_all_tracked_wallets()
-            for w in wallets:
-                txns = await get_wallet_recent_txns(w.wallet_address, w.last_checked_tx)
-                if txns:
-                    await WalletTrackerRepo.update_last_tx(w.id, txns[0].get("hash", ""))
-                    for tx in txns[:3]:
-                        val_eth = int(tx.get("value", "0")) / 1e18
-                        if val_eth < 0.01:
-                            continue
-                        direction = "SENT" if tx.get("from", "").lower() == w.wallet_address else "RECEIVED"
-                        tx_hash = tx.get("hash", "")
-                        text = crypto_ui.get_wallet_activity(w.label, direction, val_eth, tx_hash)
-                        with contextlib.suppress(asyncio.QueueFull):
-                            alert_queue.put_nowait((w.user_id, text))
-                await asyncio.sleep(0.5)
-        except Exception as e:
-            logger.error(f"Wallet watcher error: {e}")
-            raise e  # Bubble up to handle_bot_error
+    wallets = await WalletTrackerRepo.get_all_tracked_wallets()
+    for w in wallets:
+        txns = await get_wallet_recent_txns(w.wallet_address, w.last_checked_tx)
+        if txns:
+            await WalletTrackerRepo.update_last_tx(w.id, txns[0].get("hash", ""))
+            for tx in txns[:3]:
+                val_eth = int(tx.get("value", "0")) / 1e18
+                if val_eth < 0.01:
+                    continue
+                direction = "SENT" if tx.get("from", "").lower() == w.wallet_address else "RECEIVED"
+                tx_hash = tx.get("hash", "")
+                text = crypto_ui.get_wallet_activity(w.label, direction, val_eth, tx_hash)
+                with contextlib.suppress(asyncio.QueueFull):
+                    alert_queue.put_nowait((w.user_id, text))
+        await asyncio.sleep(0.5)
 
 
 async def real_whale_watcher():
-    """Monitor real on-chain whale movements via Etherscan."""
-    seen_hashes = set()
-    first_run = True
-    while True:
-        await asyncio.sleep(10 if first_run else 120)
-        first_run = False
-        try:
-            from zenith_crypto_bot.market_service import get_whale_transfers
+    """Scan the blocks since the last run, and alert subscribers to the largest whales once per alert interval."""
+    free_users, pro_users = await CryptoSubscriptionRepo.get_alert_subscribers()
+    if not free_users and not pro_users:
+        return
+    whale_watcher.collect(await whale_watcher.poll())
+    top_transfers = whale_watcher.digest(limit=3)
+    if not top_transfers:
+        return
+    for uid in pro_users:
+        for tx in top_transfers:
+            txt = crypto_ui.get_real_whale_alert(tx, is_pro=True)
+            with contextlib.suppress(asyncio.QueueFull):
+                alert_queue.put_nowait((uid, txt))
+    for uid in free_users:
+        for tx in top_transfers[:1]:
+            txt = crypto_ui.get_real_whale_alert(tx, is_pro=False)
+            with contextlib.suppress(asyncio.QueueFull):
+                alert_queue.put_nowait((uid, txt))
+
+
+_seen_unlocks: set[str] = set()
 
-            free_users, pro_users = await CryptoSubscriptionRepo.get_alert_subscribers()
-            if not free_users and not pro_users:
-                continue
-            transfers = await get_whale_transfers()
-            if not transfers:
-                continue
-            new_transfers = [tx for tx in transfers if tx.get("hash") and tx.get("hash") not in seen_hashes]
-            if not new_transfers:
-                continue
-            for tx in new_transfers:
-                seen_hashes.add(tx.get("hash"))
-            if len(seen_hashes) > 1000:
-                seen_hashes.clear()
-            for uid in pro_users:
-                for tx in new_transfers[:3]:
-                    txt = crypto_ui.get_real_whale_alert(tx, is_pro=True)
-                    with contextlib.suppress(asyncio.QueueFull):
-                        alert_queue.put_nowait((uid, txt))
-            for uid in free_users:
-                for tx in new_transfers[:1]:
-                    txt = crypto_ui.get_real_whale_alert(tx, is_pro=False)
-                    with contextlib.suppress(asyncio.QueueFull):
-                        alert_queue.put_nowait((uid, txt))
-        except Exception as e:
-            logger.debug(f"Whale watcher cycle error (non-critical): {e}")
 
 async def unlocks_watcher():
-    """Background task to notify PRO users of imminent token unlocks."""
+    """Notify PRO users of imminent token unlocks."""
     from zenith_crypto_bot.market_service import get_upcoming_unlocks
-    
-    seen_unlocks = set()
-    first_run = True
-    while True:
-        await asyncio.sleep(20 if first_run else 3600)  # Check hourly
-        first_run = False
-        try:
-            _, pro_users = await CryptoSubscriptionRepo.get_alert_subscribers()
-            if not pro_users:
-                continue
-                
-            unlocks = await get_upcoming_unlocks()
-            for u in unlocks:
-                # We alert if the date says 'In 2 days' or 'In 1 days'
-                if "In 2 days" in u["date"] or "In 1 day" in u["date"]:
-                    if u["token"] not in seen_unlocks:
-                        seen_unlocks.add(u["token"])
-                        
-                        for user_id in pro_users:
-                            text = (
-                                f"🚨 <b>WARNING: IMMINENT VC DUMP</b> 🚨\n\n"
-                                f"Token: <b>{u['token']}</b>\n"
-                                f"Amount: {u['amount']} ({u['pct_supply']}% of supply)\n"
-                                f"Value: ${u['usd_value']:,.0f}\n"
-                                f"Recipient: <b>{u['recipient']}</b>\n\n"
-                                f"<i>This is a PRO exclusive early warning. Expect massive volatility.</i>"
-                            )
-                            with contextlib.suppress(asyncio.QueueFull):
-                                alert_queue.put_nowait((user_id, text))
-                                
-            if len(seen_unlocks) > 1000:
-                seen_unlocks.clear()
-        except Exception as e:
-            logger.debug(f"Unlocks watcher cycle error: {e}")
 
+    _, pro_users = await CryptoSubscriptionRepo.get_alert_subscribers()
+    if not pro_users:
+        return
 
-async def subscription_monitor():
-    notified_warning = set()
-    notified_expired = set()
+    unlocks = await get_upcoming_unlocks()
+    for u in unlocks:
+        # We alert if the date says 'In 2 days' or 'In 1 days'
+        if ("In 2 days" in u["date"] or "In 1 day" in u["date"]) and u["token"] not in _seen_unlocks:
+            _seen_unlocks.add(u["token"])
 
-    while True:
-        await asyncio.sleep(3600)
-        try:
-            expiring = await CryptoSubscriptionRepo.get_expiring_users(within_hours=72)
-            for sub in expiring:
-                if sub.user_id in notified_warning:
-                    continue
-                notified_warning.add(sub.user_id)
-                days_left = max(1, (sub.expires_at - datetime.now(UTC)).days)
-                text = crypto_ui.get_subscription_expiring(sub.user_id, days_left)
+            for user_id in pro_users:
+                text = (
+                    f"🚨 <b>WARNING: IMMINENT VC DUMP</b> 🚨\n\n"
+                    f"Token: <b>{u['token']}</b>\n"
+                    f"Amount: {u['amount']} ({u['pct_supply']}% of supply)\n"
+                    f"Value: ${u['usd_value']:,.0f}\n"
+                    f"Recipient: <b>{u['recipient']}</b>\n\n"
+                    f"<i>This is a PRO exclusive early warning. Expect massive volatility.</i>"
+                )
                 with contextlib.suppress(asyncio.QueueFull):
-                    alert_queue.put_nowait((sub.user_id, text))
+                    alert_queue.put_nowait((user_id, text))
 
-            expired = await CryptoSubscriptionRepo.get_just_expired_users(within_hours=1)
-            for sub in expired:
-                if sub.user_id in notified_expired:
-                    continue
-                notified_expired.add(sub.user_id)
-                text = crypto_ui.get_subscription_expired(sub.user_id)
-                with contextlib.suppress(asyncio.QueueFull):
-                    alert_queue.put_nowait((sub.user_id, text))
+    if len(_seen_unlocks) > 1000:
+        _seen_unlocks.clear()
 
-            if len(notified_warning) > 1000:
-                notified_warning.clear()
-            if len(notified_expired) > 1000:
-                notified_expired.clear()
-        except Exception as e:
-            logger.error(f"Subscription monitor error: {e}")
-            raise e  # Bubble up to handle_bot_error
+
+_notified_warning: set[int] = set()
+_notified_expired: set[int] = set()
+
+
+async def subscription_monitor():
+    expiring = await CryptoSubscriptionRepo.get_expiring_users(within_hours=72)
+    for sub in expiring:
+        if sub.user_id in _notified_warning:
+            continue
+        _notified_warning.add(sub.user_id)
+        days_left = max(1, (sub.expires_at - datetime.now(UTC)).days)
+        text = crypto_ui.get_subscription_expiring(sub.user_id, days_left)
+        with contextlib.suppress(asyncio.QueueFull):
+            alert_queue.put_nowait((sub.user_id, text))
+
+    expired = await CryptoSubscriptionRepo.get_just_expired_users(within_hours=1)
+    for sub in expired:
+        if sub.user_id in _notified_expired:
+            continue
+        _notified_expired.add(sub.user_id)
+        text = crypto_ui.get_subscription_expired(sub.user_id)
+        with contextlib.suppress(asyncio.QueueFull):
+            alert_queue.put_nowait((sub.user_id, text))
+
+    if len(_notified_warning) > 1000:
+        _notified_warning.clear()
+    if len(_notified_expired) > 1000:
+        _notified_expired.clear()
+
+
+def _register_jobs():
+    scheduler.add_worker("dispatcher", alert_dispatcher)
+    # Follows every block over RPC, but DMs go out once per whale ALERT_INTERVAL;
+    # without an endpoint it falls back to polling Etherscan on that cadence
+    whale_interval = ETH_BLOCK_TIME if eth_rpc.configured else WHALE_ALERT_INTERVAL
+    scheduler.add_job(
+        "whale_watcher",
+        real_whale_watcher,
+        IntervalTrigger(whale_interval, initial_delay=10),
+        timeout=whale_interval * 0.75,
+        breaker="eth_rpc" if eth_rpc.configured else "etherscan",
+        leader=True,
+    )
+    scheduler.add_job(
+        "unlocks_watcher",
+        unlocks_watcher,
+        IntervalTrigger(3600, initial_delay=20),
+        timeout=120,
+        breaker="unlocks_scraper",
+        leader=True,
+    )
+    scheduler.add_job(
+        "price_feed",
+        refresh_price_feed,
+        IntervalTrigger(PRICE_FEED_INTERVAL, initial_delay=5),
+        timeout=PRICE_FEED_INTERVAL,
+        breaker="coingecko",
+    )
+    scheduler.add_job(
+        "market_snapshot",
+        refresh_market_snapshot,
+        IntervalTrigger(MARKET_SNAPSHOT_INTERVAL, initial_delay=3),
+        timeout=MARKET_SNAPSHOT_INTERVAL,
+        breaker="coingecko",
+    )
+    # No breaker gate: the first run loads the on-disk index even while CoinGecko is down
+    scheduler.add_job("coin_index", refresh_coin_index, IntervalTrigger(3600, initial_delay=1), timeout=120)
+    if eth_rpc.configured:
+        scheduler.add_job(
+            "pair_indexer",
+            pair_indexer.run_once,
+            IntervalTrigger(ETH_BLOCK_TIME, initial_delay=15),
+            timeout=ETH_BLOCK_TIME * 4,
+            breaker="eth_rpc",
+            leader=True,
+        )
+    scheduler.add_job(
+        "price_alerts", price_alert_checker, IntervalTrigger(60), timeout=50, breaker="coingecko", leader=True
+    )
+    scheduler.add_job(
+        "wallet_watcher", wallet_watcher, IntervalTrigger(120), timeout=110, jitter=5, breaker="etherscan", leader=True
+    )
+    scheduler.add_job(
+        "portfolio_history",
+        snapshot_portfolios,
+        IntervalTrigger(PORTFOLIO_SNAPSHOT_INTERVAL, initial_delay=60),
+        timeout=300,
+        leader=True,
+    )
+    scheduler.add_job("sub_monitor", subscription_monitor, IntervalTrigger(3600), timeout=300, leader=True)
 
 
 async def start_service():
@@ -742,7 +751,7 @@ async def start_service():
     if not CRYPTO_BOT_TOKEN:
         return
 
-    bot_app = ApplicationBuilder().token(CRYPTO_BOT_TOKEN).build()
+    bot_app = ApplicationBuilder().token(CRYPTO_BOT_TOKEN).request(MeteredHTTPXRequest("crypto")).build()
     attach_gateway(bot_app, "Crypto")
 
     bot_app.add_handler(CommandHandler("start", cmd_start))
@@ -782,12 +791,8 @@ async def start_service():
     await bot_app.initialize()
     await bot_app.start()
 
-    track_task(asyncio.create_task(safe_loop("dispatcher", alert_dispatcher)))
-    track_task(asyncio.create_task(safe_loop("whale_watcher", real_whale_watcher)))
-    track_task(asyncio.create_task(safe_loop("unlocks_watcher", unlocks_watcher)))
-    track_task(asyncio.create_task(safe_loop("price_alerts", price_alert_checker)))
-    track_task(asyncio.create_task(safe_loop("wallet_watcher", wallet_watcher)))
-    track_task(asyncio.create_task(safe_loop("sub_monitor", subscription_monitor)))
+    _register_jobs()
+    await scheduler.start()
 
 
 async def register_webhook():
@@ -796,10 +801,7 @@ async def register_webhook():
 
 
 async def stop_service(dispose_db: bool = False):
-    for t in list(background_tasks):
-        t.cancel()
-    if background_tasks:
-        await asyncio.gather(*list(background_tasks), return_exceptions=True)
+    await scheduler.stop()
     if bot_app:
         await bot_app.stop()
         await bot_app.shutdown()
@@ -1,4 +1,3 @@
-import asyncio
 import contextlib
 from datetime import UTC, datetime
 from html import escape
@@ -18,6 +17,9 @@ from core.database import dispose_engine
 from core.error_handler import handle_bot_error
 from core.gateway import attach_gateway, setup_bot_webhook
 from core.logger import setup_logger
+from core.metrics import MeteredHTTPXRequest
+from core.permissions import PRODUCT_GROUP, resolve_tier
+from core.scheduler import CronTrigger, IntervalTrigger, Scheduler
 from core.webhook_router import register_bot_webhook
 from zenith_group_bot.repository import GroupSubscriptionRepo
 from zenith_group_bot.ai_group_handlers import register_group_ai_handlers, set_group_ai_bot
@@ -83,24 +85,7 @@ from zenith_group_bot.ui import (
 logger = setup_logger("SVC_GROUP")
 
 bot_app = None
-background_tasks = set()
-
-
-def track_task(task):
-    background_tasks.add(task)
-    task.add_done_callback(background_tasks.discard)
-
-
-async def safe_loop(name, coro):
-    while True:
-        try:
-            await coro()
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Loop '{name}' crashed: {e}")
-            raise e  # Bubble up to handle_bot_error
-            await asyncio.sleep(5)
+scheduler = Scheduler("group")
 
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -115,11 +100,11 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         from zenith_ai_bot.ui import get_key_required_msg
         return await update.message.reply_text(get_key_required_msg(), parse_mode="HTML")
         
-    is_pro = await GroupSubscriptionRepo.is_pro(user_id)
+    tier = await resolve_tier(user_id, product=PRODUCT_GROUP)
+    is_pro = tier.is_pro
     groups = await SettingsRepo.get_owned_groups(user_id)
-    days_left = await GroupSubscriptionRepo.get_days_left(user_id)
 
-    text = get_dashboard_main_msg(is_pro, groups, days_left)
+    text = get_dashboard_main_msg(is_pro, groups, tier.days_left)
     await update.message.reply_text(
         text,
         reply_markup=get_admin_dashboard(is_pro, groups),
@@ -130,7 +115,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_activate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         user_id = update.effective_user.id
-        is_pro = await GroupSubscriptionRepo.is_pro(user_id)
+        is_pro = (await resolve_tier(user_id, product=PRODUCT_GROUP)).is_pro
         if is_pro:
             return await update.message.reply_text(
                 "💎 <b>Active Pro Shield</b>\n\nYou are already an active Enterprise Pro Shield member! No activation is needed right now.",
@@ -155,12 +140,12 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return await setup_callback(update, context)
 
     try:
-        is_pro = await GroupSubscriptionRepo.is_pro(user_id)
+        tier = await resolve_tier(user_id, product=PRODUCT_GROUP)
+        is_pro = tier.is_pro
 
         if data == "grp_main_menu":
             groups = await SettingsRepo.get_owned_groups(user_id)
-            days_left = await GroupSubscriptionRepo.get_days_left(user_id)
-            text = get_dashboard_main_msg(is_pro, groups, days_left)
+            text = get_dashboard_main_msg(is_pro, groups, tier.days_left)
             await query.edit_message_text(
                 text,
                 reply_markup=get_admin_dashboard(is_pro, groups),
@@ -191,8 +176,7 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
         elif data == "grp_status":
-            days = await GroupSubscriptionRepo.get_days_left(user_id)
-            text = get_status_msg(is_pro, days)
+            text = get_status_msg(is_pro, tier.days_left)
             await query.edit_message_text(text, reply_markup=get_back_button(), parse_mode="HTML")
 
 
@@ -227,11 +211,9 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         elif data.startswith("grp_analytics_") and data != "grp_analytics_pick":
             chat_id = int(data.rsplit("_", 1)[-1])
-            day_stats = await AuditLogRepo.count_actions(chat_id, hours=24)
-            week_stats = await AuditLogRepo.count_actions(chat_id, hours=168)
-            total = await AuditLogRepo.total_actions(chat_id)
-            top_violators = await AuditLogRepo.get_top_violators(chat_id, hours=168, limit=5)
-            text = get_analytics_msg(day_stats, week_stats, total, top_violators)
+            totals = await AuditLogRepo.get_action_totals(chat_id)
+            top_violators = await AuditLogRepo.get_top_violators(chat_id, days=7, limit=5)
+            text = get_analytics_msg(totals, top_violators)
             await query.edit_message_text(text, reply_markup=get_back_button(), parse_mode="HTML")
 
         elif data.startswith("grp_audit_") and data != "grp_audit_pick":
@@ -354,7 +336,6 @@ async def scheduled_message_loop():
             await ScheduleRepo.mark_sent(msg.id)
         except Exception as e:
             logger.warning(f"Scheduled msg send failed (chat {msg.chat_id}): {e}")
-    await asyncio.sleep(60)
 
 
 async def start_service():
@@ -363,7 +344,7 @@ async def start_service():
         logger.warning("GROUP_BOT_TOKEN missing! Group Service disabled.")
         return
 
-    bot_app = ApplicationBuilder().token(GROUP_BOT_TOKEN).build()
+    bot_app = ApplicationBuilder().token(GROUP_BOT_TOKEN).request(MeteredHTTPXRequest("group")).build()
     attach_gateway(bot_app, "Group")
 
     bot_app.add_handler(CommandHandler("start", cmd_start))
@@ -416,11 +397,21 @@ async def start_service():
     await bot_app.initialize()
     await bot_app.start()
 
-    track_task(asyncio.create_task(safe_loop("scheduled_messages", scheduled_message_loop)))
-    logger.info("⏰ Scheduled Message Loop: Online")
-    from zenith_group_bot.gamification import gamification_loop
-    track_task(asyncio.create_task(safe_loop("gamification", gamification_loop)))
-    logger.info("🎮 Gamification Loop: Online")
+    from zenith_group_bot.gamification import flush_gamification
+
+    # Every minute on the minute; a run more than 30s late would read the wrong hh:mm slot
+    scheduler.add_job(
+        "scheduled_messages",
+        scheduled_message_loop,
+        CronTrigger("* * * * *"),
+        timeout=55,
+        misfire_grace=30,
+        leader=True,
+    )
+    # Flushes this replica's own in-memory XP buffer, so it runs everywhere
+    scheduler.add_job("gamification", flush_gamification, IntervalTrigger(60), timeout=50)
+    await scheduler.start()
+    logger.info("⏰ Scheduled Messages & 🎮 Gamification: Online")
 
 
 async def register_webhook():
@@ -429,10 +420,7 @@ async def register_webhook():
 
 
 async def stop_service(dispose_db: bool = False):
-    for task in list(background_tasks):
-        task.cancel()
-    if background_tasks:
-        await asyncio.gather(*list(background_tasks), return_exceptions=True)
+    await scheduler.stop()
     if bot_app:
         await bot_app.stop()
         await bot_app.shutdown()
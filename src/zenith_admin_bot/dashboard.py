@@ -2,7 +2,9 @@
 import contextlib
 from telegram import Update
 from telegram.ext import ContextTypes
-from core.config import ADMIN_USER_ID
+from core.config import ADMIN_USER_ID, TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+from core.query_profiler import get_query_report
+from core.tracing import get_recent_traces
 from zenith_admin_bot import ui as admin_ui
 from zenith_admin_bot.common import logger
 from zenith_admin_bot.repository import AdminRepo, BotRegistryRepo, MonitoringRepo
@@ -118,6 +120,18 @@ async def handle_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=admin_ui.get_back_button(),
                 parse_mode="HTML",
             )
+        elif query.data == "admin_db_queries":
+            await query.edit_message_text(
+                admin_ui.format_query_profile(get_query_report()),
+                reply_markup=admin_ui.get_back_button(),
+                parse_mode="HTML",
+            )
+        elif query.data == "admin_traces":
+            await query.edit_message_text(
+                admin_ui.format_traces(get_recent_traces(), TRACE_SAMPLE_RATE, TRACE_SLOW_MS),
+                reply_markup=admin_ui.get_back_button(),
+                parse_mode="HTML",
+            )
         elif query.data == "admin_audit":
             logs = await AdminRepo.get_audit_trail(limit=15)
             await query.edit_message_text(
@@ -1,14 +1,16 @@
 import asyncio
 from datetime import UTC, datetime
 
+from core.analytics import refresh_subscription_snapshot
 from core.config import ADMIN_USER_ID
 from core.logger import setup_logger
+from core.scheduler import IntervalTrigger, Scheduler
 from zenith_admin_bot.repository import BotRegistryRepo, MonitoringRepo
 
 logger = setup_logger("ADMIN_MONITOR")
 
 alert_queue = asyncio.Queue(maxsize=100)
-background_tasks = set()
+scheduler = Scheduler("admin")
 bot_app = None
 
 bot_app_references = {
@@ -22,11 +24,6 @@ last_alert_time = {}
 ALERT_COOLDOWN = 3600
 
 
-def track_task(task):
-    background_tasks.add(task)
-    task.add_done_callback(background_tasks.discard)
-
-
 def set_bot_app(app, bot_name="Admin"):
     global bot_app
     bot_app = app
@@ -39,17 +36,6 @@ def register_bot_app(bot_name, app):
     logger.info(f"Registered {bot_name} bot app for monitoring")
 
 
-async def safe_loop(name, coro):
-    while True:
-        try:
-            await coro()
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Loop '{name}' crashed: {e}")
-            await asyncio.sleep(5)
-
-
 async def alert_dispatcher():
     while True:
         chat_id, text = await alert_queue.get()
@@ -63,14 +49,9 @@ async def alert_dispatcher():
 
 
 async def check_bot_health():
-    while True:
-        await asyncio.sleep(300)
-        try:
-            bots = await BotRegistryRepo.get_all_bots()
-            for bot in bots:
-                await check_single_bot(bot)
-        except Exception as e:
-            logger.error(f"Health check error: {e}")
+    bots = await BotRegistryRepo.get_all_bots()
+    for bot in bots:
+        await check_single_bot(bot)
 
 
 async def check_single_bot(bot):
@@ -127,37 +108,31 @@ async def check_single_bot(bot):
         last_alert_time[alert_key] = now
 
 
-async def monitor_subscriptions():
-    previous_expiring = None
-    first_run = True
+_previous_expiring: int | None = None
 
-    while True:
-        await asyncio.sleep(3600)
-        try:
-            stats = await MonitoringRepo.get_subscription_stats()
-            current_expiring = stats.get("expiring_within_7_days", 0)
-
-            if first_run:
-                if current_expiring > 0:
-                    await queue_alert(
-                        f"⚠️ <b>SUBSCRIPTION ALERT</b>\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                        f"<b>{current_expiring} subscription(s)</b> expiring within 7 days!\n\n"
-                        f"<i>Consider running a retention campaign.</i>"
-                    )
-                first_run = False
-            elif current_expiring > previous_expiring and previous_expiring is not None and previous_expiring > 0:
-                diff = current_expiring - previous_expiring
-                await queue_alert(
-                    f"⚠️ <b>REVENUE ALERT</b>\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"<b>{diff} new subscription(s)</b> expiring within 7 days!\n"
-                    f"<b>Total at risk:</b> {current_expiring}\n\n"
-                    f"<i>Consider running a retention campaign.</i>"
-                )
-
-            previous_expiring = current_expiring
 
-        except Exception as e:
-            logger.error(f"Subscription monitor error: {e}")
+async def monitor_subscriptions():
+    global _previous_expiring
+    stats = await MonitoringRepo.get_subscription_stats()
+    current_expiring = stats.get("expiring_within_7_days", 0)
+
+    if _previous_expiring is None:
+        if current_expiring > 0:
+            await queue_alert(
+                f"⚠️ <b>SUBSCRIPTION ALERT</b>\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"<b>{current_expiring} subscription(s)</b> expiring within 7 days!\n\n"
+                f"<i>Consider running a retention campaign.</i>"
+            )
+    elif current_expiring > _previous_expiring and _previous_expiring > 0:
+        diff = current_expiring - _previous_expiring
+        await queue_alert(
+            f"⚠️ <b>REVENUE ALERT</b>\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"<b>{diff} new subscription(s)</b> expiring within 7 days!\n"
+            f"<b>Total at risk:</b> {current_expiring}\n\n"
+            f"<i>Consider running a retention campaign.</i>"
+        )
+
+    _previous_expiring = current_expiring
 
 
 async def queue_alert(message: str):
@@ -175,14 +150,21 @@ async def start_monitoring(app):
     await BotRegistryRepo.register_bot("Group")
     await BotRegistryRepo.register_bot("Admin")
 
-    track_task(asyncio.create_task(safe_loop("health_check", check_bot_health)))
-    track_task(asyncio.create_task(safe_loop("sub_monitor", monitor_subscriptions)))
-    track_task(asyncio.create_task(safe_loop("dispatcher", alert_dispatcher)))
+    scheduler.add_worker("dispatcher", alert_dispatcher)
+    scheduler.add_job("health_check", check_bot_health, IntervalTrigger(300), timeout=120, leader=True)
+    scheduler.add_job(
+        "subscription_snapshot",
+        refresh_subscription_snapshot,
+        IntervalTrigger(600, initial_delay=5),
+        timeout=120,
+        leader=True,
+    )
+    scheduler.add_job("sub_monitor", monitor_subscriptions, IntervalTrigger(3600), timeout=120, leader=True)
+    await scheduler.start()
 
     logger.info("👀 Admin Monitoring: Started")
 
 
 async def stop_monitoring():
-    for t in list(background_tasks):
-        t.cancel()
+    await scheduler.stop()
     logger.info("👀 Admin Monitoring: Stopped")
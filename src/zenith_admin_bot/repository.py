@@ -1,9 +1,12 @@
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-from core.database import AsyncSessionLocal, db_retry
+from core.analytics import bump_key_counter, refresh_subscription_snapshot
+from core.analytics_models import SubscriptionDailyStat
+from core.database import AsyncSessionLocal, db_retry, db_route, use_pool
 from core.cache import async_ttl_cache
+from core.permissions import PRODUCT_CRYPTO, PRODUCT_GROUP
 from core.logger import setup_logger
 from zenith_admin_bot.models import ActionType, AdminAuditLog, BotRegistry, BotStatus
 
@@ -125,43 +128,42 @@ class BotRegistryRepo:
 
 
 class MonitoringRepo:
+    @staticmethod
+    async def _latest_snapshots() -> dict:
+        """Latest subscription rollup row per product, taking a first snapshot if none exists yet."""
+        for attempt in range(2):
+            # The first snapshot was just written to the primary; a replica may not have it yet
+            async with AsyncSessionLocal(read_only=False if attempt else None) as session:
+                latest = select(func.max(SubscriptionDailyStat.day)).where(SubscriptionDailyStat.snapshot_at.is_not(None))
+                stmt = select(SubscriptionDailyStat).where(SubscriptionDailyStat.day == latest.scalar_subquery())
+                rows = (await session.execute(stmt)).scalars().all()
+            if rows or attempt:
+                return {row.product: row for row in rows}
+            with use_pool("background"):
+                await refresh_subscription_snapshot()
+        return {}
+
     @staticmethod
     @async_ttl_cache(ttl=60)
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_subscription_stats() -> dict:
-        async with AsyncSessionLocal() as session:
-            from sqlalchemy import func
-
-            from zenith_crypto_bot.models import CryptoUser, Subscription
-
-            total_users_res = await session.execute(select(func.count(CryptoUser.user_id)))
-            total_users = total_users_res.scalar() or 0
-
-            now = datetime.now(UTC)
-            pro_users_res = await session.execute(
-                select(func.count(Subscription.user_id)).where(Subscription.expires_at > now)
-            )
-            pro_users = pro_users_res.scalar() or 0
-
-            active_subs_res = await session.execute(
-                select(func.count(Subscription.user_id)).where(Subscription.expires_at > now)
-            )
-            active_subs = active_subs_res.scalar() or 0
-
-            expiring_soon_res = await session.execute(
-                select(func.count(Subscription.user_id)).where(
-                    Subscription.expires_at > now, Subscription.expires_at <= now + timedelta(days=7)
-                )
-            )
-            expiring_soon = expiring_soon_res.scalar() or 0
-
+        crypto = (await MonitoringRepo._latest_snapshots()).get(PRODUCT_CRYPTO)
+        if crypto is None:
             return {
-                "total_users": total_users,
-                "pro_users": pro_users,
-                "free_users": total_users - pro_users,
-                "active_subscriptions": active_subs,
-                "expiring_within_7_days": expiring_soon,
+                "total_users": 0,
+                "pro_users": 0,
+                "free_users": 0,
+                "active_subscriptions": 0,
+                "expiring_within_7_days": 0,
             }
+        return {
+            "total_users": crypto.users,
+            "pro_users": crypto.active_subscriptions,
+            "free_users": crypto.users - crypto.active_subscriptions,
+            "active_subscriptions": crypto.active_subscriptions,
+            "expiring_within_7_days": crypto.expiring_soon,
+        }
 
     @staticmethod
     @db_retry
@@ -304,6 +306,7 @@ class MonitoringRepo:
                 key = ActivationKey(key_string=key_str, duration_days=days)
                 session.add(key)
                 keys.append(key_str)
+            await bump_key_counter(session, PRODUCT_CRYPTO, "keys_generated", len(keys))
             await session.commit()
         return keys
 
@@ -324,71 +327,66 @@ class MonitoringRepo:
 
     @staticmethod
     @async_ttl_cache(ttl=60)
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_db_stats() -> dict:
-        from sqlalchemy import func
+        from core.data_cleanup import MODERATION_LOG_RETENTION_DAYS
+        from zenith_group_bot.models import ModerationDailyStat
 
-        from zenith_crypto_bot.models import ActivationKey, CryptoUser, Subscription
-        from zenith_group_bot.models import GroupSettings, ModerationLog
+        snapshots = await MonitoringRepo._latest_snapshots()
+        crypto, group = snapshots.get(PRODUCT_CRYPTO), snapshots.get(PRODUCT_GROUP)
 
+        # The raw log only keeps its retention window, so its size is the rollup sum over it
+        since = datetime.now(UTC).date() - timedelta(days=MODERATION_LOG_RETENTION_DAYS)
         async with AsyncSessionLocal() as session:
-            stats = {}
-
-            stats["crypto_users"] = (await session.execute(select(func.count()).select_from(CryptoUser))).scalar() or 0
-            stats["subscriptions"] = (
-                await session.execute(select(func.count()).select_from(Subscription))
-            ).scalar() or 0
-            stats["activation_keys"] = (
-                await session.execute(select(func.count()).select_from(ActivationKey))
-            ).scalar() or 0
-            stats["groups"] = (await session.execute(select(func.count()).select_from(GroupSettings))).scalar() or 0
-            stats["moderation_logs"] = (
-                await session.execute(select(func.count()).select_from(ModerationLog))
-            ).scalar() or 0
+            moderation_logs = (
+                await session.execute(
+                    select(func.coalesce(func.sum(ModerationDailyStat.count), 0)).where(ModerationDailyStat.day >= since)
+                )
+            ).scalar()
 
-            return stats
+        return {
+            "crypto_users": crypto.users if crypto else 0,
+            "subscriptions": crypto.subscriptions if crypto else 0,
+            "activation_keys": crypto.activation_keys if crypto else 0,
+            "groups": group.users if group else 0,
+            "moderation_logs": moderation_logs,
+        }
 
     @staticmethod
     @async_ttl_cache(ttl=120)
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_revenue_report() -> dict:
-        from sqlalchemy import func
-
-        from zenith_crypto_bot.models import ActivationKey, Subscription
+        crypto = (await MonitoringRepo._latest_snapshots()).get(PRODUCT_CRYPTO)
+        month_start = datetime.now(UTC).date().replace(day=1)
 
+        redeemed = func.coalesce(func.sum(SubscriptionDailyStat.keys_redeemed), 0)
         async with AsyncSessionLocal() as session:
-            now = datetime.now(UTC)
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            active_now = (
-                await session.execute(
-                    select(func.count()).select_from(Subscription).where(Subscription.expires_at > now)
-                )
-            ).scalar() or 0
-
-            keys_this_month = (
-                await session.execute(
-                    select(func.count())
-                    .select_from(ActivationKey)
-                    .where(ActivationKey.is_used == True, ActivationKey.used_at >= month_start)
-                )
-            ).scalar() or 0
-
-            total_keys_used = (
+            keys_this_month, total_keys_used = (
                 await session.execute(
-                    select(func.count()).select_from(ActivationKey).where(ActivationKey.is_used == True)
+                    select(
+                        select(redeemed)
+                        .where(SubscriptionDailyStat.product == PRODUCT_CRYPTO, SubscriptionDailyStat.day >= month_start)
+                        .scalar_subquery(),
+                        select(redeemed).where(SubscriptionDailyStat.product == PRODUCT_CRYPTO).scalar_subquery(),
+                    )
                 )
-            ).scalar() or 0
-
-            return {
-                "active_subscriptions": active_now,
-                "keys_redeemed_month": keys_this_month,
-                "total_keys_redeemed": total_keys_used,
-                "estimated_mrr": active_now * 149,
-                "estimated_annual": active_now * 149 * 12,
-            }
+            ).one()
+
+        active_now = crypto.active_subscriptions if crypto else 0
+        return {
+            "active_subscriptions": active_now,
+            "pro_users": active_now,
+            "expiring_within_7_days": crypto.expiring_soon if crypto else 0,
+            "keys_redeemed_month": keys_this_month,
+            "total_keys_redeemed": total_keys_used,
+            "estimated_mrr": active_now * 149,
+            "estimated_annual": active_now * 149 * 12,
+        }
 
     @staticmethod
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_all_user_ids() -> list:
         from zenith_crypto_bot.models import CryptoUser
@@ -398,6 +396,7 @@ class MonitoringRepo:
             return [r[0] for r in (await session.execute(stmt)).all()]
 
     @staticmethod
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_all_pro_user_ids() -> list:
         from zenith_crypto_bot.models import Subscription
@@ -408,6 +407,7 @@ class MonitoringRepo:
             return [r[0] for r in (await session.execute(stmt)).all()]
 
     @staticmethod
+    @db_route(pool="analytics", read_only=True)
     @db_retry
     async def get_all_group_chat_ids() -> list:
         from zenith_group_bot.models import GroupSettings
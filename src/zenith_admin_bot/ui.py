@@ -1,4 +1,5 @@
 from datetime import UTC, datetime
+from html import escape
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -30,6 +31,10 @@ def get_admin_main_menu() -> InlineKeyboardMarkup:
             InlineKeyboardButton("💰 Revenue & MRR", callback_data="admin_revenue"),
             InlineKeyboardButton("💾 Database Stats", callback_data="admin_db_stats"),
         ],
+        [
+            InlineKeyboardButton("🐢 Query Profile", callback_data="admin_db_queries"),
+            InlineKeyboardButton("🧭 Traces", callback_data="admin_traces"),
+        ],
         [
             InlineKeyboardButton("📜 Audit Log", callback_data="admin_audit"),
             InlineKeyboardButton("🔒 Security Matrix", callback_data="admin_security"),
@@ -73,6 +78,8 @@ def get_group_admin_menu() -> InlineKeyboardMarkup:
 def get_system_keyboard() -> InlineKeyboardMarkup:
     keyboard = [
         [InlineKeyboardButton("Database Stats", callback_data="admin_db_stats")],
+        [InlineKeyboardButton("Query Profile", callback_data="admin_db_queries")],
+        [InlineKeyboardButton("Traces", callback_data="admin_traces")],
         [InlineKeyboardButton("Key History", callback_data="admin_key_history")],
         [InlineKeyboardButton("Back", callback_data="admin_main")],
     ]
@@ -417,6 +424,63 @@ def format_db_stats(stats: dict) -> str:
     )
 
 
+def format_query_profile(report: dict) -> str:
+    lines = [
+        "<b>Query Profile</b>",
+        f"<i>Slow threshold {report.get('slow_query_ms', 0):g}ms, "
+        f"N+1 threshold {report.get('n_plus_one_threshold', 0)} queries/update</i>",
+        "",
+        "<b>Hottest Repo Methods:</b>",
+    ]
+    repos = report.get("repos", {})
+    if not repos:
+        lines.append("  No queries recorded yet.")
+    for repo, hist in list(repos.items())[:8]:
+        lines.append(
+            f"  <code>{escape(repo)}</code>\n"
+            f"    {hist['count']:,} calls | avg {hist['avg_ms']}ms | p95 {hist['p95_ms']:g}ms | max {hist['max_ms']}ms"
+        )
+
+    slow = report.get("slow_queries", [])
+    if slow:
+        lines.extend(["", "<b>Recent Slow Queries:</b>"])
+        for entry in slow[-3:]:
+            lines.append(
+                f"  {entry['ms']}ms in <code>{escape(entry['repo'])}</code>\n"
+                f"    <code>{escape(entry['statement'][:120])}</code>"
+            )
+
+    suspects = report.get("n_plus_one", [])
+    if suspects:
+        lines.extend(["", "<b>N+1 Suspects:</b>"])
+        for entry in suspects[-3:]:
+            top = ", ".join(f"{escape(repo)} x{count}" for repo, count in entry["top_repos"])
+            lines.append(f"  {escape(entry['label'])}: {entry['queries']} queries ({top})")
+
+    return "\n".join(lines)
+
+
+def format_traces(traces: list[dict], sample_rate: float, slow_ms: float) -> str:
+    lines = [
+        "<b>Recent Traces</b>",
+        f"<i>Sampling {sample_rate:.0%} of updates, plus every failed update and every one over {slow_ms:g}ms</i>",
+        "",
+    ]
+    if not traces:
+        lines.append("No traces kept yet.")
+    for trace in traces[:6]:
+        at = datetime.fromtimestamp(trace["at"], UTC).strftime("%H:%M:%S")
+        status = f" ❌ {escape(trace['error'])}" if trace["error"] else ""
+        lines.append(
+            f"<code>{at}</code> <b>{escape(trace['name'])}</b> {trace['duration_ms']:g}ms, "
+            f"{trace['spans']} spans{status}\n"
+            f"  <code>{trace['trace_id']}</code>"
+        )
+        for kind, name, ms in trace["slowest"]:
+            lines.append(f"    {kind} <code>{escape(name)}</code> {ms:g}ms")
+    return "\n".join(lines)
+
+
 def format_revenue_detailed(report: dict) -> str:
     return (
         f"<b>Revenue Report</b>\n\n"
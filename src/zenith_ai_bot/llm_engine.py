@@ -55,16 +55,6 @@ TOOLS = [
 
 
 
-async def _check_and_record(user_id: int, query_text: str, response_text: str) -> tuple[bool, str]:
-    """Check quota and record token usage. Returns (allowed, message)."""
-    allowed, msg = await UsageRepo.check_quota(user_id)
-    if not allowed:
-        return False, msg
-    estimated = len(query_text) // 4 + len(response_text) // 4
-    await UsageRepo.record_tokens(user_id, max(1, estimated))
-    return True, ""
-
-
 async def process_ai_query(
     user_id: int,
     user_text: str,
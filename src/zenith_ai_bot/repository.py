@@ -1,13 +1,16 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, lambda_stmt, select
 
 from core.database import AsyncSessionLocal, db_retry
 from core.logger import setup_logger
-from zenith_ai_bot.models import AIConversation, AIUsageLog
+from core.lookups import fetch_scalar
+from zenith_ai_bot.models import AIConversation, AIUsageLog, AIUserSettings
 
 logger = setup_logger("AI_REPO")
 
+_user_settings = AIUserSettings.__table__
+
 
 class ConversationRepo:
     @staticmethod
@@ -190,11 +193,9 @@ class SettingsRepo:
     @staticmethod
     @db_retry
     async def get_api_key(user_id: int) -> str | None:
-        async with AsyncSessionLocal() as session:
-            from zenith_ai_bot.models import AIUserSettings
-            stmt = select(AIUserSettings).where(AIUserSettings.user_id == user_id)
-            row = (await session.execute(stmt)).scalar_one_or_none()
-            return row.groq_api_key if row else None
+        return await fetch_scalar(
+            lambda_stmt(lambda: select(_user_settings.c.groq_api_key).where(_user_settings.c.user_id == user_id))
+        )
 
     @staticmethod
     @db_retry
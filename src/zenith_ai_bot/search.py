@@ -1,22 +1,28 @@
 import httpx
 from cachetools import TTLCache
 
+from core.cache import MeteredTTLCache
 from core.circuit_breaker import get_breaker
 from core.config import SERPER_API_KEY
 from core.logger import setup_logger
+from core.single_flight import single_flight
+from core.tracing import TracedTransport
 
 logger = setup_logger("SEARCH_TOOL")
 _http_client: httpx.AsyncClient | None = None
-_search_cache: TTLCache = TTLCache(maxsize=300, ttl=300)
+_search_cache: TTLCache = MeteredTTLCache("ai.search", maxsize=300, ttl=300)
 
 
 def get_http_client() -> httpx.AsyncClient:
     global _http_client
     if _http_client is None:
-        _http_client = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=20))
+        _http_client = httpx.AsyncClient(
+            timeout=10.0, transport=TracedTransport(limits=httpx.Limits(max_keepalive_connections=20))
+        )
     return _http_client
 
 
+@single_flight
 async def perform_web_search(query: str, num_results: int = 2) -> str:
     api_key = SERPER_API_KEY
     if not api_key:
@@ -65,6 +71,7 @@ async def perform_web_search(query: str, num_results: int = 2) -> str:
         return cached or ""
 
 
+@single_flight
 async def perform_deep_research(topic: str) -> str:
     api_key = SERPER_API_KEY
     if not api_key:
@@ -152,6 +159,7 @@ async def close_http_client():
         await _http_client.aclose()
         _http_client = None
 
+@single_flight
 async def scrape_url(url: str) -> str:
     client = get_http_client()
     try:
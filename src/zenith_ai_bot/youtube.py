@@ -5,6 +5,7 @@ from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
 
 from core.logger import setup_logger
+from core.single_flight import single_flight
 
 logger = setup_logger("YOUTUBE_TOOL")
 
@@ -33,8 +34,13 @@ def _fetch_transcript_sync(video_id: str) -> str | None:
         return None
 
 
+@single_flight
+async def _fetch_transcript(video_id: str) -> str | None:
+    return await asyncio.to_thread(_fetch_transcript_sync, video_id)
+
+
 async def get_youtube_transcript(url: str) -> str | None:
     video_id = extract_yt_video_id(url)
     if not video_id:
         return None
-    return await asyncio.to_thread(_fetch_transcript_sync, video_id)
+    return await _fetch_transcript(video_id)
@@ -0,0 +1,170 @@
+"""
+Local index of the full CoinGecko coin list.
+
+``/coins/list?include_platform=true`` (every listed coin with its contract
+addresses) is fetched about once a day and saved to ``COIN_INDEX_PATH`` as
+gzipped columnar JSON. Workers load that file at startup instead of
+refetching it. Lookups are in-memory:
+
+- ``resolve``: exact id, symbol, name or Ethereum contract address
+- ``search``: prefix search over symbols and names
+
+Tickers are not unique, so several coins can match a symbol or prefix.
+Ties go to the larger market cap from the latest market snapshot, then to
+coins that match exactly.
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core.logger import setup_logger
+
+logger = setup_logger("COIN_INDEX")
+
+FORMAT_VERSION = 1
+_ADDRESS = re.compile(r"^0x[0-9a-f]{40}$")
+
+
+@dataclass(frozen=True, slots=True)
+class _IndexData:
+    ids: list[str] = field(default_factory=list)
+    symbols: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    contracts: dict[str, int] = field(default_factory=dict)  # lowercase Ethereum address -> row
+    fetched_at: float = 0.0
+    by_id: dict[str, int] = field(default_factory=dict)
+    by_symbol: dict[str, list[int]] = field(default_factory=dict)
+    by_name: dict[str, list[int]] = field(default_factory=dict)
+    prefix_keys: list[tuple[str, int]] = field(default_factory=list)  # sorted (lowercase symbol or name, row)
+
+
+def _entry(data: _IndexData, row: int) -> dict:
+    return {"id": data.ids[row], "symbol": data.symbols[row].upper(), "name": data.names[row]}
+
+
+class CoinIndex:
+    def __init__(self):
+        self._data = _IndexData()
+        self._market_caps: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._data.ids)
+
+    @property
+    def fetched_at(self) -> float:
+        return self._data.fetched_at
+
+    @property
+    def contracts(self) -> dict[str, int]:
+        return self._data.contracts
+
+    def load_coins(self, coins: list[dict], fetched_at: float | None = None) -> None:
+        """Rebuild from ``/coins/list?include_platform=true`` rows."""
+        ids, symbols, names, contracts = [], [], [], {}
+        for coin in coins:
+            if not coin.get("id"):
+                continue
+            address = ((coin.get("platforms") or {}).get("ethereum") or "").lower()
+            if _ADDRESS.match(address):
+                contracts[address] = len(ids)
+            ids.append(coin["id"])
+            symbols.append((coin.get("symbol") or "").lower())
+            names.append(coin.get("name") or coin["id"])
+        self._build(ids, symbols, names, contracts, fetched_at or time.time())
+
+    def _build(self, ids, symbols, names, contracts, fetched_at) -> None:
+        by_symbol: dict[str, list[int]] = {}
+        by_name: dict[str, list[int]] = {}
+        keys = []
+        for row, (symbol, name) in enumerate(zip(symbols, names, strict=True)):
+            by_symbol.setdefault(symbol, []).append(row)
+            by_name.setdefault(name.lower(), []).append(row)
+            keys.append((symbol, row))
+            if name.lower() != symbol:
+                keys.append((name.lower(), row))
+        keys.sort()
+        # Runs in a worker thread: one reference swap, so a concurrent lookup sees the old index or the new one
+        self._data = _IndexData(
+            ids, symbols, names, contracts, fetched_at, {i: r for r, i in enumerate(ids)}, by_symbol, by_name, keys
+        )
+
+    def set_market_caps(self, market_caps: dict[str, float]) -> None:
+        self._market_caps = market_caps
+
+    def resolve(self, query: str) -> str | None:
+        """The coin id ``query`` names exactly (id, contract, symbol or name), or None."""
+        data = self._data
+        key = query.strip().lower()
+        if key in data.by_id:
+            return key
+        if _ADDRESS.match(key):
+            row = data.contracts.get(key)
+            return data.ids[row] if row is not None else None
+        rows = data.by_symbol.get(key) or data.by_name.get(key)
+        if not rows:
+            return None
+        caps = self._market_caps
+        return data.ids[max(rows, key=lambda row: caps.get(data.ids[row], 0.0))]
+
+    def search(self, prefix: str, limit: int = 5) -> list[dict]:
+        """Coins whose symbol or name starts with ``prefix``, biggest market cap first."""
+        data = self._data
+        key = prefix.strip().lower()
+        if not key:
+            return []
+        rows = set()
+        start = bisect_left(data.prefix_keys, (key, -1))
+        for text, row in data.prefix_keys[start:]:
+            if not text.startswith(key):
+                break
+            rows.add(row)
+        caps = self._market_caps
+        ranked = sorted(
+            rows,
+            key=lambda row: (
+                -caps.get(data.ids[row], 0.0),
+                data.symbols[row] != key,
+                len(data.names[row]),
+            ),
+        )
+        return [_entry(data, row) for row in ranked[:limit]]
+
+    def entry(self, row: int) -> dict:
+        return _entry(self._data, row)
+
+    def save(self, path: Path) -> None:
+        data = self._data
+        payload = {
+            "version": FORMAT_VERSION,
+            "fetched_at": data.fetched_at,
+            "ids": data.ids,
+            "symbols": data.symbols,
+            "names": data.names,
+            "contracts": data.contracts,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)  # atomic, so another worker never reads a half-written file
+
+    def load(self, path: Path) -> bool:
+        """Load a file written by ``save``; False when it is missing or from another format version."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable coin index {path}: {e}")
+            return False
+        if payload.get("version") != FORMAT_VERSION:
+            return False
+        self._build(payload["ids"], payload["symbols"], payload["names"], payload["contracts"], payload["fetched_at"])
+        return True
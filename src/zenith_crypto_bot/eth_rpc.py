@@ -0,0 +1,165 @@
+"""
+Ethereum JSON-RPC client shared by the crypto bot's on-chain lookups.
+
+Calls that do not depend on each other go out as one JSON-RPC batch array,
+so e.g. gas price and latest block cost a single round-trip. Requests go to
+the fastest healthy endpoint from ``ETH_RPC_URLS`` (by a moving average of
+observed latency). An endpoint that errors is benched for
+``ENDPOINT_COOLDOWN`` seconds and the request fails over to the next one.
+The ``eth_rpc`` circuit breaker opens only when every endpoint is failing.
+``eth_blockNumber`` is cached for one block time, since it cannot change
+sooner.
+"""
+
+import itertools
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import httpx
+
+from core.circuit_breaker import get_breaker
+from core.logger import setup_logger
+from core.single_flight import SingleFlight
+
+logger = setup_logger("ETH_RPC")
+
+ENDPOINT_COOLDOWN = 30.0
+LATENCY_SMOOTHING = 0.3  # weight of the newest sample in the moving average
+
+# One JSON-RPC call: method name and its params
+RpcCall = tuple[str, list]
+
+
+def _host(url: str) -> str:
+    # Endpoint URLs often carry an API key in the path, so only the host is logged
+    return url.split("//")[-1].split("/")[0]
+
+
+class RpcError(Exception):
+    """The node answered, but with a JSON-RPC error object instead of a result."""
+
+
+class _Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: float | None = None  # seconds; None until the first answer
+        self.failures = 0
+        self.benched_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.benched_until
+
+    def record(self, elapsed: float) -> None:
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += LATENCY_SMOOTHING * (elapsed - self.latency)
+        self.failures = 0
+
+    def bench(self) -> None:
+        self.failures += 1
+        self.benched_until = time.monotonic() + ENDPOINT_COOLDOWN * min(self.failures, 4)
+
+
+class EthRpcClient:
+    def __init__(
+        self,
+        urls: Sequence[str],
+        http: Callable[[], httpx.AsyncClient],
+        block_time: float = 12.0,
+        breaker: str = "eth_rpc",
+    ):
+        self._endpoints = [_Endpoint(url) for url in urls]
+        self._http = http
+        self.block_time = block_time
+        self._breaker_name = breaker
+        self._ids = itertools.count(1)
+        self._block: tuple[int, float] | None = None  # (number, monotonic time it was seen)
+        self._block_flight = SingleFlight("eth_rpc.block_number")
+        self.requests = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._endpoints)
+
+    def _ranked(self) -> list[_Endpoint]:
+        healthy = [e for e in self._endpoints if e.healthy]
+        # Unmeasured endpoints sort first so each gets a sample; when all are benched, try them anyway
+        candidates = healthy or self._endpoints
+        return sorted(candidates, key=lambda e: -1.0 if e.latency is None else e.latency)
+
+    async def batch(self, calls: Sequence[RpcCall]) -> list[Any]:
+        """Send ``calls`` as one JSON-RPC batch and return their results in the same order."""
+        if not self._endpoints:
+            raise RuntimeError("No Ethereum RPC endpoint configured")
+        breaker = get_breaker(self._breaker_name)
+        if not breaker.can_execute():
+            raise RuntimeError("Ethereum RPC circuit open")
+
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": call_id}
+            for call_id, (method, params) in zip(ids, calls, strict=True)
+        ]
+        last_error: Exception | None = None
+        for endpoint in self._ranked():
+            started = time.monotonic()
+            try:
+                self.requests += 1
+                resp = await self._http().post(endpoint.url, json=payload)
+                resp.raise_for_status()
+                answers = resp.json()
+                if not isinstance(answers, list):  # some nodes answer a rejected batch with one error object
+                    raise RpcError(str(answers))
+            except (httpx.HTTPError, ValueError, RpcError) as e:
+                endpoint.bench()
+                last_error = e
+                logger.warning(f"RPC endpoint {_host(endpoint.url)} failed: {e}")
+                continue
+            endpoint.record(time.monotonic() - started)
+            breaker.record_success()
+            # Batch answers may come back in any order
+            by_id = {answer.get("id"): answer for answer in answers}
+            results = []
+            for call_id, (method, _) in zip(ids, calls, strict=True):
+                answer = by_id.get(call_id, {})
+                if "error" in answer or "result" not in answer:
+                    raise RpcError(f"{method}: {answer.get('error', 'no answer')}")
+                results.append(answer["result"])
+            return results
+
+        breaker.record_failure()
+        raise last_error
+
+    async def call(self, method: str, *params) -> Any:
+        (result,) = await self.batch([(method, list(params))])
+        return result
+
+    def note_block(self, number: int) -> None:
+        """Record a block number seen in another response, so ``block_number`` need not ask."""
+        if self._block is None or number >= self._block[0]:
+            self._block = (number, time.monotonic())
+
+    async def block_number(self) -> int:
+        """Latest block number, fetched at most once per block time."""
+        if self._block is not None and time.monotonic() - self._block[1] < self.block_time:
+            return self._block[0]
+        return await self._block_flight.do("latest", self._fetch_block_number)
+
+    async def _fetch_block_number(self) -> int:
+        number = int(await self.call("eth_blockNumber"), 16)
+        self.note_block(number)
+        return number
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "endpoint": _host(e.url),
+                "latency_ms": None if e.latency is None else round(e.latency * 1000, 1),
+                "healthy": e.healthy,
+                "failures": e.failures,
+            }
+            for e in self._endpoints
+        ]
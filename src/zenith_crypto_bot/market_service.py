@@ -1,23 +1,43 @@
+import asyncio
+import math
+import time
+
 import httpx
-from cachetools import TTLCache
 
+from core.cache import SWRCache
 from core.circuit_breaker import get_breaker
-from core.config import ETH_RPC_URL, ETHERSCAN_API_KEY
+from core.config import (
+    COIN_INDEX_MAX_AGE,
+    COIN_INDEX_PATH,
+    ETH_BLOCK_TIME,
+    ETH_RPC_URLS,
+    ETHERSCAN_API_KEY,
+    MARKET_SNAPSHOT_INTERVAL,
+    MARKET_SNAPSHOT_SIZE,
+)
 from core.logger import setup_logger
+from core.single_flight import single_flight
+from core.tracing import TracedTransport
+from zenith_crypto_bot.coin_index import CoinIndex
+from zenith_crypto_bot.eth_rpc import EthRpcClient
+from zenith_crypto_bot.market_snapshot import MarketSnapshot
+from zenith_crypto_bot.price_feed import PriceStore
+from zenith_crypto_bot.token_security import REPORT_FIELDS, SecurityStore
 
 logger = setup_logger("MARKET_SVC")
 _http_client: httpx.AsyncClient | None = None
 
-# Response caches — serve stale data when APIs are down
-_price_cache: TTLCache = TTLCache(maxsize=500, ttl=90)  # 90s for prices
-_movers_cache: TTLCache = TTLCache(maxsize=1, ttl=300)  # 5m for top movers
-_fng_cache: TTLCache = TTLCache(maxsize=1, ttl=600)  # 10m for fear & greed
-_gas_cache: TTLCache = TTLCache(maxsize=1, ttl=15)  # 15s for gas prices
+# Response caches: fresh for the soft TTL, then served stale while one background call refreshes them; the hard TTL
+# bounds how old the last-known-good value may get while the upstream is down
+_market_cache = SWRCache("crypto.market", soft_ttl=2 * MARKET_SNAPSHOT_INTERVAL, hard_ttl=3600, maxsize=1)
+_fng_cache = SWRCache("crypto.fear_greed", soft_ttl=600, hard_ttl=6 * 3600, maxsize=1)
+_gas_cache = SWRCache("crypto.gas", soft_ttl=15, hard_ttl=300, maxsize=1)
 
 COINGECKO_BASE = "https://api.coingecko.com/api/v3"
 GOPLUS_BASE = "https://api.gopluslabs.io/api/v1"
 ETHERSCAN_BASE = "https://api.etherscan.io/v2/api"
 FEAR_GREED_URL = "https://api.alternative.me/fng/?limit=1"
+MARKETS_PAGE_SIZE = 250  # most /coins/markets returns per page
 
 UNISWAP_V2_FACTORY = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
 PAIR_CREATED_TOPIC = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
@@ -67,7 +87,7 @@ def get_http_client() -> httpx.AsyncClient:
     if _http_client is None:
         _http_client = httpx.AsyncClient(
             timeout=15.0,
-            limits=httpx.Limits(max_keepalive_connections=20, max_connections=30),
+            transport=TracedTransport(limits=httpx.Limits(max_keepalive_connections=20, max_connections=30)),
             headers={"Accept": "application/json"},
         )
     return _http_client
@@ -80,36 +100,69 @@ async def close_market_client():
         _http_client = None
 
 
+coin_index = CoinIndex()
+
+
 def resolve_token_id(symbol_or_id: str) -> str:
+    """CoinGecko id for a symbol, name, id or contract address, resolved locally; unknown input passes through."""
     key = symbol_or_id.lower().strip()
-    return SYMBOL_TO_ID.get(key, key)
+    # SYMBOL_TO_ID pins the coin meant by tickers that several coins share
+    if key in SYMBOL_TO_ID:
+        return SYMBOL_TO_ID[key]
+    return coin_index.resolve(key) or key
 
 
-async def get_prices(token_ids: list[str]) -> dict:
-    if not token_ids:
-        return {}
+async def refresh_coin_index() -> None:
+    """Load the coin index from disk, and refetch the coin list once the file is older than COIN_INDEX_MAX_AGE."""
+    if not len(coin_index):
+        loaded = await asyncio.to_thread(coin_index.load, COIN_INDEX_PATH)
+        if loaded:
+            logger.info(f"Loaded {len(coin_index)} coins from {COIN_INDEX_PATH}")
+    if len(coin_index) and time.time() - coin_index.fetched_at < COIN_INDEX_MAX_AGE:
+        return
 
     breaker = get_breaker("coingecko")
-    cache_key = ",".join(sorted(set(token_ids)))
+    if not breaker.can_execute():
+        return
+    client = get_http_client()
+    try:
+        resp = await client.get(f"{COINGECKO_BASE}/coins/list", params={"include_platform": "true"}, timeout=60.0)
+        resp.raise_for_status()
+        coins = resp.json()
+        if not isinstance(coins, list):
+            raise ValueError(f"unexpected coin list payload: {type(coins).__name__}")
+    except Exception as e:
+        breaker.record_failure()
+        logger.error(f"CoinGecko coin list fetch failed: {e}")
+        return
+    breaker.record_success()
+    await asyncio.to_thread(coin_index.load_coins, coins)
+    try:
+        await asyncio.to_thread(coin_index.save, COIN_INDEX_PATH)
+    except OSError as e:
+        logger.warning(f"Could not save coin index to {COIN_INDEX_PATH}: {e}")
+    logger.info(f"Indexed {len(coin_index)} coins ({len(coin_index.contracts)} Ethereum contracts)")
+
 
+eth_rpc = EthRpcClient(ETH_RPC_URLS, get_http_client, block_time=ETH_BLOCK_TIME)
+
+
+async def _fetch_simple_prices(token_ids: list[str]) -> dict | None:
+    """One CoinGecko ``/simple/price`` call for up to ``PRICE_BATCH_SIZE`` ids; None when it failed."""
+    breaker = get_breaker("coingecko")
     if not breaker.can_execute():
-        cached = _price_cache.get(cache_key)
-        if cached:
-            logger.debug("Serving cached prices (circuit open)")
-            return cached
-        return {}
+        logger.debug("Skipping price fetch (circuit open)")
+        return None
 
     client = get_http_client()
-    ids_str = ",".join(set(token_ids))
     try:
         resp = await client.get(
             f"{COINGECKO_BASE}/simple/price",
-            params={"ids": ids_str, "vs_currencies": "usd", "include_24hr_change": "true"},
+            params={"ids": ",".join(token_ids), "vs_currencies": "usd", "include_24hr_change": "true"},
         )
         resp.raise_for_status()
         data = resp.json()
         breaker.record_success()
-        _price_cache[cache_key] = data
         return data
     except Exception as e:
         breaker.record_failure()
@@ -117,21 +170,24 @@ async def get_prices(token_ids: list[str]) -> dict:
             logger.debug(f"CoinGecko price fetch rate-limited (429): {e}")
         else:
             logger.error(f"CoinGecko price fetch failed: {e}")
-        cached = _price_cache.get(cache_key)
-        if cached:
-            logger.debug("Serving stale cached prices")
-            return cached
+        return None
+
+
+price_store = PriceStore(_fetch_simple_prices)
+
+
+async def get_prices(token_ids: list[str]) -> dict:
+    """``/simple/price``-shaped quotes from the shared price store, plus ``last_updated_at``."""
+    if not token_ids:
         return {}
+    quotes = await price_store.get(token_ids)
+    return {token_id: quote.as_coingecko() for token_id, quote in quotes.items()}
 
 
-async def get_top_movers() -> tuple[list, list]:
+async def _fetch_markets_page(page: int, per_page: int) -> list[dict]:
     breaker = get_breaker("coingecko")
-
     if not breaker.can_execute():
-        cached = _movers_cache.get("movers")
-        if cached:
-            return cached
-        return [], []
+        raise RuntimeError("CoinGecko circuit open")
 
     client = get_http_client()
     try:
@@ -140,33 +196,61 @@ async def get_top_movers() -> tuple[list, list]:
             params={
                 "vs_currency": "usd",
                 "order": "market_cap_desc",
-                "per_page": 100,
-                "page": 1,
+                "per_page": per_page,
+                "page": page,
                 "sparkline": "false",
                 "price_change_percentage": "24h",
             },
         )
         resp.raise_for_status()
         data = resp.json()
-        sorted_by_change = sorted(data, key=lambda x: x.get("price_change_percentage_24h") or 0)
-        losers = sorted_by_change[:5]
-        gainers = sorted_by_change[-5:][::-1]
-        breaker.record_success()
-        _movers_cache["movers"] = (gainers, losers)
-        return gainers, losers
-    except Exception as e:
+    except Exception:
         breaker.record_failure()
+        raise
+    breaker.record_success()
+    return data
+
+
+async def _load_market_snapshot() -> MarketSnapshot:
+    per_page = min(MARKET_SNAPSHOT_SIZE, MARKETS_PAGE_SIZE)
+    rows: list[dict] = []
+    for page in range(1, math.ceil(MARKET_SNAPSHOT_SIZE / per_page) + 1):
+        rows.extend(await _fetch_markets_page(page, per_page))
+    snapshot = MarketSnapshot(rows[:MARKET_SNAPSHOT_SIZE])
+    # The same pull refreshes the price store, so /market's BTC/ETH lines and alerts on these coins cost nothing
+    price_store.ingest(snapshot.price_quotes())
+    coin_index.set_market_caps(snapshot.market_caps())
+    return snapshot
+
+
+async def refresh_market_snapshot() -> None:
+    _market_cache.set("snapshot", await _load_market_snapshot())
+
+
+async def get_market_snapshot() -> MarketSnapshot | None:
+    try:
+        return await _market_cache.get("snapshot", _load_market_snapshot)
+    except Exception as e:
         if "429" in str(e):
-            logger.debug(f"CoinGecko top movers rate-limited (429): {e}")
+            logger.debug(f"CoinGecko markets rate-limited (429): {e}")
         else:
-            logger.error(f"CoinGecko top movers failed: {e}")
-        cached = _movers_cache.get("movers")
-        if cached:
-            return cached
+            logger.error(f"CoinGecko markets failed: {e}")
+        return None
+
+
+async def get_top_movers(n: int = 5) -> tuple[list, list]:
+    snapshot = await get_market_snapshot()
+    if snapshot is None:
         return [], []
+    return snapshot.gainers(n), snapshot.losers(n)
 
 
+@single_flight
 async def search_token(query: str) -> dict | None:
+    local = coin_index.search(query, limit=1)
+    if local:
+        return local[0]
+
     breaker = get_breaker("coingecko")
     if not breaker.can_execute():
         return None
@@ -186,7 +270,7 @@ async def search_token(query: str) -> dict | None:
     return None
 
 
-async def get_token_security(contract: str, chain_id: str = "1") -> dict | None:
+async def _fetch_goplus_batch(chain_id: str, contracts: list[str]) -> dict | None:
     breaker = get_breaker("goplus")
     if not breaker.can_execute():
         return None
@@ -195,19 +279,28 @@ async def get_token_security(contract: str, chain_id: str = "1") -> dict | None:
     try:
         resp = await client.get(
             f"{GOPLUS_BASE}/token_security/{chain_id}",
-            params={"contract_addresses": contract.lower()},
+            params={"contract_addresses": ",".join(contracts)},
         )
         resp.raise_for_status()
         data = resp.json()
-        result = data.get("result", {})
         breaker.record_success()
-        return result.get(contract.lower())
+        return {contract.lower(): security for contract, security in (data.get("result") or {}).items()}
     except Exception as e:
         breaker.record_failure()
         logger.error(f"GoPlus security scan failed: {e}")
         return None
 
 
+# Also warmed by the pair indexer for freshly listed tokens
+security_store = SecurityStore(_fetch_goplus_batch)
+
+
+async def get_token_security(contract: str, chain_id: str = "1", fields=REPORT_FIELDS) -> dict | None:
+    """GoPlus token security for ``contract``, from cache while ``fields`` are within their TTLs."""
+    return await security_store.get(contract, chain_id, fields)
+
+
+@single_flight
 async def get_wallet_recent_txns(wallet_address: str, last_known_hash: str = None) -> list[dict]:
     if not ETHERSCAN_API_KEY:
         return []
@@ -251,6 +344,7 @@ async def get_wallet_recent_txns(wallet_address: str, last_known_hash: str = Non
         return []
 
 
+@single_flight
 async def get_wallet_token_txns(wallet_address: str) -> list[dict]:
     if not ETHERSCAN_API_KEY:
         return []
@@ -284,122 +378,83 @@ async def get_wallet_token_txns(wallet_address: str) -> list[dict]:
         return []
 
 
-async def get_fear_greed_index() -> dict | None:
-    cached = _fng_cache.get("fng")
-    if cached:
-        return cached
-
+async def _load_fear_greed_index() -> dict:
     client = get_http_client()
+    resp = await client.get(FEAR_GREED_URL)
+    resp.raise_for_status()
+    entry = resp.json().get("data", [{}])[0]
+    return {
+        "value": int(entry.get("value", 0)),
+        "classification": entry.get("value_classification", "Unknown"),
+        "timestamp": entry.get("timestamp", ""),
+    }
+
+
+async def get_fear_greed_index() -> dict | None:
     try:
-        resp = await client.get(FEAR_GREED_URL)
-        resp.raise_for_status()
-        data = resp.json()
-        entry = data.get("data", [{}])[0]
-        result = {
-            "value": int(entry.get("value", 0)),
-            "classification": entry.get("value_classification", "Unknown"),
-            "timestamp": entry.get("timestamp", ""),
-        }
-        _fng_cache["fng"] = result
-        return result
+        return await _fng_cache.get("fng", _load_fear_greed_index)
     except Exception as e:
         logger.error(f"Fear & Greed API failed: {e}")
-        return cached
+        return None
+
+
+async def _load_gas_prices() -> dict:
+    hex_gas, block = await eth_rpc.batch([("eth_gasPrice", []), ("eth_getBlockByNumber", ["latest", False])])
+    gas_gwei = int(hex_gas or "0x0", 16) / 1e9
+    block = block or {}
+    if block.get("number"):
+        eth_rpc.note_block(int(block["number"], 16))
+    base_fee_gwei = int(block.get("baseFeePerGas", "0x0"), 16) / 1e9
+
+    return {
+        "gas_gwei": round(gas_gwei, 2),
+        "base_fee_gwei": round(base_fee_gwei, 2),
+        "priority_low": round(base_fee_gwei * 1.1, 2),
+        "priority_medium": round(base_fee_gwei * 1.25, 2),
+        "priority_high": round(base_fee_gwei * 1.5, 2),
+    }
 
 
 async def get_gas_prices() -> dict | None:
-    if not ETH_RPC_URL:
+    if not eth_rpc.configured:
         return None
-    client = get_http_client()
     try:
-        resp = await client.post(
-            ETH_RPC_URL,
-            json={"jsonrpc": "2.0", "method": "eth_gasPrice", "params": [], "id": 1},
-        )
-        resp.raise_for_status()
-        hex_gas = resp.json().get("result", "0x0")
-        gas_wei = int(hex_gas, 16)
-        gas_gwei = gas_wei / 1e9
-
-        resp2 = await client.post(
-            ETH_RPC_URL,
-            json={"jsonrpc": "2.0", "method": "eth_getBlockByNumber", "params": ["latest", False], "id": 2},
-        )
-        resp2.raise_for_status()
-        block = resp2.json().get("result", {})
-        base_fee_hex = block.get("baseFeePerGas", "0x0")
-        base_fee_gwei = int(base_fee_hex, 16) / 1e9
-
-        return {
-            "gas_gwei": round(gas_gwei, 2),
-            "base_fee_gwei": round(base_fee_gwei, 2),
-            "priority_low": round(base_fee_gwei * 1.1, 2),
-            "priority_medium": round(base_fee_gwei * 1.25, 2),
-            "priority_high": round(base_fee_gwei * 1.5, 2),
-        }
+        return await _gas_cache.get("gas", _load_gas_prices)
     except Exception as e:
         logger.error(f"Gas price fetch failed: {e}")
         return None
 
 
-async def get_new_pairs(from_block: int = None) -> tuple[list[dict], int]:
-    if not ETH_RPC_URL:
-        return [], 0
-    client = get_http_client()
-    try:
-        resp = await client.post(
-            ETH_RPC_URL,
-            json={"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1},
-        )
-        resp.raise_for_status()
-        latest_block = int(resp.json().get("result", "0x0"), 16)
-
-        if from_block is None:
-            from_block = max(0, latest_block - 50)
-        else:
-            from_block = max(0, from_block, latest_block - 1900)
-
-        resp2 = await client.post(
-            ETH_RPC_URL,
-            json={
-                "jsonrpc": "2.0",
-                "method": "eth_getLogs",
-                "params": [
-                    {
-                        "address": UNISWAP_V2_FACTORY,
-                        "topics": [PAIR_CREATED_TOPIC],
-                        "fromBlock": hex(from_block),
-                        "toBlock": hex(latest_block),
-                    }
-                ],
-                "id": 2,
-            },
-        )
-        resp2.raise_for_status()
-        logs = resp2.json().get("result", [])
-
-        pairs = []
-        for log in logs[-5:]:
-            topics = log.get("topics", [])
-            if len(topics) >= 3:
-                token0 = "0x" + topics[1][-40:]
-                token1 = "0x" + topics[2][-40:]
-                pair_address = "0x" + log.get("data", "")[26:66] if log.get("data") else "unknown"
-                pairs.append(
-                    {
-                        "token0": token0,
-                        "token1": token1,
-                        "pair": pair_address,
-                        "block": int(log.get("blockNumber", "0x0"), 16),
-                        "tx_hash": log.get("transactionHash", ""),
-                    }
-                )
-        return pairs, latest_block
-    except Exception as e:
-        logger.error(f"New pair scan failed: {e}")
-        return [], from_block or 0
-
-
+def _decode_pair_created(log: dict) -> dict | None:
+    topics = log.get("topics", [])
+    if len(topics) < 3:
+        return None
+    data = log.get("data") or ""
+    return {
+        "token0": "0x" + topics[1][-40:],
+        "token1": "0x" + topics[2][-40:],
+        "pair": "0x" + data[26:66] if data else "unknown",
+        "block": int(log.get("blockNumber", "0x0"), 16),
+        "tx_hash": log.get("transactionHash", ""),
+        "removed": bool(log.get("removed")),
+    }
+
+
+async def get_pair_created_logs(from_block: int, to_block: int) -> list[dict]:
+    """Decoded Uniswap V2 ``PairCreated`` logs in ``from_block..to_block``, oldest first; raises on RPC failure."""
+    logs = await eth_rpc.call(
+        "eth_getLogs",
+        {
+            "address": UNISWAP_V2_FACTORY,
+            "topics": [PAIR_CREATED_TOPIC],
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+        },
+    )
+    return [pair for log in logs or [] if (pair := _decode_pair_created(log))]
+
+
+@single_flight
 async def get_whale_transfers(min_value_eth: float = 50.0) -> list[dict]:
     """Fetch real large ETH transfers from Etherscan."""
     if not ETHERSCAN_API_KEY:
@@ -452,6 +507,7 @@ async def get_whale_transfers(min_value_eth: float = 50.0) -> list[dict]:
         logger.debug(f"Whale transfer fetch failed (non-critical): {e}")
         return []
 
+@single_flight
 async def get_upcoming_unlocks() -> list[dict]:
     """Scrape upcoming token unlocks using a web scraper (fallback to mock on failure)."""
     breaker = get_breaker("unlocks_scraper")
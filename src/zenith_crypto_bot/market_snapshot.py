@@ -0,0 +1,116 @@
+"""
+Columnar snapshot of the top coins by market cap.
+
+One paginated ``/coins/markets`` pull per ``MARKET_SNAPSHOT_INTERVAL`` backs
+every market view: top movers, the /market card, and (through the price
+store it also feeds) every BTC/ETH price line. The rows are kept as typed
+columns (``array('d')``). The orderings that gainers, losers and volume
+leaders slice, and the sums behind dominance and breadth, are computed
+once when the snapshot is built, never per request.
+"""
+
+import math
+import time
+from array import array
+from bisect import bisect_right
+
+
+def _num(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+class MarketSnapshot:
+    __slots__ = (
+        "ids",
+        "symbols",
+        "names",
+        "price",
+        "change_24h",
+        "market_cap",
+        "volume",
+        "total_market_cap",
+        "taken_at",
+        "_index",
+        "_by_change",
+        "_sorted_change",
+        "_by_volume",
+    )
+
+    def __init__(self, rows: list[dict], taken_at: float | None = None):
+        # Pages can overlap when ranks shift between requests: keep each coin's first row
+        unique: dict[str, dict] = {}
+        for r in rows:
+            if r.get("id"):
+                unique.setdefault(r["id"], r)
+        rows = list(unique.values())
+        self.ids = [r["id"] for r in rows]
+        self.symbols = [r.get("symbol") or "" for r in rows]
+        self.names = [r.get("name") or "Unknown" for r in rows]
+        self.price = array("d", (_num(r.get("current_price")) for r in rows))
+        self.change_24h = array("d", (_num(r.get("price_change_percentage_24h")) for r in rows))
+        self.market_cap = array("d", (_num(r.get("market_cap")) for r in rows))
+        self.volume = array("d", (_num(r.get("total_volume")) for r in rows))
+        self.total_market_cap = math.fsum(self.market_cap)
+        self.taken_at = time.time() if taken_at is None else taken_at
+        self._index = {token_id: i for i, token_id in enumerate(self.ids)}
+
+        count = len(self.ids)
+        self._by_change = array("I", sorted(range(count), key=self.change_24h.__getitem__))
+        self._sorted_change = array("d", (self.change_24h[i] for i in self._by_change))
+        self._by_volume = array("I", sorted(range(count), key=self.volume.__getitem__, reverse=True))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, i: int) -> dict:
+        """Coin ``i`` in the ``/coins/markets`` shape the UI cards read."""
+        return {
+            "id": self.ids[i],
+            "symbol": self.symbols[i],
+            "name": self.names[i],
+            "current_price": self.price[i],
+            "price_change_percentage_24h": self.change_24h[i],
+            "market_cap": self.market_cap[i],
+            "total_volume": self.volume[i],
+        }
+
+    def gainers(self, n: int = 5) -> list[dict]:
+        return [self.row(i) for i in reversed(self._by_change[-n:])] if n else []
+
+    def losers(self, n: int = 5) -> list[dict]:
+        return [self.row(i) for i in self._by_change[:n]]
+
+    def volume_leaders(self, n: int = 5) -> list[dict]:
+        return [self.row(i) for i in self._by_volume[:n]]
+
+    def dominance(self, token_id: str) -> float | None:
+        """``token_id``'s share of the snapshot's combined market cap, in percent."""
+        i = self._index.get(token_id)
+        if i is None or not self.total_market_cap:
+            return None
+        return self.market_cap[i] / self.total_market_cap * 100
+
+    def change_percentile(self, q: float) -> float:
+        """The 24h change that ``q`` percent of the coins are at or below (nearest rank)."""
+        if not self._sorted_change:
+            return 0.0
+        rank = max(0, math.ceil(q / 100 * len(self._sorted_change)) - 1)
+        return self._sorted_change[rank]
+
+    def breadth(self) -> float:
+        """Percentage of coins up over 24h."""
+        if not self._sorted_change:
+            return 0.0
+        advancing = len(self._sorted_change) - bisect_right(self._sorted_change, 0.0)
+        return advancing / len(self._sorted_change) * 100
+
+    def market_caps(self) -> dict[str, float]:
+        return dict(zip(self.ids, self.market_cap, strict=True))
+
+    def price_quotes(self) -> dict[str, dict]:
+        """Every priced coin in ``/simple/price`` shape, for ``PriceStore.ingest``."""
+        return {
+            token_id: {"usd": self.price[i], "usd_24h_change": self.change_24h[i]}
+            for i, token_id in enumerate(self.ids)
+            if self.price[i] > 0
+        }
@@ -1,6 +1,6 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy import JSON, BigInteger, Boolean, Column, DateTime, Float, Integer, String, UniqueConstraint
 
 from core.database import Base
 
@@ -99,3 +99,44 @@ class UserFeedback(CryptoBase):
     user_id = Column(BigInteger, nullable=False, index=True)
     message = Column(String(2000), nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
+
+
+class NewPair(CryptoBase):
+    """A Uniswap V2 ``PairCreated`` log, written by the pair indexer."""
+
+    __tablename__ = "crypto_new_pairs"
+    pair = Column(String(42), primary_key=True)
+    token0 = Column(String(42), nullable=False)
+    token1 = Column(String(42), nullable=False)
+    block = Column(BigInteger, nullable=False, index=True)
+    tx_hash = Column(String(66), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC), index=True)
+
+
+class IndexerCursor(CryptoBase):
+    """Last block an on-chain indexer has fully processed."""
+
+    __tablename__ = "crypto_indexer_cursors"
+    name = Column(String(50), primary_key=True)
+    block = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
+
+
+class TokenSecurity(CryptoBase):
+    """A GoPlus token security result, kept so audits are not rescanned while it is fresh."""
+
+    __tablename__ = "crypto_token_security"
+    chain_id = Column(String(10), primary_key=True)
+    contract = Column(String(42), primary_key=True)
+    data = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class PortfolioSnapshot(CryptoBase):
+    """A user's total portfolio value at one point in time, for value-history charts."""
+
+    __tablename__ = "crypto_portfolio_history"
+    user_id = Column(BigInteger, primary_key=True)
+    taken_at = Column(DateTime(timezone=True), primary_key=True, index=True)
+    value = Column(Float, nullable=False)
+    cost = Column(Float, nullable=False)
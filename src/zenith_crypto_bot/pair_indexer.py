@@ -0,0 +1,102 @@
+"""
+Incremental Uniswap V2 new-pair indexer.
+
+The leader's ``pair_indexer`` job asks for ``PairCreated`` logs from the
+persisted cursor up to the latest block, once per block time. It re-checks
+the last ``REORG_DEPTH`` blocks each time, so a pair a reorg dropped or moved
+is corrected in place. Pairs are stored in ``crypto_new_pairs`` and kept in
+an in-memory ring buffer. GoPlus security is fetched ahead of time for the
+new tokens, so an audit tap right after a listing is answered from cache.
+
+RPC usage follows chain growth: one ``eth_getLogs`` per new block, whatever
+the request volume. The New Pairs view reads the ring buffer on the leader
+and a short-lived copy of the table on other workers.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from core.cache import async_ttl_cache
+from core.config import ETH_BLOCK_TIME
+from core.logger import setup_logger
+from zenith_crypto_bot.market_service import eth_rpc, get_pair_created_logs, get_token_security
+from zenith_crypto_bot.repository import NewPairRepo
+
+logger = setup_logger("PAIR_INDEXER")
+
+CURSOR_NAME = "uniswap_v2_pairs"
+REORG_DEPTH = 6
+# Widest eth_getLogs range most providers accept; after a long outage the indexer skips ahead
+MAX_RANGE = 1900
+# Blocks covered on the very first run, about ten minutes
+INITIAL_RANGE = 50
+RING_SIZE = 50
+PREFETCH_LIMIT = 10
+
+# Pairs are listed against these, so they never need a security prefetch
+QUOTE_TOKENS = {
+    "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",  # WETH
+    "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",  # USDC
+    "0xdac17f958d2ee523a2206206994597c13d831ec7",  # USDT
+    "0x6b175474e89094c44da98b954eedeac495271d0f",  # DAI
+}
+
+
+@async_ttl_cache(ttl=15)
+async def _latest_from_db() -> list[dict]:
+    return await NewPairRepo.get_latest(RING_SIZE)
+
+
+class PairIndexer:
+    def __init__(self, reorg_depth: int = REORG_DEPTH, max_range: int = MAX_RANGE, ring_size: int = RING_SIZE):
+        self.reorg_depth = reorg_depth
+        self.max_range = max_range
+        self._recent: deque[dict] = deque(maxlen=ring_size)  # oldest first
+        self._cursor: int | None = None
+        self._indexed_at = 0.0
+
+    async def run_once(self) -> int:
+        """Index every block since the cursor; returns how many pairs were new."""
+        if not eth_rpc.configured:
+            return 0
+        latest = await eth_rpc.block_number()
+        if self._cursor is None:
+            self._cursor = await NewPairRepo.get_cursor(CURSOR_NAME)
+            self._recent.extend(reversed(await NewPairRepo.get_latest(self._recent.maxlen)))
+        start = latest - INITIAL_RANGE if self._cursor is None else self._cursor - self.reorg_depth + 1
+        floor = latest - self.max_range + 1
+        if floor > start:
+            logger.warning(f"Pair indexer skipped blocks {start}-{floor - 1} (more than {self.max_range} behind)")
+        from_block = max(0, start, floor)
+        if from_block > latest:  # failed over to an endpoint that is a few blocks behind
+            return 0
+
+        pairs = [p for p in await get_pair_created_logs(from_block, latest) if not p["removed"]]
+        await NewPairRepo.save_range(CURSOR_NAME, from_block, latest, pairs)
+
+        known = {p["pair"] for p in self._recent}
+        kept = [p for p in self._recent if p["block"] < from_block]
+        self._recent.clear()
+        self._recent.extend(kept + pairs)
+        self._cursor = latest
+        self._indexed_at = time.monotonic()
+
+        new_pairs = [p for p in pairs if p["pair"] not in known]
+        await self._prefetch_security(new_pairs)
+        return len(new_pairs)
+
+    async def _prefetch_security(self, pairs: list[dict]) -> None:
+        tokens = {t for p in pairs for t in (p["token0"].lower(), p["token1"].lower()) if t not in QUOTE_TOKENS}
+        # Gathered so the lookups share one GoPlus batch
+        await asyncio.gather(*(get_token_security(token) for token in sorted(tokens)[:PREFETCH_LIMIT]))
+
+    async def latest(self, limit: int = 5) -> list[dict]:
+        """The ``limit`` most recently created pairs, newest first."""
+        # Memory is authoritative only where the indexer is running, i.e. on the leader
+        if time.monotonic() - self._indexed_at < 5 * ETH_BLOCK_TIME:
+            return list(self._recent)[::-1][:limit]
+        return (await _latest_from_db())[:limit]
+
+
+pair_indexer = PairIndexer()
@@ -0,0 +1,126 @@
+"""
+Portfolio valuation from cached positions and the shared price store.
+
+A user's positions come from ``WatchlistRepo.get_positions``, which caches
+them in the state backend until the user adds or removes a token. Valuing
+a portfolio reads every quote from the price store at once. Value, cost,
+P&L, weights and the 24h change are then computed for all positions in one
+pass over typed columns (``array('d')``), with totals summed by ``fsum``.
+The /portfolio card, the Flex card and the AI context all read the same
+``PortfolioValuation`` and no longer each reload and recompute it.
+
+``snapshot_portfolios`` values every portfolio against one shared read of
+the price store. Each total is stored in ``crypto_portfolio_history``, one
+row per user per run, to back value-history charts.
+"""
+
+import math
+import operator
+from array import array
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from core.logger import setup_logger
+from zenith_crypto_bot.market_service import price_store
+from zenith_crypto_bot.price_feed import PriceQuote
+from zenith_crypto_bot.repository import PortfolioHistoryRepo, Position, WatchlistRepo
+
+logger = setup_logger("PORTFOLIO")
+
+AI_CONTEXT_POSITIONS = 10
+
+
+class PortfolioValuation:
+    __slots__ = (
+        "positions",
+        "price",
+        "change_24h",
+        "value",
+        "cost",
+        "pnl_usd",
+        "pnl_pct",
+        "weight",
+        "total_value",
+        "total_cost",
+        "total_pnl",
+        "total_pnl_pct",
+        "change_24h_pct",
+        "unpriced",
+        "_index",
+    )
+
+    def __init__(self, positions: Sequence[Position], quotes: dict[str, PriceQuote]):
+        self.positions = list(positions)
+        # An unpriced token values at 0, as the card has always shown it
+        self.price = array("d", ((q.usd if (q := quotes.get(p.token_id)) else 0.0) for p in self.positions))
+        self.change_24h = array(
+            "d", (((q.change_24h or 0.0) if (q := quotes.get(p.token_id)) else 0.0) for p in self.positions)
+        )
+        quantity = array("d", (p.quantity for p in self.positions))
+        entry = array("d", (p.entry_price for p in self.positions))
+
+        self.value = array("d", map(operator.mul, self.price, quantity))
+        self.cost = array("d", map(operator.mul, entry, quantity))
+        self.pnl_usd = array("d", map(operator.sub, self.value, self.cost))
+        self.pnl_pct = array("d", ((p - e) / e * 100 if e > 0 else 0.0 for p, e in zip(self.price, entry, strict=True)))
+        self.total_value = math.fsum(self.value)
+        self.total_cost = math.fsum(self.cost)
+        self.total_pnl = self.total_value - self.total_cost
+        self.total_pnl_pct = self.total_pnl / self.total_cost * 100 if self.total_cost > 0 else 0.0
+        self.weight = array("d", (v / self.total_value * 100 if self.total_value else 0.0 for v in self.value))
+        # What the same holdings were worth 24h ago, from each price and its 24h change
+        previous = math.fsum(
+            v / (1 + c / 100) if c > -100 else v for v, c in zip(self.value, self.change_24h, strict=True)
+        )
+        self.change_24h_pct = (self.total_value - previous) / previous * 100 if previous else 0.0
+        self.unpriced = sum(1 for p in self.price if p <= 0)
+        self._index = {p.token_id: i for i, p in enumerate(self.positions)}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def index(self, token_id: str) -> int | None:
+        return self._index.get(token_id)
+
+    def ai_context(self) -> str:
+        """The portfolio lines of the AI system prompt."""
+        if not self.positions:
+            return "Portfolio: Empty"
+        items = [
+            f"{p.token_symbol} x{p.quantity} @ ${p.entry_price:,.2f} "
+            f"(now ${self.price[i]:,.2f}, {self.pnl_pct[i]:+.1f}%, {self.weight[i]:.0f}% of value)"
+            for i, p in enumerate(self.positions[:AI_CONTEXT_POSITIONS])
+        ]
+        return (
+            "Portfolio: "
+            + "; ".join(items)
+            + f"\nPortfolio Value: ${self.total_value:,.2f} "
+            + f"(P/L ${self.total_pnl:+,.2f} / {self.total_pnl_pct:+.1f}%, 24h {self.change_24h_pct:+.1f}%)"
+        )
+
+
+async def get_portfolio(user_id: int) -> PortfolioValuation:
+    positions = await WatchlistRepo.get_positions(user_id)
+    quotes = await price_store.get(p.token_id for p in positions) if positions else {}
+    return PortfolioValuation(positions, quotes)
+
+
+async def snapshot_portfolios() -> int:
+    """Record every fully priced portfolio's value; returns how many were stored."""
+    by_user = await WatchlistRepo.get_all_positions()
+    if not by_user:
+        return 0
+    quotes = await price_store.get({p.token_id for positions in by_user.values() for p in positions})
+    taken_at = datetime.now(UTC)
+    rows = []
+    for user_id, positions in by_user.items():
+        valuation = PortfolioValuation(positions, quotes)
+        # A missing quote would chart as a crash; skip the point instead
+        if valuation.unpriced:
+            continue
+        rows.append(
+            {"user_id": user_id, "taken_at": taken_at, "value": valuation.total_value, "cost": valuation.total_cost}
+        )
+    await PortfolioHistoryRepo.add_snapshots(rows)
+    logger.debug(f"Stored {len(rows)}/{len(by_user)} portfolio snapshots")
+    return len(rows)
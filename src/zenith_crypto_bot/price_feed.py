@@ -0,0 +1,145 @@
+"""
+Shared per-token price store fed by batched CoinGecko polls.
+
+Quotes are stored per token, so any two readers that need BTC share one
+entry, whatever else they asked for. The crypto bot's ``price_feed`` job
+refreshes the union of alerted and portfolio tokens, plus everything read
+in the last ``DEMAND_TTL`` seconds. It fetches that union in batches of up
+to ``PRICE_BATCH_SIZE`` ids every ``PRICE_FEED_INTERVAL`` seconds, so
+popular tokens are always served from memory. A read that misses (new
+token, or a quote older than ``PRICE_MAX_AGE``) joins a short coalescing
+window. Every miss in that window goes out as one batch request.
+"""
+
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+from cachetools import TTLCache
+
+from core.cache import register_cache
+from core.config import PRICE_BATCH_SIZE, PRICE_MAX_AGE
+from core.logger import setup_logger
+from core.single_flight import BatchCoalescer
+
+logger = setup_logger("PRICE_FEED")
+
+DEMAND_TTL = 900
+
+# ids -> CoinGecko /simple/price payload, or None when the request failed
+FetchBatch = Callable[[list[str]], Awaitable[dict | None]]
+
+
+@dataclass(slots=True)
+class PriceQuote:
+    usd: float
+    change_24h: float | None
+    updated_at: float  # time.time() of the fetch that produced it
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.updated_at
+
+    def as_coingecko(self) -> dict:
+        """The shape ``/simple/price`` returns per id, which the UI formatters already read."""
+        return {"usd": self.usd, "usd_24h_change": self.change_24h, "last_updated_at": int(self.updated_at)}
+
+
+class PriceStore:
+    def __init__(
+        self,
+        fetch_batch: FetchBatch,
+        batch_size: int = PRICE_BATCH_SIZE,
+        max_age: float = PRICE_MAX_AGE,
+        name: str = "crypto.price",
+    ):
+        self._fetch_batch = fetch_batch
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self._quotes: dict[str, PriceQuote] = {}
+        # Tokens read recently join the background refresh until they go unread for DEMAND_TTL
+        self._demand: TTLCache = TTLCache(maxsize=5000, ttl=DEMAND_TTL)
+        # Ids CoinGecko did not return, so a typo is not refetched on every read
+        self._unknown: TTLCache = TTLCache(maxsize=5000, ttl=max_age)
+        self._batches = BatchCoalescer(self._fetch)
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        register_cache(name, self)
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def peek(self, token_id: str) -> PriceQuote | None:
+        return self._quotes.get(token_id)
+
+    def watched(self) -> set[str]:
+        return set(self._demand)
+
+    async def get(self, token_ids: Iterable[str], max_age: float | None = None) -> dict[str, PriceQuote]:
+        """Quotes for ``token_ids``; fetches missing or older-than-``max_age`` ones in the next batch."""
+        max_age = self.max_age if max_age is None else max_age
+        wanted = set(token_ids)
+        missing = []
+        for token_id in wanted:
+            self._demand[token_id] = True
+            quote = self._quotes.get(token_id)
+            if (quote is None or quote.age > max_age) and token_id not in self._unknown:
+                missing.append(token_id)
+        self.hits += len(wanted) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            await self._batches.request(missing)
+        # A failed fetch leaves the previous quote in place: stale beats nothing while CoinGecko is down
+        return {token_id: quote for token_id in wanted if (quote := self._quotes.get(token_id))}
+
+    async def refresh(self, token_ids: Iterable[str] = (), min_age: float = 0) -> int:
+        """
+        Fetch ``token_ids`` plus every recently read token, except quotes younger than ``min_age``;
+        returns how many quotes were updated.
+        """
+        wanted = set(token_ids) | set(self._demand)
+        for token_id in [t for t, quote in self._quotes.items() if t not in wanted and quote.age > DEMAND_TTL]:
+            del self._quotes[token_id]
+        if min_age:
+            wanted = {t for t in wanted if (quote := self._quotes.get(t)) is None or quote.age >= min_age}
+        updated = await self._fetch(wanted)
+        logger.debug(f"Refreshed {updated}/{len(wanted)} prices")
+        return updated
+
+    async def _fetch(self, token_ids: set[str]) -> int:
+        ids = sorted(token_ids)
+        updated = 0
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start : start + self.batch_size]
+            self.requests += 1
+            data = await self._fetch_batch(chunk)
+            if data is None:
+                continue
+            for token_id in chunk:
+                entry = data.get(token_id)
+                if not entry or entry.get("usd") is None:
+                    self._unknown[token_id] = True
+            updated += self.ingest(data)
+        return updated
+
+    def ingest(self, data: dict) -> int:
+        """Store quotes in ``/simple/price`` shape fetched elsewhere, e.g. by the market snapshot."""
+        now = time.time()
+        updated = 0
+        for token_id, entry in data.items():
+            if entry and entry.get("usd") is not None:
+                self._quotes[token_id] = PriceQuote(entry["usd"], entry.get("usd_24h_change"), now)
+                updated += 1
+        return updated
+
+    def stats(self) -> dict:
+        stale = sum(1 for quote in self._quotes.values() if quote.age > self.max_age)
+        return {
+            "tokens": len(self._quotes),
+            "watched": len(self._demand),
+            "stale": stale,
+            "hits": self.hits,
+            "misses": self.misses,
+            "requests": self.requests,
+        }
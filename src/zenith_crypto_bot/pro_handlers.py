@@ -7,6 +7,7 @@ from telegram.ext import ContextTypes
 
 from core.animation import send_loading_message, send_typing_action
 from core.logger import setup_logger
+from core.permissions import resolve_tier
 from core.validators import (
     validate_ethereum_address,
     validate_price,
@@ -16,21 +17,25 @@ from zenith_crypto_bot import ui as crypto_ui
 from zenith_crypto_bot.market_service import (
     get_fear_greed_index,
     get_gas_prices,
-    get_new_pairs,
+    get_market_snapshot,
     get_prices,
     get_token_security,
     get_top_movers,
     get_upcoming_unlocks,
     resolve_token_id,
     search_token,
+    security_store,
 )
+from zenith_crypto_bot.pair_indexer import pair_indexer
+from zenith_crypto_bot.portfolio import get_portfolio
 from zenith_crypto_bot.repository import PriceAlertRepo, CryptoSubscriptionRepo, WalletTrackerRepo, WatchlistRepo
+from zenith_crypto_bot.token_security import REPORT_FIELDS, RISK_FIELDS, SAVED_AUDIT_MAX_AGE
 
 logger = setup_logger("PRO_HANDLERS")
 
 async def cmd_unlocks(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
     
     msg = await send_loading_message(update, context, "Scanning blockchain for upcoming token unlocks...")
     
@@ -41,7 +46,7 @@ async def cmd_unlocks(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
 
     if not context.args or len(context.args) < 3:
         return await update.message.reply_text(crypto_ui.get_alert_help(), parse_mode="HTML")
@@ -83,7 +88,7 @@ async def cmd_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await send_typing_action(update, context)
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
     alerts = await PriceAlertRepo.get_user_alerts(user_id)
     if not alerts:
         return await update.message.reply_text(crypto_ui.get_alerts_empty(), parse_mode="HTML")
@@ -107,7 +112,7 @@ async def cmd_delalert(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_track(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
     if not is_pro:
         msg, kb = crypto_ui.get_pro_feature_msg("Wallet Tracker")
         return await update.message.reply_text(msg, reply_markup=kb, parse_mode="HTML")
@@ -147,7 +152,7 @@ async def cmd_track(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await send_typing_action(update, context)
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
     wallets = await WalletTrackerRepo.get_user_wallets(user_id)
     if not wallets:
         return await update.message.reply_text(crypto_ui.get_wallets_empty(), parse_mode="HTML")
@@ -177,7 +182,7 @@ async def cmd_untrack(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_addtoken(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    is_pro = await CryptoSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id)).is_pro
 
     if not context.args or len(context.args) < 2:
         return await update.message.reply_text(crypto_ui.get_addtoken_help(), parse_mode="HTML")
@@ -215,16 +220,16 @@ async def cmd_addtoken(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cmd_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    tokens = await WatchlistRepo.get_watchlist(user_id)
-    if not tokens:
+    if not await WatchlistRepo.get_positions(user_id):
         return await update.message.reply_text(crypto_ui.get_portfolio_empty(), parse_mode="HTML")
 
     msg = await send_loading_message(update, context, crypto_ui.get_portfolio_loading())
-    token_ids = [t.token_id for t in tokens]
-    prices = await get_prices(token_ids)
-    text = crypto_ui.get_portfolio_card(tokens, prices)
+    portfolio = await get_portfolio(user_id)
+    text = crypto_ui.get_portfolio_card(portfolio)
     try:
-        await msg.edit_text(text, reply_markup=crypto_ui.get_portfolio_keyboard(tokens), parse_mode="HTML")
+        await msg.edit_text(
+            text, reply_markup=crypto_ui.get_portfolio_keyboard(portfolio.positions), parse_mode="HTML"
+        )
     except Exception:
         await msg.edit_text(text, parse_mode="HTML")
 
@@ -237,25 +242,38 @@ async def cmd_removetoken(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(crypto_ui.get_removetoken_result(removed))
 
 
-async def cmd_market(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    msg = await send_loading_message(update, context, crypto_ui.get_market_loading())
-    fng, (gainers, losers), btc_data = await asyncio.gather(
-        get_fear_greed_index(), get_top_movers(), get_prices(["bitcoin", "ethereum"])
+async def build_market_card(is_pro: bool) -> str:
+    fng, snapshot, majors = await asyncio.gather(
+        get_fear_greed_index(), get_market_snapshot(), get_prices(["bitcoin", "ethereum"])
     )
-    is_pro = await CryptoSubscriptionRepo.is_pro(update.effective_user.id)
-
     fng_val = fng["value"] if fng else 0
     fng_class = fng["classification"] if fng else "N/A"
     gauge_bar = crypto_ui.build_gauge(fng_val)
 
-    btc_price = btc_data.get("bitcoin", {}).get("usd", 0)
-    btc_change = btc_data.get("bitcoin", {}).get("usd_24h_change", 0)
-    eth_price = btc_data.get("ethereum", {}).get("usd", 0)
-    eth_change = btc_data.get("ethereum", {}).get("usd_24h_change", 0)
-
-    text = crypto_ui.get_market_card(
-        fng_val, fng_class, gauge_bar, btc_price, btc_change, eth_price, eth_change, gainers, losers, is_pro
+    btc_price = majors.get("bitcoin", {}).get("usd", 0)
+    btc_change = majors.get("bitcoin", {}).get("usd_24h_change", 0)
+    eth_price = majors.get("ethereum", {}).get("usd", 0)
+    eth_change = majors.get("ethereum", {}).get("usd_24h_change", 0)
+
+    gainers, losers, stats = [], [], None
+    if snapshot is not None and len(snapshot):
+        gainers, losers = snapshot.gainers(5), snapshot.losers(5)
+        stats = {
+            "coins": len(snapshot),
+            "btc_dominance": snapshot.dominance("bitcoin"),
+            "breadth": snapshot.breadth(),
+            "median_change": snapshot.change_percentile(50),
+            "volume_leaders": snapshot.volume_leaders(3),
+        }
+    return crypto_ui.get_market_card(
+        fng_val, fng_class, gauge_bar, btc_price, btc_change, eth_price, eth_change, gainers, losers, is_pro, stats
     )
+
+
+async def cmd_market(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = await send_loading_message(update, context, crypto_ui.get_market_loading())
+    is_pro = (await resolve_tier(update.effective_user.id)).is_pro
+    text = await build_market_card(is_pro)
     with contextlib.suppress(Exception):
         await msg.edit_text(text, reply_markup=crypto_ui.get_back_button(), parse_mode="HTML")
 
@@ -288,14 +306,21 @@ async def cmd_gas(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await msg_obj.edit_text(crypto_ui.get_gas_card(gas), reply_markup=crypto_ui.get_back_button(), parse_mode="HTML")
 
 
-async def perform_real_audit(user_id: int, contract: str, msg, is_pro: bool):
+async def perform_real_audit(user_id: int, contract: str, msg, is_pro: bool, saved: bool = False):
     try:
-        stages = crypto_ui.get_audit_scanning_stages(contract)
-        for stage in stages:
-            await msg.edit_text(f"<i>{stage}...</i>", parse_mode="HTML")
-            await asyncio.sleep(0.4)
-
-        security = await get_token_security(contract)
+        fields = REPORT_FIELDS if is_pro else RISK_FIELDS
+        # A saved audit renders from the stored scan at once; a stale one is refreshed for next time
+        record = await security_store.cached(contract) if saved else None
+        if record is not None and record.age < SAVED_AUDIT_MAX_AGE:
+            security = record.data
+            if not record.fresh_for(fields):
+                security_store.refresh_soon(contract)
+        else:
+            stages = crypto_ui.get_audit_scanning_stages(contract)
+            for stage in stages:
+                await msg.edit_text(f"<i>{stage}...</i>", parse_mode="HTML")
+                await asyncio.sleep(0.4)
+            security = await get_token_security(contract, fields=fields)
         await CryptoSubscriptionRepo.save_audit(user_id, contract)
 
         if not security:
@@ -384,7 +409,7 @@ async def perform_real_audit(user_id: int, contract: str, msg, is_pro: bool):
 
 
 async def show_new_pairs(msg, is_pro: bool):
-    pairs, _ = await get_new_pairs()
+    pairs = await pair_indexer.latest()
     if not pairs:
         await msg.edit_text(
             crypto_ui.get_new_pairs_empty(),
@@ -1,19 +1,29 @@
 import uuid
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from core.database import AsyncSessionLocal, db_retry
+from core.analytics import bump_key_counter
+from core.database import AsyncSessionLocal, after_commit, db_retry
 from core.logger import setup_logger
-from core.permissions import invalidate_tier_cache
+from core.lookups import fetch_scalar
+from core.permissions import PRODUCT_CRYPTO, invalidate_tier_cache
+from core.state_backend import get_state_backend, register_state_type
 from zenith_crypto_bot.models import (
     ActivationKey,
     CryptoUser,
+    IndexerCursor,
+    NewPair,
+    PortfolioSnapshot,
     PriceAlert,
     ReferralCode,
     ReferralRedemption,
     SavedAudit,
     Subscription,
+    TokenSecurity,
     TrackedWallet,
     UserFeedback,
     WatchlistToken,
@@ -21,6 +31,32 @@ from zenith_crypto_bot.models import (
 
 logger = setup_logger("CRYPTO_DB")
 
+_subscriptions = Subscription.__table__
+
+_POSITIONS_CACHE_TTL = 3600
+
+
+def _positions_key(user_id: int) -> str:
+    return f"crypto_positions:{user_id}"
+
+
+async def _invalidate_positions(user_id: int) -> None:
+    """Drop the cached positions now, and again once the write has committed."""
+    key = _positions_key(user_id)
+    await get_state_backend().delete(key)
+    await after_commit(lambda: get_state_backend().delete(key))
+
+
+@register_state_type
+@dataclass(slots=True, frozen=True)
+class Position:
+    """Read-only snapshot of a ``WatchlistToken`` row, as returned by ``get_positions``."""
+
+    token_id: str
+    token_symbol: str
+    entry_price: float
+    quantity: float
+
 
 class CryptoSubscriptionRepo:
     @staticmethod
@@ -64,6 +100,7 @@ class CryptoSubscriptionRepo:
         async with AsyncSessionLocal() as session:
             expires_at = datetime.now(UTC) + timedelta(days=validity_days)
             session.add(ActivationKey(key_string=new_key, duration_days=days, expires_at=expires_at))
+            await bump_key_counter(session, PRODUCT_CRYPTO, "keys_generated")
             await session.commit()
         return new_key
 
@@ -84,6 +121,7 @@ class CryptoSubscriptionRepo:
             key.is_used = True
             key.used_by = user_id
             key.used_at = datetime.now(UTC)
+            await bump_key_counter(session, PRODUCT_CRYPTO, "keys_redeemed")
 
             res = await session.execute(select(Subscription).where(Subscription.user_id == user_id).with_for_update())
             sub = res.scalar_one_or_none()
@@ -97,7 +135,7 @@ class CryptoSubscriptionRepo:
                     sub.expires_at = new_expiry
                 else:
                     session.add(Subscription(user_id=user_id, expires_at=new_expiry))
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True, (
                 f"💎 <b>ZENITH PRO ACTIVATED</b>\n\n"
                 f"✅ Successfully applied <b>{key.duration_days} days</b> to your account.\n"
@@ -107,14 +145,14 @@ class CryptoSubscriptionRepo:
     @staticmethod
     @db_retry
     async def get_days_left(user_id: int) -> int:
-        async with AsyncSessionLocal() as session:
-            res = await session.execute(select(Subscription).where(Subscription.user_id == user_id))
-            sub = res.scalar_one_or_none()
-            now = datetime.now(UTC)
-            if not sub or sub.expires_at <= now:
-                return 0
-            remaining = sub.expires_at - now
-            return remaining.days + (1 if remaining.seconds > 0 else 0)
+        expires_at = await fetch_scalar(
+            lambda_stmt(lambda: select(_subscriptions.c.expires_at).where(_subscriptions.c.user_id == user_id))
+        )
+        now = datetime.now(UTC)
+        if not expires_at or expires_at <= now:
+            return 0
+        remaining = expires_at - now
+        return remaining.days + (1 if remaining.seconds > 0 else 0)
 
     @staticmethod
     @db_retry
@@ -140,7 +178,7 @@ class CryptoSubscriptionRepo:
             else:
                 session.add(Subscription(user_id=user_id, expires_at=now + add_on))
             new_expiry = sub.expires_at if sub else now + add_on
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True, (
                 f"✅ <b>Subscription Extended</b>\n\n"
                 f"<b>User:</b> <code>{user_id}</code>\n"
@@ -159,7 +197,7 @@ class CryptoSubscriptionRepo:
 
             past_date = datetime(2000, 1, 1, tzinfo=UTC)
             sub.expires_at = past_date
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True, (
                 f"✅ <b>Subscription Revoked</b>\n\n"
                 f"<b>User:</b> <code>{user_id}</code>\n"
@@ -237,42 +275,37 @@ class CryptoSubscriptionRepo:
 
     @staticmethod
     @db_retry
-    async def get_user_ai_context(user_id: int) -> str:
+    async def get_user_ai_context(user_id: int, portfolio: str) -> str:
+        """Account summary for the AI system prompt; ``portfolio`` is the valuation's own summary line."""
         async with AsyncSessionLocal() as session:
-            parts = []
-
-            sub_res = await session.execute(select(Subscription).where(Subscription.user_id == user_id))
-            sub = sub_res.scalar_one_or_none()
-            now = datetime.now(UTC)
-            if sub and sub.expires_at > now:
-                days = (sub.expires_at - now).days + 1
-                parts.append(f"Subscription: Pro ({days} days left)")
-            else:
-                parts.append("Subscription: Free tier")
-
-            watch_res = await session.execute(select(WatchlistToken).where(WatchlistToken.user_id == user_id))
-            tokens = watch_res.scalars().all()
-            if tokens:
-                items = []
-                for t in tokens[:10]:
-                    items.append(f"{t.token_symbol} x{t.quantity} @ ${t.entry_price:,.2f}")
-                parts.append("Portfolio: " + "; ".join(items))
-            else:
-                parts.append("Portfolio: Empty")
-
-            alert_count = await session.execute(
-                select(PriceAlert).where(PriceAlert.user_id == user_id, PriceAlert.is_triggered == False)
+            stmt = select(
+                select(Subscription.expires_at).where(Subscription.user_id == user_id).scalar_subquery(),
+                select(func.count())
+                .select_from(PriceAlert)
+                .where(PriceAlert.user_id == user_id, PriceAlert.is_triggered.is_(False))
+                .scalar_subquery(),
+                select(func.count())
+                .select_from(TrackedWallet)
+                .where(TrackedWallet.user_id == user_id)
+                .scalar_subquery(),
+                select(func.count()).select_from(SavedAudit).where(SavedAudit.user_id == user_id).scalar_subquery(),
             )
-            alert_total = len(alert_count.scalars().all())
-            parts.append(f"Active Alerts: {alert_total}")
-
-            wallet_total = await session.execute(select(TrackedWallet).where(TrackedWallet.user_id == user_id))
-            parts.append(f"Tracked Wallets: {len(wallet_total.scalars().all())}")
-
-            audit_total = await session.execute(select(SavedAudit).where(SavedAudit.user_id == user_id))
-            parts.append(f"Saved Audits: {len(audit_total.scalars().all())}")
-
-            return "\n".join(parts)
+            expires_at, alerts, wallets, audits = (await session.execute(stmt)).one()
+
+        parts = []
+        now = datetime.now(UTC)
+        if expires_at is not None and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        if expires_at and expires_at > now:
+            days = (expires_at - now).days + 1
+            parts.append(f"Subscription: Pro ({days} days left)")
+        else:
+            parts.append("Subscription: Free tier")
+        parts.append(portfolio)
+        parts.append(f"Active Alerts: {alerts}")
+        parts.append(f"Tracked Wallets: {wallets}")
+        parts.append(f"Saved Audits: {audits}")
+        return "\n".join(parts)
 
 
 class PriceAlertRepo:
@@ -312,6 +345,13 @@ class PriceAlertRepo:
             stmt = select(PriceAlert).where(PriceAlert.is_triggered == False)
             return (await session.execute(stmt)).scalars().all()
 
+    @staticmethod
+    @db_retry
+    async def get_active_token_ids() -> list[str]:
+        async with AsyncSessionLocal() as session:
+            stmt = select(PriceAlert.token_id).where(PriceAlert.is_triggered == False).distinct()
+            return list((await session.execute(stmt)).scalars().all())
+
     @staticmethod
     @db_retry
     async def trigger_alert(alert_id: int):
@@ -411,6 +451,10 @@ class WalletTrackerRepo:
             return result.scalar() or 0
 
 
+def _position(token: WatchlistToken) -> Position:
+    return Position(token.token_id, token.token_symbol, token.entry_price, token.quantity)
+
+
 class WatchlistRepo:
     @staticmethod
     @db_retry
@@ -436,7 +480,8 @@ class WatchlistRepo:
                     )
                 )
             await session.commit()
-            return True
+        await _invalidate_positions(user_id)
+        return True
 
     @staticmethod
     @db_retry
@@ -449,6 +494,34 @@ class WatchlistRepo:
             )
             return (await session.execute(stmt)).scalars().all()
 
+    @staticmethod
+    @db_retry
+    async def get_positions(user_id: int) -> tuple[Position, ...]:
+        """The user's positions, newest first, cached until ``add_token`` or ``remove_token`` changes them."""
+        cached = await get_state_backend().get(_positions_key(user_id))
+        if cached is not None:
+            return cached
+        positions = tuple(_position(t) for t in await WatchlistRepo.get_watchlist(user_id))
+        await get_state_backend().set(_positions_key(user_id), positions, ttl=_POSITIONS_CACHE_TTL)
+        return positions
+
+    @staticmethod
+    @db_retry
+    async def get_all_positions() -> dict[int, list[Position]]:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(select(WatchlistToken))).scalars().all()
+        by_user: dict[int, list[Position]] = {}
+        for t in rows:
+            by_user.setdefault(t.user_id, []).append(_position(t))
+        return by_user
+
+    @staticmethod
+    @db_retry
+    async def get_all_token_ids() -> list[str]:
+        async with AsyncSessionLocal() as session:
+            stmt = select(WatchlistToken.token_id).distinct()
+            return list((await session.execute(stmt)).scalars().all())
+
     @staticmethod
     @db_retry
     async def remove_token(user_id: int, token_id: str) -> bool:
@@ -456,7 +529,8 @@ class WatchlistRepo:
             stmt = delete(WatchlistToken).where(WatchlistToken.user_id == user_id, WatchlistToken.token_id == token_id)
             result = await session.execute(stmt)
             await session.commit()
-            return result.rowcount > 0
+        await _invalidate_positions(user_id)
+        return result.rowcount > 0
 
     @staticmethod
     @db_retry
@@ -528,7 +602,7 @@ class WatchlistRepo:
                     sub.expires_at += add_on
                 else:
                     session.add(Subscription(user_id=uid, expires_at=now + add_on))
-                invalidate_tier_cache(uid)
+                await invalidate_tier_cache(uid, session)
 
             return True, (
                 f"🎉 <b>Referral Redeemed!</b>\n\n"
@@ -541,3 +615,114 @@ class WatchlistRepo:
         async with AsyncSessionLocal() as session:
             session.add(UserFeedback(user_id=user_id, message=message[:2000]))
             await session.commit()
+
+
+class NewPairRepo:
+    @staticmethod
+    @db_retry
+    async def get_cursor(name: str) -> int | None:
+        async with AsyncSessionLocal() as session:
+            return await session.scalar(select(IndexerCursor.block).where(IndexerCursor.name == name))
+
+    @staticmethod
+    @db_retry
+    async def save_range(name: str, from_block: int, to_block: int, pairs: list[dict]) -> None:
+        """
+        Replace the indexed pairs of blocks ``from_block..to_block`` with ``pairs`` and move the
+        cursor to ``to_block``, in one transaction. Pairs a reorg dropped from the range go away.
+        """
+        async with AsyncSessionLocal() as session:
+            insert = sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+            await session.execute(
+                delete(NewPair).where(
+                    NewPair.block.between(from_block, to_block), NewPair.pair.not_in([p["pair"] for p in pairs])
+                )
+            )
+            if pairs:
+                stmt = insert(NewPair).values(
+                    [{k: p[k] for k in ("pair", "token0", "token1", "block", "tx_hash")} for p in pairs]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["pair"], set_={"block": stmt.excluded.block, "tx_hash": stmt.excluded.tx_hash}
+                )
+                await session.execute(stmt)
+            cursor = insert(IndexerCursor).values(name=name, block=to_block, updated_at=datetime.now(UTC))
+            cursor = cursor.on_conflict_do_update(
+                index_elements=["name"], set_={"block": cursor.excluded.block, "updated_at": cursor.excluded.updated_at}
+            )
+            await session.execute(cursor)
+            await session.commit()
+
+    @staticmethod
+    @db_retry
+    async def get_latest(limit: int = 20) -> list[dict]:
+        async with AsyncSessionLocal() as session:
+            stmt = select(NewPair).order_by(NewPair.block.desc()).limit(limit)
+            rows = (await session.execute(stmt)).scalars().all()
+            return [
+                {"pair": r.pair, "token0": r.token0, "token1": r.token1, "block": r.block, "tx_hash": r.tx_hash}
+                for r in rows
+            ]
+
+
+class TokenSecurityRepo:
+    @staticmethod
+    @db_retry
+    async def get_many(chain_id: str, contracts: list[str]) -> dict[str, tuple[dict, datetime]]:
+        """Stored GoPlus results by lowercase contract, with the time each was fetched."""
+        async with AsyncSessionLocal() as session:
+            stmt = select(TokenSecurity).where(
+                TokenSecurity.chain_id == chain_id, TokenSecurity.contract.in_(contracts)
+            )
+            rows = (await session.execute(stmt)).scalars().all()
+            # SQLite hands timestamps back naive; they were written as UTC
+            return {
+                r.contract: (r.data, r.fetched_at if r.fetched_at.tzinfo else r.fetched_at.replace(tzinfo=UTC))
+                for r in rows
+            }
+
+    @staticmethod
+    @db_retry
+    async def save_many(chain_id: str, results: dict[str, dict], fetched_at: datetime) -> None:
+        if not results:
+            return
+        async with AsyncSessionLocal() as session:
+            insert = sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+            stmt = insert(TokenSecurity).values(
+                [
+                    {"chain_id": chain_id, "contract": contract, "data": data, "fetched_at": fetched_at}
+                    for contract, data in results.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["chain_id", "contract"],
+                set_={"data": stmt.excluded.data, "fetched_at": stmt.excluded.fetched_at},
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+
+class PortfolioHistoryRepo:
+    @staticmethod
+    @db_retry
+    async def add_snapshots(rows: list[dict]) -> None:
+        """Insert ``{"user_id", "taken_at", "value", "cost"}`` rows in one statement."""
+        if not rows:
+            return
+        async with AsyncSessionLocal() as session:
+            insert = sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+            await session.execute(insert(PortfolioSnapshot).values(rows).on_conflict_do_nothing())
+            await session.commit()
+
+    @staticmethod
+    @db_retry
+    async def get_history(user_id: int, days: int = 30) -> list[tuple[datetime, float, float]]:
+        """``(taken_at, value, cost)`` for the last ``days`` days, oldest first."""
+        since = datetime.now(UTC) - timedelta(days=days)
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(PortfolioSnapshot.taken_at, PortfolioSnapshot.value, PortfolioSnapshot.cost)
+                .where(PortfolioSnapshot.user_id == user_id, PortfolioSnapshot.taken_at >= since)
+                .order_by(PortfolioSnapshot.taken_at)
+            )
+            return [tuple(row) for row in (await session.execute(stmt)).all()]
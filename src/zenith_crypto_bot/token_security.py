@@ -0,0 +1,174 @@
+"""
+Two-tier cache of GoPlus token security results.
+
+Contract security data rarely changes. Each result is kept in an in-memory
+LRU and in ``crypto_token_security`` together with the time it was fetched.
+Freshness is judged per field (``FIELD_TTLS``): a read names the fields it
+renders and only refetches once one of them has outlived its TTL. Holder
+counts go stale within the hour, but a token's name or verified source
+does not. A memory miss falls through to the table. A miss in both joins a
+short coalescing window, and every contract in that window goes to GoPlus
+in one ``contract_addresses`` request. Saved audits render from ``cached``
+without waiting on the network.
+"""
+
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from cachetools import LRUCache, TTLCache
+
+from core.cache import register_cache
+from core.logger import setup_logger
+from core.single_flight import BatchCoalescer
+from zenith_crypto_bot.repository import TokenSecurityRepo
+
+logger = setup_logger("TOKEN_SECURITY")
+
+HOUR = 3600
+FIELD_TTLS = {
+    # Fixed at deploy time
+    "token_name": 30 * 24 * HOUR,
+    "token_symbol": 30 * 24 * HOUR,
+    "is_open_source": 7 * 24 * HOUR,
+    "is_proxy": 7 * 24 * HOUR,
+    # Change with ownership or an upgrade
+    "can_take_back_ownership": 24 * HOUR,
+    "owner_change_balance": 24 * HOUR,
+    # Owner-adjustable or driven by trading
+    "is_honeypot": 6 * HOUR,
+    "buy_tax": 6 * HOUR,
+    "sell_tax": 6 * HOUR,
+    "holder_count": HOUR,
+    "lp_holder_count": HOUR,
+}
+DEFAULT_FIELD_TTL = 6 * HOUR
+# What the risk score and the free report read; the pro report adds holder counts
+RISK_FIELDS = (
+    "token_name",
+    "token_symbol",
+    "is_honeypot",
+    "is_open_source",
+    "is_proxy",
+    "can_take_back_ownership",
+    "owner_change_balance",
+    "buy_tax",
+    "sell_tax",
+)
+REPORT_FIELDS = (*RISK_FIELDS, "holder_count", "lp_holder_count")
+
+GOPLUS_BATCH_SIZE = 20
+# A saved audit older than this is rescanned before it is shown rather than rendered from the store
+SAVED_AUDIT_MAX_AGE = 7 * 24 * HOUR
+# Contracts GoPlus returned nothing for are not asked about again for this long
+UNKNOWN_TTL = 600
+
+# chain id, lowercase contracts -> GoPlus ``result`` keyed by contract, or None when the request failed
+FetchBatch = Callable[[str, list[str]], Awaitable[dict | None]]
+
+
+@dataclass(slots=True)
+class SecurityRecord:
+    data: dict
+    fetched_at: float  # time.time() of the GoPlus request that produced it
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def fresh_for(self, fields: Iterable[str]) -> bool:
+        age = self.age
+        return all(age < FIELD_TTLS.get(field, DEFAULT_FIELD_TTL) for field in fields)
+
+
+class SecurityStore:
+    def __init__(
+        self,
+        fetch_batch: FetchBatch,
+        batch_size: int = GOPLUS_BATCH_SIZE,
+        maxsize: int = 2000,
+        name: str = "crypto.security",
+    ):
+        self._fetch_batch = fetch_batch
+        self.batch_size = batch_size
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self._unknown: TTLCache = TTLCache(maxsize=maxsize, ttl=UNKNOWN_TTL)
+        self._batches = BatchCoalescer(self._fetch)
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        register_cache(name, self)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    async def cached(self, contract: str, chain_id: str = "1") -> SecurityRecord | None:
+        """The stored result for ``contract`` however old, from memory or the table; never the network."""
+        key = (chain_id, contract.lower())
+        record = self._memory.get(key)
+        if record is None:
+            stored = (await TokenSecurityRepo.get_many(chain_id, [key[1]])).get(key[1])
+            if stored:
+                record = self._memory[key] = SecurityRecord(stored[0], stored[1].timestamp())
+        return record
+
+    async def get(self, contract: str, chain_id: str = "1", fields: Iterable[str] = REPORT_FIELDS) -> dict | None:
+        """GoPlus data for ``contract``, refetched in the next batch when any of ``fields`` is past its TTL."""
+        key = (chain_id, contract.lower())
+        record = await self.cached(contract, chain_id)
+        if record is not None and record.fresh_for(fields):
+            self.hits += 1
+            return record.data
+        self.misses += 1
+        if key not in self._unknown:
+            await self._batches.request([key])
+        # A failed fetch leaves the previous result in place: stale beats nothing while GoPlus is down
+        record = self._memory.get(key) or record
+        return record.data if record else None
+
+    def refresh_soon(self, contract: str, chain_id: str = "1") -> None:
+        """Queue ``contract`` for the next batch without waiting for it."""
+        self._batches.submit([(chain_id, contract.lower())])
+
+    async def _fetch(self, keys: set[tuple[str, str]]) -> int:
+        by_chain: dict[str, list[str]] = defaultdict(list)
+        for chain_id, contract in sorted(keys):
+            by_chain[chain_id].append(contract)
+        stored = 0
+        for chain_id, contracts in by_chain.items():
+            for start in range(0, len(contracts), self.batch_size):
+                chunk = contracts[start : start + self.batch_size]
+                self.requests += 1
+                result = await self._fetch_batch(chain_id, chunk)
+                if result is None:
+                    continue
+                stored += await self._store(chain_id, chunk, result)
+        return stored
+
+    async def _store(self, chain_id: str, contracts: list[str], result: dict) -> int:
+        now = time.time()
+        found = {}
+        for contract in contracts:
+            data = result.get(contract)
+            if data:
+                self._memory[(chain_id, contract)] = SecurityRecord(data, now)
+                found[contract] = data
+            else:
+                self._unknown[(chain_id, contract)] = True
+        try:
+            await TokenSecurityRepo.save_many(chain_id, found, datetime.fromtimestamp(now, UTC))
+        except Exception as e:
+            # Memory still serves this worker; the others fetch it themselves
+            logger.warning(f"Could not persist {len(found)} security results: {e}")
+        return len(found)
+
+    def stats(self) -> dict:
+        return {
+            "contracts": len(self._memory),
+            "unknown": len(self._unknown),
+            "hits": self.hits,
+            "misses": self.misses,
+            "requests": self.requests,
+        }
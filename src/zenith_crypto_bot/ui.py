@@ -455,27 +455,19 @@ def get_portfolio_loading() -> str:
     return "Loading live portfolio data..."
 
 
-def get_portfolio_card(tokens: list, prices: dict) -> str:
+def get_portfolio_card(portfolio) -> str:
     lines = ["<b>Portfolio Overview</b>", ""]
-    total_invested = 0
-    total_current = 0
-    for t in tokens:
-        cp = prices.get(t.token_id, {}).get("usd", 0)
-        change_24h = prices.get(t.token_id, {}).get("usd_24h_change", 0)
-        invested = t.entry_price * t.quantity
-        cur = cp * t.quantity
-        pnl_pct = ((cp - t.entry_price) / t.entry_price * 100) if t.entry_price > 0 else 0
-        pnl_usd = cur - invested
-        total_invested += invested
-        total_current += cur
+    for i, t in enumerate(portfolio.positions):
         lines.append(f"<b>{t.token_symbol}</b> x {t.quantity}")
-        lines.append(f"   ${t.entry_price:,.2f} \u2192 ${cp:,.2f} ({pnl_pct:+.1f}%) ${pnl_usd:+,.2f}")
-        lines.append(f"   24h: {change_24h:+.1f}%\n")
+        lines.append(
+            f"   ${t.entry_price:,.2f} \u2192 ${portfolio.price[i]:,.2f} "
+            f"({portfolio.pnl_pct[i]:+.1f}%) ${portfolio.pnl_usd[i]:+,.2f}"
+        )
+        lines.append(f"   24h: {portfolio.change_24h[i]:+.1f}% \u2022 {portfolio.weight[i]:.0f}% of value\n")
 
-    tp = total_current - total_invested
-    tpct = ((total_current - total_invested) / total_invested * 100) if total_invested > 0 else 0
-    lines.append(f"<b>Total P/L: ${tp:+,.2f} ({tpct:+.1f}%)</b>")
-    lines.append(f"Invested: ${total_invested:,.2f} \u2192 Value: ${total_current:,.2f}")
+    lines.append(f"<b>Total P/L: ${portfolio.total_pnl:+,.2f} ({portfolio.total_pnl_pct:+.1f}%)</b>")
+    lines.append(f"Invested: ${portfolio.total_cost:,.2f} \u2192 Value: ${portfolio.total_value:,.2f}")
+    lines.append(f"24h: {portfolio.change_24h_pct:+.1f}%")
     return "\n".join(lines)
 
 
@@ -502,6 +494,7 @@ def get_market_card(
     gainers: list,
     losers: list,
     is_pro: bool,
+    stats: dict | None = None,
 ) -> str:
     lines = [
         "<b>Market Intelligence</b>",
@@ -513,6 +506,11 @@ def get_market_card(
         f"ETH: ${eth_price:,.0f} ({eth_change:+.1f}%)",
         "",
     ]
+    if is_pro and stats:
+        if stats.get("btc_dominance") is not None:
+            lines.append(f"BTC Dominance: {stats['btc_dominance']:.1f}% of top {stats['coins']}")
+        lines.append(f"Breadth: {stats['breadth']:.0f}% up \u2014 median {stats['median_change']:+.1f}%")
+        lines.append("")
     if is_pro and gainers:
         lines.append("<b>Top Gainers (24h)</b>")
         for g in gainers[:5]:
@@ -523,6 +521,11 @@ def get_market_card(
         for loser in losers[:5]:
             pct = loser.get("price_change_percentage_24h", 0) or 0
             lines.append(f"  \u2022 {loser['symbol'].upper()} ${loser.get('current_price', 0):,.4f} ({pct:+.1f}%)")
+        if stats and stats.get("volume_leaders"):
+            lines.append("")
+            lines.append("<b>Volume Leaders (24h)</b>")
+            for v in stats["volume_leaders"]:
+                lines.append(f"  \u2022 {v['symbol'].upper()} ${v.get('total_volume', 0) / 1e9:,.2f}B")
     else:
         lines.append("Top Gainers/Losers: [Pro Required]")
     return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""
+Whale transfer detection that follows new Ethereum blocks.
+
+Each poll fetches every block since the last one seen, as full transaction
+objects, in one JSON-RPC batch. A transfer alerts when it moves at least
+``WHALE_MIN_ETH`` to or from a ``smart_money.KNOWN_WALLETS`` address, or at
+least ``WHALE_ANY_MIN_ETH`` between any two addresses. Hashes already
+alerted on are kept in a bounded LRU, so a transfer seen twice (an
+overlapping poll, a reorg) alerts once and old hashes age out one by one.
+A block the node fails to return is fetched again on the next poll, along
+with everything after it. Detection runs every block, but subscribers are
+messaged on a slower cadence: new transfers collect in a buffer and
+``digest`` hands out the largest of them at most once per
+``ALERT_INTERVAL``. Without an RPC endpoint the watcher falls back to
+Etherscan polling of one exchange wallet.
+"""
+
+import time
+
+from cachetools import LRUCache
+
+from core.config import WHALE_ANY_MIN_ETH, WHALE_MIN_ETH
+from core.logger import setup_logger
+from zenith_crypto_bot.market_service import eth_rpc, get_whale_transfers
+from zenith_crypto_bot.smart_money import KNOWN_WALLETS
+
+logger = setup_logger("WHALES")
+
+WEI_PER_ETH = 10**18
+# After a longer gap older blocks are skipped: a late whale alert is noise
+MAX_BLOCKS_PER_POLL = 5
+SEEN_SIZE = 10_000
+# How often subscribers hear about whales, whatever the detection cadence
+ALERT_INTERVAL = 120
+# Only the largest transfers of a digest are ever sent, so the buffer keeps no more than this
+DIGEST_SIZE = 10
+
+
+def _hex_digits(value: str) -> str:
+    return value.lower().removeprefix("0x").lstrip("0")
+
+
+def _largest(transfers: list[dict], limit: int) -> list[dict]:
+    return sorted(transfers, key=lambda tx: (tx["value_eth"], int(tx.get("timestamp") or 0)), reverse=True)[:limit]
+
+
+class WhaleWatcher:
+    def __init__(
+        self,
+        wallets=KNOWN_WALLETS,
+        min_eth: float = WHALE_MIN_ETH,
+        any_min_eth: float = WHALE_ANY_MIN_ETH,
+        max_blocks: int = MAX_BLOCKS_PER_POLL,
+        alert_interval: float = ALERT_INTERVAL,
+    ):
+        self.wallets = {address.lower() for address in wallets}
+        self.min_eth = min_eth
+        self._min_wei = int(min_eth * WEI_PER_ETH)
+        self._any_min_wei = int(any_min_eth * WEI_PER_ETH)
+        self._min_digits = _hex_digits(hex(self._min_wei))
+        self.max_blocks = max_blocks
+        self._last_block: int | None = None
+        self._seen: LRUCache = LRUCache(maxsize=SEEN_SIZE)
+        self.alert_interval = alert_interval
+        self._buffer: list[dict] = []
+        self._next_digest = 0.0
+
+    async def poll(self) -> list[dict]:
+        """Whale transfers not reported before, oldest first."""
+        if eth_rpc.configured:
+            transfers = await self._scan_new_blocks()
+        else:
+            transfers = await get_whale_transfers(self.min_eth)
+        fresh = []
+        for tx in transfers:
+            if tx["hash"] and tx["hash"] not in self._seen:
+                self._seen[tx["hash"]] = True
+                fresh.append(tx)
+        return fresh
+
+    def collect(self, transfers: list[dict]) -> None:
+        """Hold new transfers for the next digest, keeping only the largest."""
+        self._buffer = _largest(self._buffer + transfers, DIGEST_SIZE)
+
+    def digest(self, limit: int = DIGEST_SIZE) -> list[dict]:
+        """The largest transfers collected since the last digest, newest first among equals, once per interval."""
+        now = time.monotonic()
+        if not self._buffer or now < self._next_digest:
+            return []
+        # Slack so a job running on the same cadence as the digest does not miss every other run
+        self._next_digest = now + self.alert_interval * 0.9
+        top, self._buffer = _largest(self._buffer, limit), []
+        return top
+
+    async def _scan_new_blocks(self) -> list[dict]:
+        latest = await eth_rpc.block_number()
+        if self._last_block is None:
+            self._last_block = latest - 1
+        first = max(self._last_block + 1, latest - self.max_blocks + 1)
+        if first > latest:
+            return []
+        blocks = await eth_rpc.batch([("eth_getBlockByNumber", [hex(n), True]) for n in range(first, latest + 1)])
+        whales = []
+        for number, block in enumerate(blocks, start=first):
+            # A block that errored or timed out ends the run; it and the rest are retried next poll
+            if not block:
+                break
+            whales.extend(self.filter_block(block))
+            self._last_block = number
+        return whales
+
+    def filter_block(self, block: dict) -> list[dict]:
+        """Whale transfers in one block fetched with full transactions."""
+        txs = block.get("transactions") or []
+        # One pass over the whole block compares the hex values by length and digits, so only the handful of
+        # transfers above the lower threshold are parsed to integers and checked against the address set
+        floor = self._min_digits
+        large = [
+            tx
+            for tx in txs
+            if len(digits := _hex_digits(tx.get("value") or "0x0")) > len(floor)
+            or (len(digits) == len(floor) and digits >= floor)
+        ]
+        timestamp = str(int(block.get("timestamp", "0x0"), 16))
+        whales = []
+        for tx in large:
+            value = int(tx["value"], 16)
+            sender = (tx.get("from") or "").lower()
+            recipient = (tx.get("to") or "").lower()
+            if value >= self._any_min_wei or sender in self.wallets or recipient in self.wallets:
+                whales.append(
+                    {
+                        "hash": tx.get("hash", ""),
+                        "from": sender,
+                        "to": recipient,
+                        "value_eth": round(value / WEI_PER_ETH, 2),
+                        "timestamp": timestamp,
+                        "block": int(block.get("number", "0x0"), 16),
+                    }
+                )
+        return whales
+
+
+whale_watcher = WhaleWatcher()
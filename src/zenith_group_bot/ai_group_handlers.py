@@ -8,7 +8,7 @@ from telegram.ext import CommandHandler, ContextTypes
 from core.animation import send_loading_message
 from core.llm_helpers import process_ai_query, sanitize_telegram_html
 from core.logger import setup_logger
-from zenith_group_bot.repository import GroupSubscriptionRepo
+from core.permissions import PRODUCT_GROUP, resolve_tier
 from zenith_group_bot.flood_control import add_warning, check_bot_command_limit, get_flood_action
 from zenith_group_bot.repository import SettingsRepo
 from zenith_group_bot.ui import (
@@ -99,15 +99,15 @@ async def cmd_group_ask(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not settings or not settings.is_active:
         return
 
-    is_pro = await GroupSubscriptionRepo.is_pro(user_id)
-    is_flooding, msg, remaining = check_bot_command_limit(user_id, is_pro)
+    is_pro = (await resolve_tier(user_id, product=PRODUCT_GROUP)).is_pro
+    is_flooding, msg, remaining = await check_bot_command_limit(user_id, is_pro)
 
     if is_flooding:
         if remaining > 0:
             with contextlib.suppress(Exception):
                 await update.message.reply_text(get_flood_cooldown(update.effective_user.first_name, remaining))
         else:
-            warning_count = add_warning(user_id)
+            warning_count = await add_warning(user_id)
             action, duration = get_flood_action(warning_count, is_pro)
 
             if action == "warn":
@@ -185,7 +185,7 @@ async def cmd_group_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or update.message.chat.type not in ["group", "supergroup"]:
         return
 
-    is_pro = await GroupSubscriptionRepo.is_pro(update.effective_user.id)
+    is_pro = (await resolve_tier(update.effective_user.id, product=PRODUCT_GROUP)).is_pro
     msg = get_ai_help_msg(is_pro)
     await update.message.reply_text(msg, parse_mode="HTML")
 
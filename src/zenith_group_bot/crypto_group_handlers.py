@@ -6,7 +6,7 @@ from telegram.ext import CommandHandler, ContextTypes
 
 from core.animation import send_loading_message
 from core.logger import setup_logger
-from zenith_group_bot.repository import GroupSubscriptionRepo
+from core.permissions import PRODUCT_GROUP, resolve_tier
 from zenith_crypto_bot.market_service import get_fear_greed_index, get_prices, resolve_token_id
 from zenith_group_bot.flood_control import add_warning, check_bot_command_limit, get_flood_action
 from zenith_group_bot.repository import SettingsRepo
@@ -43,15 +43,15 @@ async def cmd_group_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not settings or not settings.is_active:
         return
 
-    is_pro = await GroupSubscriptionRepo.is_pro(user_id)
-    is_flooding, msg, remaining = check_bot_command_limit(user_id, is_pro)
+    is_pro = (await resolve_tier(user_id, product=PRODUCT_GROUP)).is_pro
+    is_flooding, msg, remaining = await check_bot_command_limit(user_id, is_pro)
 
     if is_flooding:
         if remaining > 0:
             with contextlib.suppress(Exception):
                 await update.message.reply_text(get_flood_cooldown(update.effective_user.first_name, remaining))
         else:
-            warning_count = add_warning(user_id)
+            warning_count = await add_warning(user_id)
             action, duration = get_flood_action(warning_count, is_pro)
 
             if action == "warn":
@@ -93,7 +93,7 @@ async def cmd_group_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     user_id = update.effective_user.id
-    is_pro = await GroupSubscriptionRepo.is_pro(user_id)
+    is_pro = (await resolve_tier(user_id, product=PRODUCT_GROUP)).is_pro
 
     if not is_pro:
         await update.message.reply_text(get_alert_pro_msg(), parse_mode="HTML")
@@ -113,8 +113,8 @@ async def cmd_group_market(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not settings or not settings.is_active:
         return
 
-    is_pro = await GroupSubscriptionRepo.is_pro(user_id)
-    is_flooding, msg, remaining = check_bot_command_limit(user_id, is_pro)
+    is_pro = (await resolve_tier(user_id, product=PRODUCT_GROUP)).is_pro
+    is_flooding, msg, remaining = await check_bot_command_limit(user_id, is_pro)
 
     if is_flooding:
         return
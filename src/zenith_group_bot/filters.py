@@ -1,10 +1,9 @@
 import re
 
-from cachetools import TTLCache
-
+from core.cache import MeteredTTLCache
 from zenith_group_bot.word_list import BANNED_WORDS, SPAM_DOMAINS
 
-_pattern_cache = TTLCache(maxsize=1000, ttl=300)
+_pattern_cache = MeteredTTLCache("group.patterns", maxsize=1000, ttl=300)
 
 
 def _word_to_pattern(word: str) -> str:
@@ -1,4 +1,3 @@
-import asyncio
 import contextlib
 from collections import defaultdict
 from core.database import AsyncSessionLocal
@@ -90,11 +89,6 @@ async def flush_gamification():
             logger.error(f"Error flushing gamification: {e}")
             await session.rollback()
 
-async def gamification_loop():
-    while True:
-        await asyncio.sleep(60)
-        await flush_gamification()
-
 async def get_user_stats(user_id: int, chat_id: int):
     async with AsyncSessionLocal() as session:
         stmt = select(GroupMemberStats).where(GroupMemberStats.user_id == user_id, GroupMemberStats.chat_id == chat_id)
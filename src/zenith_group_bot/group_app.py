@@ -5,8 +5,9 @@ from telegram import ChatPermissions, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
+from core.cache import MeteredTTLCache
 from core.logger import setup_logger
-from core.permissions import resolve_tier
+from core.permissions import PRODUCT_GROUP, resolve_tier
 
 from zenith_group_bot.gamification import add_xp_sync, add_rep_sync, can_give_rep
 from zenith_group_bot.filters import scan_for_abuse, scan_for_spam
@@ -37,7 +38,7 @@ from zenith_group_bot.ui import (
 logger = setup_logger("GROUP_APP")
 
 _permission_errors = TTLCache(maxsize=500, ttl=60)
-_admin_cache = TTLCache(maxsize=1000, ttl=300)
+_admin_cache = MeteredTTLCache("group.admins", maxsize=1000, ttl=300)
 
 
 async def _is_admin_cached(chat_id: int, user_id: int, context) -> bool:
@@ -196,14 +197,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await AuditLogRepo.log_action(chat_id, user_id, username, "DELETED", "Anti-raid lockdown", context.bot.id)
         return
 
-    tier_ctx = await resolve_tier(settings.owner_id)
+    tier_ctx = await resolve_tier(settings.owner_id, product=PRODUCT_GROUP)
     owner_is_pro = tier_ctx.is_pro
 
     media_group_id = msg.media_group_id
-    is_flood, flood_reason = is_flooding(user_id, media_group_id, strength)
+    is_flood, flood_reason = await is_flooding(user_id, media_group_id, strength)
     if is_flood:
         if await _try_delete(msg, chat_id):
-            warn_count = add_warning(user_id)
+            warn_count = await add_warning(user_id)
             action, duration = get_flood_action(warn_count, owner_is_pro)
             await AuditLogRepo.log_action(
                 chat_id, user_id, username, "DELETED", f"Flood control (Warn {warn_count})", context.bot.id
@@ -293,7 +294,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await _notify_owner(settings, context, user, f"Abuse detected (Strike {strikes})")
             return
 
-    flooding, flood_reason = is_flooding(user_id, getattr(msg, "media_group_id", None), strength)
+    flooding, flood_reason = await is_flooding(user_id, getattr(msg, "media_group_id", None), strength)
     if flooding and await _try_delete(msg, chat_id):
         strikes = await GroupRepo.process_violation(user_id, chat_id)
         await AuditLogRepo.log_action(
@@ -374,7 +375,7 @@ async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         await MemberRepo.register_new_member(member.id, chat_id)
 
-        tier_ctx = await resolve_tier(settings.owner_id)
+        tier_ctx = await resolve_tier(settings.owner_id, product=PRODUCT_GROUP)
         owner_is_pro = tier_ctx.is_pro
         
         import random
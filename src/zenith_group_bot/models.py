@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, Integer, String, Text, UniqueConstraint
 
 from core.database import Base
 from utils.time_util import utc_now
@@ -85,6 +85,23 @@ class ModerationLog(Base):
     created_at = Column(DateTime, default=utc_now)
 
 
+class ModerationDailyStat(Base):
+    __tablename__ = "zenith_moderation_daily"
+    chat_id = Column(BigInteger, primary_key=True)
+    day = Column(Date, primary_key=True)
+    action = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ModerationViolatorDaily(Base):
+    __tablename__ = "zenith_moderation_violators_daily"
+    chat_id = Column(BigInteger, primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    username = Column(String(100), nullable=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class GroupMemberStats(Base):
     __tablename__ = "zenith_group_member_stats"
     id = Column(Integer, primary_key=True)
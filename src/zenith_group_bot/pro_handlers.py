@@ -4,7 +4,7 @@ from telegram import Update, ChatPermissions
 from telegram.ext import ContextTypes
 
 from core.logger import setup_logger
-from zenith_group_bot.repository import GroupSubscriptionRepo
+from core.permissions import PRODUCT_GROUP, resolve_tier
 from core.validators import validate_custom_word
 from zenith_group_bot.repository import (
     AuditLogRepo,
@@ -69,7 +69,7 @@ async def cmd_warn(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception:
         pass
 
-    warn_count = add_warning(target_id)
+    warn_count = await add_warning(target_id)
     action, duration = get_flood_action(warn_count, is_pro=True)
     
     reason = " ".join(context.args[1:]) if len(context.args) > 1 else "Manual Warning"
@@ -205,7 +205,7 @@ async def _check_group_admin_pro(update: Update, context: ContextTypes.DEFAULT_T
         await update.message.reply_text("Run /setup first to configure this group.")
         return chat_id, user_id, False
 
-    is_pro = await GroupSubscriptionRepo.is_pro(settings.owner_id)
+    is_pro = (await resolve_tier(settings.owner_id, product=PRODUCT_GROUP)).is_pro
     if not is_pro:
         await update.message.reply_text(
             "Pro Feature\n\nThe group owner needs Zenith Pro to unlock this feature.\n/activate [KEY]",
@@ -233,7 +233,7 @@ async def _check_dm_admin_pro(update: Update, context: ContextTypes.DEFAULT_TYPE
     settings = owned_groups[0]
     chat_id = settings.chat_id
 
-    is_pro = await GroupSubscriptionRepo.is_pro(settings.owner_id)
+    is_pro = (await resolve_tier(settings.owner_id, product=PRODUCT_GROUP)).is_pro
     if not is_pro:
         await update.message.reply_text(
             "Pro Feature\n\nYou need Zenith Pro to unlock this feature.\n/activate [KEY]",
@@ -509,14 +509,12 @@ async def cmd_analytics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not ok:
         return
 
-    day_stats = await AuditLogRepo.count_actions(chat_id, hours=24)
-    week_stats = await AuditLogRepo.count_actions(chat_id, hours=168)
-    top_violators = await AuditLogRepo.get_top_violators(chat_id, hours=168)
-    total = await AuditLogRepo.total_actions(chat_id)
+    totals = await AuditLogRepo.get_action_totals(chat_id)
+    top_violators = await AuditLogRepo.get_top_violators(chat_id, days=7)
 
     from zenith_group_bot.ui import get_analytics_msg
 
-    msg = get_analytics_msg(day_stats, week_stats, total, top_violators)
+    msg = get_analytics_msg(totals, top_violators)
     await update.message.reply_text(msg, parse_mode="HTML")
 
 
@@ -1,17 +1,28 @@
-from datetime import timedelta
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 
 from cachetools import TTLCache
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, lambda_stmt, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from core.database import AsyncSessionLocal, db_retry
+from core.analytics import bump_key_counter
+from core.cache import MeteredTTLCache
+from core.database import AsyncSessionLocal, after_commit, db_retry
 from core.logger import setup_logger
+from core.lookups import fetch_first, fetch_scalar
+from core.permissions import PRODUCT_GROUP, invalidate_tier_cache
+from core.state_backend import get_state_backend, register_state_type
 from utils.time_util import utc_now
 from zenith_group_bot.models import (
     CustomBannedWord,
+    GroupActivationKey,
     GroupSettings,
     GroupStrike,
+    GroupSubscription,
+    ModerationDailyStat,
     ModerationLog,
+    ModerationViolatorDaily,
     NewMember,
     ScheduledMessage,
     WelcomeConfig,
@@ -19,24 +30,66 @@ from zenith_group_bot.models import (
 
 logger = setup_logger("DB_REPO")
 
-settings_cache = TTLCache(maxsize=1000, ttl=300)
-quarantine_cache = TTLCache(maxsize=5000, ttl=3600)
+_SETTINGS_CACHE_TTL = 300
+# Day windows shown by /analytics; rollups are kept for the longest one
+ANALYTICS_WINDOWS = (1, 7, 30, 90)
+quarantine_cache = MeteredTTLCache("group.quarantine", maxsize=5000, ttl=3600)
 join_debounce = TTLCache(maxsize=2000, ttl=60)
-custom_words_cache = TTLCache(maxsize=500, ttl=300)
+custom_words_cache = MeteredTTLCache("group.custom_words", maxsize=500, ttl=300)
+
+
+_settings_table = GroupSettings.__table__
+_strikes = GroupStrike.__table__
+_new_members = NewMember.__table__
+
+
+def _settings_key(chat_id: int) -> str:
+    return f"group_settings:{chat_id}"
+
+
+async def _invalidate_settings(chat_id: int) -> None:
+    """Drop the cached settings now, and again once the write has committed (``get_settings`` refills it)."""
+    key = _settings_key(chat_id)
+    await get_state_backend().delete(key)
+    await after_commit(lambda: get_state_backend().delete(key))
+
+
+@register_state_type
+@dataclass(slots=True, frozen=True)
+class GroupSettingsRow:
+    """Read-only snapshot of a ``GroupSettings`` row, as returned by ``get_settings``."""
+
+    chat_id: int
+    owner_id: int
+    group_name: str | None
+    features: str | None
+    strength: str | None
+    is_active: bool | None
+    ai_enabled: bool | None
+    crypto_enabled: bool | None
+    raid_mode: bool | None
+    raid_expires_at: datetime | None
+    setup_date: datetime | None
+    faq_knowledge: str | None
+    groq_api_key: str | None
+    groq_tokens_used: int | None
 
 
 class SettingsRepo:
     @staticmethod
     @db_retry
     async def get_settings(chat_id: int):
-        if chat_id in settings_cache:
-            return settings_cache[chat_id]
-        async with AsyncSessionLocal() as session:
-            stmt = select(GroupSettings).where(GroupSettings.chat_id == chat_id)
-            record = (await session.execute(stmt)).scalar_one_or_none()
-            if record:
-                settings_cache[chat_id] = record
-            return record
+        cached = await get_state_backend().get(_settings_key(chat_id))
+        if cached is not None:
+            return cached
+        row = await fetch_first(
+            lambda_stmt(lambda: select(_settings_table).where(_settings_table.c.chat_id == chat_id))
+        )
+        if row is None:
+            return None
+        record = GroupSettingsRow(**row._mapping)
+        await get_state_backend().set(_settings_key(chat_id), record, ttl=_SETTINGS_CACHE_TTL)
+        return record
 
     @staticmethod
     @db_retry
@@ -118,8 +171,8 @@ class SettingsRepo:
 
             res = await session.execute(select(GroupSettings).where(GroupSettings.chat_id == chat_id))
             record = res.scalar_one()
-            settings_cache[chat_id] = record
-            return record
+        await _invalidate_settings(chat_id)
+        return record
 
     @staticmethod
     @db_retry
@@ -130,7 +183,8 @@ class SettingsRepo:
             if record:
                 record.groq_tokens_used = (record.groq_tokens_used or 0) + tokens
                 await session.commit()
-                settings_cache[chat_id] = record
+        if record:
+            await _invalidate_settings(chat_id)
 
     @staticmethod
     @db_retry
@@ -144,7 +198,7 @@ class SettingsRepo:
                     stmt = update(GroupSettings).where(GroupSettings.chat_id == chat_id).values(raid_mode=False)
                     await session.execute(stmt)
                     await session.commit()
-                    settings_cache.pop(chat_id, None)
+                await _invalidate_settings(chat_id)
             return False
         return bool(settings.raid_mode)
 
@@ -160,7 +214,7 @@ class SettingsRepo:
             )
             await session.execute(stmt)
             await session.commit()
-            settings_cache.pop(chat_id, None)
+        await _invalidate_settings(chat_id)
 
     @staticmethod
     @db_retry
@@ -177,9 +231,9 @@ class SettingsRepo:
             await session.execute(delete(ModerationLog).where(ModerationLog.chat_id == chat_id))
             await session.execute(delete(GroupSettings).where(GroupSettings.chat_id == chat_id))
             await session.commit()
-            settings_cache.pop(chat_id, None)
-            custom_words_cache.pop(chat_id, None)
-            return True
+        await _invalidate_settings(chat_id)
+        custom_words_cache.pop(chat_id, None)
+        return True
 
 
 class GroupRepo:
@@ -208,10 +262,14 @@ class GroupRepo:
     @staticmethod
     @db_retry
     async def get_strikes(user_id: int, chat_id: int) -> int:
-        async with AsyncSessionLocal() as session:
-            stmt = select(GroupStrike).where(GroupStrike.user_id == user_id, GroupStrike.chat_id == chat_id)
-            record = (await session.execute(stmt)).scalar_one_or_none()
-            return record.strike_count if record else 0
+        count = await fetch_scalar(
+            lambda_stmt(
+                lambda: select(_strikes.c.strike_count).where(
+                    _strikes.c.user_id == user_id, _strikes.c.chat_id == chat_id
+                )
+            )
+        )
+        return count or 0
 
     @staticmethod
     @db_retry
@@ -252,13 +310,17 @@ class MemberRepo:
         cache_key = f"{chat_id}_{user_id}"
         if quarantine_cache.get(cache_key) == "CLEARED":
             return False
-        async with AsyncSessionLocal() as session:
-            stmt = select(NewMember).where(NewMember.user_id == user_id, NewMember.chat_id == chat_id)
-            record = (await session.execute(stmt)).scalar_one_or_none()
-            if record and (utc_now() - record.joined_at) < timedelta(hours=24):
-                return True
-            quarantine_cache[cache_key] = "CLEARED"
-            return False
+        joined_at = await fetch_scalar(
+            lambda_stmt(
+                lambda: select(_new_members.c.joined_at).where(
+                    _new_members.c.user_id == user_id, _new_members.c.chat_id == chat_id
+                )
+            )
+        )
+        if joined_at and (utc_now() - joined_at) < timedelta(hours=24):
+            return True
+        quarantine_cache[cache_key] = "CLEARED"
+        return False
 
     @staticmethod
     @db_retry
@@ -470,6 +532,27 @@ class AuditLogRepo:
                     moderator_id=moderator_id,
                 )
             )
+            # Keep the daily rollups in step with the log; they outlive its 7-day retention
+            day = utc_now().date()
+            daily = pg_insert(ModerationDailyStat).values(chat_id=chat_id, day=day, action=action, count=1)
+            await session.execute(
+                daily.on_conflict_do_update(
+                    index_elements=["chat_id", "day", "action"],
+                    set_={"count": ModerationDailyStat.count + 1},
+                )
+            )
+            violator = pg_insert(ModerationViolatorDaily).values(
+                chat_id=chat_id, day=day, user_id=user_id, username=username, count=1
+            )
+            await session.execute(
+                violator.on_conflict_do_update(
+                    index_elements=["chat_id", "day", "user_id"],
+                    set_={
+                        "count": ModerationViolatorDaily.count + 1,
+                        "username": func.coalesce(violator.excluded.username, ModerationViolatorDaily.username),
+                    },
+                )
+            )
             await session.commit()
 
     @staticmethod
@@ -486,66 +569,49 @@ class AuditLogRepo:
 
     @staticmethod
     @db_retry
-    async def count_actions(chat_id: int, hours: int = 24) -> dict:
+    async def get_action_totals(chat_id: int, windows: tuple[int, ...] = ANALYTICS_WINDOWS) -> dict[int, dict]:
+        """Per-action totals for each window of calendar days (UTC, today inclusive), from the daily rollups."""
+        today = utc_now().date()
         async with AsyncSessionLocal() as session:
-            cutoff = utc_now() - timedelta(hours=hours)
-            stmt = (
-                select(
-                    ModerationLog.action,
-                    func.count().label("cnt"),
-                )
-                .where(
-                    ModerationLog.chat_id == chat_id,
-                    ModerationLog.created_at >= cutoff,
-                )
-                .group_by(ModerationLog.action)
+            stmt = select(ModerationDailyStat.day, ModerationDailyStat.action, ModerationDailyStat.count).where(
+                ModerationDailyStat.chat_id == chat_id,
+                ModerationDailyStat.day > today - timedelta(days=max(windows)),
             )
             rows = (await session.execute(stmt)).all()
-            return {row[0]: row[1] for row in rows}
+
+        totals: dict[int, dict] = {days: {} for days in windows}
+        for day, action, count in rows:
+            age = (today - day).days
+            for days, stats in totals.items():
+                if age < days:
+                    stats[action] = stats.get(action, 0) + count
+        return totals
 
     @staticmethod
     @db_retry
-    async def get_top_violators(chat_id: int, hours: int = 168, limit: int = 5) -> list:
+    async def get_top_violators(chat_id: int, days: int = 7, limit: int = 5) -> list:
+        since = utc_now().date() - timedelta(days=days)
         async with AsyncSessionLocal() as session:
-            cutoff = utc_now() - timedelta(hours=hours)
+            violations = func.sum(ModerationViolatorDaily.count)
             stmt = (
                 select(
-                    ModerationLog.username,
-                    ModerationLog.user_id,
-                    func.count().label("violations"),
+                    func.max(ModerationViolatorDaily.username),
+                    ModerationViolatorDaily.user_id,
+                    violations.label("violations"),
                 )
                 .where(
-                    ModerationLog.chat_id == chat_id,
-                    ModerationLog.created_at >= cutoff,
-                )
-                .group_by(
-                    ModerationLog.username,
-                    ModerationLog.user_id,
+                    ModerationViolatorDaily.chat_id == chat_id,
+                    ModerationViolatorDaily.day > since,
                 )
-                .order_by(func.count().desc())
+                .group_by(ModerationViolatorDaily.user_id)
+                .order_by(violations.desc())
                 .limit(limit)
             )
             return (await session.execute(stmt)).all()
 
-    @staticmethod
-    @db_retry
-    async def total_actions(chat_id: int) -> int:
-        async with AsyncSessionLocal() as session:
-            stmt = (
-                select(func.count())
-                .select_from(ModerationLog)
-                .where(
-                    ModerationLog.chat_id == chat_id,
-                )
-            )
-            return (await session.execute(stmt)).scalar() or 0
 
-from zenith_group_bot.models import GroupSubscription, GroupActivationKey
-import uuid
-from datetime import UTC, datetime, timedelta
-from sqlalchemy import select
-from core.database import AsyncSessionLocal, db_retry
-from core.permissions import invalidate_tier_cache
+_group_subscriptions = GroupSubscription.__table__
+
 
 class GroupSubscriptionRepo:
     @staticmethod
@@ -555,6 +621,7 @@ class GroupSubscriptionRepo:
         async with AsyncSessionLocal() as session:
             expires_at = datetime.now(UTC) + timedelta(days=validity_days)
             session.add(GroupActivationKey(key_string=new_key, duration_days=days, expires_at=expires_at))
+            await bump_key_counter(session, PRODUCT_GROUP, "keys_generated")
             await session.commit()
         return new_key
 
@@ -575,6 +642,7 @@ class GroupSubscriptionRepo:
             key.is_used = True
             key.used_by = user_id
             key.used_at = datetime.now(UTC)
+            await bump_key_counter(session, PRODUCT_GROUP, "keys_redeemed")
 
             res = await session.execute(select(GroupSubscription).where(GroupSubscription.user_id == user_id).with_for_update())
             sub = res.scalar_one_or_none()
@@ -588,7 +656,7 @@ class GroupSubscriptionRepo:
                     sub.expires_at = new_expiry
                 else:
                     session.add(GroupSubscription(user_id=user_id, expires_at=new_expiry))
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True, (
                 f"💎 <b>ZENITH PRO ACTIVATED (GROUP)</b>\n\n"
                 f"✅ Successfully applied <b>{key.duration_days} days</b> to your account.\n"
@@ -598,14 +666,16 @@ class GroupSubscriptionRepo:
     @staticmethod
     @db_retry
     async def get_days_left(user_id: int) -> int:
-        async with AsyncSessionLocal() as session:
-            res = await session.execute(select(GroupSubscription).where(GroupSubscription.user_id == user_id))
-            sub = res.scalar_one_or_none()
-            now = datetime.now(UTC)
-            if not sub or sub.expires_at <= now:
-                return 0
-            remaining = sub.expires_at - now
-            return remaining.days + (1 if remaining.seconds > 0 else 0)
+        expires_at = await fetch_scalar(
+            lambda_stmt(
+                lambda: select(_group_subscriptions.c.expires_at).where(_group_subscriptions.c.user_id == user_id)
+            )
+        )
+        now = datetime.now(UTC)
+        if not expires_at or expires_at <= now:
+            return 0
+        remaining = expires_at - now
+        return remaining.days + (1 if remaining.seconds > 0 else 0)
 
     @staticmethod
     @db_retry
@@ -662,7 +732,7 @@ class GroupSubscriptionRepo:
             if not sub:
                 return False
             sub.expires_at += timedelta(days=days)
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True
 
     @staticmethod
@@ -674,5 +744,5 @@ class GroupSubscriptionRepo:
             if not sub:
                 return False
             sub.expires_at = datetime.now(UTC) - timedelta(days=1)
-            invalidate_tier_cache(user_id)
+            await invalidate_tier_cache(user_id, session)
             return True
@@ -425,31 +425,30 @@ def get_welcomeoff_result(disabled: bool) -> str:
     return "Custom welcome disabled." if disabled else "No active welcome config found."
 
 
-def get_analytics_msg(day_stats: dict, week_stats: dict, total: int, top_violators: list) -> str:
-    deleted_24h = day_stats.get("DELETED", 0)
-    warned_24h = day_stats.get("WARNED", 0)
-    banned_24h = day_stats.get("BANNED", 0)
-    quarantine_24h = day_stats.get("QUARANTINE", 0)
-
-    deleted_7d = week_stats.get("DELETED", 0)
-    warned_7d = week_stats.get("WARNED", 0)
-    banned_7d = week_stats.get("BANNED", 0)
-
+def get_analytics_msg(totals: dict[int, dict], top_violators: list) -> str:
+    today = totals.get(1, {})
     lines = [
         "<b>Moderation Analytics</b>",
         "",
-        "<b>Last 24 Hours:</b>",
-        f"  Messages Deleted: {deleted_24h}",
-        f"  Warnings Issued: {warned_24h}",
-        f"  Users Banned: {banned_24h}",
-        f"  Quarantine Blocks: {quarantine_24h}",
-        "",
-        "<b>Last 7 Days:</b>",
-        f"  Deleted: {deleted_7d} | Warned: {warned_7d} | Banned: {banned_7d}",
-        "",
-        f"<b>Total All-Time Actions:</b> {total}",
+        "<b>Today (UTC):</b>",
+        f"  Messages Deleted: {today.get('DELETED', 0)}",
+        f"  Warnings Issued: {today.get('WARNED', 0)}",
+        f"  Users Banned: {today.get('BANNED', 0)}",
+        f"  Quarantine Blocks: {today.get('QUARANTINE', 0)}",
     ]
 
+    for days, stats in sorted(totals.items()):
+        if days == 1:
+            continue
+        lines.extend(
+            [
+                "",
+                f"<b>Last {days} Days:</b> {sum(stats.values())} actions",
+                f"  Deleted: {stats.get('DELETED', 0)} | Warned: {stats.get('WARNED', 0)} | "
+                f"Banned: {stats.get('BANNED', 0)}",
+            ]
+        )
+
     if top_violators:
         lines.extend(
             [
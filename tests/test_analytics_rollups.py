@@ -0,0 +1,113 @@
+"""Tests for the daily rollups behind group analytics and the admin dashboards."""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from core.analytics_models import SubscriptionDailyStat
+from core.data_cleanup import run_cleanup
+from core.database import AsyncSessionLocal, init_db
+from utils.time_util import utc_now
+from zenith_admin_bot import repository as admin_repository
+from zenith_admin_bot.repository import MonitoringRepo
+from zenith_crypto_bot.repository import CryptoSubscriptionRepo
+from zenith_group_bot.models import ModerationDailyStat, ModerationLog
+from zenith_group_bot.repository import AuditLogRepo
+
+
+async def _age_moderation(chat_id: int, days: int) -> None:
+    """Move a chat's raw log and rollups ``days`` into the past."""
+    async with AsyncSessionLocal() as session:
+        for model, column in ((ModerationLog, "created_at"), (ModerationDailyStat, "day")):
+            rows = (await session.execute(select(model).where(model.chat_id == chat_id))).scalars().all()
+            for row in rows:
+                setattr(row, column, getattr(row, column) - timedelta(days=days))
+        await session.commit()
+
+
+async def _key_counters(product: str) -> tuple[int, int]:
+    async with AsyncSessionLocal() as session:
+        row = await session.get(SubscriptionDailyStat, (utc_now().date(), product))
+        return (row.keys_generated, row.keys_redeemed) if row else (0, 0)
+
+
+class TestModerationRollups:
+    @pytest.mark.asyncio
+    async def test_log_action_maintains_daily_counters(self):
+        await init_db()
+        await AuditLogRepo.log_action(-2001, 1, "spammer", "DELETED", "spam")
+        await AuditLogRepo.log_action(-2001, 1, "spammer", "DELETED", "spam")
+        await AuditLogRepo.log_action(-2001, 2, None, "WARNED", "abuse")
+
+        totals = await AuditLogRepo.get_action_totals(-2001)
+        assert totals[1] == {"DELETED": 2, "WARNED": 1}
+        assert totals[90] == totals[1]
+
+        top = await AuditLogRepo.get_top_violators(-2001)
+        assert [tuple(row) for row in top] == [("spammer", 1, 2), (None, 2, 1)]
+
+    @pytest.mark.asyncio
+    async def test_long_windows_survive_log_cleanup(self):
+        await init_db()
+        await AuditLogRepo.log_action(-2002, 3, "old", "BANNED", "raid")
+        await _age_moderation(-2002, days=20)
+        await AuditLogRepo.log_action(-2002, 4, "new", "BANNED", "raid")
+
+        results = await run_cleanup()
+        assert results["zenith_moderation_log"] >= 1
+
+        totals = await AuditLogRepo.get_action_totals(-2002)
+        assert totals[7] == {"BANNED": 1}
+        assert totals[30] == {"BANNED": 2}
+
+    @pytest.mark.asyncio
+    async def test_rollups_expire_after_longest_window(self):
+        await init_db()
+        await AuditLogRepo.log_action(-2003, 5, "ancient", "DELETED", "spam")
+        await _age_moderation(-2003, days=120)
+
+        await run_cleanup()
+        assert (await AuditLogRepo.get_action_totals(-2003))[90] == {}
+
+
+class TestSubscriptionRollups:
+    @pytest.mark.asyncio
+    async def test_key_write_paths_bump_counters(self):
+        await init_db()
+        before = await _key_counters("crypto")
+        await CryptoSubscriptionRepo.generate_key(30)
+        await MonitoringRepo.generate_bulk_keys(3, 30)
+        generated, redeemed = await _key_counters("crypto")
+        assert (generated - before[0], redeemed - before[1]) == (4, 0)
+
+    @pytest.mark.asyncio
+    async def test_dashboards_read_the_snapshot(self):
+        await init_db()
+        await CryptoSubscriptionRepo.register_user(7001)
+        await CryptoSubscriptionRepo.extend_subscription(7001, days=3)
+
+        stats = await MonitoringRepo.get_subscription_stats.__wrapped__()
+        assert stats["active_subscriptions"] >= 1
+        assert stats["expiring_within_7_days"] >= 1
+
+        report = await MonitoringRepo.get_revenue_report.__wrapped__()
+        assert report["active_subscriptions"] == stats["active_subscriptions"]
+        assert report["estimated_mrr"] == report["active_subscriptions"] * 149
+
+    @pytest.mark.asyncio
+    async def test_first_snapshot_is_read_back_from_the_primary(self, monkeypatch):
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(SubscriptionDailyStat))
+            await session.commit()
+        routes = []
+
+        def session_factory(**kwargs):
+            routes.append(kwargs.get("read_only"))
+            return AsyncSessionLocal(**kwargs)
+
+        monkeypatch.setattr(admin_repository, "AsyncSessionLocal", session_factory)
+        snapshots = await MonitoringRepo._latest_snapshots()
+        assert "crypto" in snapshots
+        assert routes == [None, False]
@@ -0,0 +1,83 @@
+"""Tests for the benchmark harness and the load generator's traffic and stubs."""
+
+import httpx
+import pytest
+
+from benchmarks.harness import Case, Result, find_regressions, load_baseline, measure, save_baseline
+from benchmarks.stubs import StubServices
+from benchmarks.traffic import FLOOD_BURST, TrafficGenerator, parse_mix
+
+
+class TestBaselines:
+    def test_save_merges_with_existing_cases(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        save_baseline(1000.0, [Result("a", 500.0, 0.5), Result("b", 100.0, 0.1)], path)
+        save_baseline(2000.0, [Result("a", 800.0, 0.4)], path)
+
+        baseline = load_baseline(path)
+        assert baseline["calibration_score"] == 2000.0
+        assert baseline["cases"]["a"]["normalized"] == 0.4
+        assert baseline["cases"]["b"]["normalized"] == 0.1
+
+    def test_missing_baseline_is_empty(self, tmp_path):
+        assert load_baseline(tmp_path / "absent.json") == {}
+
+    def test_regressions_use_normalized_throughput(self):
+        baseline = {"cases": {"slow": {"normalized": 1.0}, "ok": {"normalized": 1.0}}}
+        results = [Result("slow", 10.0, 0.6), Result("ok", 10.0, 0.8), Result("new", 1.0, 0.01)]
+
+        regressions = find_regressions(results, baseline, threshold=0.3)
+        assert [r.name for r in regressions] == ["slow"]
+        assert regressions[0].change == pytest.approx(-0.4)
+
+
+class TestMeasure:
+    @pytest.mark.asyncio
+    async def test_async_cases_run_setup_once(self):
+        calls = {"setup": 0, "run": 0}
+
+        def setup():
+            calls["setup"] += 1
+
+        async def run():
+            calls["run"] += 1
+
+        ops_per_sec = await measure(Case("noop", run, ops=10, setup=setup), min_time=0.01, rounds=2)
+        assert calls["setup"] == 1
+        assert calls["run"] > 2
+        assert ops_per_sec > 0
+
+
+class TestTraffic:
+    def test_bursts_share_a_class_and_get_unique_ids(self):
+        generator = TrafficGenerator({"group_flood": 1})
+        events = generator.next_events() + generator.next_events()
+        assert len(events) == 2 * FLOOD_BURST
+        assert {e.traffic_class for e in events} == {"group_flood"}
+        assert len({e.update_id for e in events}) == len(events)
+        assert len({e.payload["message"]["from"]["id"] for e in events[:FLOOD_BURST]}) == 1
+
+    def test_unknown_class_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown traffic class"):
+            parse_mix(["group_cleen=5"])
+
+
+class TestStubs:
+    @pytest.mark.asyncio
+    async def test_requests_never_leave_the_process(self):
+        stubs = StubServices(latency_ms={}, failure_rate={"coingecko": 1.0})
+        stubs.install()
+        try:
+            async with httpx.AsyncClient() as client:
+                sent = await client.post(
+                    "https://api.telegram.org/bot100001:token/sendMessage", data={"chat_id": "42", "text": "hi"}
+                )
+                limited = await client.get("https://api.coingecko.com/api/v3/simple/price", params={"ids": "bitcoin"})
+                unknown = await client.get("https://example.org/")
+        finally:
+            stubs.uninstall()
+
+        assert sent.json()["result"]["chat"]["id"] == 42
+        assert limited.status_code == 429
+        assert unknown.status_code == 502
+        assert stubs.calls["unstubbed", "example.org"] == 1
@@ -0,0 +1,94 @@
+"""Tests for the stale-while-revalidate cache behind market data and async_ttl_cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from core.cache import SWRCache, async_ttl_cache
+
+
+class _Loader:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return self.calls
+
+
+def _age(cache: SWRCache, key, seconds: float) -> None:
+    value, loaded_at = cache._entries[key]
+    cache._entries[key] = (value, loaded_at - seconds)
+
+
+class TestSWRCache:
+    def test_hard_ttl_below_soft_ttl_is_rejected(self):
+        with pytest.raises(ValueError, match="hard_ttl"):
+            SWRCache("test.swr.invalid", soft_ttl=60, hard_ttl=30)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        load = _Loader()
+        cache = SWRCache("test.swr.miss", soft_ttl=60, hard_ttl=600)
+        assert await asyncio.gather(*(cache.get("k", load) for _ in range(5))) == [1] * 5
+        assert load.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_is_served_while_refreshing(self):
+        load = _Loader()
+        cache = SWRCache("test.swr.stale", soft_ttl=60, hard_ttl=600)
+        await cache.get("k", load)
+        _age(cache, "k", 120)
+
+        started = time.monotonic()
+        assert await cache.get("k", load) == 1
+        assert await cache.get("k", load) == 1
+        assert time.monotonic() - started < 0.01
+        await asyncio.gather(*cache._refreshes)
+
+        assert load.calls == 2
+        assert await cache.get("k", load) == 2
+        assert cache.stale_hits == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_known_good(self):
+        load = _Loader()
+        cache = SWRCache("test.swr.failure", soft_ttl=60, hard_ttl=600)
+        await cache.get("k", load)
+        _age(cache, "k", 120)
+        load.fail = True
+
+        assert await cache.get("k", load) == 1
+        await asyncio.gather(*cache._refreshes)
+        assert cache.refresh_failures == 1
+        assert cache.peek("k") == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_after_hard_expiry_raises_loader_error(self):
+        load = _Loader()
+        load.fail = True
+        cache = SWRCache("test.swr.cold", soft_ttl=60, hard_ttl=600)
+        with pytest.raises(ConnectionError):
+            await cache.get("k", load)
+        assert len(cache) == 0
+
+
+class TestAsyncTTLCache:
+    @pytest.mark.asyncio
+    async def test_unhashable_arguments_are_cached_by_repr(self):
+        calls = []
+
+        @async_ttl_cache(ttl=60)
+        async def lookup(ids: list[int]):
+            calls.append(ids)
+            return sum(ids)
+
+        assert await lookup([1, 2]) == 3
+        assert await lookup([1, 2]) == 3
+        assert await lookup([2, 3]) == 5
+        assert calls == [[1, 2], [2, 3]]
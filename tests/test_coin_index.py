@@ -0,0 +1,77 @@
+"""Tests for the local CoinGecko coin-list index."""
+
+import gzip
+import json
+
+import pytest
+
+from zenith_crypto_bot import market_service
+from zenith_crypto_bot.coin_index import CoinIndex
+
+PEPE = "0x6982508145454ce325ddbf47a25d4ec3d2311933"
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+    {"id": "batcat", "symbol": "btc", "name": "Batcat", "platforms": {}},
+    {"id": "pepe", "symbol": "pepe", "name": "Pepe", "platforms": {"ethereum": PEPE.upper().replace("X", "x")}},
+    {"id": "pepecoin", "symbol": "pepecoin", "name": "PepeCoin", "platforms": {"ethereum": ""}},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "platforms": {}},
+    {"symbol": "bad", "name": "No id"},
+]
+
+
+@pytest.fixture
+def index() -> CoinIndex:
+    index = CoinIndex()
+    index.load_coins(COINS, fetched_at=1_700_000_000)
+    return index
+
+
+class TestCoinIndex:
+    def test_resolves_ids_names_and_contracts(self, index):
+        assert len(index) == 5
+        assert index.resolve("Ethereum") == "ethereum"
+        assert index.resolve(" PepeCoin ") == "pepecoin"
+        assert index.resolve(PEPE) == "pepe"
+        assert index.resolve("0x" + "0" * 40) is None
+        assert index.resolve("nope") is None
+
+    def test_shared_tickers_go_to_the_larger_market_cap(self, index):
+        index.set_market_caps({"batcat": 5e6})
+        assert index.resolve("btc") == "batcat"
+        index.set_market_caps({"bitcoin": 1.3e12, "batcat": 5e6})
+        assert index.resolve("btc") == "bitcoin"
+
+    def test_prefix_search_ranks_by_market_cap(self, index):
+        index.set_market_caps({"pepe": 4e9})
+        assert [c["id"] for c in index.search("pep")] == ["pepe", "pepecoin"]
+        assert index.search("PEPE", limit=1) == [{"id": "pepe", "symbol": "PEPE", "name": "Pepe"}]
+        assert [c["id"] for c in index.search("b")] == ["batcat", "bitcoin"]
+        assert index.search("  ") == []
+
+    def test_save_and_load_roundtrip(self, index, tmp_path):
+        path = tmp_path / "data" / "coins.json.gz"
+        index.save(path)
+        restored = CoinIndex()
+        assert restored.load(path)
+        assert restored.fetched_at == 1_700_000_000
+        assert restored.resolve(PEPE) == "pepe"
+        assert [c["id"] for c in restored.search("eth")] == ["ethereum"]
+
+    def test_missing_or_outdated_files_are_ignored(self, index, tmp_path):
+        assert not CoinIndex().load(tmp_path / "missing.json.gz")
+        path = tmp_path / "old.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"version": 0, "ids": ["bitcoin"]}, f)
+        assert not index.load(path)
+        assert len(index) == 5
+
+
+class TestResolveTokenId:
+    def test_pinned_symbols_win_over_the_index(self, index, monkeypatch):
+        monkeypatch.setattr(market_service, "coin_index", index)
+        index.set_market_caps({"batcat": 5e6})
+        assert market_service.resolve_token_id("BTC") == "bitcoin"
+        assert market_service.resolve_token_id("pepecoin") == "pepecoin"
+        assert market_service.resolve_token_id(PEPE) == "pepe"
+        assert market_service.resolve_token_id("unlisted") == "unlisted"
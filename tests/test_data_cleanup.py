@@ -0,0 +1,111 @@
+"""Tests for the batched, checkpointed data retention engine."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from core import data_cleanup
+from core.data_cleanup import RetentionPolicy, purge_expired, retention_in_progress, run_cleanup
+from core.database import AsyncSessionLocal, init_db
+from core.rate_limit_models import PersistentRateLimit
+from core.rate_limit_repo import RateLimitRepo
+from utils.time_util import utc_now
+from zenith_crypto_bot.models import PriceAlert
+from zenith_group_bot.models import ModerationDailyStat, ModerationLog
+
+_LOG_POLICY = RetentionPolicy(ModerationLog, ModerationLog.created_at, timedelta(days=7))
+
+
+async def _add_logs(chat_id: int, count: int, age: timedelta) -> None:
+    async with AsyncSessionLocal() as session:
+        for i in range(count):
+            session.add(ModerationLog(chat_id=chat_id, user_id=i, action="DELETED", created_at=utc_now() - age))
+        await session.commit()
+
+
+async def _count(model, *where) -> int:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(func.count()).select_from(model).where(*where))).scalar()
+
+
+class TestPurgeExpired:
+    @pytest.mark.asyncio
+    async def test_deletes_expired_rows_in_batches(self, monkeypatch):
+        await init_db()
+        monkeypatch.setattr(data_cleanup, "RETENTION_BATCH_PAUSE", 0)
+        await _add_logs(-3001, 7, age=timedelta(days=8))
+        await _add_logs(-3001, 2, age=timedelta(days=1))
+
+        deleted, finished = await purge_expired(_LOG_POLICY, batch_size=3)
+        assert (deleted, finished) == (7, True)
+        assert await _count(ModerationLog, ModerationLog.chat_id == -3001) == 2
+
+    @pytest.mark.asyncio
+    async def test_composite_keys_and_extra_filters(self):
+        await init_db()
+        today = utc_now().date()
+        async with AsyncSessionLocal() as session:
+            session.add_all(
+                [
+                    ModerationDailyStat(chat_id=-3002, day=today - timedelta(days=100), action="BANNED", count=1),
+                    ModerationDailyStat(chat_id=-3002, day=today, action="BANNED", count=1),
+                    PriceAlert(
+                        user_id=31,
+                        token_id="btc",
+                        token_symbol="BTC",
+                        target_price=1.0,
+                        direction="above",
+                        is_triggered=True,
+                        created_at=datetime.now(UTC) - timedelta(days=40),
+                    ),
+                    PriceAlert(
+                        user_id=31,
+                        token_id="eth",
+                        token_symbol="ETH",
+                        target_price=1.0,
+                        direction="above",
+                        is_triggered=False,
+                        created_at=datetime.now(UTC) - timedelta(days=40),
+                    ),
+                ]
+            )
+            await session.commit()
+
+        results = await run_cleanup()
+        assert results["zenith_moderation_daily"] >= 1
+        assert await _count(ModerationDailyStat, ModerationDailyStat.chat_id == -3002) == 1
+        assert await _count(PriceAlert, PriceAlert.user_id == 31) == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_cleanup_uses_naive_cutoff(self):
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            session.add(
+                PersistentRateLimit(user_id=32, action="ai", count=1, window_start=utc_now() - timedelta(days=2))
+            )
+            session.add(PersistentRateLimit(user_id=32, action="ai", count=1, window_start=utc_now()))
+            await session.commit()
+
+        assert await RateLimitRepo.cleanup_old(older_than_hours=24) == 1
+        assert await _count(PersistentRateLimit, PersistentRateLimit.user_id == 32) == 1
+
+
+class TestCheckpointing:
+    @pytest.mark.asyncio
+    async def test_out_of_budget_run_resumes(self, monkeypatch):
+        await init_db()
+        monkeypatch.setattr(data_cleanup, "RETENTION_BATCH_PAUSE", 0)
+        await _add_logs(-3003, 5, age=timedelta(days=9))
+        policies = (_LOG_POLICY, RetentionPolicy(PersistentRateLimit, PersistentRateLimit.window_start, timedelta(1)))
+
+        first = await run_cleanup(policies, time_budget=0, batch_size=2)
+        assert first["zenith_moderation_log"] == 2
+        assert "rate_limits" not in first
+        assert await retention_in_progress()
+
+        second = await run_cleanup(policies, batch_size=2)
+        assert second["zenith_moderation_log"] == 5
+        assert "rate_limits" in second
+        assert not await retention_in_progress()
+        assert await _count(ModerationLog, ModerationLog.chat_id == -3003) == 0
@@ -0,0 +1,89 @@
+"""Tests for named connection pools and read-replica routing."""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import core.database as db_mod
+from core.database import AsyncSessionLocal, db_route, get_engine, init_db, unit_of_work, use_pool
+from core.db_health import get_pool_stats
+
+
+@pytest.fixture
+def postgres_engines(monkeypatch):
+    """Point the module at Postgres + one replica and record the engines it would create."""
+    monkeypatch.setattr(db_mod, "_engine", None)
+    monkeypatch.setattr(db_mod, "_engines", {})
+    monkeypatch.setattr(db_mod, "_sessionmakers", {})
+    monkeypatch.setattr(db_mod, "DATABASE_URL", "postgresql+asyncpg://u:p@primary/db")
+    monkeypatch.setattr(db_mod, "DATABASE_REPLICA_URLS", ["postgres://u:p@replica/db"])
+    with patch("core.database.create_async_engine", side_effect=lambda url, **kw: (url, kw)) as mock_create:
+        yield mock_create
+
+
+class TestPoolRouting:
+    @pytest.mark.usefixtures("postgres_engines")
+    def test_each_pool_gets_its_own_engine(self):
+        interactive = get_engine()
+        background = get_engine("background")
+        analytics = get_engine("analytics")
+
+        assert len({id(interactive), id(background), id(analytics)}) == 3
+        assert background[1]["pool_size"] == db_mod.POOL_CONFIGS["background"].size
+        assert analytics[1]["pool_timeout"] == db_mod.POOL_CONFIGS["analytics"].timeout
+        assert get_engine("background") is background
+        assert get_engine("leader")[1]["pool_size"] == 1
+        assert get_engine("leader") is not background
+
+    @pytest.mark.usefixtures("postgres_engines")
+    def test_read_only_uses_replica(self):
+        url, _ = get_engine("analytics", read_only=True)
+        assert url == "postgresql+asyncpg://u:p@replica/db"
+        assert get_engine("analytics")[0] == "postgresql+asyncpg://u:p@primary/db"
+        assert "analytics@replica0" in db_mod.get_engines()
+
+    def test_unknown_pool_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown database pool"):
+            get_engine("reports")
+
+    def test_pool_stats_cover_every_pool(self):
+        get_engine()
+        assert "interactive" in get_pool_stats()
+
+    @pytest.mark.asyncio
+    async def test_pool_stats_report_utilization(self):
+        engine = create_async_engine(
+            "sqlite+aiosqlite://", poolclass=AsyncAdaptedQueuePool, pool_size=2, max_overflow=1
+        )
+        async with engine.connect():
+            stats = get_pool_stats(engine)
+        await engine.dispose()
+        assert stats["checked_out"] == 1
+        assert stats["utilization"] == round(1 / 3, 3)
+
+
+class TestRouteSelection:
+    @pytest.mark.asyncio
+    async def test_db_route_sets_pool_for_the_call(self):
+        seen = []
+
+        @db_route(pool="analytics", read_only=True)
+        async def report():
+            seen.append((db_mod._pool_var.get(), db_mod._read_only_var.get()))
+
+        await report()
+        assert seen == [("analytics", True)]
+        assert db_mod._pool_var.get() == "interactive"
+
+    @pytest.mark.asyncio
+    async def test_routed_sessions_do_not_join_unit_of_work(self):
+        await init_db()
+        async with unit_of_work() as uow:
+            with use_pool("analytics", read_only=True):
+                async with AsyncSessionLocal() as session:
+                    assert not isinstance(session, db_mod._JoinedSession)
+            async with AsyncSessionLocal() as session:
+                assert isinstance(session, db_mod._JoinedSession)
+        assert uow.joins == 1
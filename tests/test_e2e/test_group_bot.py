@@ -28,30 +28,35 @@ class TestWordList:
 
 
 class TestFloodControl:
-    def test_is_flooding_first_message(self):
-        result, reason = is_flooding(user_id=99999)
+    @pytest.mark.asyncio
+    async def test_is_flooding_first_message(self):
+        result, reason = await is_flooding(user_id=99999)
         assert result is False
         assert reason == ""
 
-    def test_is_flooding_with_idempotent_media(self):
-        result, reason = is_flooding(user_id=88888, media_group_id="grp1")
+    @pytest.mark.asyncio
+    async def test_is_flooding_with_idempotent_media(self):
+        result, reason = await is_flooding(user_id=88888, media_group_id="grp1")
         assert result is False
 
-    def test_is_flooding_duplicate_media_skips(self):
-        is_flooding(user_id=77777, media_group_id="grp2")
-        result, reason = is_flooding(user_id=77777, media_group_id="grp2")
+    @pytest.mark.asyncio
+    async def test_is_flooding_duplicate_media_skips(self):
+        await is_flooding(user_id=77777, media_group_id="grp2")
+        result, reason = await is_flooding(user_id=77777, media_group_id="grp2")
         assert result is False
 
-    def test_check_bot_command_limit_free_user(self):
-        limited, msg, _ = check_bot_command_limit(user_id=11111, is_pro=False)
+    @pytest.mark.asyncio
+    async def test_check_bot_command_limit_free_user(self):
+        limited, msg, _ = await check_bot_command_limit(user_id=11111, is_pro=False)
         assert limited is False
 
-    def test_warning_cycle(self):
-        assert get_warning_count(user_id=22222) == 0
-        add_warning(user_id=22222)
-        assert get_warning_count(user_id=22222) == 1
-        clear_warnings(user_id=22222)
-        assert get_warning_count(user_id=22222) == 0
+    @pytest.mark.asyncio
+    async def test_warning_cycle(self):
+        assert await get_warning_count(user_id=22222) == 0
+        await add_warning(user_id=22222)
+        assert await get_warning_count(user_id=22222) == 1
+        await clear_warnings(user_id=22222)
+        assert await get_warning_count(user_id=22222) == 0
 
     def test_get_flood_action_free_user(self):
         action, duration = get_flood_action(warning_count=1, is_pro=False)
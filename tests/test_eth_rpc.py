@@ -0,0 +1,78 @@
+"""Tests for the batching, multi-endpoint Ethereum RPC client."""
+
+import json
+
+import httpx
+import pytest
+
+from zenith_crypto_bot.eth_rpc import EthRpcClient, RpcError
+
+
+class _Node:
+    """Fake JSON-RPC nodes keyed by host; ``down`` hosts answer 503."""
+
+    def __init__(self, *down: str):
+        self.down = set(down)
+        self.requests: list[tuple[str, list]] = []
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.requests.append((request.url.host, payload))
+        if request.url.host in self.down:
+            return httpx.Response(503)
+        answers = []
+        for call in payload:
+            if call["method"] == "eth_call":
+                answers.append({"jsonrpc": "2.0", "id": call["id"], "error": {"code": 3, "message": "reverted"}})
+            else:
+                answers.append({"jsonrpc": "2.0", "id": call["id"], "result": hex(100 + len(answers))})
+        # Nodes may answer a batch in any order
+        return httpx.Response(200, json=answers[::-1])
+
+
+class TestEthRpcClient:
+    @pytest.mark.asyncio
+    async def test_batch_is_one_request_with_ordered_results(self):
+        node = _Node()
+        rpc = EthRpcClient(["https://a.node"], lambda: node.client, breaker="test_rpc_batch")
+        results = await rpc.batch([("eth_gasPrice", []), ("eth_getBlockByNumber", ["latest", False])])
+        assert results == ["0x64", "0x65"]
+        assert len(node.requests) == 1
+        assert [call["method"] for call in node.requests[0][1]] == ["eth_gasPrice", "eth_getBlockByNumber"]
+
+    @pytest.mark.asyncio
+    async def test_failing_endpoint_fails_over_and_is_benched(self):
+        node = _Node("a.node")
+        rpc = EthRpcClient(["https://a.node", "https://b.node"], lambda: node.client, breaker="test_rpc_failover")
+        assert await rpc.call("eth_gasPrice") == "0x64"
+        assert await rpc.call("eth_gasPrice") == "0x64"
+        assert [host for host, _ in node.requests] == ["a.node", "b.node", "b.node"]
+
+    @pytest.mark.asyncio
+    async def test_all_endpoints_down_counts_against_the_breaker(self):
+        node = _Node("a.node")
+        rpc = EthRpcClient(["https://a.node"], lambda: node.client, breaker="test_rpc_down")
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await rpc.call("eth_gasPrice")
+        with pytest.raises(RuntimeError, match="circuit open"):
+            await rpc.call("eth_gasPrice")
+        assert len(node.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_error_object_raises_rpc_error(self):
+        node = _Node()
+        rpc = EthRpcClient(["https://a.node"], lambda: node.client, breaker="test_rpc_error")
+        with pytest.raises(RpcError, match="reverted"):
+            await rpc.call("eth_call", {"to": "0x0"}, "latest")
+
+    @pytest.mark.asyncio
+    async def test_block_number_is_cached_for_a_block_time(self):
+        node = _Node()
+        rpc = EthRpcClient(["https://a.node"], lambda: node.client, breaker="test_rpc_block")
+        assert await rpc.block_number() == 100
+        assert await rpc.block_number() == 100
+        rpc.note_block(105)
+        assert await rpc.block_number() == 105
+        assert len(node.requests) == 1
@@ -0,0 +1,81 @@
+"""Tests for lease-based leader election (SQLite lease-table mode)."""
+
+import asyncio
+
+import pytest
+
+import core.leader as leader
+from core.database import get_engine, init_db
+from core.leader import LeaderElector, leader_only
+
+
+def _elector(**kwargs) -> LeaderElector:
+    return LeaderElector(get_engine(), use_advisory_locks=False, **kwargs)
+
+
+class TestLeaseElection:
+    @pytest.mark.asyncio
+    async def test_single_leader_and_handover_on_release(self):
+        await init_db()
+        a, b = _elector(), _elector()
+        a.register("test.handover")
+        b.register("test.handover")
+
+        await a.tick()
+        await b.tick()
+        assert a.is_leader("test.handover")
+        assert not b.is_leader("test.handover")
+
+        await a.release()
+        await b.tick()
+        assert b.is_leader("test.handover")
+        await b.release()
+
+    @pytest.mark.asyncio
+    async def test_stale_lease_is_taken_over(self):
+        await init_db()
+        a, b = _elector(lease_seconds=0.05), _elector()
+        a.register("test.failover")
+        b.register("test.failover")
+
+        await a.tick()
+        assert a.is_leader("test.failover")
+        await asyncio.sleep(0.1)  # leader stops renewing
+        await b.tick()
+        assert b.is_leader("test.failover")
+
+        await a.tick()
+        assert not a.is_leader("test.failover")
+        await b.release()
+
+
+class TestLeaderOnly:
+    @pytest.mark.asyncio
+    async def test_loop_cancelled_when_lease_lost(self, monkeypatch):
+        await init_db()
+        elector = _elector()
+        monkeypatch.setattr(leader, "_elector", elector)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def loop():
+            started.set()
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        runner = asyncio.create_task(leader_only("test.loop", loop)())
+        await asyncio.sleep(0)
+        await elector.tick()
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        elector._drop_all()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert not runner.done()
+
+        runner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        await elector.release()
@@ -0,0 +1,45 @@
+"""Tests for the compiled-statement fast path used by hot repository lookups."""
+
+import pytest
+
+from core.database import init_db, unit_of_work
+from core.state_backend import get_state_backend
+from zenith_ai_bot.repository import SettingsRepo as AISettingsRepo
+from zenith_group_bot.repository import GroupRepo, GroupSettingsRow, MemberRepo, SettingsRepo, quarantine_cache
+
+
+class TestHotLookups:
+    @pytest.mark.asyncio
+    async def test_get_settings_returns_slots_row(self):
+        await init_db()
+        await SettingsRepo.upsert_settings(-1001, 42, "Lookup Group", features="spam", strength="high")
+        await get_state_backend().delete("group_settings:-1001")
+
+        settings = await SettingsRepo.get_settings(-1001)
+        assert isinstance(settings, GroupSettingsRow)
+        assert (settings.owner_id, settings.group_name, settings.strength) == (42, "Lookup Group", "high")
+        assert not hasattr(settings, "__dict__")
+        assert await SettingsRepo.get_settings(-1999) is None
+
+    @pytest.mark.asyncio
+    async def test_strikes_and_quarantine(self):
+        await init_db()
+        assert await GroupRepo.get_strikes(7, -1002) == 0
+        await GroupRepo.process_violation(7, -1002)
+        await GroupRepo.process_violation(7, -1002)
+        assert await GroupRepo.get_strikes(7, -1002) == 2
+
+        await MemberRepo.register_new_member(8, -1002)
+        assert await MemberRepo.is_restricted(8, -1002) is True
+        quarantine_cache.pop("-1002_9", None)
+        assert await MemberRepo.is_restricted(9, -1002) is False
+        assert quarantine_cache.get("-1002_9") == "CLEARED"
+
+    @pytest.mark.asyncio
+    async def test_api_key_lookup_sees_unit_of_work_writes(self):
+        await init_db()
+        async with unit_of_work() as uow:
+            await AISettingsRepo.set_api_key(9, "gsk_test")
+            assert await AISettingsRepo.get_api_key(9) == "gsk_test"
+        assert uow.joins == 2
+        assert await AISettingsRepo.get_api_key(10) is None
@@ -1,6 +1,11 @@
+import asyncio
+
 import pytest
 
+from core.cache import get_cache_stats
 from zenith_crypto_bot.market_service import close_market_client, resolve_token_id
+from zenith_crypto_bot.market_snapshot import MarketSnapshot
+from zenith_crypto_bot.price_feed import PriceStore
 
 
 @pytest.mark.asyncio
@@ -29,3 +34,122 @@ class TestResolveTokenId:
         assert resolve_token_id("BTC") == "bitcoin"
         assert resolve_token_id("Btc") == "bitcoin"
         assert resolve_token_id("Eth") == "ethereum"
+
+
+class _FakeCoinGecko:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[str]] = []
+        self.fail = fail
+
+    async def __call__(self, ids: list[str]) -> dict | None:
+        self.batches.append(ids)
+        await asyncio.sleep(0)
+        if self.fail:
+            return None
+        return {i: {"usd": 100.0, "usd_24h_change": 1.5} for i in ids if i != "nosuchcoin"}
+
+
+class TestPriceStore:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_batch(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, name="test.price.coalesce")
+        a, b = await asyncio.gather(store.get(["bitcoin", "ethereum"]), store.get(["bitcoin", "solana"]))
+        assert upstream.batches == [["bitcoin", "ethereum", "solana"]]
+        assert set(a) == {"bitcoin", "ethereum"}
+        assert b["solana"].as_coingecko()["usd"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_fresh_quotes_are_served_from_memory(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, name="test.price.fresh")
+        await store.get(["bitcoin"])
+        await store.get(["bitcoin"])
+        assert len(upstream.batches) == 1
+        assert get_cache_stats()["test.price.fresh"] == {"hits": 1, "misses": 1, "size": 1}
+
+    @pytest.mark.asyncio
+    async def test_refresh_covers_recent_reads_in_batches(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, batch_size=2, name="test.price.refresh")
+        await store.get(["bitcoin"])
+        upstream.batches.clear()
+        assert await store.refresh(["ethereum", "solana"]) == 3
+        assert upstream.batches == [["bitcoin", "ethereum"], ["solana"]]
+
+    @pytest.mark.asyncio
+    async def test_stale_quote_is_served_when_upstream_fails(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, max_age=0, name="test.price.stale")
+        await store.get(["bitcoin"])
+        upstream.fail = True
+        quotes = await store.get(["bitcoin"])
+        assert quotes["bitcoin"].usd == 100.0
+        assert len(upstream.batches) == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_ids_are_not_refetched(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, name="test.price.unknown")
+        assert await store.get(["nosuchcoin"]) == {}
+        assert await store.get(["nosuchcoin"]) == {}
+        assert len(upstream.batches) == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_quotes_younger_than_min_age(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, name="test.price.min_age")
+        store.ingest({"bitcoin": {"usd": 1.0, "usd_24h_change": 0.0}})
+        assert await store.refresh(["bitcoin", "ethereum"], min_age=30) == 1
+        assert upstream.batches == [["ethereum"]]
+
+
+def _market_row(coin_id: str, change: float | None, market_cap: float, volume: float) -> dict:
+    return {
+        "id": coin_id,
+        "symbol": coin_id[:3],
+        "name": coin_id.title(),
+        "current_price": 10.0,
+        "price_change_percentage_24h": change,
+        "market_cap": market_cap,
+        "total_volume": volume,
+    }
+
+
+class TestMarketSnapshot:
+    def _snapshot(self) -> MarketSnapshot:
+        return MarketSnapshot(
+            [
+                _market_row("bitcoin", 2.0, 600, 30),
+                _market_row("ethereum", -1.0, 300, 20),
+                _market_row("solana", 9.0, 50, 25),
+                _market_row("pepe", -12.0, 30, 5),
+                _market_row("dogecoin", None, 20, 1),
+                _market_row("ethereum", 5.0, 300, 20),  # repeated on the next page
+            ]
+        )
+
+    def test_movers_and_volume_leaders(self):
+        snapshot = self._snapshot()
+        assert len(snapshot) == 5
+        assert [g["id"] for g in snapshot.gainers(2)] == ["solana", "bitcoin"]
+        assert [loser["id"] for loser in snapshot.losers(2)] == ["pepe", "ethereum"]
+        assert [v["id"] for v in snapshot.volume_leaders(2)] == ["bitcoin", "solana"]
+        assert snapshot.gainers(0) == []
+
+    def test_dominance_breadth_and_percentiles(self):
+        snapshot = self._snapshot()
+        assert snapshot.dominance("bitcoin") == 60.0
+        assert snapshot.dominance("unknown") is None
+        assert snapshot.breadth() == 40.0
+        assert snapshot.change_percentile(50) == 0.0
+        assert snapshot.change_percentile(100) == 9.0
+
+    @pytest.mark.asyncio
+    async def test_feeds_the_price_store(self):
+        upstream = _FakeCoinGecko()
+        store = PriceStore(upstream, name="test.price.snapshot")
+        assert store.ingest(self._snapshot().price_quotes()) == 5
+        quotes = await store.get(["bitcoin", "ethereum"])
+        assert quotes["ethereum"].change_24h == -1.0
+        assert upstream.batches == []
@@ -0,0 +1,81 @@
+"""Tests for the in-process Prometheus exporter and metered caches."""
+
+import pytest
+
+from core import metrics
+from core.cache import MeteredTTLCache, async_ttl_cache, get_cache_stats
+from core.gateway import _route_label
+
+
+class TestInstruments:
+    def test_counter_renders_with_total_suffix(self):
+        registry = metrics.Registry()
+        sent = registry.counter("test_sent", "Sent", ["bot"])
+        sent.inc(bot="group")
+        sent.inc(2, bot="group")
+        assert 'test_sent_total{bot="group"} 3' in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = metrics.Registry()
+        latency = registry.histogram("test_latency", "Latency", ["route"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, route="/start")
+        text = registry.render()
+        assert 'test_latency_bucket{route="/start",le="0.1"} 1' in text
+        assert 'test_latency_bucket{route="/start",le="1"} 2' in text
+        assert 'test_latency_bucket{route="/start",le="+Inf"} 3' in text
+        assert 'test_latency_count{route="/start"} 3' in text
+
+    def test_label_cardinality_is_capped(self, monkeypatch):
+        monkeypatch.setattr(metrics, "MAX_SERIES", 3)
+        counter = metrics.Counter("test_capped", "Capped", ["route"])
+        for i in range(10):
+            counter.inc(route=f"/cmd{i}")
+        assert len(counter._series) == 4
+        assert counter.value(route="other") == 7
+
+    def test_failing_collector_is_skipped(self):
+        registry = metrics.Registry()
+        registry.gauge("test_broken", "Broken", lambda: 1 / 0)
+        registry.gauge("test_ok", "Ok", lambda: [({"pool": "interactive"}, 2)])
+        text = registry.render()
+        assert "test_broken" not in text
+        assert 'test_ok{pool="interactive"} 2' in text
+
+    def test_label_values_are_escaped(self):
+        registry = metrics.Registry()
+        registry.counter("test_escaped", "Escaped", ["route"]).inc(route='say "hi"\n')
+        assert 'test_escaped_total{route="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+class TestRouteLabel:
+    def test_callback_ids_are_dropped(self):
+        assert _route_label("callback:admin_db_queries") == "callback:admin_db"
+        assert _route_label("callback:alert_del_42_7") == "callback:alert_del"
+
+    def test_commands_pass_through(self):
+        assert _route_label("/start") == "/start"
+
+
+class TestMeteredCache:
+    def test_lookups_are_counted(self):
+        cache = MeteredTTLCache("test.lookups", maxsize=10, ttl=60)
+        assert cache.get("a") is None
+        cache["a"] = 1
+        assert cache.get("a") == 1
+        assert "b" not in cache
+        assert "a" in cache
+        assert cache["a"] == 1
+        cache.pop("a", None)
+        assert get_cache_stats()["test.lookups"] == {"hits": 2, "misses": 2, "size": 0}
+
+    @pytest.mark.asyncio
+    async def test_async_ttl_cache_registers_by_qualname(self):
+        @async_ttl_cache(ttl=60)
+        async def lookup(x):
+            return x * 2
+
+        assert await lookup(2) == 4
+        assert await lookup(2) == 4
+        stats = get_cache_stats()[lookup.__qualname__]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
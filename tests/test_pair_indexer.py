@@ -0,0 +1,102 @@
+"""Tests for the incremental new-pair indexer."""
+
+import pytest
+from sqlalchemy import delete
+
+from core.database import AsyncSessionLocal, init_db
+from zenith_crypto_bot import pair_indexer as indexer_module
+from zenith_crypto_bot.models import IndexerCursor, NewPair
+from zenith_crypto_bot.pair_indexer import CURSOR_NAME, PairIndexer
+from zenith_crypto_bot.repository import NewPairRepo
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+
+def _pair(n: int, block: int) -> dict:
+    return {
+        "pair": f"0x{n:040x}",
+        "token0": f"0x{n + 1000:040x}",
+        "token1": WETH,
+        "block": block,
+        "tx_hash": f"0x{n:064x}",
+        "removed": False,
+    }
+
+
+class _Chain:
+    def __init__(self, head: int):
+        self.head = head
+        self.pairs: list[dict] = []
+        self.ranges: list[tuple[int, int]] = []
+        self.audited: list[str] = []
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    async def block_number(self) -> int:
+        return self.head
+
+    async def get_logs(self, from_block: int, to_block: int) -> list[dict]:
+        self.ranges.append((from_block, to_block))
+        return [p for p in self.pairs if from_block <= p["block"] <= to_block]
+
+    async def audit(self, token: str):
+        self.audited.append(token)
+
+
+@pytest.fixture
+async def chain(monkeypatch):
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(NewPair))
+        await session.execute(delete(IndexerCursor))
+        await session.commit()
+    chain = _Chain(head=1000)
+    monkeypatch.setattr(indexer_module, "eth_rpc", chain)
+    monkeypatch.setattr(indexer_module, "get_pair_created_logs", chain.get_logs)
+    monkeypatch.setattr(indexer_module, "get_token_security", chain.audit)
+    return chain
+
+
+class TestPairIndexer:
+    @pytest.mark.asyncio
+    async def test_follows_the_cursor_and_rechecks_recent_blocks(self, chain):
+        chain.pairs = [_pair(1, 990)]
+        indexer = PairIndexer(reorg_depth=3)
+        assert await indexer.run_once() == 1
+        assert await NewPairRepo.get_cursor(CURSOR_NAME) == 1000
+
+        chain.head = 1004
+        chain.pairs.append(_pair(2, 1003))
+        assert await indexer.run_once() == 1
+        assert chain.ranges == [(950, 1000), (998, 1004)]
+        assert [p["pair"] for p in await indexer.latest()] == [_pair(2, 0)["pair"], _pair(1, 0)["pair"]]
+
+    @pytest.mark.asyncio
+    async def test_reorged_pairs_are_dropped(self, chain):
+        chain.pairs = [_pair(3, 999), _pair(4, 1000)]
+        indexer = PairIndexer(reorg_depth=3)
+        await indexer.run_once()
+
+        chain.head = 1001
+        chain.pairs = [_pair(3, 999)]
+        assert await indexer.run_once() == 0
+        assert [p["pair"] for p in await NewPairRepo.get_latest()] == [_pair(3, 0)["pair"]]
+        assert [p["pair"] for p in await indexer.latest()] == [_pair(3, 0)["pair"]]
+
+    @pytest.mark.asyncio
+    async def test_restart_resumes_from_the_stored_cursor(self, chain):
+        chain.pairs = [_pair(5, 995)]
+        await PairIndexer(reorg_depth=3).run_once()
+
+        chain.head = 1002
+        restarted = PairIndexer(reorg_depth=3)
+        assert await restarted.run_once() == 0
+        assert chain.ranges[-1] == (998, 1002)
+
+    @pytest.mark.asyncio
+    async def test_security_is_prefetched_for_listed_tokens_only(self, chain):
+        chain.pairs = [_pair(6, 1000)]
+        await PairIndexer().run_once()
+        assert chain.audited == [_pair(6, 0)["token0"]]
@@ -0,0 +1,111 @@
+"""Tests for unified tier resolution across both subscription tables."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import core.permissions as permissions
+from core.database import AsyncSessionLocal, get_engine, init_db, unit_of_work
+from core.permissions import PRODUCT_GROUP, resolve_tier
+from core.state_backend import get_state_backend
+from zenith_crypto_bot.repository import CryptoSubscriptionRepo
+from zenith_group_bot.models import GroupSubscription
+
+
+@pytest.fixture
+def statements():
+    executed = []
+    engine = get_engine().sync_engine
+
+    def on_execute(_conn, _cursor, statement, *_args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+
+class TestResolveTier:
+    @pytest.mark.asyncio
+    async def test_both_products_from_one_cached_query(self, statements):
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            session.add(GroupSubscription(user_id=501, expires_at=datetime.now(UTC) + timedelta(days=9, hours=12)))
+            await session.commit()
+        statements.clear()
+
+        group = await resolve_tier(501, product=PRODUCT_GROUP)
+        crypto = await resolve_tier(501)
+
+        assert (group.is_pro, group.days_left, group.tier_name) == (True, 10, "pro")
+        assert (crypto.is_pro, crypto.days_left, crypto.tier_name) == (False, 0, "free")
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_extend_and_revoke_invalidate(self):
+        await init_db()
+        assert not (await resolve_tier(502)).is_pro  # cached as free
+
+        ok, _ = await CryptoSubscriptionRepo.extend_subscription(502, days=30)
+        assert ok
+        assert (await resolve_tier(502)).days_left == 30
+
+        await CryptoSubscriptionRepo.revoke_subscription(502)
+        assert not (await resolve_tier(502)).is_pro
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_cached_before_commit_is_dropped_after(self):
+        await init_db()
+        backend = get_state_backend()
+        async with unit_of_work():
+            await CryptoSubscriptionRepo.extend_subscription(505, days=7)
+            # A concurrent update re-caches the pre-commit tier
+            await backend.set(permissions._tier_key(505), {"crypto": None, "group": None}, ttl=600)
+        await asyncio.sleep(0)
+        assert (await resolve_tier(505)).days_left == 7
+
+    @pytest.mark.asyncio
+    async def test_tier_cached_from_a_rolled_back_change_is_dropped(self):
+        await init_db()
+        async with unit_of_work() as uow:
+            await CryptoSubscriptionRepo.extend_subscription(506, days=7)
+            # Read through the shared session, so this caches the uncommitted tier
+            assert (await resolve_tier(506)).days_left == 7
+            # As after a connection error: the unit of work rolls back instead of committing
+            uow.detach()
+        assert await get_state_backend().get(permissions._tier_key(506)) is None
+
+    @pytest.mark.asyncio
+    async def test_owner_short_circuits(self, statements):
+        statements.clear()
+        tier = await resolve_tier(12345, product=PRODUCT_GROUP)
+        assert tier.is_owner
+        assert tier.can_access_pro
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_product_rejected(self):
+        with pytest.raises(ValueError, match="Unknown product"):
+            await resolve_tier(504, product="support")
+
+
+class TestTierCacheTtl:
+    def test_ttl_ends_at_soonest_expiry(self):
+        now = datetime.now(UTC)
+        expiries = {"crypto": now + timedelta(seconds=90), "group": now + timedelta(days=3)}
+        assert permissions._cache_ttl(expiries, now) == pytest.approx(90)
+
+    def test_no_subscription_is_cached_for_full_cap(self):
+        now = datetime.now(UTC)
+        expired = {"crypto": now - timedelta(days=1), "group": None}
+        assert permissions._cache_ttl(expired, now) == permissions._TIER_CACHE_MAX_TTL
+
+    @pytest.mark.asyncio
+    async def test_cached_entry_is_dropped(self):
+        await init_db()
+        await resolve_tier(503)
+        assert await get_state_backend().get(permissions._tier_key(503)) is not None
+        await permissions.invalidate_tier_cache(503)
+        assert await get_state_backend().get(permissions._tier_key(503)) is None
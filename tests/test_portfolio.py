@@ -0,0 +1,129 @@
+"""Tests for portfolio valuation and value history."""
+
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from core.database import AsyncSessionLocal, init_db, unit_of_work
+from core.state_backend import get_state_backend
+from zenith_crypto_bot import portfolio as portfolio_module
+from zenith_crypto_bot.models import PortfolioSnapshot, PriceAlert, WatchlistToken
+from zenith_crypto_bot.portfolio import PortfolioValuation, get_portfolio, snapshot_portfolios
+from zenith_crypto_bot.price_feed import PriceQuote
+from zenith_crypto_bot.repository import (
+    CryptoSubscriptionRepo,
+    PortfolioHistoryRepo,
+    Position,
+    PriceAlertRepo,
+    WatchlistRepo,
+    _positions_key,
+)
+
+USER = 5_000_001
+OTHER = 5_000_002
+
+
+def _quote(usd: float, change: float | None = 0.0) -> PriceQuote:
+    return PriceQuote(usd, change, time.time())
+
+
+class _Prices:
+    def __init__(self, quotes: dict[str, PriceQuote]):
+        self.quotes = quotes
+        self.reads: list[set[str]] = []
+
+    async def get(self, token_ids):
+        wanted = set(token_ids)
+        self.reads.append(wanted)
+        return {t: q for t, q in self.quotes.items() if t in wanted}
+
+
+@pytest.fixture
+async def prices(monkeypatch):
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        for model in (WatchlistToken, PortfolioSnapshot, PriceAlert):
+            await session.execute(delete(model).where(model.user_id.in_([USER, OTHER])))
+        await session.commit()
+    for user_id in (USER, OTHER):
+        await get_state_backend().delete(_positions_key(user_id))
+    prices = _Prices({"bitcoin": _quote(60_000, 20.0), "ethereum": _quote(2_000, -50.0)})
+    monkeypatch.setattr(portfolio_module, "price_store", prices)
+    return prices
+
+
+class TestPortfolioValuation:
+    def test_values_every_position_in_one_pass(self):
+        positions = [Position("bitcoin", "BTC", 50_000, 0.5), Position("ethereum", "ETH", 1_000, 10)]
+        valuation = PortfolioValuation(positions, {"bitcoin": _quote(60_000, 20.0), "ethereum": _quote(2_000, -50.0)})
+        assert list(valuation.value) == [30_000, 20_000]
+        assert list(valuation.pnl_usd) == [5_000, 10_000]
+        assert list(valuation.pnl_pct) == [20.0, 100.0]
+        assert list(valuation.weight) == [60.0, 40.0]
+        assert (valuation.total_value, valuation.total_cost, valuation.total_pnl) == (50_000, 35_000, 15_000)
+        assert valuation.total_pnl_pct == pytest.approx(42.857, abs=1e-3)
+        # 24h ago: 30_000 / 1.2 + 20_000 / 0.5 = 65_000
+        assert valuation.change_24h_pct == pytest.approx((50_000 - 65_000) / 65_000 * 100)
+        assert valuation.unpriced == 0
+
+    def test_unpriced_and_empty_portfolios(self):
+        valuation = PortfolioValuation([Position("unlisted", "UNL", 1.0, 100)], {"unlisted": _quote(1.0, None)})
+        assert list(valuation.change_24h) == [0.0]
+        missing = PortfolioValuation([Position("unlisted", "UNL", 1.0, 100)], {})
+        assert missing.unpriced == 1
+        assert missing.total_pnl == -100
+        empty = PortfolioValuation([], {})
+        assert (empty.total_value, empty.total_pnl_pct, empty.change_24h_pct) == (0, 0, 0)
+        assert empty.ai_context() == "Portfolio: Empty"
+
+
+class TestPortfolioService:
+    @pytest.mark.asyncio
+    async def test_positions_are_cached_until_the_watchlist_changes(self, prices):
+        await WatchlistRepo.add_token(USER, "bitcoin", "btc", 50_000, 0.5)
+        first = await WatchlistRepo.get_positions(USER)
+        assert first == (Position("bitcoin", "BTC", 50_000, 0.5),)
+        assert await WatchlistRepo.get_positions(USER) is first
+
+        await WatchlistRepo.add_token(USER, "ethereum", "eth", 1_000, 10)
+        portfolio = await get_portfolio(USER)
+        assert {p.token_id for p in portfolio.positions} == {"bitcoin", "ethereum"}
+        assert prices.reads == [{"bitcoin", "ethereum"}]
+        assert "Portfolio Value: $50,000.00" in portfolio.ai_context()
+
+        await WatchlistRepo.remove_token(USER, "bitcoin")
+        assert [p.token_id for p in (await get_portfolio(USER)).positions] == ["ethereum"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("prices")
+    async def test_ai_context_reads_counts_in_one_query(self):
+        await WatchlistRepo.add_token(USER, "bitcoin", "btc", 50_000, 0.5)
+        await PriceAlertRepo.create_alert(USER, "bitcoin", "btc", 70_000, "above")
+        portfolio = await get_portfolio(USER)
+        context = await CryptoSubscriptionRepo.get_user_ai_context(USER, portfolio.ai_context())
+        lines = context.split("\n")
+        assert lines[0] == "Subscription: Free tier"
+        assert lines[1].startswith("Portfolio: BTC x0.5 @ $50,000.00 (now $60,000.00, +20.0%, 100% of value)")
+        assert lines[3:] == ["Active Alerts: 1", "Tracked Wallets: 0", "Saved Audits: 0"]
+
+    @pytest.mark.asyncio
+    async def test_snapshots_skip_portfolios_with_a_missing_price(self, prices):
+        await WatchlistRepo.add_token(USER, "bitcoin", "btc", 50_000, 0.5)
+        await WatchlistRepo.add_token(USER, "ethereum", "eth", 1_000, 10)
+        await WatchlistRepo.add_token(OTHER, "unlisted", "unl", 1.0, 100)
+        await snapshot_portfolios()
+        assert len(prices.reads) == 1
+
+        history = await PortfolioHistoryRepo.get_history(USER)
+        assert [(value, cost) for _, value, cost in history] == [(50_000, 35_000)]
+        assert await PortfolioHistoryRepo.get_history(OTHER) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("prices")
+    async def test_positions_cached_mid_update_are_dropped_after_commit(self):
+        async with unit_of_work():
+            await WatchlistRepo.add_token(USER, "bitcoin", "btc", 50_000, 0.5)
+            assert len(await WatchlistRepo.get_positions(USER)) == 1
+            assert await get_state_backend().get(_positions_key(USER)) is not None
+        assert await get_state_backend().get(_positions_key(USER)) is None
@@ -0,0 +1,67 @@
+"""Tests for per-repo query timings, slow-query sampling and N+1 detection."""
+
+import pytest
+from sqlalchemy import text
+
+import core.query_profiler as profiler
+from core.database import AsyncSessionLocal, db_retry, init_db
+from core.query_profiler import get_query_report, query_scope
+from zenith_group_bot.repository import GroupRepo
+
+
+@db_retry
+async def _lookup_secret(secret: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SELECT :secret"), {"secret": secret})
+
+
+@pytest.fixture(autouse=True)
+def _clean_stats():
+    profiler.reset_query_stats()
+    yield
+    profiler.reset_query_stats()
+
+
+class TestQueryProfiler:
+    @pytest.mark.asyncio
+    async def test_statements_are_tagged_by_repo_method(self):
+        await init_db()
+        await GroupRepo.get_strikes(11, -4001)
+        await GroupRepo.get_strikes(12, -4001)
+
+        repos = get_query_report()["repos"]
+        assert repos["GroupRepo.get_strikes"]["count"] == 2
+        assert repos["GroupRepo.get_strikes"]["p95_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_slow_queries_are_sampled_redacted(self, monkeypatch):
+        monkeypatch.setattr(profiler, "DB_SLOW_QUERY_MS", 0)
+        await _lookup_secret("hunter2")
+
+        slow = get_query_report()["slow_queries"]
+        assert slow[-1]["repo"] == "_lookup_secret"
+        assert "hunter2" not in str(slow)
+        assert slow[-1]["parameters"] == ["str"]
+
+    @pytest.mark.asyncio
+    async def test_chatty_update_is_flagged(self, monkeypatch):
+        await init_db()
+        monkeypatch.setattr(profiler, "DB_N_PLUS_ONE_THRESHOLD", 2)
+        with query_scope("/analytics") as scope:
+            for user_id in range(3):
+                await GroupRepo.get_strikes(user_id, -4002)
+
+        assert scope.queries == 3
+        suspect = get_query_report()["n_plus_one"][-1]
+        assert suspect["label"] == "/analytics"
+        assert suspect["top_repos"] == [("GroupRepo.get_strikes", 3)]
+
+
+class TestLatencyHistogram:
+    def test_percentiles_use_bucket_bounds(self):
+        hist = profiler.LatencyHistogram()
+        for ms in (0.5, 3, 4, 40, 4000):
+            hist.observe(ms)
+        assert hist.percentile(0.5) == 5
+        assert hist.percentile(1.0) == 4000
+        assert hist.to_dict()["count"] == 5
@@ -0,0 +1,85 @@
+"""Tests for the sliding-window limiter and its batched persistence."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from core.database import init_db
+from core.rate_limit_repo import RateLimitRepo
+from core.rate_limiter import SlidingWindowLimiter
+
+
+class TestSlidingWindow:
+    @pytest.mark.asyncio
+    async def test_blocks_after_limit(self):
+        limiter = SlidingWindowLimiter()
+        limiter._hydrated.add("cmd_60")
+        for _ in range(3):
+            allowed, _ = await limiter.check(1, "cmd", 3, 60)
+            assert allowed
+        allowed, seconds_left = await limiter.check(1, "cmd", 3, 60)
+        assert not allowed
+        assert seconds_left >= 1
+
+    @pytest.mark.asyncio
+    async def test_pending_deltas_are_aggregated(self):
+        limiter = SlidingWindowLimiter()
+        limiter._hydrated.add("cmd_60")
+        for uid in (1, 1, 2):
+            await limiter.check(uid, "cmd", 10, 60)
+        totals = {}
+        for (uid, action, _), count in limiter._pending.items():
+            assert action == "cmd"
+            totals[uid] = totals.get(uid, 0) + count
+        assert totals == {1: 2, 2: 1}
+
+
+class TestPersistence:
+    @pytest.mark.asyncio
+    async def test_flush_upserts_and_accumulates(self):
+        await init_db()
+        limiter = SlidingWindowLimiter()
+        limiter._hydrated.add("flush_60")
+        for _ in range(3):
+            await limiter.check(7, "flush", 10, 60)
+        assert await limiter.flush() == 1
+        await limiter.check(7, "flush", 10, 60)
+        await limiter.flush()
+        assert limiter._pending == {}
+
+        since = datetime.now(UTC).replace(tzinfo=None, second=0, microsecond=0)
+        counts = await RateLimitRepo.get_all_active("flush", since.replace(minute=0))
+        assert counts == {7: 4}
+
+    @pytest.mark.asyncio
+    async def test_rehydrates_after_restart(self):
+        await init_db()
+        window_start = datetime.now(UTC).replace(tzinfo=None, second=0, microsecond=0)
+        await RateLimitRepo.increment_many({(9, "hydrate", window_start): 2})
+
+        limiter = SlidingWindowLimiter()
+        allowed, _ = await limiter.check(9, "hydrate", 3, 3600)
+        assert allowed
+        allowed, _ = await limiter.check(9, "hydrate", 3, 3600)
+        assert not allowed
+
+    @pytest.mark.asyncio
+    async def test_failed_rehydrate_is_retried(self, monkeypatch):
+        await init_db()
+        window_start = datetime.now(UTC).replace(tzinfo=None, second=0, microsecond=0)
+        await RateLimitRepo.increment_many({(10, "blip", window_start): 2})
+
+        async def db_down(*_args):
+            raise ConnectionError("db down")
+
+        monkeypatch.setattr(RateLimitRepo, "get_all_active", db_down)
+        limiter = SlidingWindowLimiter()
+        await limiter.check(11, "blip", 3, 3600)
+        assert "blip_3600" not in limiter._hydrated
+
+        monkeypatch.undo()
+        limiter._hydrate_retry_at.clear()
+        allowed, _ = await limiter.check(10, "blip", 3, 3600)
+        assert allowed
+        allowed, _ = await limiter.check(10, "blip", 3, 3600)
+        assert not allowed
@@ -0,0 +1,112 @@
+"""Tests for the core job scheduler and its triggers."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from core.circuit_breaker import get_breaker
+from core.scheduler import CronTrigger, IntervalTrigger, Scheduler
+
+
+def _ts(*args) -> float:
+    return datetime(*args, tzinfo=UTC).timestamp()
+
+
+class TestCronTrigger:
+    def test_every_minute_rounds_up(self):
+        trigger = CronTrigger("* * * * *")
+        assert trigger.next_fire(_ts(2026, 1, 1, 10, 0, 30)) == _ts(2026, 1, 1, 10, 1)
+
+    def test_daily_at_fixed_time_rolls_to_next_day(self):
+        trigger = CronTrigger("30 3 * * *")
+        assert trigger.next_fire(_ts(2026, 1, 1, 4, 0)) == _ts(2026, 1, 2, 3, 30)
+
+    def test_steps_and_weekdays(self):
+        trigger = CronTrigger("*/15 9-17 * * 1-5")
+        # Saturday 2026-01-03 -> Monday 2026-01-05 09:00
+        assert trigger.next_fire(_ts(2026, 1, 3, 12, 0)) == _ts(2026, 1, 5, 9, 0)
+        assert trigger.next_fire(_ts(2026, 1, 5, 9, 0)) == _ts(2026, 1, 5, 9, 15)
+
+    def test_rejects_bad_expression(self):
+        with pytest.raises(ValueError, match="out of range"):
+            CronTrigger("61 * * * *")
+        with pytest.raises(ValueError, match="5 fields"):
+            CronTrigger("* * *")
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_failing_job_keeps_running(self):
+        sched = Scheduler("test_failing")
+        calls = []
+
+        async def job():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        sched.add_job("flaky", job, IntervalTrigger(0.02, initial_delay=0))
+        await sched.start()
+        await asyncio.sleep(0.15)
+        await sched.stop()
+
+        stats = sched.get_stats()["jobs"]["flaky"]
+        assert len(calls) >= 3
+        assert stats["failures"] == stats["runs"] == len(calls)
+        assert stats["last_error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_overlap_are_counted(self):
+        sched = Scheduler("test_timeout")
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        sched.add_job("slow", slow, IntervalTrigger(0.02, initial_delay=0), timeout=0.05)
+        await sched.start()
+        await asyncio.sleep(0.2)
+        await sched.stop()
+
+        stats = sched.get_stats()["jobs"]["slow"]
+        assert stats["timeouts"] >= 1
+        assert stats["skipped"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_pauses_job(self):
+        breaker = get_breaker("test_sched_breaker")
+        for _ in range(breaker.config.failure_threshold):
+            breaker.record_failure()
+        assert breaker.is_open
+
+        sched = Scheduler("test_breaker")
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        sched.add_job("guarded", job, IntervalTrigger(0.02, initial_delay=0), breaker="test_sched_breaker")
+        await sched.start()
+        await asyncio.sleep(0.1)
+        await sched.stop()
+
+        assert calls == []
+        assert sched.get_stats()["jobs"]["guarded"]["paused"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_worker_is_restarted_after_crash(self):
+        sched = Scheduler("test_worker", worker_restart_delay=0.01)
+        starts = []
+
+        async def worker():
+            starts.append(1)
+            if len(starts) == 1:
+                raise RuntimeError("first start fails")
+            await asyncio.sleep(3600)
+
+        sched.add_worker("consumer", worker)
+        await sched.start()
+        await asyncio.sleep(0.1)
+        await sched.stop()
+
+        assert len(starts) == 2
+        assert sched.get_stats()["workers"]["consumer"]["restarts"] == 1
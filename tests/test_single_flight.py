@@ -0,0 +1,98 @@
+"""Tests for request coalescing of external API calls."""
+
+import asyncio
+
+import pytest
+
+from core.metrics import UPSTREAM_COALESCED
+from core.single_flight import BatchCoalescer, single_flight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_request(self):
+        calls = []
+
+        @single_flight
+        async def fetch_movers(page: int):
+            calls.append(page)
+            await asyncio.sleep(0.01)
+            return {"page": page}
+
+        before = UPSTREAM_COALESCED.value(call=fetch_movers.flight.name)
+        results = await asyncio.gather(*(fetch_movers(1) for _ in range(5)), fetch_movers(2))
+
+        assert calls == [1, 2]
+        assert results[:5] == [{"page": 1}] * 5
+        assert UPSTREAM_COALESCED.value(call=fetch_movers.flight.name) == before + 4
+        assert fetch_movers.flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_nothing_is_kept_after_the_call(self):
+        calls = 0
+
+        @single_flight
+        async def fetch_gas():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await fetch_gas() == 1
+        assert await fetch_gas() == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        @single_flight
+        async def fetch_security(contract: str):
+            await asyncio.sleep(0.01)
+            raise ConnectionError(contract)
+
+        results = await asyncio.gather(fetch_security("0xabc"), fetch_security("0xabc"), return_exceptions=True)
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_shared_call(self):
+        @single_flight
+        async def search(query: str):
+            await asyncio.sleep(0.02)
+            return query.upper()
+
+        first = asyncio.create_task(search("eth"))
+        second = asyncio.create_task(search("eth"))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "ETH"
+
+
+class TestBatchCoalescer:
+    @pytest.mark.asyncio
+    async def test_keys_in_one_window_share_one_fetch(self):
+        batches = []
+
+        async def fetch(keys: set):
+            batches.append(sorted(keys))
+
+        coalescer = BatchCoalescer(fetch, window=0.01)
+        await asyncio.gather(coalescer.request(["btc", "eth"]), coalescer.request(["btc", "sol"]))
+        assert batches == [["btc", "eth", "sol"]]
+
+        await coalescer.request(["btc"])
+        assert batches[-1] == ["btc"]
+        assert coalescer.pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_does_not_wait_and_cancelled_callers_do_not_cancel_the_batch(self):
+        batches = []
+
+        async def fetch(keys: set):
+            await asyncio.sleep(0.01)
+            batches.append(sorted(keys))
+
+        coalescer = BatchCoalescer(fetch, window=0.01)
+        coalescer.submit(["pepe"])
+        first = asyncio.create_task(coalescer.request(["shib"]))
+        second = asyncio.create_task(coalescer.request(["shib"]))
+        await asyncio.sleep(0)
+        first.cancel()
+        await second
+        assert batches == [["pepe", "shib"]]
@@ -36,3 +36,29 @@ class TestGatewayHealth:
         headers = response.headers
         assert headers.get("x-content-type-options") == "nosniff"
         assert "max-age=31536000" in headers.get("strict-transport-security", "")
+
+    @pytest.mark.asyncio
+    async def test_health_db_reports_pools_and_queries(self, client):
+        response = await client.get("/health/db", headers={"Authorization": "Bearer test-secret"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["db_healthy"] is True
+        assert "interactive" in data["pools"]
+        assert {"repos", "slow_queries", "n_plus_one"} <= set(data["queries"])
+
+    @pytest.mark.asyncio
+    async def test_health_db_requires_the_webhook_secret(self, client):
+        assert (await client.get("/health/db")).status_code == 404
+        response = await client.get("/health/db", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 404
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_metrics_exposition(self, client):
+        assert (await client.get("/metrics")).status_code == 404
+        response = await client.get("/metrics", headers={"Authorization": "Bearer test-secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE monolith_handler_duration_seconds histogram" in response.text
+        assert 'monolith_db_pool_size{pool="interactive"}' in response.text
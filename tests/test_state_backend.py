@@ -0,0 +1,190 @@
+"""Contract tests for the shared state backends (local and Redis-protocol)."""
+
+import json
+import pickle
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from core.state_backend import LocalStateBackend, RedisStateBackend
+from zenith_crypto_bot.repository import Position
+from zenith_group_bot.repository import GroupSettingsRow
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands the backend uses."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.expiry: dict[str, float] = {}
+
+    def _gc(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.values.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expiry.pop(key, None)
+
+    async def get(self, key):
+        self._gc(key)
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        self._gc(key)
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.expiry.pop(key, None)
+        if px:
+            self.expiry[key] = time.time() + px / 1000
+        return True
+
+    async def incrby(self, key, amount):
+        self._gc(key)
+        value = int(self.values.get(key, b"0")) + amount
+        self.values[key] = str(value).encode()
+        return value
+
+    async def pexpire(self, key, ms, nx=False):
+        self._gc(key)
+        if key not in self.values and key not in self.zsets:
+            return False
+        if nx and key in self.expiry:
+            return False
+        self.expiry[key] = time.time() + ms / 1000
+        return True
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+        self.zsets.pop(key, None)
+        self.expiry.pop(key, None)
+
+    async def zremrangebyscore(self, key, lo, hi):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if lo <= score <= hi]:
+            del zset[member]
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zrange(self, key, start, stop, withscores=False):  # noqa: ARG002
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1])
+        return items[start : stop + 1]
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    async def zcount(self, key, lo, _hi):
+        floor = float(lo.lstrip("("))
+        return sum(1 for score in self.zsets.get(key, {}).values() if score > floor)
+
+    def pipeline(self, transaction=True):  # noqa: ARG002
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+@pytest.fixture(params=["local", "redis"])
+def backend(request):
+    if request.param == "local":
+        return LocalStateBackend()
+    return RedisStateBackend(FakeRedis())
+
+
+class TestStateBackendContract:
+    @pytest.mark.asyncio
+    async def test_set_get_delete_roundtrip(self, backend):
+        await backend.set("k", {"tier": "pro", "days": 3})
+        assert await backend.get("k") == {"tier": "pro", "days": 3}
+        await backend.delete("k")
+        assert await backend.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_set_if_absent_claims_once(self, backend):
+        assert await backend.set_if_absent("dedup:1", True, ttl=60)
+        assert not await backend.set_if_absent("dedup:1", True, ttl=60)
+
+    @pytest.mark.asyncio
+    async def test_ttl_expires_value(self, backend):
+        await backend.set("short", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert await backend.get("short") is None
+
+    @pytest.mark.asyncio
+    async def test_incr_counts_and_reads_back(self, backend):
+        assert await backend.incr("warn:1", ttl=60) == 1
+        assert await backend.incr("warn:1", ttl=60) == 2
+        assert await backend.get("warn:1") == 2
+
+    @pytest.mark.asyncio
+    async def test_window_hit_enforces_limit(self, backend):
+        results = [await backend.window_hit("rl:x", 2, 60) for _ in range(3)]
+        assert [allowed for allowed, _, _ in results] == [True, True, False]
+        assert results[-1][2] > 0
+        assert await backend.window_count("rl:x", 60) == 2
+
+    @pytest.mark.asyncio
+    async def test_window_hit_record_rejected(self, backend):
+        for _ in range(3):
+            await backend.window_hit("rl:y", 1, 60, record_rejected=True)
+        assert await backend.window_count("rl:y", 60) == 3
+
+
+class TestRedisCodec:
+    @pytest.mark.asyncio
+    async def test_cached_rows_roundtrip_as_json(self):
+        client = FakeRedis()
+        backend = RedisStateBackend(client)
+        expiries = {"crypto": datetime(2026, 1, 1, tzinfo=UTC), "group": None}
+        settings = GroupSettingsRow(**{**dict.fromkeys(GroupSettingsRow.__slots__), "chat_id": -100, "owner_id": 1})
+        positions = (Position("bitcoin", "BTC", 50_000.0, 0.5),)
+        for key, value in (("tier", expiries), ("settings", settings), ("positions", positions)):
+            await backend.set(key, value)
+            assert await backend.get(key) == value
+        assert json.loads(client.values["zenith:tier"])["crypto"] == {"__datetime__": "2026-01-01T00:00:00+00:00"}
+
+    @pytest.mark.asyncio
+    async def test_pickles_and_unregistered_types_are_refused(self):
+        client = FakeRedis()
+        backend = RedisStateBackend(client)
+        client.values["zenith:evil"] = pickle.dumps({"x": 1})
+        assert await backend.get("evil") is None
+        with pytest.raises(TypeError):
+            await backend.set("obj", object())
+
+    @pytest.mark.asyncio
+    async def test_incr_sets_the_ttl_in_the_same_transaction(self):
+        client = FakeRedis()
+        calls = []
+        pipeline = client.pipeline
+
+        def recording_pipeline(transaction=True):
+            pipe = pipeline(transaction)
+            calls.append(pipe._calls)
+            return pipe
+
+        client.pipeline = recording_pipeline
+        backend = RedisStateBackend(client)
+        await backend.incr("flood:1", ttl=60)
+        await backend.incr("flood:1", ttl=0.01)
+        assert [[name for name, _, _ in c] for c in calls] == [["incrby", "pexpire"]] * 2
+        time.sleep(0.02)
+        assert await backend.get("flood:1") == 2
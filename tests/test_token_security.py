@@ -0,0 +1,105 @@
+"""Tests for the two-tier GoPlus security cache."""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from core.database import AsyncSessionLocal, init_db
+from zenith_crypto_bot.models import TokenSecurity
+from zenith_crypto_bot.token_security import FIELD_TTLS, RISK_FIELDS, SecurityRecord, SecurityStore
+
+PEPE = "0x6982508145454Ce325dDbE47a25d4ec3d2311933"
+SHIB = "0x95aD61b0a150d79219dCF64E1E6Cc01f0B64C4cE"
+
+
+def _report(name: str) -> dict:
+    return {"token_name": name, "is_honeypot": "0", "holder_count": "1000"}
+
+
+class _GoPlus:
+    def __init__(self):
+        self.batches: list[list[str]] = []
+        self.chains: list[str] = []
+        self.down = False
+
+    async def fetch(self, chain_id: str, contracts: list[str]) -> dict | None:
+        self.batches.append(contracts)
+        self.chains.append(chain_id)
+        if self.down:
+            return None
+        return {c: _report(c[-4:]) for c in contracts if c != SHIB.lower()}
+
+
+@pytest.fixture
+async def goplus():
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(TokenSecurity))
+        await session.commit()
+    return _GoPlus()
+
+
+class TestSecurityRecord:
+    def test_freshness_follows_the_fields_read(self):
+        record = SecurityRecord({}, time.time() - 2 * 3600)
+        assert record.fresh_for(["token_name", "is_proxy"])
+        assert not record.fresh_for(["token_name", "holder_count"])
+        assert record.fresh_for(RISK_FIELDS)
+        assert FIELD_TTLS["holder_count"] < FIELD_TTLS["is_honeypot"]
+
+
+class TestSecurityStore:
+    @pytest.mark.asyncio
+    async def test_misses_are_fetched_per_chain_and_unknowns_remembered(self, goplus):
+        store = SecurityStore(goplus.fetch, batch_size=1, name="test.security")
+        pepe, shib, bsc = await asyncio.gather(store.get(PEPE), store.get(SHIB), store.get(PEPE, chain_id="56"))
+        assert pepe == bsc == _report(PEPE.lower()[-4:])
+        assert shib is None
+        assert goplus.chains == ["1", "1", "56"]
+        assert goplus.batches == [[PEPE.lower()], [SHIB.lower()], [PEPE.lower()]]
+
+        assert await store.get(PEPE.lower()) == pepe
+        assert await store.get(SHIB) is None
+        assert len(goplus.batches) == 3
+        assert (store.hits, store.misses) == (1, 4)
+
+    @pytest.mark.asyncio
+    async def test_results_survive_a_restart_in_the_table(self, goplus):
+        await SecurityStore(goplus.fetch, name="test.security").get(PEPE)
+        restarted = SecurityStore(goplus.fetch, name="test.security")
+        record = await restarted.cached(PEPE)
+        assert record.data["token_name"] == PEPE.lower()[-4:]
+        assert record.age < 60
+        assert await restarted.get(PEPE) == record.data
+        assert len(goplus.batches) == 1
+
+    @pytest.mark.asyncio
+    async def test_only_expired_fields_trigger_a_refetch(self, goplus):
+        store = SecurityStore(goplus.fetch, name="test.security")
+        await store.get(PEPE)
+        store._memory[("1", PEPE.lower())].fetched_at -= 2 * 3600
+        await store.get(PEPE, fields=RISK_FIELDS)
+        assert len(goplus.batches) == 1
+        await store.get(PEPE)
+        assert len(goplus.batches) == 2
+        assert store._memory[("1", PEPE.lower())].age < 60
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_while_goplus_is_down(self, goplus):
+        store = SecurityStore(goplus.fetch, name="test.security")
+        first = await store.get(PEPE)
+        store._memory[("1", PEPE.lower())].fetched_at -= 2 * 3600
+        goplus.down = True
+        assert await store.get(PEPE) == first
+        assert len(goplus.batches) == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_soon_batches_in_the_background(self, goplus):
+        store = SecurityStore(goplus.fetch, name="test.security")
+        store.refresh_soon(PEPE)
+        store.refresh_soon(PEPE)
+        assert goplus.batches == []
+        await asyncio.sleep(0.1)
+        assert goplus.batches == [[PEPE.lower()]]
@@ -0,0 +1,110 @@
+"""Tests for sampled in-process tracing and correlation id propagation."""
+
+from datetime import UTC, datetime
+
+import pytest
+from telegram import Chat, Message, Update, User
+
+from core import tracing
+from core.database import init_db
+from core.gateway import gateway_middleware
+from core.logger import get_correlation_id
+from zenith_crypto_bot.repository import CryptoSubscriptionRepo
+
+
+@pytest.fixture
+def _keep_all(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    tracing.reset_traces()
+    yield
+    tracing.reset_traces()
+
+
+def _command_update(update_id: int, user_id: int, text: str = "/start") -> Update:
+    user = User(id=user_id, first_name="Trace", is_bot=False)
+    message = Message(
+        message_id=1, date=datetime.now(UTC), chat=Chat(id=user_id, type="private"), from_user=user, text=text
+    )
+    return Update(update_id=update_id, message=message)
+
+
+class TestSpans:
+    @pytest.mark.usefixtures("_keep_all")
+    def test_spans_nest_under_the_current_span(self):
+        with (
+            tracing.start_trace("/start") as trace,
+            tracing.span("handler", "stage") as handler,
+            tracing.span("api.example.com", "http"),
+        ):
+            pass
+        http, outer = trace.spans
+        assert outer is handler
+        assert outer.parent_id == trace.root_id
+        assert http.parent_id == handler.span_id
+        assert tracing.get_recent_traces()[0]["trace_id"] == trace.trace_id
+
+    def test_span_outside_a_trace_is_a_noop(self):
+        with tracing.span("orphan") as current:
+            assert current is None
+
+    def test_unsampled_fast_traces_are_dropped(self, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+        tracing.reset_traces()
+        with tracing.start_trace("/fast"):
+            pass
+        assert tracing.get_recent_traces() == []
+
+    def test_failed_traces_are_always_kept(self, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+        tracing.reset_traces()
+        with pytest.raises(ValueError, match="bad input"), tracing.start_trace("/boom"), tracing.span("handler"):
+            raise ValueError("bad input")
+        assert tracing.get_recent_traces()[0]["error"] == "ValueError"
+
+    def test_correlation_id_is_scoped_to_the_trace(self):
+        with tracing.start_trace("/start") as trace:
+            assert get_correlation_id() == trace.trace_id
+        assert get_correlation_id() is None
+
+    @pytest.mark.usefixtures("_keep_all")
+    def test_otlp_payload_links_spans_to_the_root(self):
+        with tracing.start_trace("/start", update_id=7) as trace, tracing.span("handler", "stage"):
+            tracing.record_span("CryptoSubscriptionRepo.get_user", "db", trace.start)
+        exporter = tracing.OTLPExporter("http://localhost:4318/v1/traces", "monolith-test")
+        spans = exporter.payload([trace])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        root, db, handler = spans
+        assert root["spanId"] == trace.root_id
+        assert {db["traceId"], handler["traceId"]} == {trace.trace_id}
+        assert db["parentSpanId"] == handler["spanId"]
+        assert db["kind"] == 3
+
+
+class TestGatewayTracing:
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("_keep_all")
+    async def test_update_reuses_the_webhook_trace_id(self):
+        await init_db()
+        bot = object()
+        update = _command_update(901, 8101)
+        update.set_bot(bot)
+        trace_id = tracing.begin_ingress(bot, 901)
+
+        async def handler(_update, _context):
+            assert get_correlation_id() == trace_id
+            await CryptoSubscriptionRepo.register_user(8101)
+
+        await gateway_middleware(update, None, handler)
+
+        trace = tracing._recent[-1]
+        assert trace.trace_id == trace_id
+        kinds = {(s.kind, s.name) for s in trace.spans}
+        assert {("stage", "queue_wait"), ("stage", "validation"), ("stage", "handler")} <= kinds
+        assert any(kind == "db" for kind, _ in kinds)
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("_keep_all")
+    async def test_invalid_updates_are_traced_as_rejected(self):
+        update = Update(update_id=902)
+
+        await gateway_middleware(update, None, None)
+        assert tracing._recent[-1].attributes["rejected"] == "Invalid or missing user ID"
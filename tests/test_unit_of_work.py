@@ -0,0 +1,135 @@
+"""Tests for the per-update unit of work shared by repository calls."""
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import event, select
+
+from core.database import AsyncSessionLocal, after_commit, get_engine, init_db, unit_of_work
+from core.tracing import TracedTransport
+from zenith_crypto_bot.models import CryptoUser
+from zenith_crypto_bot.repository import CryptoSubscriptionRepo
+
+
+@pytest.fixture
+def checkouts():
+    counter = []
+    engine = get_engine().sync_engine
+
+    def on_checkout(*_args):
+        counter.append(1)
+
+    event.listen(engine, "checkout", on_checkout)
+    yield counter
+    event.remove(engine, "checkout", on_checkout)
+
+
+@pytest.fixture
+def checked_out():
+    state = {"now": 0}
+    engine = get_engine().sync_engine
+
+    def on_checkout(*_args):
+        state["now"] += 1
+
+    def on_checkin(*_args):
+        state["now"] -= 1
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    yield state
+    event.remove(engine, "checkout", on_checkout)
+    event.remove(engine, "checkin", on_checkin)
+
+
+async def _alerts_enabled(user_id: int) -> bool | None:
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(select(CryptoUser.alerts_enabled).where(CryptoUser.user_id == user_id))
+        return res.scalar_one_or_none()
+
+
+async def _add_then_fail(user_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        session.add(CryptoUser(user_id=user_id, alerts_enabled=True))
+        await session.commit()
+        raise RuntimeError("handler bug")
+
+
+class TestUnitOfWork:
+    @pytest.mark.asyncio
+    async def test_repo_calls_share_one_checkout(self, checkouts):
+        await init_db()
+        checkouts.clear()
+        async with unit_of_work() as uow:
+            await CryptoSubscriptionRepo.register_user(9001)
+            await CryptoSubscriptionRepo.toggle_alerts(9001, True)
+            await CryptoSubscriptionRepo.is_pro(9001)
+            await CryptoSubscriptionRepo.get_days_left(9001)
+
+        assert uow.joins == 4
+        assert len(checkouts) == 1
+        assert await _alerts_enabled(9001) is True
+
+    @pytest.mark.asyncio
+    async def test_failed_block_only_undoes_its_own_work(self):
+        await init_db()
+        async with unit_of_work():
+            await CryptoSubscriptionRepo.register_user(9002)
+            with pytest.raises(RuntimeError, match="handler bug"):
+                await _add_then_fail(9003)
+            await CryptoSubscriptionRepo.toggle_alerts(9002, True)
+
+        assert await _alerts_enabled(9002) is True
+        assert await _alerts_enabled(9003) is None
+
+    @pytest.mark.asyncio
+    async def test_spawned_tasks_use_their_own_sessions(self):
+        await init_db()
+        async with unit_of_work() as uow:
+            await asyncio.gather(
+                CryptoSubscriptionRepo.register_user(9004),
+                CryptoSubscriptionRepo.register_user(9005),
+            )
+        assert uow.joins == 0
+        assert await _alerts_enabled(9004) is False
+
+    @pytest.mark.asyncio
+    async def test_after_commit_waits_for_the_real_commit(self):
+        await init_db()
+        seen = []
+
+        async def check():
+            seen.append(await _alerts_enabled(9006))
+
+        await after_commit(check)
+        assert seen == [None]
+        async with unit_of_work() as uow:
+            await CryptoSubscriptionRepo.register_user(9006)
+            await CryptoSubscriptionRepo.toggle_alerts(9006, True)
+            await after_commit(check)
+            assert seen == [None]
+            assert len(uow.deferred) == 1
+        assert seen == [None, True]
+
+    @pytest.mark.asyncio
+    async def test_connection_is_returned_during_external_calls(self, checked_out, monkeypatch):
+        await init_db()
+        during_call = []
+
+        async def upstream(_transport, request):
+            # Another worker sees the committed rows while this handler waits
+            during_call.append((checked_out["now"], await asyncio.create_task(_alerts_enabled(9007))))
+            return httpx.Response(200, request=request)
+
+        monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", upstream)
+        async with unit_of_work() as uow, httpx.AsyncClient(transport=TracedTransport()) as client:
+            await CryptoSubscriptionRepo.register_user(9007)
+            await CryptoSubscriptionRepo.toggle_alerts(9007, True)
+            assert checked_out["now"] == 1
+            await client.get("https://api.example.com/price")
+            assert uow.session is None
+            assert await CryptoSubscriptionRepo.is_pro(9007) is False
+
+        assert during_call == [(0, True)]
+        assert checked_out["now"] == 0
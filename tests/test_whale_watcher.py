@@ -0,0 +1,110 @@
+"""Tests for block-following whale detection."""
+
+import pytest
+
+from zenith_crypto_bot import whale_watcher as watcher_module
+from zenith_crypto_bot.whale_watcher import WhaleWatcher
+
+BINANCE = "0x28c6c06298d514db089934071355e5743bf21d60"
+
+
+def _tx(n: int, eth: float, sender: str = "0xaaa", recipient: str = "0xbbb") -> dict:
+    return {"hash": f"0x{n:064x}", "from": sender, "to": recipient, "value": hex(int(eth * 10**18))}
+
+
+def _block(number: int, *txs: dict) -> dict:
+    return {"number": hex(number), "timestamp": hex(1_700_000_000 + number), "transactions": list(txs)}
+
+
+class _Node:
+    def __init__(self, head: int):
+        self.head = head
+        self.blocks: dict[int, dict] = {}
+        self.failing: set[int] = set()
+        self.batches: list[list[int]] = []
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    async def block_number(self) -> int:
+        return self.head
+
+    async def batch(self, calls):
+        numbers = [int(params[0], 16) for _, params in calls]
+        self.batches.append(numbers)
+        return [None if n in self.failing else self.blocks.get(n, _block(n)) for n in numbers]
+
+
+class TestFilterBlock:
+    def test_thresholds_for_known_and_unknown_addresses(self):
+        watcher = WhaleWatcher(wallets=[BINANCE], min_eth=50, any_min_eth=1000)
+        block = _block(
+            1,
+            _tx(1, 49.9, sender=BINANCE),
+            _tx(2, 50, recipient=BINANCE.upper()),
+            _tx(3, 999),
+            _tx(4, 1000),
+            _tx(5, 0),
+        )
+        whales = watcher.filter_block(block)
+        assert [w["hash"][-1] for w in whales] == ["2", "4"]
+        assert whales[0]["to"] == BINANCE
+        assert whales[0]["value_eth"] == 50.0
+        assert whales[1]["block"] == 1
+
+
+class TestWhaleWatcher:
+    @pytest.mark.asyncio
+    async def test_follows_new_blocks_in_one_batch_and_deduplicates(self, monkeypatch):
+        node = _Node(head=100)
+        monkeypatch.setattr(watcher_module, "eth_rpc", node)
+        watcher = WhaleWatcher(wallets=[BINANCE], min_eth=50, any_min_eth=1000)
+
+        node.blocks[100] = _block(100, _tx(1, 60, sender=BINANCE))
+        assert len(await watcher.poll()) == 1
+
+        node.head = 103
+        node.blocks[102] = _block(102, _tx(1, 60, sender=BINANCE), _tx(2, 5000))
+        fresh = await watcher.poll()
+        assert [tx["hash"] for tx in fresh] == [_tx(2, 0)["hash"]]
+        assert node.batches == [[100], [101, 102, 103]]
+        assert await watcher.poll() == []
+
+    @pytest.mark.asyncio
+    async def test_blocks_that_fail_are_retried_with_the_rest(self, monkeypatch):
+        node = _Node(head=100)
+        monkeypatch.setattr(watcher_module, "eth_rpc", node)
+        watcher = WhaleWatcher(wallets=[BINANCE], min_eth=50, any_min_eth=1000)
+        await watcher.poll()
+
+        node.head = 103
+        node.failing = {102}
+        node.blocks[102] = _block(102, _tx(1, 5000))
+        node.blocks[103] = _block(103, _tx(2, 5000))
+        assert await watcher.poll() == []
+
+        node.failing.clear()
+        fresh = await watcher.poll()
+        assert [tx["block"] for tx in fresh] == [102, 103]
+        assert node.batches[-2:] == [[101, 102, 103], [102, 103]]
+
+    @pytest.mark.asyncio
+    async def test_long_gaps_skip_to_the_recent_blocks(self, monkeypatch):
+        node = _Node(head=10)
+        monkeypatch.setattr(watcher_module, "eth_rpc", node)
+        watcher = WhaleWatcher(max_blocks=3)
+        await watcher.poll()
+        node.head = 50
+        await watcher.poll()
+        assert node.batches[-1] == [48, 49, 50]
+
+    def test_digest_sends_the_largest_transfers_once_per_interval(self):
+        watcher = WhaleWatcher(alert_interval=60)
+        watcher.collect([{"hash": "0x1", "value_eth": 80.0, "timestamp": "1"}])
+        watcher.collect([{"hash": f"0x{n}", "value_eth": eth, "timestamp": str(n)} for n, eth in [(2, 500), (3, 80)]])
+        assert [tx["hash"] for tx in watcher.digest(limit=2)] == ["0x2", "0x3"]
+        watcher.collect([{"hash": "0x4", "value_eth": 900.0, "timestamp": "4"}])
+        assert watcher.digest() == []
+        watcher._next_digest = 0
+        assert [tx["hash"] for tx in watcher.digest()] == ["0x4"]